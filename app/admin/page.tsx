@@ -1,11 +1,12 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { useAuth } from "@/lib/auth-context"
 import { useRouter } from "next/navigation"
 import { FileText, Download, X } from "lucide-react"
 import AdminNavigation from "@/components/admin-navigation"
 import { LocalStorageDebugger } from "@/lib/debug-localstorage"
+import { mergeChatMessages, subscribeToChat } from "@/lib/chat-stream"
 
 export default function AdminDashboard() {
   const { user } = useAuth()
@@ -44,18 +45,34 @@ export default function AdminDashboard() {
   const [isAuthChecking, setIsAuthChecking] = useState(true)
   const [isRefreshing, setIsRefreshing] = useState(false)
   const [lastRefresh, setLastRefresh] = useState<Date | null>(null)
+  // next_since of the last /admin/messages response; refreshes fetch only newer messages
+  const chatCursor = useRef<string | null>(null)
 
-  // Auto-refresh data every 10 seconds for better real-time experience
+  // Auto-refresh data every 10 seconds; chat messages only sync what is new since the last load
   useEffect(() => {
     const refreshInterval = setInterval(() => {
       console.log("[Admin] Auto-refreshing data...")
       setIsRefreshing(true)
-      fetchData().finally(() => setIsRefreshing(false))
+      fetchData(true).finally(() => setIsRefreshing(false))
     }, 10000) // Refresh every 10 seconds
 
     return () => clearInterval(refreshInterval)
   }, [])
 
+  // New and deleted chat messages from every conversation arrive over the chat stream
+  useEffect(() => {
+    if (isAuthChecking) return
+
+    return subscribeToChat({
+      onMessage: (msg) => {
+        setMessages((prev) => mergeChatMessages(prev, [{ ...msg, id: msg.message_id, userId: msg.user_id }]))
+      },
+      onDelete: ({ message_id }) => {
+        setMessages((prev) => prev.filter((m) => m.id !== message_id))
+      }
+    })
+  }, [isAuthChecking])
+
   useEffect(() => {
     // Check authentication on page load
     const checkAuth = () => {
@@ -144,7 +161,9 @@ export default function AdminDashboard() {
     }
   }, [user, router])
 
-  const fetchData = async () => {
+  // refresh: fetch only chat messages newer than the last load (the rest is re-read in full)
+  const fetchData = async (refresh = false) => {
+    const messagesSince = refresh ? chatCursor.current : null
     try {
       console.log("[Admin] Fetching fresh data...")
       
@@ -152,7 +171,7 @@ export default function AdminDashboard() {
       console.log("[Admin] Clearing admin cache data...")
       localStorage.removeItem("adminSubmissions")
       localStorage.removeItem("helpTickets") 
-      localStorage.removeItem("chatMessages")
+      if (!messagesSince) localStorage.removeItem("chatMessages")
       localStorage.removeItem("registeredUsers")
       
       // First, test admin authentication
@@ -176,7 +195,7 @@ export default function AdminDashboard() {
         const [submissionsRes, ticketsRes, messagesRes, usersRes, feedbacksRes] = await Promise.allSettled([
           AdminApiClient.getSubmissions(),
           AdminApiClient.getTickets(),
-          AdminApiClient.getMessages(),
+          AdminApiClient.getMessages(messagesSince),
           AdminApiClient.getUsers(),
           AdminApiClient.getFeedbacks()
         ])
@@ -218,15 +237,16 @@ export default function AdminDashboard() {
         if (messagesRes.status === "fulfilled") {
           const data = messagesRes.value
           loadedMessages = data.messages || []
-          console.log("[Admin] Backend messages:", loadedMessages.length)
+          chatCursor.current = data.next_since || chatCursor.current
+          console.log("[Admin] Backend messages:", loadedMessages.length, messagesSince ? "(delta)" : "")
           console.log("[Admin] Sample message:", loadedMessages[0])
           
-          // If backend returns empty, try to get from localStorage
-          if (loadedMessages.length === 0) {
+          // If backend returns empty, try to get from localStorage; an empty delta just means nothing new
+          if (loadedMessages.length === 0 && !messagesSince) {
             console.log("[Admin] Backend messages empty, aggregating from localStorage...")
             loadedMessages = await aggregateAllChatMessages()
           }
-        } else {
+        } else if (!messagesSince) {
           console.log("[Admin] Backend messages failed, aggregating from localStorage...")
           loadedMessages = await aggregateAllChatMessages()
         }
@@ -291,7 +311,16 @@ export default function AdminDashboard() {
 
         setSubmissions(loadedSubmissions)
         setTickets(transformedTickets)
-        setMessages(transformedMessages)
+        if (messagesSince) {
+          setMessages((prev) => {
+            const merged = mergeChatMessages(prev, transformedMessages)
+            localStorage.setItem("chatMessages", JSON.stringify(merged))
+            return merged
+          })
+        } else {
+          setMessages(transformedMessages)
+          localStorage.setItem("chatMessages", JSON.stringify(transformedMessages))
+        }
         setUsers(loadedUsers)
         setFeedbacks(transformedFeedbacks)
         
@@ -306,7 +335,6 @@ export default function AdminDashboard() {
         // Save fresh data to localStorage
         localStorage.setItem("adminSubmissions", JSON.stringify(loadedSubmissions))
         localStorage.setItem("helpTickets", JSON.stringify(transformedTickets))
-        localStorage.setItem("chatMessages", JSON.stringify(transformedMessages))
         localStorage.setItem("registeredUsers", JSON.stringify(loadedUsers))
         localStorage.setItem("userFeedbacks", JSON.stringify(transformedFeedbacks))
 
@@ -799,17 +827,18 @@ export default function AdminDashboard() {
         const result = await response.json()
         console.log("[Admin] Backend response:", result)
         
+        // The server's ID, so the copy the chat stream delivers replaces this one
         const newMessage = {
-          id: Date.now().toString(),
+          id: result.message_id || Date.now().toString(),
           sender: "admin",
           userId: selectedChatUser.id,
           userName: "Admin",
           userEmail: "admin@example.com",
           text: replyMessage,
-          timestamp: new Date().toISOString(),
+          timestamp: result.timestamp || new Date().toISOString(),
         }
 
-        const updatedMessages = [...messages, newMessage]
+        const updatedMessages = mergeChatMessages(messages, [newMessage])
         setMessages(updatedMessages)
         localStorage.setItem("chatMessages", JSON.stringify(updatedMessages))
         setReplyMessage("")
@@ -875,7 +904,16 @@ export default function AdminDashboard() {
         localStorage.setItem("adminSubmissions", JSON.stringify(updatedSubmissions))
         setStatusUpdate("")
         setSelectedSubmission(null)
-        alert("Status updated successfully!")
+        if (updated?.notified === false && updated?.notify_error) {
+          // The status is saved either way; only the email needs another try
+          if (confirm("Status updated, but the email to the user could not be queued. Try sending it again?")) {
+            AdminApiClient.resendStatusNotification(trackingId)
+              .then(() => alert("Notification email queued."))
+              .catch(() => alert("The notification email still could not be queued. Try again later."))
+          }
+        } else {
+          alert("Status updated successfully!")
+        }
         
         // Notify user about status update
         notifyUserStatusUpdate(trackingId, status, statusUpdate)
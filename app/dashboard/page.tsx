@@ -4,6 +4,7 @@ import { useState, useEffect } from "react"
 import { useAuth } from "@/lib/auth-context"
 import { useRouter } from "next/navigation"
 import StatusUpdater from "@/lib/status-updater"
+import { fetchChatMessages, mergeChatMessages, subscribeToChat } from "@/lib/chat-stream"
 import { getTrackingId, getFormTitle, getFormType, findSubmissionByTrackingId, matchesTrackingId, getTrackingIdDisplay, copyTrackingIdToClipboard } from "@/lib/tracking-utils"
 import { 
   FileText, 
@@ -45,6 +46,10 @@ interface UserStats {
 }
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
+const SUBMISSIONS_PAGE_SIZE = 50
+const CHAT_HISTORY_PAGE_SIZE = 100
+
+const submissionKey = (submission: any) => submission.tracking_id || submission.trackingId || submission.id
 
 export default function UserDashboard() {
   const { user, isLoading } = useAuth()
@@ -58,6 +63,8 @@ export default function UserDashboard() {
     thisMonthSubmissions: 0
   })
   const [loading, setLoading] = useState(true)
+  const [hasMoreSubmissions, setHasMoreSubmissions] = useState(false)
+  const [loadingMoreSubmissions, setLoadingMoreSubmissions] = useState(false)
   const [searchTerm, setSearchTerm] = useState("")
   const [statusFilter, setStatusFilter] = useState("all")
   const [sortBy, setSortBy] = useState("newest")
@@ -66,6 +73,7 @@ export default function UserDashboard() {
   const [showChat, setShowChat] = useState(false)
   const [chatMessage, setChatMessage] = useState("")
   const [chatMessages, setChatMessages] = useState<any[]>([])
+  const [chatHistoryBefore, setChatHistoryBefore] = useState<string | null>(null)
   
   // Help ticket state
   const [showHelpTicket, setShowHelpTicket] = useState(false)
@@ -94,7 +102,7 @@ export default function UserDashboard() {
       console.log("[Dashboard] User ID:", user.id)
       loadUserSubmissions()
       loadChatMessages()
-      fetchChatMessagesFromBackend() // Fetch messages from backend
+      syncChatMessages() // Only what the local copy is missing
       loadUserTickets()
       loadUserFeedbacks()
     }
@@ -119,22 +127,47 @@ export default function UserDashboard() {
     }
   }, [user, router])
 
+  // Receive admin replies as they are sent instead of re-fetching the whole history
+  useEffect(() => {
+    if (!user) return
+
+    const unsubscribe = subscribeToChat({
+      onMessage: (msg) => {
+        updateChatMessages((prev) => mergeChatMessages(prev, [toChatMessage(msg)]))
+      },
+      onDelete: ({ message_id }) => {
+        updateChatMessages((prev) => prev.filter((m) => m.id !== message_id))
+      }
+    })
+
+    return unsubscribe
+  }, [user])
+
+  const fetchSubmissionsPage = (offset: number) =>
+    fetch(`${API_BASE_URL}/user/submissions?limit=${SUBMISSIONS_PAGE_SIZE}&offset=${offset}`, {
+      headers: {
+        'Authorization': `Bearer ${localStorage.getItem('token')}`,
+        'Content-Type': 'application/json'
+      }
+    })
+
   const loadUserSubmissions = async () => {
     try {
       setLoading(true)
       
       // Try to fetch from backend first
       try {
-        const response = await fetch(`${API_BASE_URL}/user/submissions`, {
-          headers: {
-            'Authorization': `Bearer ${localStorage.getItem('token')}`,
-            'Content-Type': 'application/json'
-          }
-        })
+        const response = await fetchSubmissionsPage(0)
         
         if (response.ok) {
           const data = await response.json()
-          setSubmissions(data.submissions || [])
+          const firstPage = data.submissions || []
+          // Refreshes replace the newest page but keep older pages already loaded
+          setSubmissions((prev) => {
+            const fresh = new Set(firstPage.map(submissionKey))
+            return [...firstPage, ...prev.slice(SUBMISSIONS_PAGE_SIZE).filter((s) => !fresh.has(submissionKey(s)))]
+          })
+          setHasMoreSubmissions(Boolean(data.has_more))
           setStats(data.stats || stats)
           return
         }
@@ -277,6 +310,25 @@ export default function UserDashboard() {
     }
   }
 
+  const loadMoreSubmissions = async () => {
+    setLoadingMoreSubmissions(true)
+    try {
+      const response = await fetchSubmissionsPage(submissions.length)
+      if (response.ok) {
+        const data = await response.json()
+        setSubmissions((prev) => {
+          const seen = new Set(prev.map(submissionKey))
+          return [...prev, ...(data.submissions || []).filter((s: any) => !seen.has(submissionKey(s)))]
+        })
+        setHasMoreSubmissions(Boolean(data.has_more))
+      }
+    } catch (error) {
+      console.error("[Dashboard] Error loading more submissions:", error)
+    } finally {
+      setLoadingMoreSubmissions(false)
+    }
+  }
+
   const calculateStats = (submissions: FormSubmission[]) => {
     const now = new Date()
     const thisMonth = new Date(now.getFullYear(), now.getMonth(), 1)
@@ -341,52 +393,68 @@ export default function UserDashboard() {
     }
   }
 
-  const fetchChatMessagesFromBackend = async () => {
+  const toChatMessage = (msg: any) => ({
+    id: msg.message_id || msg._id,
+    sender: msg.sender,
+    userId: msg.user_id,
+    userName: msg.user_name || msg.userName || (msg.sender === "admin" ? "Admin" : user?.name),
+    userEmail: msg.user_email || msg.userEmail || (msg.sender === "admin" ? "admin@example.com" : user?.email),
+    text: msg.text,
+    timestamp: msg.timestamp || msg.created_at
+  })
+
+  // Keep the local copy and its cursor together, so the next sync only asks for newer messages
+  const storeChatMessages = (messages: any[], cursor?: string | null) => {
+    if (!user) return
+    localStorage.setItem(`userChatMessages_${user.id}`, JSON.stringify(messages))
+    if (cursor) localStorage.setItem(`userChatCursor_${user.id}`, cursor)
+  }
+
+  const updateChatMessages = (update: (prev: any[]) => any[], cursor?: string | null) => {
+    setChatMessages((prev) => {
+      const next = update(prev)
+      storeChatMessages(next, cursor)
+      return next
+    })
+  }
+
+  // Delta sync by cursor: the newest page the first time, then only messages after next_since.
+  // New messages also arrive over the chat stream; this catches up after the page was closed.
+  const syncChatMessages = async () => {
     if (!user) return
 
     try {
-      const token = localStorage.getItem('token')
-      if (!token) {
-        console.log("[Dashboard] No token found, skipping backend fetch")
+      const cached = JSON.parse(localStorage.getItem(`userChatMessages_${user.id}`) || "[]")
+      const since = cached.length ? localStorage.getItem(`userChatCursor_${user.id}`) : null
+      const page = await fetchChatMessages(since ? { since } : { limit: CHAT_HISTORY_PAGE_SIZE })
+      if (!page) {
+        console.error("[Dashboard] Failed to sync chat messages from backend")
         return
       }
 
-      console.log("[Dashboard] Fetching chat messages from backend...")
-      const response = await fetch('http://localhost:8000/chat/messages', {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
-        }
-      })
-
-      if (response.ok) {
-        const data = await response.json()
-        const messages = data.messages || []
-        console.log("[Dashboard] Fetched messages from backend:", messages.length)
-        
-        // Transform messages to match frontend format
-        const transformedMessages = messages.map((msg: any) => ({
-          id: msg.message_id || msg._id,
-          sender: msg.sender,
-          userId: msg.user_id,
-          userName: msg.user_name || msg.userName || (msg.sender === "admin" ? "Admin" : user.name),
-          userEmail: msg.user_email || msg.userEmail || (msg.sender === "admin" ? "admin@example.com" : user.email),
-          text: msg.text,
-          timestamp: msg.timestamp || msg.created_at
-        }))
-
-        setChatMessages(transformedMessages)
-        
-        // Save to localStorage
-        localStorage.setItem(`userChatMessages_${user.id}`, JSON.stringify(transformedMessages))
-        
-        console.log("[Dashboard] Updated chat messages:", transformedMessages.length)
+      const incoming = page.messages.map(toChatMessage)
+      console.log("[Dashboard] Synced chat messages from backend:", incoming.length, since ? "(delta)" : "(newest page)")
+      if (since) {
+        updateChatMessages((prev) => mergeChatMessages(prev, incoming), page.next_since)
       } else {
-        console.error("[Dashboard] Failed to fetch messages from backend:", response.status)
+        updateChatMessages(() => incoming, page.next_since)
+        setChatHistoryBefore(page.has_more ? page.next_before || null : null)
+      }
+    } catch (error) {
+      console.error("[Dashboard] Error syncing chat messages from backend:", error)
+    }
+  }
+
+  const loadEarlierChatMessages = async () => {
+    if (!chatHistoryBefore) return
+    try {
+      const page = await fetchChatMessages({ before: chatHistoryBefore, limit: CHAT_HISTORY_PAGE_SIZE })
+      if (page) {
+        updateChatMessages((prev) => mergeChatMessages(prev, page.messages.map(toChatMessage)))
+        setChatHistoryBefore(page.has_more ? page.next_before || null : null)
       }
     } catch (error) {
-      console.error("[Dashboard] Error fetching chat messages from backend:", error)
+      console.error("[Dashboard] Error loading earlier chat messages:", error)
     }
   }
 
@@ -406,7 +474,7 @@ export default function UserDashboard() {
     try {
       // Send message to backend database
       const token = localStorage.getItem('token')
-      const response = await fetch('http://localhost:8000/chat/messages', {
+      const response = await fetch(`${API_BASE_URL}/chat/messages`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -419,12 +487,11 @@ export default function UserDashboard() {
       })
 
       if (response.ok) {
-        console.log("[Dashboard] Message sent to backend successfully")
         const result = await response.json()
-        console.log("[Dashboard] Backend response:", result)
-        
-        // Refresh messages from backend after sending
-        await fetchChatMessagesFromBackend()
+        console.log("[Dashboard] Message sent to backend successfully:", result)
+        // Keep the server's ID, so the copy the chat stream delivers replaces this one
+        newMessage.id = result.message_id || newMessage.id
+        newMessage.timestamp = result.timestamp || newMessage.timestamp
       } else {
         console.error("[Dashboard] Failed to send message to backend:", response.status)
         // Fallback to localStorage if backend fails
@@ -435,11 +502,7 @@ export default function UserDashboard() {
     }
 
     // Always update local state and localStorage (for immediate UI update)
-    const updatedMessages = [...chatMessages, newMessage]
-    setChatMessages(updatedMessages)
-    
-    // Save to localStorage
-    localStorage.setItem(`userChatMessages_${user.id}`, JSON.stringify(updatedMessages))
+    updateChatMessages((prev) => mergeChatMessages(prev, [newMessage]))
     
     // Also save to global chat messages for admin
     const globalMessages = JSON.parse(localStorage.getItem("chatMessages") || "[]")
@@ -789,6 +852,16 @@ export default function UserDashboard() {
                 </div>
               ) : (
                 <div className="space-y-3">
+                  {chatHistoryBefore && (
+                    <div className="text-center">
+                      <button
+                        onClick={loadEarlierChatMessages}
+                        className="text-sm text-blue-600 hover:underline"
+                      >
+                        Load earlier messages
+                      </button>
+                    </div>
+                  )}
                   {chatMessages.map((message) => (
                     <div
                       key={message.id}
@@ -825,7 +898,7 @@ export default function UserDashboard() {
                 className="flex-1 px-4 py-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-green-500 focus:border-green-500"
               />
               <button
-                onClick={fetchChatMessagesFromBackend}
+                onClick={syncChatMessages}
                 className="px-4 py-3 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition flex items-center gap-2"
                 title="Refresh messages"
               >
@@ -1329,6 +1402,19 @@ export default function UserDashboard() {
               ))}
             </div>
           )}
+
+          {hasMoreSubmissions && (
+            <div className="px-6 py-4 border-t border-gray-200 text-center">
+              <button
+                onClick={loadMoreSubmissions}
+                disabled={loadingMoreSubmissions}
+                className="inline-flex items-center gap-2 px-6 py-2 text-blue-600 hover:bg-blue-50 rounded-lg transition-colors disabled:opacity-50"
+              >
+                <RefreshCw className={`w-4 h-4 ${loadingMoreSubmissions ? "animate-spin" : ""}`} />
+                {loadingMoreSubmissions ? "Loading..." : "Load older submissions"}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
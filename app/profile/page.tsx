@@ -4,6 +4,7 @@ import type React from "react"
 
 import { useState, useEffect } from "react"
 import { useAuth } from "@/lib/auth-context"
+import { resolveFileUrl } from "@/lib/file-url"
 import { useRouter } from "next/navigation"
 import { Camera, User, Mail, Phone, MapPin, Save, Settings, HelpCircle, LogOut, Upload, FileText, X, ArrowLeft, Trash2, Filter } from "lucide-react"
 
@@ -59,7 +60,7 @@ export default function ProfilePage() {
           address: data.profile?.address || "",
           photo: data.profile?.photo || data.photo || "",
         })
-        setPhotoPreview(data.profile?.photo || data.photo || "")
+        setPhotoPreview(resolveFileUrl(data.profile?.photo || data.photo))
       }
     } catch (error) {
       console.error("Error loading profile:", error)
@@ -437,7 +438,8 @@ export default function ProfilePage() {
                 {filteredDocuments.map((doc, index) => {
                   const fileUrl = doc.document_data?.file_url || doc.file_url
                   const isBase64 = fileUrl && fileUrl.startsWith('data:')
-                  const isCloudinary = fileUrl && !isBase64
+                  const isStored = fileUrl && fileUrl.startsWith('/files/')
+                  const isCloudinary = fileUrl && !isBase64 && !isStored
                   
                   // Get the correct document ID
                   const docId = doc._id || doc.id || doc.document_id
@@ -466,10 +468,10 @@ export default function ProfilePage() {
                       </p>
                       
                       {/* Show preview for base64 images */}
-                      {isBase64 && doc.document_data?.file_type?.startsWith('image/') && (
+                      {(isBase64 || isStored) && doc.document_data?.file_type?.startsWith('image/') && (
                         <div className="mb-2 rounded overflow-hidden border border-gray-300">
                           <img
-                            src={fileUrl}
+                            src={resolveFileUrl(fileUrl)}
                             alt={doc.document_type}
                             className="w-full h-32 object-cover"
                           />
@@ -478,9 +480,9 @@ export default function ProfilePage() {
                       
                       {/* View document link */}
                       <div className="flex items-center gap-2 mt-3">
-                        {isCloudinary ? (
+                        {isCloudinary || isStored ? (
                           <a
-                            href={fileUrl}
+                            href={resolveFileUrl(fileUrl)}
                             target="_blank"
                             rel="noopener noreferrer"
                             className="text-blue-600 hover:text-blue-800 text-sm font-medium"
@@ -1,15 +1,19 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, WebSocket, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, WebSocket, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel
+import asyncio
+import functools
+import hashlib
+import time
 import uuid
 import os
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from contextlib import asynccontextmanager
 from typing import Optional
-import cloudinary
-import cloudinary.uploader
 
 class GoogleAuthRequest(BaseModel):
     code: str
@@ -32,23 +36,63 @@ class PasswordResetConfirmRequest(BaseModel):
     new_password: str
 
 from config import *
-from database import DatabaseService
+from database import DB_TYPE, DatabaseService, DatabaseUnavailableError, VersionConflictError, user_cache
+from db_health import HealthMonitor
 from services.auth_service import AuthService
 from services.openai_service import OpenAIService
 from chat_database import ChatDatabaseService
+from forms_registry import FORMS_DB, form_field_ids
+from file_storage import (
+    file_storage, file_url, parse_range, save_data_url, signed_file_url, stored_file_url, verify_file_signature
+)
+from pdf_cache import pdf_cache, pdf_cache_key
+from pdf_renderer import RenderPoolBusy, RenderTimeout, render_pool
+from smtp_pool import smtp_pool
+from email_outbox import EMAIL_OUTBOX_WORKER, OutboxWorker, email_outbox
+from submission_export import EXPORT_FORMATS, export_submissions
+from pdf_export import export_pdf_zip
+from submission_artifacts import delete_pdf_artifact, publish_submission_pdf, queue_submission_confirmation, render_to_cache
+from search_index import SEARCH_KINDS, query_terms, search_result
+from chat_events import catch_up, chat_broker, chat_cursor, format_sse, ALL_CONVERSATIONS, CHAT_STREAM_HEARTBEAT_SECONDS
 from services.email_service import EmailService
-from services.pdf_service import PDFService
 from services.user_service import UserService
-from middleware import get_current_user, get_current_user_optional, require_admin
-
-app = FastAPI(title="Legal Voice App API", version="2.0.0")
-
-# Configure Cloudinary once at startup
-cloudinary.config(
-    cloud_name=CLOUDINARY_CLOUD_NAME,
-    api_key=CLOUDINARY_API_KEY,
-    api_secret=CLOUDINARY_API_SECRET
-)
+from middleware import get_current_user, get_current_user_optional, require_admin, is_admin
+
+# Background probe of the configured database, reported by /health
+database_health = HealthMonitor(DB_TYPE, DatabaseService.ping)
+# Delivers queued emails on a thread here, unless email_worker.py runs separately
+email_worker = OutboxWorker(email_outbox, EmailService.deliver_batch)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect to the database before serving; an unreachable database fails startup"""
+    await asyncio.to_thread(DatabaseService.connect)
+    await database_health.check()
+    database_health.start()
+    if EMAIL_OUTBOX_WORKER == "inline":
+        email_worker.start()
+    try:
+        yield
+    finally:
+        await database_health.stop()
+        await asyncio.to_thread(email_worker.stop)
+        await asyncio.to_thread(render_pool.shutdown)
+        await asyncio.to_thread(smtp_pool.close)
+        await asyncio.to_thread(DatabaseService.close)
+
+app = FastAPI(title="Legal Voice App API", version="2.0.0", lifespan=lifespan)
+
+@functools.lru_cache(maxsize=None)
+def cloudinary_uploader():
+    """Import and configure Cloudinary on first upload; it is optional and slow to import"""
+    import cloudinary
+    import cloudinary.uploader
+    cloudinary.config(
+        cloud_name=CLOUDINARY_CLOUD_NAME,
+        api_key=CLOUDINARY_API_KEY,
+        api_secret=CLOUDINARY_API_SECRET
+    )
+    return cloudinary.uploader
 
 # CORS middleware
 app.add_middleware(
@@ -57,170 +101,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Content-Range", "Content-Disposition"],
 )
 
 security = HTTPBearer()
 
-FORMS_DB = {
-    "name_change": {
-        "id": "name_change",
-        "title": "Name Change Affidavit",
-        "description": "Apply for official name change",
-        "fields": [
-            {"id": "applicant_full_name", "label": "Full Name", "type": "text", "required": True, "help": "Your current full legal name"},
-            {"id": "applicant_age", "label": "Age", "type": "number", "required": True, "help": "Your age in years"},
-            {"id": "applicant_father_name", "label": "Father's Name", "type": "text", "required": True, "help": "Father or guardian's full name"},
-            {"id": "current_address", "label": "Current Address", "type": "textarea", "required": True, "help": "Full residential address with PIN code"},
-            {"id": "previous_name", "label": "Previous Name", "type": "text", "required": True, "help": "The name you used earlier"},
-            {"id": "new_name", "label": "New Name", "type": "text", "required": True, "help": "The new name you want officially"},
-            {"id": "reason", "label": "Reason for Change", "type": "textarea", "required": True, "help": "Short reason, e.g., marriage, spelling correction"},
-            {"id": "date_of_declaration", "label": "Date of Declaration", "type": "date", "required": True, "help": "Date when you sign this form"},
-            {"id": "place", "label": "Place", "type": "text", "required": True, "help": "City/town where you sign"},
-            {"id": "id_proof_type", "label": "ID Proof Type", "type": "select", "required": True, "options": ["Aadhar", "Passport", "Voter ID", "Driving Licence"]},
-            {"id": "id_proof_number", "label": "ID Proof Number", "type": "text", "required": True, "help": "ID number from selected proof"},
-        ]
-    },
-    "property_dispute": {
-        "id": "property_dispute",
-        "title": "Property Dispute Plaint",
-        "description": "File a property dispute case",
-        "fields": [
-            {"id": "plaintiff_name", "label": "Your Name", "type": "text", "required": True},
-            {"id": "plaintiff_address", "label": "Your Address", "type": "textarea", "required": True},
-            {"id": "defendant_name", "label": "Defendant Name", "type": "text", "required": True},
-            {"id": "defendant_address", "label": "Defendant Address", "type": "textarea", "required": True},
-            {"id": "property_description", "label": "Property Details", "type": "textarea", "required": True},
-            {"id": "nature_of_claim", "label": "Claim Type", "type": "select", "required": True, "options": ["Ownership", "Ejectment", "Partition", "Possession"]},
-            {"id": "value_of_claim", "label": "Claim Value (₹)", "type": "number", "required": True},
-            {"id": "facts_of_case", "label": "Facts of Case", "type": "textarea", "required": True},
-            {"id": "relief_sought", "label": "Relief Sought", "type": "textarea", "required": True},
-        ]
-    },
-    "traffic_fine_appeal": {
-        "id": "traffic_fine_appeal",
-        "title": "Traffic Fine Appeal",
-        "description": "Appeal against traffic challan",
-        "fields": [
-            {"id": "appellant_name", "label": "Your Name", "type": "text", "required": True},
-            {"id": "appellant_address", "label": "Your Address", "type": "textarea", "required": True},
-            {"id": "challan_number", "label": "Challan Number", "type": "text", "required": True},
-            {"id": "vehicle_number", "label": "Vehicle Number", "type": "text", "required": True},
-            {"id": "date_of_challan", "label": "Date of Challan", "type": "date", "required": True},
-            {"id": "offence_details", "label": "Offence Details", "type": "textarea", "required": True},
-            {"id": "explanation", "label": "Explanation", "type": "textarea", "required": True},
-        ]
-    },
-    "mutual_divorce": {
-        "id": "mutual_divorce",
-        "title": "Mutual Divorce Petition",
-        "description": "File for mutual consent divorce",
-        "fields": [
-            {"id": "husband_name", "label": "Husband's Name", "type": "text", "required": True},
-            {"id": "wife_name", "label": "Wife's Name", "type": "text", "required": True},
-            {"id": "marriage_date", "label": "Marriage Date", "type": "date", "required": True},
-            {"id": "marriage_place", "label": "Marriage Place", "type": "text", "required": True},
-            {"id": "reason_for_divorce", "label": "Reason for Divorce", "type": "textarea", "required": True},
-            {"id": "mutual_agreement", "label": "Mutual Agreement", "type": "checkbox", "required": True},
-        ]
-    },
-    "affidavit_general": {
-        "id": "affidavit_general",
-        "title": "General Affidavit",
-        "description": "Sworn statement for verification",
-        "fields": [
-            {"id": "deponent_name", "label": "Your Name", "type": "text", "required": True},
-            {"id": "deponent_age", "label": "Your Age", "type": "number", "required": True},
-            {"id": "deponent_address", "label": "Your Address", "type": "textarea", "required": True},
-            {"id": "statement_text", "label": "Statement", "type": "textarea", "required": True},
-            {"id": "place_of_sworn", "label": "Place of Sworn", "type": "text", "required": True},
-            {"id": "date_of_sworn", "label": "Date of Sworn", "type": "date", "required": True},
-        ]
-    },
-    "name_change_gazette": {
-        "id": "name_change_gazette",
-        "title": "Name Change Gazette Notification",
-        "description": "Apply for name change gazette publication",
-        "fields": [
-            {"id": "applicant_full_name", "label": "Current Full Name", "type": "text", "required": True, "help": "Your current full legal name"},
-            {"id": "new_name", "label": "New Name", "type": "text", "required": True, "help": "Your desired new name"},
-            {"id": "previous_name", "label": "Previous Name", "type": "text", "required": True, "help": "Any previous names"},
-            {"id": "reason", "label": "Reason", "type": "textarea", "required": True, "help": "Reason for name change"},
-            {"id": "publication_address", "label": "Publication Address", "type": "textarea", "required": True, "help": "Address for gazette office"},
-            {"id": "proof_of_publication_fee", "label": "Publication Fee Proof", "type": "file", "required": False, "help": "Upload fee payment proof"},
-            {"id": "date_of_application", "label": "Application Date", "type": "date", "required": True, "help": "Date of application"},
-        ]
-    },
-    "property_dispute_simple": {
-        "id": "property_dispute_simple",
-        "title": "Property Dispute Plaint (Simple)",
-        "description": "File a simple property dispute case",
-        "fields": [
-            {"id": "plaintiff_name", "label": "Plaintiff Name", "type": "text", "required": True, "help": "Your full legal name"},
-            {"id": "plaintiff_address", "label": "Plaintiff Address", "type": "textarea", "required": True, "help": "Your complete address with pincode"},
-            {"id": "defendant_name", "label": "Defendant Name", "type": "text", "required": True, "help": "Defendant full legal name"},
-            {"id": "defendant_address", "label": "Defendant Address", "type": "textarea", "required": True, "help": "Defendant complete address"},
-            {"id": "property_description", "label": "Property Description", "type": "textarea", "required": True, "help": "Location, survey number, or address of property"},
-            {"id": "nature_of_claim", "label": "Nature of Claim", "type": "select", "required": True, "options": ["Ownership", "Ejectment", "Partition", "Possession"], "help": "Type of claim"},
-            {"id": "value_of_claim", "label": "Value of Claim (₹)", "type": "number", "required": True, "help": "Monetary value of claim"},
-            {"id": "facts_of_case", "label": "Facts of Case", "type": "textarea", "required": True, "help": "Detailed facts of the case"},
-            {"id": "relief_sought", "label": "Relief Sought", "type": "textarea", "required": True, "help": "What relief you are seeking"},
-            {"id": "date_of_incident", "label": "Date of Incident", "type": "date", "required": False, "help": "When the incident occurred"},
-            {"id": "evidence_list", "label": "Evidence List", "type": "file", "required": False, "help": "Upload evidence documents"},
-            {"id": "verification_declaration", "label": "I Verify", "type": "boolean", "required": True, "help": "I verify that the above information is true"},
-        ]
-    },
-    "traffic_fine_appeal": {
-        "id": "traffic_fine_appeal",
-        "title": "Traffic Fine Appeal",
-        "description": "Appeal against traffic challan",
-        "fields": [
-            {"id": "appellant_name", "label": "Appellant Name", "type": "text", "required": True, "help": "Your full legal name"},
-            {"id": "appellant_address", "label": "Appellant Address", "type": "textarea", "required": True, "help": "Your complete address"},
-            {"id": "challan_number", "label": "Challan Number", "type": "text", "required": True, "help": "Your traffic fine challan number"},
-            {"id": "vehicle_number", "label": "Vehicle Number", "type": "text", "required": True, "help": "Vehicle registration number"},
-            {"id": "date_of_challan", "label": "Date of Challan", "type": "date", "required": True, "help": "When the challan was issued"},
-            {"id": "offence_details", "label": "Offence Details", "type": "textarea", "required": True, "help": "Details of the alleged offence"},
-            {"id": "explanation", "label": "Your Explanation", "type": "textarea", "required": True, "help": "Your explanation/defense"},
-            {"id": "police_station", "label": "Police Station", "type": "text", "required": False, "help": "Police station name"},
-            {"id": "attachments", "label": "Attachments", "type": "file", "required": False, "help": "Upload supporting documents"},
-        ]
-    },
-    "mutual_divorce_petition": {
-        "id": "mutual_divorce_petition",
-        "title": "Mutual Divorce Petition",
-        "description": "File for mutual divorce",
-        "fields": [
-            {"id": "husband_full_name", "label": "Husband's Full Name", "type": "text", "required": True, "help": "Husband's full legal name"},
-            {"id": "wife_full_name", "label": "Wife's Full Name", "type": "text", "required": True, "help": "Wife's full legal name"},
-            {"id": "marriage_date", "label": "Marriage Date", "type": "date", "required": True, "help": "Date of marriage"},
-            {"id": "marriage_place", "label": "Place of Marriage", "type": "text", "required": True, "help": "Where the marriage took place"},
-            {"id": "residential_address_husband", "label": "Husband's Address", "type": "textarea", "required": True, "help": "Husband's residential address"},
-            {"id": "residential_address_wife", "label": "Wife's Address", "type": "textarea", "required": True, "help": "Wife's residential address"},
-            {"id": "reason_for_divorce", "label": "Reason for Divorce", "type": "textarea", "required": True, "help": "Reason for seeking divorce"},
-            {"id": "mutual_agreement", "label": "Mutual Agreement", "type": "boolean", "required": True, "help": "Both parties agree to divorce"},
-            {"id": "children", "label": "Children Details", "type": "textarea", "required": False, "help": "Names, DOB, and custody preferences"},
-            {"id": "maintenance_terms", "label": "Maintenance Terms", "type": "textarea", "required": False, "help": "Agreed maintenance terms"},
-            {"id": "date_of_affidavit", "label": "Date of Affidavit", "type": "date", "required": True, "help": "Date of this affidavit"},
-            {"id": "attachments", "label": "Attachments", "type": "file", "required": True, "help": "Marriage certificate and IDs required"},
-        ]
-    },
-    "affidavit_general": {
-        "id": "affidavit_general",
-        "title": "General Affidavit",
-        "description": "Create a general affidavit",
-        "fields": [
-            {"id": "deponent_name", "label": "Deponent Name", "type": "text", "required": True, "help": "Your full legal name"},
-            {"id": "deponent_age", "label": "Age", "type": "number", "required": True, "help": "Your age"},
-            {"id": "deponent_address", "label": "Address", "type": "textarea", "required": True, "help": "Your complete address"},
-            {"id": "statement_text", "label": "Statement", "type": "textarea", "required": True, "help": "Your statement in first person"},
-            {"id": "place_of_sworn", "label": "Place of Sworn", "type": "text", "required": True, "help": "Where this is sworn"},
-            {"id": "date_of_sworn", "label": "Date of Sworn", "type": "date", "required": True, "help": "Date of swearing"},
-            {"id": "notary_name", "label": "Notary Name", "type": "text", "required": False, "help": "Name of notary public"},
-            {"id": "attachments", "label": "Attachments", "type": "file", "required": False, "help": "Supporting documents"},
-        ]
-    }
-}
-
 # ============ Authentication Endpoints ============
 
 @app.post("/auth/signup")
@@ -243,7 +128,7 @@ async def signin(request: SigninRequest):
         print(f"[DEBUG] Signin request: email={request.email}")
         
         # Check if user exists first
-        user = DatabaseService.get_user_by_email(request.email)
+        user = DatabaseService.get_user_by_email(request.email, "summary")
         print(f"[DEBUG] User found in database: {user is not None}")
         if user:
             print(f"[DEBUG] User data: {user}")
@@ -274,7 +159,7 @@ async def signin(request: SigninRequest):
         
         # Also check if user has admin privileges in database
         if not is_admin:
-            user_from_db = DatabaseService.get_user_by_email(request.email)
+            user_from_db = DatabaseService.get_user_by_email(request.email, "auth")
             if user_from_db and (user_from_db.get("is_admin") or user_from_db.get("admin")):
                 is_admin = True
         
@@ -444,7 +329,7 @@ async def password_reset_request(request: PasswordResetRequest):
         print(f"[DEBUG] Password reset request for email: {email}")
         
         # Check if user exists
-        user = UserService.get_user_by_email(email)
+        user = UserService.get_user_by_email(email, "summary")
         if not user:
             # Don't reveal if user exists or not for security
             return {"message": "If an account with that email exists, a password reset link has been sent"}
@@ -466,6 +351,10 @@ async def password_reset_request(request: PasswordResetRequest):
         EmailService.send_password_reset_link(email, reset_token, user_name)
         
         return {"message": "If an account with that email exists, a password reset link has been sent"}
+    except DatabaseUnavailableError as e:
+        print(f"[ERROR] Password reset email could not be queued: {str(e)}")
+        raise HTTPException(status_code=503, detail="Could not send the password reset email, please retry",
+                            headers={"Retry-After": "5"})
     except Exception as e:
         print(f"[ERROR] Password reset request failed: {str(e)}")
         raise HTTPException(status_code=400, detail="Failed to process password reset request")
@@ -490,7 +379,7 @@ async def password_reset(request: PasswordResetConfirmRequest):
             raise HTTPException(status_code=400, detail="Reset token has expired")
         
         # Get user by email
-        user = UserService.get_user_by_email(reset_data["email"])
+        user = UserService.get_user_by_email(reset_data["email"], "summary")
         if not user:
             raise HTTPException(status_code=400, detail="User not found")
         
@@ -781,7 +670,7 @@ async def submit_form(request: SubmitFormRequest, background_tasks: BackgroundTa
             raise HTTPException(status_code=400, detail="User ID not found in authentication")
         
         # Ensure user exists in database (for AI forms users)
-        existing_user = DatabaseService.get_user(user_id)
+        existing_user = DatabaseService.get_user(user_id, "summary")
         if not existing_user:
             print(f"[DEBUG] User {user_id} not found in database, creating user record")
             # Create a basic user record for AI form submissions
@@ -797,6 +686,7 @@ async def submit_form(request: SubmitFormRequest, background_tasks: BackgroundTa
                 "created_at": datetime.now().isoformat()
             }
             DatabaseService.save_user(user_data)
+            existing_user = user_data
         
         print(f"[DEBUG] Using user_id: {user_id}")
         
@@ -810,121 +700,199 @@ async def submit_form(request: SubmitFormRequest, background_tasks: BackgroundTa
             status="submitted"
         )
         
-        # Generate PDF (optional - don't fail if PDF generation fails)
-        try:
-            pdf_path = PDFService.generate_form_pdf(request.form_id, request.filled_data, tracking_id)
-            print(f"[DEBUG] PDF generated successfully: {pdf_path}")
-        except Exception as pdf_error:
-            print(f"[DEBUG] PDF generation failed (non-critical): {str(pdf_error)}")
-            pdf_path = None
-        
-        # Send beautiful confirmation email
-        print(f"[DEBUG] Attempting to send email for user_id: {user_id}")
-        user = UserService.get_user(user_id)
-        print(f"[DEBUG] User found: {user}")
+        # Confirmation email is queued now and held until the background task attaches the PDF
+        user = existing_user
         
-        # Fallback to current_user if UserService.get_user fails
-        if not user:
-            print(f"[DEBUG] User not found in database, using current_user data")
+        # Fallback to current_user if the user record has no email
+        if not user.get("email"):
+            print(f"[DEBUG] User has no email in database, using current_user data")
             user = current_user
-        
-        if user and user.get("email"):
-            print(f"[DEBUG] Sending email to: {user['email']}")
-            background_tasks.add_task(
-                EmailService.send_submission_confirmation,
-                user["email"],
-                tracking_id,
-                FORMS_DB[request.form_id]["title"],
-                user.get("name", "User")
-            )
-            
-            # Also send PDF if it was generated successfully
-            if pdf_path and not pdf_path.startswith("mock_"):
-                print(f"[DEBUG] Sending PDF attachment: {pdf_path}")
-                background_tasks.add_task(
-                    EmailService.send_form_pdf,
+        if not user.get("email"):
+            print(f"[DEBUG] No user email found - user: {user}")
+        else:
+            try:
+                await asyncio.to_thread(
+                    queue_submission_confirmation,
+                    submission,
+                    FORMS_DB[request.form_id]["title"],
                     user["email"],
-                    pdf_path,
-                    tracking_id
+                    user.get("name", "User")
                 )
-            
-            print(f"[DEBUG] Email task added to background tasks")
-        else:
-            print(f"[DEBUG] No user email found - user: {user}")
+            except DatabaseUnavailableError as e:
+                # Without its confirmation the submission is rolled back, so a retry starts clean
+                print(f"[EMAIL ERROR] Could not queue confirmation for {tracking_id}: {e}")
+                DatabaseService.delete_submission(tracking_id)
+                raise HTTPException(status_code=503, detail="Could not queue the confirmation email, please retry",
+                                    headers={"Retry-After": "5"})
+        
+        background_tasks.add_task(publish_submission_pdf, submission, user.get("email"))
         
         return {
             "tracking_id": tracking_id,
             "status": "submitted",
             "message": "Form submitted successfully"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _tracked_status(tracking_id: str, current_user: dict) -> dict:
+    """Cached status of a submission the caller may see; others get the same 404 as a missing one"""
+    status = DatabaseService.get_submission_status(tracking_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    owner_id = status.get("user_id")
+    current_user_id = current_user.get("user_id") or current_user.get("id")
+    if owner_id and owner_id != current_user_id and not is_admin(current_user):
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return status
+
+def _tracking_headers(status: dict, variant: str) -> dict:
+    """Validators for a submission representation; version changes on every status update"""
+    digest = hashlib.sha1(
+        f"{status['tracking_id']}:{status.get('version')}:{status.get('updated_at')}:{variant}".encode()
+    ).hexdigest()[:16]
+    headers = {"ETag": f'W/"{digest}"', "Cache-Control": "private, no-cache"}
+    try:
+        updated_at = datetime.fromisoformat(status["updated_at"]).astimezone(timezone.utc)
+        headers["Last-Modified"] = format_datetime(updated_at, usegmt=True)
+    except (KeyError, TypeError, ValueError):
+        pass
+    return headers
+
+def _not_modified(request: Request, headers: dict) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since (RFC 7232 section 6)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or headers["ETag"] in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            return parsedate_to_datetime(headers["Last-Modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
 @app.get("/track/{tracking_id}")
-async def track_submission(tracking_id: str, current_user: dict = Depends(get_current_user)):
-    """Get submission status"""
-    submission = DatabaseService.get_submission(tracking_id)
+async def track_submission(tracking_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Get submission status with history and form data; answers 304 while it is unchanged"""
+    status = _tracked_status(tracking_id, current_user)
+    headers = _tracking_headers(status, "full")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
     
+    submission = DatabaseService.get_submission(tracking_id)
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
     
-    return {
+    return JSONResponse(headers=headers, content={
         "tracking_id": tracking_id,
         "form_id": submission["form_id"],
         "status": submission["status"],
         "created_at": submission["created_at"],
         "updated_at": submission.get("updated_at", submission["created_at"]),
+        "version": submission.get("version", 1),
         "history": submission["history"],
         "data": submission.get("data", {}),  # Include form data
         "user_id": submission.get("user_id", ""),
         "admin_message": submission.get("admin_message", "")
-    }
+    })
+
+@app.get("/track/{tracking_id}/status")
+async def track_submission_status(tracking_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Lightweight status for polling: no form data or history, cached server-side, 304 while unchanged"""
+    status = _tracked_status(tracking_id, current_user)
+    headers = _tracking_headers(status, "status")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    
+    return JSONResponse(headers=headers, content={
+        "tracking_id": tracking_id,
+        "form_id": status["form_id"],
+        "status": status["status"],
+        "message": status.get("message"),
+        "created_at": status["created_at"],
+        "updated_at": status["updated_at"],
+        "version": status["version"]
+    })
 
 # ============ User Endpoints ============
 
+def _dashboard_stats(user_id: str) -> dict:
+    """Dashboard counters computed by the database instead of from the full submission list"""
+    stats = DatabaseService.get_user_submission_stats(user_id)
+    by_status = stats["by_status"]
+    return {
+        "totalSubmissions": stats["total"],
+        "pendingSubmissions": by_status.get("submitted", 0) + by_status.get("processing", 0),
+        "approvedSubmissions": by_status.get("approved", 0),
+        "rejectedSubmissions": by_status.get("rejected", 0),
+        "thisMonthSubmissions": stats["this_month"]
+    }
+
 @app.get("/user/submissions")
-async def get_user_submissions(current_user: dict = Depends(get_current_user)):
-    """Get user's own submissions"""
+async def get_user_submissions(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get one page of the user's own submissions, newest first"""
     try:
         user_id = current_user.get("user_id") or current_user.get("id")
         if not user_id:
             raise HTTPException(status_code=400, detail="User ID not found")
         
-        submissions = DatabaseService.get_user_submissions(user_id)
+        submissions = DatabaseService.get_user_submissions(user_id, limit=limit, offset=offset)
+        stats = _dashboard_stats(user_id)
         
-        # Calculate statistics
-        total_submissions = len(submissions)
-        pending_submissions = len([s for s in submissions if s["status"] in ["submitted", "processing"]])
-        approved_submissions = len([s for s in submissions if s["status"] == "approved"])
-        rejected_submissions = len([s for s in submissions if s["status"] == "rejected"])
-        
-        # This month submissions
-        from datetime import datetime, timedelta
-        this_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        this_month_submissions = 0
-        
-        try:
-            this_month_submissions = len([
-                s for s in submissions 
-                if datetime.fromisoformat(s["created_at"].replace('Z', '+00:00')) >= this_month
-            ])
-        except Exception as date_error:
-            print(f"[DEBUG] Date parsing error: {date_error}")
-            # Fallback: count all submissions if date parsing fails
-            this_month_submissions = len(submissions)
-        
-        stats = {
-            "totalSubmissions": total_submissions,
-            "pendingSubmissions": pending_submissions,
-            "approvedSubmissions": approved_submissions,
-            "rejectedSubmissions": rejected_submissions,
-            "thisMonthSubmissions": this_month_submissions
+        return {
+            "submissions": [_signed_submission(submission) for submission in submissions],
+            "stats": stats,
+            "limit": limit,
+            "offset": offset,
+            "has_more": offset + len(submissions) < stats["totalSubmissions"]
         }
-        
-        return {"submissions": submissions, "stats": stats}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/user/submissions/stats")
+async def get_user_submission_stats(current_user: dict = Depends(get_current_user)):
+    """Get the user's dashboard counters without loading any submissions"""
+    user_id = current_user.get("user_id") or current_user.get("id")
+    if not user_id:
+        raise HTTPException(status_code=400, detail="User ID not found")
+    try:
+        return _dashboard_stats(user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _signed_profile(profile: Optional[dict]) -> dict:
+    """Copy of a profile whose stored photo is linked with a signed URL"""
+    profile = dict(profile or {})
+    file_id = profile.get("photo_file_id")
+    if file_id and profile.get("photo") == file_url(file_id):
+        profile["photo"] = signed_file_url(file_id)
+    return profile
+
+def _signed_document(document: dict) -> dict:
+    """Copy of a document record whose stored file is linked with a signed URL"""
+    data = document.get("document_data") or {}
+    file_id = data.get("file_id")
+    if file_id and data.get("file_url") == file_url(file_id):
+        document = {**document, "document_data": {**data, "file_url": signed_file_url(file_id)}}
+    return document
+
+def _signed_submission(submission: dict) -> dict:
+    """Copy of a submission whose PDF artifact is linked with a signed URL"""
+    artifact = submission.get("pdf_artifact")
+    if artifact and artifact.get("file_id"):
+        submission = {**submission, "pdf_artifact": {**artifact, "url": signed_file_url(artifact["file_id"])}}
+    return submission
+
 @app.get("/user/profile")
 async def get_user_profile(current_user: dict = Depends(get_current_user)):
     """Get user profile"""
@@ -937,7 +905,7 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
             user_email = current_user.get("email")
             if user_email:
                 print(f"[DEBUG] Trying to find user by email: {user_email}")
-                user_by_email = DatabaseService.get_user_by_email(user_email)
+                user_by_email = DatabaseService.get_user_by_email(user_email, "summary")
                 if user_by_email:
                     user_id = user_by_email.get("user_id")
                     print(f"[DEBUG] Found user by email, user_id: {user_id}")
@@ -947,7 +915,7 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
                 raise HTTPException(status_code=400, detail="User ID not found")
         
         print(f"[DEBUG] Looking for user_id: {user_id}")
-        user = DatabaseService.get_user(user_id)
+        user = DatabaseService.get_user(user_id, "profile")
         if not user:
             print(f"[ERROR] User not found in database for user_id: {user_id}")
             # For development users, create a basic user record
@@ -974,7 +942,7 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
             "email": user.get("email"),
             "name": user.get("name"),
             "phone": user.get("phone"),
-            "profile": user.get("profile", {}),
+            "profile": _signed_profile(user.get("profile")),
             "settings": user.get("settings", {}),
             "created_at": user.get("created_at"),
             "updated_at": user.get("updated_at")
@@ -996,18 +964,37 @@ async def update_user_profile(request: ProfileUpdateRequest, current_user: dict
         if not user_id:
             raise HTTPException(status_code=400, detail="User ID not found")
         
+        # The client may send back the signed link it was given; records keep the plain path
+        photo = stored_file_url(request.photo)
         profile_data = {
             "name": request.name,
             "phone": request.phone,
             "address": request.address,
-            "photo": request.photo
+            "photo": photo
         }
         
-        updated_user = DatabaseService.save_user_profile(user_id, profile_data)
-        if not updated_user:
+        # Keep the stored-file reference while the photo is unchanged; never store inline images
+        previous_profile = (DatabaseService.get_user(user_id, "profile") or {}).get("profile") or {}
+        if photo.startswith("data:"):
+            stored = save_data_url(photo, "profile_photo", user_id)
+            profile_data.update(photo=file_url(stored["file_id"]), photo_storage=stored["storage_type"],
+                                photo_file_id=stored["file_id"])
+        elif photo == previous_profile.get("photo"):
+            for key in ("photo_storage", "photo_file_id"):
+                if key in previous_profile:
+                    profile_data[key] = previous_profile[key]
+        
+        previous_file_id = previous_profile.get("photo_file_id")
+        if previous_file_id and previous_file_id != profile_data.get("photo_file_id"):
+            file_storage.delete(previous_file_id, user_id)
+        
+        if not DatabaseService.save_user_profile(user_id, profile_data):
             raise HTTPException(status_code=404, detail="User not found")
         
-        return {"message": "Profile updated successfully", "user": updated_user}
+        user = DatabaseService.get_user(user_id, "profile")
+        if user:
+            user = {**user, "profile": _signed_profile(user.get("profile"))}
+        return {"message": "Profile updated successfully", "user": user}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1053,13 +1040,10 @@ async def upload_profile_photo(
         if not user_id:
             raise HTTPException(status_code=400, detail="User ID not found")
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Try Cloudinary first, fallback to MongoDB if it fails
+        # Try Cloudinary first, fall back to local storage if it fails
         try:
-            upload_result = cloudinary.uploader.upload(
-                file_content,
+            upload_result = cloudinary_uploader().upload(
+                file.file,
                 folder="legal_ai/profile_photos/",
                 public_id=f"user_{user_id}",
                 overwrite=True,
@@ -1067,30 +1051,42 @@ async def upload_profile_photo(
             )
             
             photo_url = upload_result["secure_url"]
+            photo_file_id = None
             storage_type = "cloudinary"
             
         except Exception as cloudinary_error:
             print(f"[WARNING] Cloudinary upload failed: {cloudinary_error}")
-            print(f"[INFO] Falling back to MongoDB storage")
+            print(f"[INFO] Falling back to {file_storage.storage_type} file storage")
             
-            # Fallback to MongoDB storage
-            import base64
-            photo_data = base64.b64encode(file_content).decode('utf-8')
-            photo_url = f"data:image/jpeg;base64,{photo_data}"
-            storage_type = "mongodb"
+            # Stream the photo into the file store; the profile keeps only its URL
+            file.file.seek(0)
+            stored = file_storage.save(
+                file.file, file.filename or "profile_photo", file.content_type or "image/jpeg", user_id
+            )
+            photo_url = file_url(stored["file_id"])
+            photo_file_id = stored["file_id"]
+            storage_type = stored["storage_type"]
+        
+        # Release the previous stored photo, if any
+        previous_profile = (DatabaseService.get_user(user_id, "profile") or {}).get("profile") or {}
+        previous_file_id = previous_profile.get("photo_file_id")
+        if previous_file_id and previous_file_id != photo_file_id:
+            file_storage.delete(previous_file_id, user_id)
         
-        # Update user profile with photo URL
+        # Update user profile with photo URL, keeping the rest of the profile
         update_data = {
             "profile": {
+                **previous_profile,
                 "photo": photo_url,
-                "photo_storage": storage_type
+                "photo_storage": storage_type,
+                "photo_file_id": photo_file_id
             }
         }
         DatabaseService.update_user(user_id, update_data)
         
         return {
             "message": "Profile photo uploaded successfully", 
-            "secure_url": photo_url,
+            "secure_url": signed_file_url(photo_file_id) if photo_file_id else photo_url,
             "storage_type": storage_type
         }
     except Exception as e:
@@ -1124,44 +1120,41 @@ async def upload_user_document(
             if "pdf" in file.content_type:
                 resource_type = "raw"
         
-        # Read file content
-        file_content = await file.read()
-        
         # Generate unique public_id
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         public_id = f"user_{user_id}_{document_type}_{timestamp}"
         
-        # Try Cloudinary first, fallback to MongoDB if it fails
+        # Try Cloudinary first, fall back to local storage if it fails
         try:
-            upload_result = cloudinary.uploader.upload(
-                file_content,
+            upload_result = cloudinary_uploader().upload(
+                file.file,
                 folder=f"legal_ai/documents/{user_id}/",
                 public_id=public_id,
                 resource_type=resource_type
             )
             
-            file_url = upload_result["secure_url"]
+            document_url = upload_result["secure_url"]
             file_id = upload_result["public_id"]
-            file_size = upload_result.get("bytes", len(file_content))
+            file_size = upload_result.get("bytes", file.size)
             file_type = upload_result.get("format", file.content_type or "application/pdf")
             storage_type = "cloudinary"
             
         except Exception as cloudinary_error:
             print(f"[WARNING] Cloudinary upload failed: {cloudinary_error}")
-            print(f"[INFO] Falling back to MongoDB storage")
+            print(f"[INFO] Falling back to {file_storage.storage_type} file storage")
             
-            # Fallback to MongoDB storage (base64)
-            import base64
-            file_id = f"mongodb_{public_id}"
-            file_data = base64.b64encode(file_content).decode('utf-8')
-            file_url = f"data:{file.content_type or 'application/pdf'};base64,{file_data}"
-            file_size = len(file_content)
+            # Stream the file into the file store; the document keeps only metadata
+            file.file.seek(0)
             file_type = file.content_type or "application/pdf"
-            storage_type = "mongodb"
+            stored = file_storage.save(file.file, file.filename or f"{document_type}.pdf", file_type, user_id)
+            file_id = stored["file_id"]
+            document_url = file_url(file_id)
+            file_size = stored["length"]
+            storage_type = stored["storage_type"]
         
         # Prepare document data
         document_data = {
-            "file_url": file_url,
+            "file_url": document_url,
             "file_id": file_id,
             "file_size": file_size,
             "file_type": file_type,
@@ -1174,7 +1167,7 @@ async def upload_user_document(
         
         return {
             "message": "Document uploaded successfully", 
-            "document": document,
+            "document": _signed_document(document) if isinstance(document, dict) else document,
             "storage_type": storage_type
         }
     except Exception as e:
@@ -1205,7 +1198,7 @@ async def get_user_documents(current_user: dict = Depends(get_current_user)):
         for doc in documents:
             if "_id" in doc:
                 doc["_id"] = str(doc["_id"])
-            formatted_documents.append(doc)
+            formatted_documents.append(_signed_document(doc))
         
         print(f"[DEBUG] Returning {len(formatted_documents)} documents for user {user_id}")
         return {"documents": formatted_documents}
@@ -1223,12 +1216,23 @@ async def delete_user_document(document_id: str, current_user: dict = Depends(ge
         
         print(f"[DELETE] Attempting to delete document_id: {document_id} for user: {user_id}")
         
+        # Remember where the bytes live before the record goes away
+        stored_file_id = None
+        for doc in DatabaseService.get_user_documents(user_id):
+            if document_id in (str(doc.get("_id")), doc.get("document_id"), doc.get("id")):
+                document_data = doc.get("document_data") or {}
+                if document_data.get("storage_type") == file_storage.storage_type:
+                    stored_file_id = document_data.get("file_id")
+                break
+        
         # Call database service to delete document
         success = DatabaseService.delete_user_document(document_id, user_id)
         
         print(f"[DELETE] Delete result: {success}")
         
         if success:
+            if stored_file_id:
+                file_storage.delete(stored_file_id, user_id)
             return {"message": "Document deleted successfully"}
         else:
             print(f"[DELETE] Document not found: {document_id}")
@@ -1237,6 +1241,57 @@ async def delete_user_document(document_id: str, current_user: dict = Depends(ge
         print(f"[ERROR] Error deleting document: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/files/{file_id}")
+async def download_file(
+    file_id: str,
+    request: Request,
+    expires: Optional[int] = Query(None, description="Expiry of a signed link, for <img>/<a> tags that cannot send headers"),
+    signature: Optional[str] = Query(None, description="Signature of a signed link, from signed_file_url()"),
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
+    """Stream a stored upload to its owner, an admin, or the holder of a signed link, honouring single byte ranges"""
+    signed = expires is not None and bool(signature) and verify_file_signature(file_id, expires, signature)
+    if not current_user and not signed:
+        raise HTTPException(status_code=401, detail="Invalid, expired or missing file link")
+    
+    stored = file_storage.open(file_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    if not signed:
+        current_user_id = current_user.get("user_id") or current_user.get("id")
+        if current_user_id not in stored.owner_ids and not is_admin(current_user):
+            stored.reader.close()
+            raise HTTPException(status_code=404, detail="File not found")
+    
+    # Stored files never change, so the id doubles as a strong validator
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{stored.file_id}"',
+        "Cache-Control": "private, max-age=86400",
+        "Content-Disposition": f'inline; filename="{stored.filename or stored.file_id}"'
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        stored.reader.close()
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        byte_range = parse_range(request.headers.get("range"), stored.length)
+    except ValueError:
+        stored.reader.close()
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{stored.length}"})
+    
+    if byte_range is None:
+        headers["Content-Length"] = str(stored.length)
+        return StreamingResponse(stored.iter_range(), media_type=stored.content_type, headers=headers)
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stored.length}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        stored.iter_range(start, end), status_code=206, media_type=stored.content_type, headers=headers
+    )
+
 # ============ Admin Endpoints ============
 
 @app.get("/admin/submissions")
@@ -1247,11 +1302,11 @@ async def get_all_submissions(form_id: Optional[str] = None, status: Optional[st
     # Enhance submissions with user information
     enhanced_submissions = []
     for submission in submissions:
-        enhanced_submission = submission.copy()
+        enhanced_submission = _signed_submission(submission.copy())
         
         # Get user information if user_id exists
         if submission.get("user_id"):
-            user = UserService.get_user(submission["user_id"])
+            user = UserService.get_user(submission["user_id"], "summary")
             if user:
                 enhanced_submission["user_email"] = user.get("email")
                 enhanced_submission["user_name"] = user.get("name")
@@ -1267,6 +1322,71 @@ async def get_all_submissions(form_id: Optional[str] = None, status: Optional[st
     
     return {"count": len(enhanced_submissions), "submissions": enhanced_submissions}
 
+def _parse_day(value: Optional[str]) -> Optional[datetime]:
+    """Validate a YYYY-MM-DD query parameter"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD")
+
+@app.get("/admin/submissions/export")
+async def export_all_submissions(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    form_id: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[str] = Query(None, description="First day, YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="Last day (inclusive), YYYY-MM-DD"),
+    gzip: bool = False,
+    current_user: dict = Depends(require_admin)
+):
+    """Stream every matching submission as NDJSON or CSV, batch by batch (admin only)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}', expected ndjson or csv")
+    if form_id and form_id not in FORMS_DB:
+        raise HTTPException(status_code=404, detail="Form not found")
+    start_day, end_day = _parse_day(start), _parse_day(end)
+    created_from = start_day.isoformat() if start_day else None
+    created_before = (end_day + timedelta(days=1)).isoformat() if end_day else None
+    
+    filename = f"submissions-{form_id or 'all'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{format}"
+    media_type = EXPORT_FORMATS[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    print(f"[EXPORT] {current_user.get('email')} exporting {filename}")
+    
+    return StreamingResponse(
+        export_submissions(format, form_id, status, created_from, created_before, gzip=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/admin/submissions/export/pdf")
+async def export_submission_pdfs(
+    form_id: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[str] = Query(None, description="First day, YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="Last day (inclusive), YYYY-MM-DD"),
+    current_user: dict = Depends(require_admin)
+):
+    """Stream the PDFs of every matching submission as one ZIP archive (admin only)"""
+    if form_id and form_id not in FORMS_DB:
+        raise HTTPException(status_code=404, detail="Form not found")
+    start_day, end_day = _parse_day(start), _parse_day(end)
+    created_from = start_day.isoformat() if start_day else None
+    created_before = (end_day + timedelta(days=1)).isoformat() if end_day else None
+    
+    filename = f"submissions-{form_id or 'all'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
+    print(f"[EXPORT] {current_user.get('email')} exporting {filename}")
+    
+    return StreamingResponse(
+        export_pdf_zip(form_id, status, created_from, created_before),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.get("/admin/tickets")
 async def get_all_tickets(current_user: dict = Depends(require_admin)):
     """Get all help tickets (admin only)"""
@@ -1285,7 +1405,7 @@ async def get_all_tickets(current_user: dict = Depends(require_admin)):
             
             # Get user information if user_id exists
             if ticket.get("user_id"):
-                user = UserService.get_user(ticket["user_id"])
+                user = UserService.get_user(ticket["user_id"], "summary")
                 if user:
                     enhanced_ticket["user_email"] = user.get("email")
                     enhanced_ticket["user_name"] = user.get("name")
@@ -1304,13 +1424,16 @@ async def get_all_tickets(current_user: dict = Depends(require_admin)):
         return {"count": 0, "tickets": []}
 
 @app.get("/admin/messages")
-async def get_all_messages(current_user: dict = Depends(require_admin)):
-    """Get all chat messages (admin only)"""
+async def get_all_messages(
+    since: Optional[str] = Query(None, description="next_since of an earlier response: only newer messages (delta sync)"),
+    current_user: dict = Depends(require_admin)
+):
+    """Get all chat messages, or with since only the newer ones (admin only)"""
     try:
         print(f"[DEBUG] Admin messages request from user: {current_user.get('email')}")
         
         # Get all chat messages from database
-        messages = ChatDatabaseService.get_chat_messages()
+        messages = ChatDatabaseService.get_chat_messages(since=since)
         print(f"[DEBUG] Raw messages from database: {len(messages)} messages")
         print(f"[DEBUG] Sample message: {messages[0] if messages else 'No messages'}")
         
@@ -1321,7 +1444,7 @@ async def get_all_messages(current_user: dict = Depends(require_admin)):
             
             # Get user information if user_id exists
             if message.get("user_id"):
-                user = UserService.get_user(message["user_id"])
+                user = UserService.get_user(message["user_id"], "summary")
                 if user:
                     enhanced_message["user_email"] = user.get("email")
                     enhanced_message["user_name"] = user.get("name")
@@ -1332,7 +1455,11 @@ async def get_all_messages(current_user: dict = Depends(require_admin)):
             enhanced_messages.append(enhanced_message)
         
         print(f"[DEBUG] Enhanced messages count: {len(enhanced_messages)}")
-        return {"count": len(enhanced_messages), "messages": enhanced_messages}
+        return {
+            "count": len(enhanced_messages),
+            "messages": enhanced_messages,
+            "next_since": chat_cursor(messages[-1]) if messages else since
+        }
     except Exception as e:
         print(f"[DEBUG] Error getting messages: {e}")
         import traceback
@@ -1342,9 +1469,126 @@ async def get_all_messages(current_user: dict = Depends(require_admin)):
 @app.get("/admin/users")
 async def get_all_users(current_user: dict = Depends(require_admin)):
     """Get all users (admin only)"""
-    users = DatabaseService.get_all_users()
+    users = DatabaseService.get_all_users("profile")
     return {"count": len(users), "users": users}
 
+@app.get("/admin/cache/stats")
+async def get_cache_stats(current_user: dict = Depends(require_admin)):
+    """Hit rates and sizes of the in-process caches (admin only)"""
+    return {"user_cache": user_cache.stats(), "pdf_cache": pdf_cache.stats()}
+
+@app.get("/admin/render/stats")
+async def get_render_stats(current_user: dict = Depends(require_admin)):
+    """Queue depth, throughput and latency of the PDF render pool (admin only)"""
+    return render_pool.stats()
+
+@app.get("/admin/email/stats")
+async def get_email_stats(current_user: dict = Depends(require_admin)):
+    """Outbox backlog, worker outcomes and SMTP connection reuse (admin only)"""
+    outbox = await asyncio.to_thread(email_outbox.stats)
+    return {"outbox": outbox, "worker": email_worker.stats(), "smtp": smtp_pool.stats()}
+
+@app.get("/admin/email/dead-letters")
+async def get_email_dead_letters(limit: int = Query(100, ge=1, le=1000), current_user: dict = Depends(require_admin)):
+    """Emails that failed permanently or ran out of attempts (admin only)"""
+    emails = await asyncio.to_thread(email_outbox.dead_letters, limit)
+    return {"count": len(emails), "emails": emails}
+
+@app.post("/admin/email/dead-letters/{email_id}/retry")
+async def retry_dead_letter(email_id: str, current_user: dict = Depends(require_admin)):
+    """Queue a dead-lettered email again (admin only)"""
+    if not await asyncio.to_thread(email_outbox.requeue, email_id):
+        raise HTTPException(status_code=404, detail="Dead-lettered email not found")
+    return {"message": "Email queued again", "email_id": email_id}
+
+@app.get("/admin/stats")
+async def get_admin_stats(
+    start: Optional[str] = Query(None, description="First day, YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="Last day (inclusive), YYYY-MM-DD"),
+    form_id: Optional[str] = None,
+    current_user: dict = Depends(require_admin)
+):
+    """Submission analytics from the pre-aggregated form/status/day counters (admin only)"""
+    for value in (start, end):
+        _parse_day(value)
+    
+    buckets = DatabaseService.get_submission_counters(start, end, form_id)
+    
+    by_status, by_form, by_day = {}, {}, {}
+    for bucket in buckets:
+        status, count = bucket["status"], bucket["count"]
+        by_status[status] = by_status.get(status, 0) + count
+        
+        form_stats = by_form.setdefault(bucket["form_id"], {
+            "title": FORMS_DB.get(bucket["form_id"], {}).get("title", bucket["form_id"]),
+            "total": 0,
+            "by_status": {}
+        })
+        form_stats["total"] += count
+        form_stats["by_status"][status] = form_stats["by_status"].get(status, 0) + count
+        
+        day_stats = by_day.setdefault(bucket["day"], {"day": bucket["day"], "total": 0, "by_status": {}})
+        day_stats["total"] += count
+        day_stats["by_status"][status] = day_stats["by_status"].get(status, 0) + count
+    
+    return {
+        "start": start,
+        "end": end,
+        "form_id": form_id,
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_form": by_form,
+        "by_day": [by_day[day] for day in sorted(by_day)]
+    }
+
+@app.post("/admin/stats/rebuild")
+async def rebuild_admin_stats(current_user: dict = Depends(require_admin)):
+    """Recompute the analytics counters from scratch (admin only)"""
+    try:
+        buckets = DatabaseService.rebuild_submission_counters()
+        return {"message": "Analytics counters rebuilt", "buckets": buckets}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/search")
+async def admin_search(
+    q: str = Query(..., min_length=1, description="Search terms; the last one also matches as a prefix"),
+    kinds: Optional[str] = Query(None, description="Comma-separated subset of submission, ticket, chat"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(require_admin)
+):
+    """Ranked full-text search over submissions, tickets and chat messages (admin only)"""
+    requested = [kind.strip() for kind in kinds.split(",") if kind.strip()] if kinds else list(SEARCH_KINDS)
+    unknown = [kind for kind in requested if kind not in SEARCH_KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search kinds: {', '.join(unknown)}")
+    
+    terms = query_terms(q)
+    started = time.perf_counter()
+    results = []
+    for score, document in DatabaseService.search(terms, requested, limit):
+        result = search_result(document, score, terms)
+        if result["kind"] == "submission":
+            result["form_title"] = FORMS_DB.get(result["title"], {}).get("title", result["title"])
+        results.append(result)
+    
+    return {
+        "query": q,
+        "terms": terms,
+        "count": len(results),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results
+    }
+
+@app.post("/admin/search/rebuild")
+async def rebuild_search_index(current_user: dict = Depends(require_admin)):
+    """Re-index every submission, ticket and chat message (admin only)"""
+    try:
+        documents = DatabaseService.rebuild_search_index()
+        return {"message": "Search index rebuilt", "documents": documents}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/admin/feedbacks")
 async def get_all_feedbacks(current_user: dict = Depends(require_admin)):
     """Get all feedbacks (admin only)"""
@@ -1363,7 +1607,7 @@ async def get_all_feedbacks(current_user: dict = Depends(require_admin)):
             
             # Get user information if user_id exists
             if feedback.get("user_id"):
-                user = UserService.get_user(feedback["user_id"])
+                user = UserService.get_user(feedback["user_id"], "summary")
                 if user:
                     enhanced_feedback["user_email"] = user.get("email")
                     enhanced_feedback["user_name"] = user.get("name")
@@ -1382,7 +1626,7 @@ async def get_all_feedbacks(current_user: dict = Depends(require_admin)):
         return {"count": 0, "feedbacks": []}
 
 @app.post("/admin/tickets/{ticket_id}/reply")
-async def reply_to_help_ticket(ticket_id: str, request: dict, background_tasks: BackgroundTasks, current_user: dict = Depends(require_admin)):
+async def reply_to_help_ticket(ticket_id: str, request: dict, current_user: dict = Depends(require_admin)):
     """Reply to help ticket (admin only)"""
     try:
         # Get ticket details and user email
@@ -1394,7 +1638,7 @@ async def reply_to_help_ticket(ticket_id: str, request: dict, background_tasks:
         
         # Send email notification to user
         if user_email and admin_reply:
-            background_tasks.add_task(
+            await asyncio.to_thread(
                 EmailService.send_help_ticket_response,
                 user_email,
                 ticket_id,
@@ -1402,14 +1646,16 @@ async def reply_to_help_ticket(ticket_id: str, request: dict, background_tasks:
                 admin_reply,
                 user_name
             )
-            print(f"[EMAIL] Help ticket response sent to {user_email}")
+            print(f"[EMAIL] Help ticket response queued for {user_email}")
         
         return {"message": "Reply sent successfully", "ticket_id": ticket_id}
+    except DatabaseUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Reply email could not be queued: {e}", headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/admin/feedbacks/{feedback_id}/reply")
-async def reply_to_feedback(feedback_id: str, request: dict, background_tasks: BackgroundTasks, current_user: dict = Depends(require_admin)):
+async def reply_to_feedback(feedback_id: str, request: dict, current_user: dict = Depends(require_admin)):
     """Reply to feedback (admin only)"""
     try:
         # Get feedback details and user email
@@ -1421,7 +1667,7 @@ async def reply_to_feedback(feedback_id: str, request: dict, background_tasks: B
         
         # Send email notification to user
         if user_email and admin_reply:
-            background_tasks.add_task(
+            await asyncio.to_thread(
                 EmailService.send_feedback_response,
                 user_email,
                 feedback_id,
@@ -1429,9 +1675,11 @@ async def reply_to_feedback(feedback_id: str, request: dict, background_tasks: B
                 admin_reply,
                 user_name
             )
-            print(f"[EMAIL] Feedback response sent to {user_email}")
+            print(f"[EMAIL] Feedback response queued for {user_email}")
         
         return {"message": "Reply sent successfully", "feedback_id": feedback_id}
+    except DatabaseUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Reply email could not be queued: {e}", headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1571,7 +1819,10 @@ async def send_chat_message(request: dict, current_user: dict = Depends(get_curr
         )
         
         print(f"[DEBUG] Message created successfully: {message}")
-        return {"message": "Message sent successfully", "message_id": message_id}
+        chat_broker.publish("message", message)
+        return {"message": "Message sent successfully", "message_id": message_id, "timestamp": message["timestamp"]}
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e) if str(e) else f"Unknown error: {type(e).__name__}"
         print(f"[DEBUG] Error creating chat message: {error_msg}")
@@ -1582,32 +1833,110 @@ async def send_chat_message(request: dict, current_user: dict = Depends(get_curr
         raise HTTPException(status_code=500, detail=f"Error creating chat message: {error_msg}")
 
 @app.get("/chat/messages")
-async def get_chat_messages(user_id: str = None, current_user: dict = Depends(get_current_user)):
-    """Get chat messages"""
+async def get_chat_messages(
+    user_id: str = None,
+    since: Optional[str] = Query(None, description="next_since of an earlier response: only newer messages (delta sync)"),
+    before: Optional[str] = Query(None, description="next_before of an earlier response: only older messages (history paging)"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get chat messages; pass since for new messages only, or limit/before to page back through history"""
     try:
         # Get current user's ID
         current_user_id = current_user.get("user_id") or current_user.get("id")
         
-        if user_id:
-            # Admin requesting messages for specific user
-            messages = ChatDatabaseService.get_chat_messages(user_id)
+        if user_id and user_id != current_user_id and not is_admin(current_user):
+            raise HTTPException(status_code=403, detail="Cannot read another user's messages")
+        
+        conversation_id = user_id or current_user_id
+        if conversation_id:
+            messages = ChatDatabaseService.get_chat_messages(conversation_id, since=since, before=before, limit=limit)
         else:
-            # User requesting their own messages
-            if current_user_id:
-                messages = ChatDatabaseService.get_chat_messages(current_user_id)
-            else:
-                messages = []
+            messages = []
         
-        print(f"[DEBUG] Getting chat messages for user_id: {current_user_id or user_id}")
+        print(f"[DEBUG] Getting chat messages for user_id: {conversation_id}")
         print(f"[DEBUG] Found {len(messages)} messages")
         
-        return {"messages": messages}
+        return {
+            "messages": messages,
+            # Opaque cursors for the next delta request and the next older page, and whether older history remains
+            "next_since": chat_cursor(messages[-1]) if messages else since,
+            "next_before": chat_cursor(messages[0]) if messages else before,
+            "has_more": limit is not None and not since and len(messages) == limit
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[DEBUG] Error getting chat messages: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+def _chat_stream_scope(current_user: dict, user_id: Optional[str]) -> Optional[str]:
+    """Conversation a caller may stream: their own, or for admins user_id's or every one"""
+    current_user_id = current_user.get("user_id") or current_user.get("id")
+    if is_admin(current_user):
+        return user_id or ALL_CONVERSATIONS
+    if user_id and user_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Cannot stream another user's messages")
+    return current_user_id
+
+@app.post("/chat/stream/ticket")
+async def create_chat_stream_ticket(user_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Short-lived ticket that opens /chat/stream, for EventSource, which cannot send the Authorization header"""
+    scope = _chat_stream_scope(current_user, user_id)
+    ticket = AuthService.create_stream_ticket(current_user.get("user_id") or current_user.get("id"), scope)
+    return {"ticket": ticket, "expires_in": CHAT_STREAM_TICKET_SECONDS}
+
+@app.get("/chat/stream")
+async def stream_chat_messages(
+    request: Request,
+    user_id: Optional[str] = None,
+    since: Optional[str] = None,
+    ticket: Optional[str] = Query(None, description="From POST /chat/stream/ticket, for EventSource clients"),
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
+    """Server-Sent Events stream of new and deleted chat messages.
+    Users receive their own conversation; admins receive every conversation unless user_id is given.
+    Header-less clients pass a ticket, which fixes the conversation when it is issued."""
+    if current_user:
+        scope = _chat_stream_scope(current_user, user_id)
+    elif ticket:
+        claims = AuthService.verify_stream_ticket(ticket)
+        if not claims:
+            raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+        scope = claims.get("scope")
+    else:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+    
+    # Browsers resend the last seen event id when EventSource reconnects
+    resume_from = request.headers.get("last-event-id") or since
+    
+    async def event_stream():
+        # Subscribe before the catch-up query so nothing saved in between is missed
+        queue = chat_broker.subscribe(scope)
+        try:
+            yield "retry: 3000\n\n"
+            if resume_from:
+                backlog = lambda since, limit: ChatDatabaseService.get_chat_messages(scope, since=since, limit=limit)
+                async for message in catch_up(backlog, resume_from):
+                    yield format_sse("message", message)
+            while not await request.is_disconnected():
+                try:
+                    event, payload = await asyncio.wait_for(queue.get(), timeout=CHAT_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event, payload)
+        finally:
+            chat_broker.unsubscribe(scope, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/chat/users")
 async def get_chat_users(current_user: dict = Depends(get_current_user)):
     """Get chat users"""
@@ -1617,51 +1946,115 @@ async def get_chat_users(current_user: dict = Depends(get_current_user)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/conversations/{user_id}/read")
+async def mark_conversation_read(user_id: str, current_user: dict = Depends(get_current_user)):
+    """Clear the caller's unread count for a conversation"""
+    if is_admin(current_user):
+        reader = "admin"
+    elif user_id == (current_user.get("user_id") or current_user.get("id")):
+        reader = "user"
+    else:
+        raise HTTPException(status_code=403, detail="Cannot mark another user's conversation as read")
+    
+    if not ChatDatabaseService.mark_conversation_read(user_id, reader):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return {"message": "Conversation marked as read", "user_id": user_id, "reader": reader}
+
 @app.delete("/chat/messages/{message_id}")
 async def delete_chat_message(message_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a chat message"""
     try:
+        message = ChatDatabaseService.get_chat_message(message_id)
+        if not message:
+            raise HTTPException(status_code=404, detail="Message not found")
+        if not is_admin(current_user) and message.get("user_id") != (current_user.get("user_id") or current_user.get("id")):
+            raise HTTPException(status_code=403, detail="Cannot delete another user's message")
+        
         result = ChatDatabaseService.delete_chat_message(message_id)
         if result:
+            chat_broker.publish("delete", {"message_id": message_id, "user_id": message.get("user_id")})
             return {"message": "Message deleted successfully"}
         else:
             raise HTTPException(status_code=404, detail="Message not found")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 class StatusUpdateRequest(BaseModel):
     status: str
     message: str
+    version: Optional[int] = None  # Version the admin last saw; stale versions are rejected with 409
 
 @app.put("/admin/submissions/{tracking_id}/status")
-async def update_submission_status(tracking_id: str, request: StatusUpdateRequest, background_tasks: BackgroundTasks, current_user: dict = Depends(require_admin)):
-    """Update submission status (admin only)"""
+async def update_submission_status(tracking_id: str, request: StatusUpdateRequest, current_user: dict = Depends(require_admin)):
+    """Update submission status (admin only).
+    The update stands even if the notification email cannot be queued: the response then has
+    notified false, and POST /admin/submissions/{tracking_id}/notify sends it later."""
     try:
-        submission = DatabaseService.update_submission_status(tracking_id, request.status, request.message)
-        
-        if submission and submission.get("user_id"):
-            user = UserService.get_user(submission["user_id"])
-            if user:
-                background_tasks.add_task(
-                    EmailService.send_status_update,
-                    user["email"],
-                    tracking_id,
-                    request.status,
-                    request.message
-                )
+        submission = DatabaseService.update_submission_status(
+            tracking_id, request.status, request.message, expected_version=request.version
+        )
+        if submission is None:
+            return None
         
-        return submission
+        try:
+            notified = await _notify_status_update(
+                submission.get("user_id"), tracking_id, request.status, request.message, submission.get("version")
+            )
+            return {**submission, "notified": notified}
+        except DatabaseUnavailableError as e:
+            print(f"[STATUS] Version {submission.get('version')} of {tracking_id} saved, user not notified: {e}")
+            return {**submission, "notified": False, "notify_error": str(e)}
+    except HTTPException:
+        raise
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _notify_status_update(user_id: Optional[str], tracking_id: str, status: str, message: str,
+                                version: Optional[int]) -> bool:
+    """Queue the status email for one version of a submission; False if there is nobody to tell.
+    The email is keyed on the version, so sending one twice queues it once."""
+    user = UserService.get_user(user_id, "summary") if user_id else None
+    if not user or not user.get("email"):
+        return False
+    await asyncio.to_thread(EmailService.send_status_update, user["email"], tracking_id, status, message, version)
+    return True
+
+@app.post("/admin/submissions/{tracking_id}/notify")
+async def resend_status_notification(tracking_id: str, current_user: dict = Depends(require_admin)):
+    """Queue the status email for the submission's current version, e.g. after an update answered
+    notified false (admin only); safe to retry"""
+    status = DatabaseService.get_submission_status(tracking_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    try:
+        notified = await _notify_status_update(
+            status.get("user_id"), tracking_id, status["status"], status.get("message") or "", status.get("version")
+        )
+    except DatabaseUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"The email could not be queued: {e}", headers={"Retry-After": "5"})
+    return {"tracking_id": tracking_id, "version": status.get("version"), "notified": notified}
+
+@app.get("/admin/submissions/{tracking_id}/history")
+async def get_submission_history(tracking_id: str, current_user: dict = Depends(require_admin)):
+    """Full status history of a submission (admin only)"""
+    return {"tracking_id": tracking_id, "history": DatabaseService.get_submission_history(tracking_id)}
+
 @app.delete("/admin/submissions/{tracking_id}")
 async def delete_submission(tracking_id: str, current_user: dict = Depends(require_admin)):
     """Delete submission (admin only)"""
     try:
+        submission = DatabaseService.get_submission(tracking_id)
+        
         # Delete from database
         result = DatabaseService.delete_submission(tracking_id)
         
         if result:
+            if submission and submission.get("pdf_artifact"):
+                await asyncio.to_thread(delete_pdf_artifact, submission)
             return {"message": "Submission deleted successfully", "tracking_id": tracking_id}
         else:
             raise HTTPException(status_code=404, detail="Submission not found")
@@ -1672,32 +2065,36 @@ async def delete_submission(tracking_id: str, current_user: dict = Depends(requi
 async def test_pdf_generation(current_user: dict = Depends(require_admin)):
     """Test PDF generation endpoint"""
     try:
-        import tempfile
+        import io
         from reportlab.pdfgen import canvas
         from reportlab.lib.pagesizes import letter
-        from fastapi.responses import FileResponse
-        
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        temp_path = temp_file.name
-        temp_file.close()
         
-        c = canvas.Canvas(temp_path, pagesize=letter)
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter)
         c.drawString(100, 750, "Test PDF Generation")
         c.drawString(100, 700, "This is a test PDF from the backend")
         c.drawString(100, 650, f"Generated at: {datetime.now()}")
         c.save()
         
-        return FileResponse(
-            path=temp_path,
-            filename="test.pdf",
-            media_type="application/pdf"
+        return Response(
+            content=buffer.getvalue(),
+            media_type="application/pdf",
+            headers={"Content-Disposition": 'attachment; filename="test.pdf"'}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Test PDF generation failed: {str(e)}")
 
+def _submission_pdf_headers(tracking_id: str, pdf_key: str) -> dict:
+    """The cache key covers everything the PDF shows, so it doubles as a strong validator"""
+    return {
+        "ETag": f'"{pdf_key}"',
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="{tracking_id}.pdf"'
+    }
+
 @app.get("/admin/submissions/{tracking_id}/pdf")
-async def download_submission_pdf(tracking_id: str, current_user: dict = Depends(require_admin)):
-    """Download submission PDF (admin only)"""
+async def download_submission_pdf(tracking_id: str, request: Request, current_user: dict = Depends(require_admin)):
+    """Download submission PDF (admin only); rendered once per version of the submission, then served from the PDF cache"""
     try:
         print(f"[Admin PDF] Download request for tracking ID: {tracking_id}")
         
@@ -1707,46 +2104,43 @@ async def download_submission_pdf(tracking_id: str, current_user: dict = Depends
             print(f"[Admin PDF] Submission not found: {tracking_id}")
             raise HTTPException(status_code=404, detail="Submission not found")
         
-        print(f"[Admin PDF] Found submission: {submission}")
+        pdf_key = pdf_cache_key(submission)
+        headers = _submission_pdf_headers(tracking_id, pdf_key)
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
         
-        # Generate PDF if not exists
+        cached = pdf_cache.get(pdf_key)
+        if cached:
+            print(f"[Admin PDF] Serving cached PDF: {pdf_key}")
+            headers["Content-Length"] = str(cached.length)
+            return StreamingResponse(cached.iter_range(), media_type="application/pdf", headers=headers)
+        
+        # Render in the pool into the cache, then stream it from there
         try:
-            from services.pdf_service import PDFService
-            pdf_path = PDFService.generate_form_pdf(
-                submission["form_id"],
-                submission["data"],
-                submission["tracking_id"]
-            )
-            print(f"[Admin PDF] PDF generated at: {pdf_path}")
-            
-            if pdf_path and not pdf_path.startswith("mock_"):
-                # Return file download
-                from fastapi.responses import FileResponse
-                print(f"[Admin PDF] Returning file: {pdf_path}")
-                return FileResponse(
-                    path=pdf_path,
-                    filename=f"{tracking_id}.pdf",
-                    media_type="application/pdf"
-                )
+            if await render_to_cache(submission, pdf_key):
+                cached = pdf_cache.get(pdf_key)
+                if cached:
+                    print(f"[Admin PDF] PDF rendered and cached: {pdf_key}")
+                    headers["Content-Length"] = str(cached.length)
+                    return StreamingResponse(cached.iter_range(), media_type="application/pdf", headers=headers)
+        except (RenderPoolBusy, RenderTimeout) as busy:
+            print(f"[Admin PDF] Render pool overloaded: {busy}")
+            raise HTTPException(status_code=503, detail="PDF rendering is busy, please retry", headers={"Retry-After": "5"})
         except Exception as pdf_error:
             print(f"[Admin PDF] PDF service error: {pdf_error}")
             print(f"[Admin PDF] Falling back to simple PDF generation")
         
-        # Fallback: Generate temporary PDF for download
+        # Fallback: Generate a simple PDF in memory for download
         try:
-            import tempfile
-            import os
+            import io
             from reportlab.pdfgen import canvas
             from reportlab.lib.pagesizes import letter
             
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            temp_path = temp_file.name
-            temp_file.close()
-            
-            print(f"[Admin PDF] Creating fallback PDF at: {temp_path}")
+            print(f"[Admin PDF] Creating fallback PDF for: {tracking_id}")
             
             # Create a simple PDF with form data
-            c = canvas.Canvas(temp_path, pagesize=letter)
+            buffer = io.BytesIO()
+            c = canvas.Canvas(buffer, pagesize=letter)
             c.drawString(100, 750, f"Form Submission: {tracking_id}")
             c.drawString(100, 700, f"Form Type: {submission['form_id']}")
             c.drawString(100, 650, f"Status: {submission['status']}")
@@ -1778,10 +2172,10 @@ async def download_submission_pdf(tracking_id: str, current_user: dict = Depends
             c.save()
             print(f"[Admin PDF] Fallback PDF created successfully")
             
-            return FileResponse(
-                path=temp_path,
-                filename=f"{tracking_id}.pdf",
-                media_type="application/pdf"
+            return Response(
+                content=buffer.getvalue(),
+                media_type="application/pdf",
+                headers={"Content-Disposition": f'attachment; filename="{tracking_id}.pdf"'}
             )
             
         except Exception as fallback_error:
@@ -1829,19 +2223,19 @@ async def setup_admin(current_user: dict = Depends(get_current_user)):
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "version": "2.0.0"}
+    """Health check endpoint; 503 while the background probe cannot reach the database"""
+    health = {"status": "healthy", "version": "2.0.0", "database": database_health.snapshot()}
+    if database_health.healthy is False:
+        health["status"] = "degraded"
+        return JSONResponse(status_code=503, content=health)
+    return health
 
 @app.get("/test-cloudinary")
 async def test_cloudinary():
     """Test Cloudinary configuration"""
     try:
         # Configure Cloudinary
-        cloudinary.config(
-            cloud_name=CLOUDINARY_CLOUD_NAME,
-            api_key=CLOUDINARY_API_KEY,
-            api_secret=CLOUDINARY_API_SECRET
-        )
+        cloudinary_uploader()
         
         # Test configuration
         return {
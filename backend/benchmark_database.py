@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Database benchmark for Legal Voice App
+Runs the same DatabaseService workload against whichever DB_TYPE is configured,
+so the PostgreSQL and MongoDB paths can be compared on the same machine:
+
+    DB_TYPE=mongodb python benchmark_database.py --records 5000
+    DB_TYPE=postgresql DATABASE_URL=postgresql://localhost/legal_voice python benchmark_database.py --records 5000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseService, DB_TYPE
+
+FORM_IDS = ["name_change", "property_dispute", "traffic_fine_appeal", "mutual_divorce", "affidavit_general"]
+
+def timed(samples: list, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    samples.append(time.perf_counter() - start)
+    return result
+
+def report(name: str, samples: list):
+    if not samples:
+        return
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    total = sum(samples)
+    print(f"{name:<34} {len(samples):>7} {len(samples) / total:>10.0f} "
+          f"{statistics.median(samples) * 1000:>9.2f} {p95 * 1000:>9.2f}")
+
+def run(records: int, users: int, cleanup: bool):
+    run_id = uuid.uuid4().hex[:8]
+    user_ids = [f"bench_{run_id}_user_{i}" for i in range(users)]
+    tracking_ids = []
+    samples = {name: [] for name in (
+        "save_user", "get_user_by_email", "save_submission", "get_submission",
+        "update_submission_status", "get_user_submissions", "get_all_submissions(form,status)"
+    )}
+
+    print(f"🚀 Benchmarking DB_TYPE={DB_TYPE} with {records} submissions across {users} users")
+
+    for user_id in user_ids:
+        timed(samples["save_user"], DatabaseService.save_user, {
+            "user_id": user_id,
+            "email": f"{user_id}@example.com",
+            "name": "Benchmark User",
+            "phone": "9999999999"
+        })
+
+    for i in range(records):
+        tracking_id = f"BENCH{run_id}-{i:08d}"
+        tracking_ids.append(tracking_id)
+        timed(samples["save_submission"], DatabaseService.save_submission,
+              tracking_id, FORM_IDS[i % len(FORM_IDS)],
+              {"applicant_full_name": f"आवेदक {i}", "reason": "benchmark", "index": i},
+              user_ids[i % users])
+
+    for tracking_id in tracking_ids:
+        timed(samples["get_submission"], DatabaseService.get_submission, tracking_id)
+
+    for tracking_id in tracking_ids[::2]:
+        timed(samples["update_submission_status"], DatabaseService.update_submission_status,
+              tracking_id, "processing", "Benchmark review")
+
+    for user_id in user_ids:
+        timed(samples["get_user_by_email"], DatabaseService.get_user_by_email, f"{user_id}@example.com")
+        timed(samples["get_user_submissions"], DatabaseService.get_user_submissions, user_id)
+
+    for form_id in FORM_IDS:
+        for status in ("submitted", "processing"):
+            timed(samples["get_all_submissions(form,status)"], DatabaseService.get_all_submissions, form_id, status)
+
+    print(f"\n{'operation':<34} {'calls':>7} {'ops/sec':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    print("-" * 73)
+    for name, values in samples.items():
+        report(name, values)
+
+    if cleanup:
+        for tracking_id in tracking_ids:
+            DatabaseService.delete_submission(tracking_id)
+        print(f"\n🧹 Removed {len(tracking_ids)} benchmark submissions")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the configured DatabaseService backend")
+    parser.add_argument("--records", type=int, default=2000, help="number of submissions to write")
+    parser.add_argument("--users", type=int, default=100, help="number of users to spread submissions across")
+    parser.add_argument("--keep", action="store_true", help="keep benchmark submissions instead of deleting them")
+    args = parser.parse_args()
+    run(args.records, args.users, cleanup=not args.keep)
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@ Chat message database operations
 """
 
 import os
-from typing import List, Dict
+import uuid
+from typing import List, Dict, Optional
 from datetime import datetime
 
 # Database type from environment
@@ -11,9 +12,150 @@ DB_TYPE = os.getenv("DB_TYPE", "mongodb")
 
 # Import database connection
 if DB_TYPE == "mongodb":
-    from database import db
+    from database import db, mongo
+
+    def _create_chat_indexes(database):
+        database.messages.create_index([("user_id", 1), ("timestamp", 1), ("message_id", 1)])
+        _create_conversation_indexes(database.conversations)
+        database.messages.create_index([("text", "text")], name="search_text", default_language="none",
+                                       language_override="search_language")
+
+    mongo.on_connect(_create_chat_indexes)
 elif DB_TYPE == "postgresql":
-    from database import SessionLocal
+    from postgres_database import postgres_db
+elif DB_TYPE == "sqlite":
+    from sqlite_database import sqlite_db
+
+from chat_events import parse_chat_cursor
+from memory_index import IndexedTable, SortedIndex
+from search_index import local_search_index, search_document
+
+# Mock message store, indexed per user in timestamp order
+messages_db = IndexedTable(
+    by_user=SortedIndex(lambda m: m.get("user_id"), lambda m: m.get("timestamp", ""))
+)
+# Mock conversation summaries keyed by user_id; written under messages_db.lock
+conversations_db = IndexedTable()
+
+def _unread_increments(sender: str) -> dict:
+    """A message is unread for whoever didn't send it"""
+    return {"unread_admin": int(sender != "admin"), "unread_user": int(sender == "admin")}
+
+def _unseen(message: dict, summary: dict) -> bool:
+    """Whether a message is newer than its reader last read the conversation (never read: all are)"""
+    read_at = summary.get("user_read_at") if message.get("sender") == "admin" else summary.get("admin_read_at")
+    return read_at is None or message.get("timestamp", "") > read_at
+
+def _create_conversation_indexes(collection):
+    collection.create_index("user_id", unique=True)
+    collection.create_index([("last_message_time", -1)])
+
+def _last_message_fields(message: dict) -> dict:
+    return {
+        "last_message_id": message["message_id"],
+        "last_message": message.get("text", ""),
+        "last_sender": message.get("sender"),
+        "last_message_time": message.get("timestamp", "")
+    }
+
+# MongoDB summaries are changed only by single-document updates, which need no replica set for
+# transactions. Update pipelines compute every field from the document's current values, so a
+# concurrent save or delete can never be overwritten with values read before it.
+
+def _advance_last_message(message: dict) -> dict:
+    """Pipeline $set fields making message the last one, unless the summary already has a newer message"""
+    newer = {"$lte": [{"$ifNull": ["$last_message_time", ""]}, {"$literal": message.get("timestamp", "")}]}
+    return {field: {"$cond": [newer, {"$literal": value}, f"${field}"]}
+            for field, value in _last_message_fields(message).items()}
+
+def _mongo_add_to_summary(database, message: dict):
+    """Count a saved message into its conversation summary, creating it if needed, in one atomic update"""
+    counts = {field: {"$add": [{"$ifNull": [f"${field}", 0]}, increment]}
+              for field, increment in {"message_count": 1, **_unread_increments(message.get("sender"))}.items()}
+    database.conversations.update_one(
+        {"user_id": message["user_id"]},
+        [{"$set": {**counts, **_advance_last_message(message)}}],
+        upsert=True
+    )
+
+def _mongo_remove_from_summary(database, message: dict):
+    """Undo a deleted message's contribution to its conversation summary.
+    Counts change in one atomic update; if the message was the last one, the next latest replaces it
+    only while it is still the last, then any message saved meanwhile moves the summary forward again."""
+    user_id = message["user_id"]
+    sender = message.get("sender")
+    unread_field = "unread_admin" if sender != "admin" else "unread_user"
+    read_at = f"${'admin' if sender != 'admin' else 'user'}_read_at"
+    unseen = {"$or": [{"$eq": [{"$ifNull": [read_at, None]}, None]},
+                      {"$gt": [{"$literal": message.get("timestamp", "")}, read_at]}]}
+    from pymongo import ReturnDocument
+    summary = database.conversations.find_one_and_update({"user_id": user_id}, [{"$set": {
+        "message_count": {"$add": ["$message_count", -1]},
+        unread_field: {"$cond": [unseen, {"$max": [0, {"$add": [{"$ifNull": [f"${unread_field}", 0]}, -1]}]},
+                                 f"${unread_field}"]}
+    }}], return_document=ReturnDocument.AFTER)
+    if summary is None:
+        return
+    if summary.get("message_count", 0) <= 0:
+        # Unless a message saved meanwhile has raised the count again, and keeps the summary
+        database.conversations.delete_one({"user_id": user_id, "message_count": {"$lte": 0}})
+        return
+    if summary.get("last_message_id") != message["message_id"]:
+        return
+    
+    def latest() -> Optional[dict]:
+        return database.messages.find_one({"user_id": user_id}, sort=[("timestamp", -1), ("message_id", -1)])
+    
+    replacement = latest()
+    if replacement is None:
+        return
+    database.conversations.update_one({"user_id": user_id, "last_message_id": message["message_id"]},
+                                      {"$set": _last_message_fields(replacement)})
+    newest = latest()
+    if newest is not None and newest["message_id"] != replacement["message_id"]:
+        database.conversations.update_one({"user_id": user_id}, [{"$set": _advance_last_message(newest)}])
+
+def _mongo_rebuild_summaries(database) -> int:
+    """Recompute every conversation summary from the messages, keeping each reader's read time and
+    counting as unread the other side's messages newer than it. Built under a name of its own and
+    renamed over the live summaries in one step, like the counter rebuild; a save, delete or read
+    landing while it runs is lost until the next rebuild."""
+    def unread(from_sender, read_at):
+        unseen = {"$or": [{"$eq": [{"$ifNull": [read_at, None]}, None]}, {"$gt": ["$timestamp", read_at]}]}
+        return {"$sum": {"$cond": [{"$and": [from_sender, unseen]}, 1, 0]}}
+
+    scratch = f"conversations_rebuild_{uuid.uuid4().hex[:12]}"
+    database.messages.aggregate([
+        {"$sort": {"timestamp": -1, "message_id": -1}},
+        {"$lookup": {"from": "conversations", "localField": "user_id", "foreignField": "user_id", "as": "summary"}},
+        {"$set": {
+            "admin_read_at": {"$arrayElemAt": ["$summary.admin_read_at", 0]},
+            "user_read_at": {"$arrayElemAt": ["$summary.user_read_at", 0]}
+        }},
+        {"$group": {
+            "_id": "$user_id",
+            "last_message_id": {"$first": "$message_id"},
+            "last_message": {"$first": "$text"},
+            "last_sender": {"$first": "$sender"},
+            "last_message_time": {"$first": "$timestamp"},
+            "message_count": {"$sum": 1},
+            "unread_admin": unread({"$ne": ["$sender", "admin"]}, "$admin_read_at"),
+            "unread_user": unread({"$eq": ["$sender", "admin"]}, "$user_read_at"),
+            "admin_read_at": {"$first": "$admin_read_at"},
+            "user_read_at": {"$first": "$user_read_at"}
+        }},
+        {"$set": {"user_id": "$_id"}},
+        {"$project": {"_id": False}},
+        {"$out": scratch}
+    ])
+    rebuilt = database[scratch]
+    try:
+        _create_conversation_indexes(rebuilt)  # Also creates the collection when there are no messages
+        rebuilt.rename("conversations", dropTarget=True)
+    except Exception:
+        rebuilt.drop()
+        raise
+    return database.conversations.count_documents({})
 
 class ChatDatabaseService:
     """Service for managing chat messages in database"""
@@ -37,27 +179,60 @@ class ChatDatabaseService:
             # Create messages collection if it doesn't exist
             messages_collection = db.messages
             messages_collection.insert_one(message)
+            message.pop("_id", None)
+            _mongo_add_to_summary(db, message)
             return message
         elif DB_TYPE == "postgresql":
-            # TODO: Implement PostgreSQL message saving
-            pass
+            return postgres_db.save_chat_message(message)
+        elif DB_TYPE == "sqlite":
+            return sqlite_db.save_chat_message(message)
         else:  # mock
-            if "messages_db" not in globals():
-                globals()["messages_db"] = {}
-            globals()["messages_db"][message_id] = message
+            with messages_db.lock:
+                messages_db.put(message_id, message)
+                summary = conversations_db.get(user_id) or {
+                    "user_id": user_id, "message_count": 0, "unread_admin": 0, "unread_user": 0,
+                    "last_message_time": None, "admin_read_at": None, "user_read_at": None
+                }
+                summary = {**summary, "message_count": summary["message_count"] + 1}
+                for field, increment in _unread_increments(sender).items():
+                    summary[field] += increment
+                if summary["last_message_time"] is None or timestamp >= summary["last_message_time"]:
+                    summary.update(_last_message_fields(message))
+                conversations_db.put(user_id, summary)
+            local_search_index.add(search_document("chat", message))
             return message
     
     @staticmethod
-    def get_chat_messages(user_id: str = None) -> List[dict]:
-        """Get chat messages, optionally filtered by user"""
+    def get_chat_messages(user_id: str = None, since: Optional[str] = None, before: Optional[str] = None,
+                          limit: Optional[int] = None) -> List[dict]:
+        """Get chat messages in (timestamp, message_id) order, optionally filtered by user.
+        since and before are chat cursors (see chat_events.chat_cursor): since returns only
+        messages after that one (delta sync); otherwise limit returns the newest page before
+        before (history paging). Messages sharing a timestamp are ordered by ID, so none are
+        skipped at a page boundary."""
         print(f"[ChatDatabaseService] Getting chat messages, DB_TYPE: {DB_TYPE}, user_id: {user_id}")
+        newest_first = not since and limit is not None
+        since = parse_chat_cursor(since) if since else None
+        before = parse_chat_cursor(before) if before else None
         if DB_TYPE == "mongodb":
             try:
                 messages_collection = db.messages
+                query = {}
                 if user_id:
-                    messages = messages_collection.find({"user_id": user_id}).sort("timestamp", 1)
-                else:
-                    messages = messages_collection.find().sort("timestamp", 1)
+                    query["user_id"] = user_id
+                bounds = []
+                if since:
+                    bounds.append({"$or": [{"timestamp": {"$gt": since[0]}},
+                                           {"timestamp": since[0], "message_id": {"$gt": since[1]}}]})
+                if before:
+                    bounds.append({"$or": [{"timestamp": {"$lt": before[0]}},
+                                           {"timestamp": before[0], "message_id": {"$lt": before[1]}}]})
+                if bounds:
+                    query["$and"] = bounds
+                direction = -1 if newest_first else 1
+                messages = messages_collection.find(query).sort([("timestamp", direction), ("message_id", direction)])
+                if limit is not None:
+                    messages = messages.limit(limit)
                 
                 result = []
                 for message in messages:
@@ -65,76 +240,218 @@ class ChatDatabaseService:
                     if "_id" in message_dict:
                         message_dict["_id"] = str(message_dict["_id"])
                     result.append(message_dict)
+                if newest_first:
+                    result.reverse()
                 print(f"[ChatDatabaseService] Found {len(result)} messages in MongoDB")
                 return result
             except Exception as e:
                 print(f"[ChatDatabaseService] MongoDB error: {e}")
                 return []
         elif DB_TYPE == "postgresql":
-            # TODO: Implement PostgreSQL message retrieval
-            return []
+            result = postgres_db.get_chat_messages(user_id, since, before, limit)
+            print(f"[ChatDatabaseService] Found {len(result)} messages in PostgreSQL")
+            return result
+        elif DB_TYPE == "sqlite":
+            result = sqlite_db.get_chat_messages(user_id, since, before, limit)
+            print(f"[ChatDatabaseService] Found {len(result)} messages in SQLite")
+            return result
         else:  # mock
-            if "messages_db" not in globals():
-                print("[ChatDatabaseService] No messages_db in globals, returning empty list")
-                return []
-            messages = list(globals()["messages_db"].values())
             if user_id:
-                messages = [m for m in messages if m.get("user_id") == user_id]
-            result = sorted(messages, key=lambda x: x.get("timestamp", ""))
+                after, after_id = since or (None, "")
+                before_ts, before_id = before or (None, "")
+                result = messages_db.lookup_range("by_user", user_id, after, before_ts, after_id, before_id)
+            else:
+                position = lambda m: (m.get("timestamp", ""), m["message_id"])
+                result = sorted(
+                    (m for m in messages_db.values()
+                     if (not since or position(m) > since) and (not before or position(m) < before)),
+                    key=position
+                )
+            if limit is not None:
+                result = result[-limit:] if newest_first else result[:limit]
             print(f"[ChatDatabaseService] Found {len(result)} messages in mock DB")
             return result
     
+    @staticmethod
+    def get_chat_message(message_id: str) -> Optional[dict]:
+        """Get one chat message by ID"""
+        if DB_TYPE == "mongodb":
+            return db.messages.find_one({"message_id": message_id}, {"_id": False})
+        elif DB_TYPE == "postgresql":
+            return postgres_db.get_chat_message(message_id)
+        elif DB_TYPE == "sqlite":
+            return sqlite_db.get_chat_message(message_id)
+        else:  # mock
+            return messages_db.get(message_id)
+    
+    @staticmethod
+    def get_conversation_summaries() -> List[dict]:
+        """Per-user conversation summaries joined with user name/email, most recent first"""
+        if DB_TYPE == "mongodb":
+            return list(db.conversations.aggregate([
+                {"$sort": {"last_message_time": -1}},
+                {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "user_id", "as": "user"}},
+                {"$set": {
+                    "name": {"$arrayElemAt": ["$user.name", 0]},
+                    "email": {"$arrayElemAt": ["$user.email", 0]}
+                }},
+                {"$project": {"_id": False, "user": False}}
+            ]))
+        elif DB_TYPE == "postgresql":
+            return postgres_db.get_conversation_summaries()
+        elif DB_TYPE == "sqlite":
+            return sqlite_db.get_conversation_summaries()
+        else:  # mock
+            from database import DatabaseService
+            summaries = sorted(conversations_db.values(), key=lambda c: c.get("last_message_time") or "", reverse=True)
+            result = []
+            for summary in summaries:
+                user = DatabaseService.get_user(summary["user_id"], "summary") or {}
+                result.append({**summary, "name": user.get("name"), "email": user.get("email")})
+            return result
+    
     @staticmethod
     def get_chat_users() -> List[dict]:
-        """Get unique chat users with their latest message info"""
-        messages = ChatDatabaseService.get_chat_messages()
-        user_map = {}
-        
-        for message in messages:
-            user_id = message.get("user_id")
-            if not user_id:
-                continue
-                
-            if user_id not in user_map:
-                user_map[user_id] = {
-                    "id": user_id,
-                    "name": f"User {user_id[:8]}",
-                    "email": f"user{user_id[:8]}@example.com",
-                    "lastMessage": "",
-                    "lastMessageTime": message.get("timestamp", message.get("created_at", ""))
-                }
-            
-            # Update with latest message info
-            if message.get("sender") == "user":
-                user_map[user_id]["lastMessage"] = message.get("text", "")
-                user_map[user_id]["lastMessageTime"] = message.get("timestamp", message.get("created_at", ""))
-        
-        return list(user_map.values())
+        """Get chat users with their latest message info from the conversation summaries"""
+        users = []
+        for summary in ChatDatabaseService.get_conversation_summaries():
+            user_id = summary["user_id"]
+            users.append({
+                "id": user_id,
+                "name": summary.get("name") or f"User {user_id[:8]}",
+                "email": summary.get("email") or "",
+                "lastMessage": summary.get("last_message") or "",
+                "lastMessageTime": summary.get("last_message_time") or "",
+                "lastSender": summary.get("last_sender"),
+                "messageCount": summary.get("message_count", 0),
+                "unreadByAdmin": summary.get("unread_admin", 0),
+                "unreadByUser": summary.get("unread_user", 0)
+            })
+        return users
+    
+    @staticmethod
+    def mark_conversation_read(user_id: str, reader: str) -> bool:
+        """Clear the unread count for the reader ("admin" or "user") of a conversation"""
+        if DB_TYPE == "mongodb":
+            prefix = "admin" if reader == "admin" else "user"
+            result = db.conversations.update_one(
+                {"user_id": user_id},
+                {"$set": {f"unread_{prefix}": 0, f"{prefix}_read_at": datetime.now().isoformat()}}
+            )
+            return result.matched_count > 0
+        elif DB_TYPE == "postgresql":
+            return postgres_db.mark_conversation_read(user_id, reader)
+        elif DB_TYPE == "sqlite":
+            return sqlite_db.mark_conversation_read(user_id, reader)
+        else:  # mock
+            prefix = "admin" if reader == "admin" else "user"
+            with messages_db.lock:
+                return conversations_db.update(
+                    user_id, {f"unread_{prefix}": 0, f"{prefix}_read_at": datetime.now().isoformat()}
+                ) is not None
+    
+    @staticmethod
+    def rebuild_conversation_summaries() -> int:
+        """Recompute every conversation summary from the stored messages; returns the conversation count.
+        Read times are kept, and unread counts are recounted against them."""
+        if DB_TYPE == "mongodb":
+            return _mongo_rebuild_summaries(db)
+        elif DB_TYPE == "postgresql":
+            return postgres_db.rebuild_conversation_summaries()
+        elif DB_TYPE == "sqlite":
+            return sqlite_db.rebuild_conversation_summaries()
+        else:  # mock
+            with messages_db.lock:
+                previous = {summary["user_id"]: summary for summary in conversations_db.values()}
+                conversations_db.records.clear()
+                for message in sorted(messages_db.values(), key=lambda m: (m.get("timestamp", ""), m["message_id"])):
+                    user_id = message["user_id"]
+                    summary = conversations_db.get(user_id)
+                    if summary is None:
+                        read_times = previous.get(user_id, {})
+                        summary = {
+                            "user_id": user_id, "message_count": 0, "unread_admin": 0, "unread_user": 0,
+                            "admin_read_at": read_times.get("admin_read_at"), "user_read_at": read_times.get("user_read_at")
+                        }
+                    if _unseen(message, summary):
+                        for field, increment in _unread_increments(message.get("sender")).items():
+                            summary[field] += increment
+                    summary.update(_last_message_fields(message), message_count=summary["message_count"] + 1)
+                    conversations_db.put(user_id, summary)
+                return len(conversations_db)
     
     @staticmethod
     def delete_chat_message(message_id: str) -> bool:
-        """Delete a chat message"""
+        """Delete a chat message and back it out of its conversation summary"""
         if DB_TYPE == "mongodb":
             try:
-                messages_collection = db.messages
-                result = messages_collection.delete_one({"message_id": message_id})
-                return result.deleted_count > 0
+                message = db.messages.find_one_and_delete({"message_id": message_id})
+                if message is None:
+                    return False
+                _mongo_remove_from_summary(db, message)
+                return True
             except Exception as e:
                 print(f"[ChatDB] MongoDB delete error: {e}")
                 return False
         elif DB_TYPE == "postgresql":
-            # TODO: Implement PostgreSQL message deletion
-            print("[ChatDB] PostgreSQL delete not implemented")
-            return False
+            return postgres_db.delete_chat_message(message_id)
+        elif DB_TYPE == "sqlite":
+            return sqlite_db.delete_chat_message(message_id)
         else:  # mock
             try:
-                if "messages_db" in globals() and message_id in globals()["messages_db"]:
-                    del globals()["messages_db"][message_id]
-                    print(f"[ChatDB] Mock: Deleted message {message_id}")
-                    return True
-                else:
-                    print(f"[ChatDB] Mock: Message {message_id} not found")
-                    return False
+                with messages_db.lock:
+                    message = messages_db.delete(message_id)
+                    local_search_index.remove("chat", message_id)
+                    if message is not None:
+                        ChatDatabaseService._remove_from_summary(conversations_db.get(message["user_id"]), message)
+                        print(f"[ChatDB] Mock: Deleted message {message_id}")
+                        return True
+                    else:
+                        print(f"[ChatDB] Mock: Message {message_id} not found")
+                        return False
             except Exception as e:
                 print(f"[ChatDB] Mock delete error: {e}")
                 return False
+    
+    @staticmethod
+    def bulk_insert_messages(messages: List[dict]) -> int:
+        """Insert a batch of new messages in one round trip; rebuild the conversation
+        summaries and the search index once loading is done"""
+        if not messages:
+            return 0
+        if DB_TYPE == "mongodb":
+            db.messages.insert_many(messages, ordered=False)
+        elif DB_TYPE == "postgresql":
+            postgres_db.bulk_insert("messages", messages)
+        elif DB_TYPE == "sqlite":
+            sqlite_db.bulk_insert("messages", messages)
+        else:  # mock
+            with messages_db.lock:
+                for message in messages:
+                    messages_db.put(message["message_id"], message)
+        return len(messages)
+    
+    @staticmethod
+    def _remove_from_summary(summary: dict, message: dict):
+        """Undo a deleted message's contribution to its conversation summary (mock; call under messages_db.lock)"""
+        if summary is None:
+            return
+        user_id = message["user_id"]
+        if summary.get("message_count", 0) <= 1:
+            conversations_db.delete(user_id)
+            return
+        
+        increments = {"message_count": -1}
+        if _unseen(message, summary):
+            for field, increment in _unread_increments(message.get("sender")).items():
+                if increment and summary.get(field, 0) > 0:
+                    increments[field] = -increment
+        
+        updates = {}
+        if summary.get("last_message_id") == message["message_id"]:
+            updates = _last_message_fields(messages_db.lookup("by_user", user_id)[-1])
+        
+        conversations_db.update(user_id, {
+            **{field: summary.get(field, 0) + change for field, change in increments.items()},
+            **updates
+        })
@@ -0,0 +1,98 @@
+"""
+In-process chat event broker for Legal Voice App
+Pushes saved and deleted chat messages to connected SSE clients, so chat views
+no longer need to poll /chat/messages. Each worker process has its own broker;
+clients that reconnect to a different worker catch up via Last-Event-ID, a chat
+cursor: the last message's timestamp and ID, since messages can share a timestamp.
+"""
+
+import asyncio
+import base64
+import json
+import os
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+CHAT_STREAM_QUEUE_SIZE = 100
+CHAT_STREAM_HEARTBEAT_SECONDS = 15
+# Messages per query when a reconnecting client catches up from its Last-Event-ID
+CHAT_STREAM_CATCHUP_PAGE_SIZE = int(os.getenv("CHAT_STREAM_CATCHUP_PAGE_SIZE", "200"))
+
+ALL_CONVERSATIONS = None  # subscription key for admins watching every conversation
+
+
+class ChatEventBroker:
+    """Fans chat events out to per-connection queues, keyed by conversation user_id"""
+
+    def __init__(self, queue_size: int = CHAT_STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[Optional[str], Set[asyncio.Queue]] = {}
+
+    def subscribe(self, user_id: Optional[str] = ALL_CONVERSATIONS) -> asyncio.Queue:
+        """Register a connection for one conversation, or for all of them"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: Optional[str], queue: asyncio.Queue):
+        subscribers = self._subscribers.get(user_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def publish(self, event: str, payload: dict):
+        """Deliver an event to the conversation's subscribers and to admins; call from the event loop"""
+        targets = self._subscribers.get(payload.get("user_id"), set()) | self._subscribers.get(ALL_CONVERSATIONS, set())
+        for queue in targets:
+            if queue.full():
+                # A slow client loses its oldest event rather than stalling everyone else
+                queue.get_nowait()
+            queue.put_nowait((event, payload))
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+def chat_cursor(message: dict) -> str:
+    """Opaque position just after a message, for delta sync and stream resumes"""
+    raw = json.dumps([message.get("timestamp", ""), message["message_id"]], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def parse_chat_cursor(cursor: str) -> Tuple[str, str]:
+    """(timestamp, message_id) of a chat cursor. A bare timestamp, as older clients send, is (timestamp, ""),
+    which includes that timestamp's messages again: a repeat, which clients drop by ID, rather than a gap."""
+    try:
+        timestamp, message_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if isinstance(timestamp, str) and isinstance(message_id, str):
+            return timestamp, message_id
+    except (ValueError, TypeError):
+        pass
+    return cursor, ""
+
+
+async def catch_up(fetch_page: Callable[[str, int], List[dict]], since: str,
+                   page_size: int = CHAT_STREAM_CATCHUP_PAGE_SIZE) -> AsyncIterator[dict]:
+    """Messages after a chat cursor, oldest first. fetch_page(since, limit) is a blocking
+    database read, so each page runs in a worker thread and the event loop keeps serving."""
+    while True:
+        page = await asyncio.to_thread(fetch_page, since, page_size)
+        for message in page:
+            yield message
+        if len(page) < page_size:
+            return
+        since = chat_cursor(page[-1])
+
+
+def format_sse(event: str, payload: dict) -> str:
+    """Encode one Server-Sent Event; messages carry their chat cursor as the resume id"""
+    lines = []
+    if event == "message" and payload.get("message_id"):
+        lines.append(f"id: {chat_cursor(payload)}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(payload, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+# Global instance
+chat_broker = ChatEventBroker()
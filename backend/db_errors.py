@@ -0,0 +1,20 @@
+"""
+Database errors shared by every backend
+"""
+
+
+class VersionConflictError(Exception):
+    """Raised when a write carries an expected version that no longer matches the stored record"""
+
+    def __init__(self, tracking_id: str, expected_version: int):
+        self.tracking_id = tracking_id
+        self.expected_version = expected_version
+        super().__init__(f"Submission {tracking_id} is no longer at version {expected_version}")
+
+
+class DatabaseUnavailableError(Exception):
+    """Raised when the configured database cannot be reached"""
+
+    def __init__(self, backend: str, reason):
+        self.backend = backend
+        super().__init__(f"{backend} is unavailable: {reason}")
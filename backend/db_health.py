@@ -0,0 +1,83 @@
+"""
+Background database health probing for Legal Voice App
+While the app runs, a task pings the configured backend every
+DB_HEALTH_INTERVAL_SECONDS off the event loop and keeps the latest
+outcome for /health, logging only when reachability changes.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+DB_HEALTH_INTERVAL_SECONDS = float(os.getenv("DB_HEALTH_INTERVAL_SECONDS", "15"))
+DB_HEALTH_TIMEOUT_SECONDS = float(os.getenv("DB_HEALTH_TIMEOUT_SECONDS", "5"))
+
+
+class HealthMonitor:
+    """Pings a backend periodically and remembers the last result"""
+
+    def __init__(self, name: str, ping: Callable[[], None],
+                 interval: float = DB_HEALTH_INTERVAL_SECONDS, timeout: float = DB_HEALTH_TIMEOUT_SECONDS):
+        self.name = name
+        self.interval = interval
+        self.timeout = timeout
+        self.healthy: Optional[bool] = None  # None until the first probe
+        self.latency_ms: Optional[float] = None
+        self.last_checked: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self._ping = ping
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> bool:
+        """Run one probe now; a ping that raises or outlasts the timeout counts as a failure"""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self._ping), self.timeout)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if self.healthy is not False:
+                print(f"[HEALTH] {self.name} unreachable: {error}")
+            self.healthy = False
+            self.last_error = error
+            self.consecutive_failures += 1
+        else:
+            if self.healthy is False:
+                print(f"[HEALTH] {self.name} reachable again after {self.consecutive_failures} failed probes")
+            self.healthy = True
+            self.last_error = None
+            self.consecutive_failures = 0
+        self.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.last_checked = datetime.now(timezone.utc).isoformat()
+        return self.healthy
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def start(self):
+        """Start probing on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": self.name,
+            "healthy": self.healthy,
+            "latency_ms": self.latency_ms,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+        }
@@ -0,0 +1,518 @@
+"""
+Durable email outbox for Legal Voice App
+EmailService never talks to the mail server from a request: it writes each
+email to the outbox and returns. An OutboxWorker, in its own process
+(email_worker.py) or on a thread in the app with EMAIL_OUTBOX_WORKER=inline,
+claims due emails in batches, delivers each batch over one pooled SMTP
+connection and records the outcome. Temporary failures are retried with
+exponential backoff; permanent ones, and emails still failing after
+EMAIL_MAX_ATTEMPTS, are dead-lettered for an admin to inspect and requeue.
+An email's ID is a hash of its event and recipient, so enqueueing the same
+event for the same recipient twice sends one email. Claims are leases: if a
+worker dies mid-batch, its emails are claimed again once the lease runs out,
+so delivery is at least once. Every claim counts as an attempt, so an email
+that kills or hangs its worker is dead-lettered once its last lease runs out,
+and every claim carries a claim_id, so a worker whose lease ran out cannot
+record an outcome over the worker that claimed the email after it. The outbox is a MongoDB collection on
+DB_TYPE=mongodb and an SQLite file (EMAIL_OUTBOX_PATH) otherwise, so the
+worker process reaches it whichever store the app uses.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from database import DB_TYPE
+from db_errors import DatabaseUnavailableError
+
+EMAIL_OUTBOX_WORKER = os.getenv("EMAIL_OUTBOX_WORKER", "inline")  # inline: a thread in the app; external: email_worker.py
+EMAIL_OUTBOX_PATH = os.getenv(
+    "EMAIL_OUTBOX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "email_outbox.db")
+)
+EMAIL_OUTBOX_COLLECTION = "email_outbox"
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "8"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "3600"))
+EMAIL_LEASE_SECONDS = float(os.getenv("EMAIL_LEASE_SECONDS", "300"))
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "2"))
+# Sent emails are kept this long, which is also how long a repeated event is recognised
+EMAIL_RETENTION_DAYS = float(os.getenv("EMAIL_RETENTION_DAYS", "7"))
+
+STATUSES = ("pending", "sending", "sent", "dead")
+LEASE_EXPIRED = "Lease expired on the last attempt; the worker died or hung while sending"
+
+
+def email_id(event: str, recipient: str) -> str:
+    """Idempotency key of one event's email to one recipient"""
+    return hashlib.sha256(f"{event}\n{recipient.strip().lower()}".encode("utf-8")).hexdigest()
+
+
+def _encode_attachments(attachments: Optional[List[Tuple[str, bytes]]]) -> List[dict]:
+    return [{"filename": filename, "data": base64.b64encode(data).decode("ascii")}
+            for filename, data in attachments or []]
+
+
+def _email(email_id: str, event: str, recipient: str, subject: str, html: str,
+           attachments: Optional[List[Tuple[str, bytes]]], due: float) -> dict:
+    return {
+        "id": email_id,
+        "event": event,
+        "recipient": recipient,
+        "subject": subject,
+        "html": html,
+        "attachments": _encode_attachments(attachments),
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": due,
+        "lease_until": None,
+        "claim_id": None,
+        "last_error": None,
+        "created_at": datetime.now().isoformat(),
+        "sent_at": None,
+    }
+
+
+def email_attachments(email: dict) -> List[Tuple[str, bytes]]:
+    """An outbox email's attachments as (filename, bytes) pairs"""
+    return [(a["filename"], base64.b64decode(a["data"])) for a in email.get("attachments") or []]
+
+
+def permanent_failure(error: Exception) -> bool:
+    """A 5xx answer will not change on retry; dropped connections and 4xx answers may"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    code = getattr(error, "smtp_code", None)
+    return isinstance(code, int) and code >= 500
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter after the given number of failed attempts"""
+    delay = min(EMAIL_RETRY_MAX_SECONDS, EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class SQLiteOutbox:
+    """Outbox in its own SQLite file, shared by the app and worker processes through WAL"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id TEXT PRIMARY KEY,
+        event TEXT NOT NULL,
+        recipient TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        html TEXT NOT NULL,
+        attachments TEXT NOT NULL DEFAULT '[]' CHECK (json_valid(attachments)),
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        lease_until REAL,
+        claim_id TEXT,
+        last_error TEXT,
+        created_at TEXT NOT NULL,
+        sent_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(status, next_attempt_at);
+    CREATE INDEX IF NOT EXISTS idx_email_outbox_lease ON email_outbox(status, lease_until);
+    """
+
+    def __init__(self, path: str = EMAIL_OUTBOX_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._ready_lock:
+                if not self._ready:
+                    conn.executescript(self.SCHEMA)
+                    self._migrate(conn)
+                    self._ready = True
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """Add columns introduced after an outbox file was created"""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(email_outbox)")}
+        if "claim_id" not in columns:
+            conn.execute("ALTER TABLE email_outbox ADD COLUMN claim_id TEXT")
+
+    @contextmanager
+    def _transaction(self):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> dict:
+        email = dict(row)
+        email["attachments"] = json.loads(email["attachments"])
+        return email
+
+    def add(self, email: dict) -> bool:
+        cursor = self.conn.execute(
+            """INSERT INTO email_outbox (id, event, recipient, subject, html, attachments, status, attempts,
+                                         next_attempt_at, lease_until, claim_id, last_error, created_at, sent_at)
+               VALUES (:id, :event, :recipient, :subject, :html, :attachments, :status, :attempts,
+                       :next_attempt_at, :lease_until, :claim_id, :last_error, :created_at, :sent_at)
+               ON CONFLICT (id) DO NOTHING""",
+            {**email, "attachments": json.dumps(email["attachments"])}
+        )
+        return cursor.rowcount == 1
+
+    def expire_leases(self, now: float, max_attempts: int) -> int:
+        """Dead-letter emails whose lease ran out on their last allowed attempt"""
+        return self.conn.execute(
+            """UPDATE email_outbox SET status = 'dead', lease_until = NULL, claim_id = NULL, last_error = ?
+               WHERE status = 'sending' AND lease_until <= ? AND attempts >= ?""",
+            (LEASE_EXPIRED, now, max_attempts)
+        ).rowcount
+
+    def claim(self, limit: int, now: float, lease: float, max_attempts: int) -> List[dict]:
+        """Lease due emails, and those whose lease ran out with attempts left, counting an attempt for each"""
+        claim_id = uuid.uuid4().hex
+        with self._transaction() as conn:
+            rows = conn.execute(
+                """SELECT * FROM email_outbox
+                   WHERE (status = 'pending' AND next_attempt_at <= ?)
+                      OR (status = 'sending' AND lease_until <= ? AND attempts < ?)
+                   ORDER BY next_attempt_at LIMIT ?""",
+                (now, now, max_attempts, limit)
+            ).fetchall()
+            conn.executemany(
+                """UPDATE email_outbox SET status = 'sending', attempts = attempts + 1, lease_until = ?, claim_id = ?
+                   WHERE id = ?""",
+                [(now + lease, claim_id, row["id"]) for row in rows]
+            )
+        return [{**self._from_row(row), "status": "sending", "attempts": row["attempts"] + 1,
+                 "lease_until": now + lease, "claim_id": claim_id} for row in rows]
+
+    def mark_sent(self, email_id: str, claim_id: str) -> bool:
+        """False if the claim was lost: the lease ran out and the email was claimed again"""
+        cursor = self.conn.execute(
+            """UPDATE email_outbox SET status = 'sent', lease_until = NULL, last_error = NULL, sent_at = ?,
+                   html = '', attachments = '[]' WHERE id = ? AND claim_id = ? AND status = 'sending'""",
+            (datetime.now().isoformat(), email_id, claim_id)
+        )
+        return cursor.rowcount == 1
+
+    def mark_failed(self, email_id: str, claim_id: str, error: str, retry_at: Optional[float]) -> bool:
+        """Back to pending until retry_at, or dead-lettered when retry_at is None; False if the claim was lost"""
+        cursor = self.conn.execute(
+            """UPDATE email_outbox SET status = ?, lease_until = NULL, last_error = ?,
+                   next_attempt_at = COALESCE(?, next_attempt_at) WHERE id = ? AND claim_id = ? AND status = 'sending'""",
+            ("pending" if retry_at is not None else "dead", error, retry_at, email_id, claim_id)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, email_id: str, attachments: List[dict], now: float) -> bool:
+        cursor = self.conn.execute(
+            """UPDATE email_outbox SET attachments = ?, next_attempt_at = ?
+               WHERE id = ? AND status = 'pending' AND attempts = 0""",
+            (json.dumps(attachments), now, email_id)
+        )
+        return cursor.rowcount == 1
+
+    def requeue(self, email_id: str, now: float) -> bool:
+        cursor = self.conn.execute(
+            """UPDATE email_outbox SET status = 'pending', attempts = 0, next_attempt_at = ?
+               WHERE id = ? AND status = 'dead'""",
+            (now, email_id)
+        )
+        return cursor.rowcount == 1
+
+    def dead_letters(self, limit: int) -> List[dict]:
+        rows = self.conn.execute(
+            """SELECT id, event, recipient, subject, attempts, last_error, created_at FROM email_outbox
+               WHERE status = 'dead' ORDER BY created_at DESC LIMIT ?""",
+            (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def purge_sent(self, before: str) -> int:
+        return self.conn.execute("DELETE FROM email_outbox WHERE status = 'sent' AND sent_at < ?", (before,)).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM email_outbox GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+class MongoOutbox:
+    """Outbox in a MongoDB collection; each claim is an atomic findOneAndUpdate"""
+
+    def __init__(self, get_database: Callable):
+        self._get_database = get_database
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            collection = self._get_database()[EMAIL_OUTBOX_COLLECTION]
+            collection.create_index([("status", 1), ("next_attempt_at", 1)])
+            collection.create_index([("status", 1), ("lease_until", 1)])
+            self._collection = collection
+        return self._collection
+
+    @staticmethod
+    def _from_doc(doc: dict) -> dict:
+        doc["id"] = doc.pop("_id")
+        return doc
+
+    def add(self, email: dict) -> bool:
+        from pymongo.errors import DuplicateKeyError
+        doc = dict(email)
+        doc["_id"] = doc.pop("id")
+        try:
+            self.collection.insert_one(doc)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def expire_leases(self, now: float, max_attempts: int) -> int:
+        result = self.collection.update_many(
+            {"status": "sending", "lease_until": {"$lte": now}, "attempts": {"$gte": max_attempts}},
+            {"$set": {"status": "dead", "lease_until": None, "claim_id": None, "last_error": LEASE_EXPIRED}}
+        )
+        return result.modified_count
+
+    def claim(self, limit: int, now: float, lease: float, max_attempts: int) -> List[dict]:
+        from pymongo import ReturnDocument
+        claimed = []
+        claim_id = uuid.uuid4().hex
+        due = {"$or": [{"status": "pending", "next_attempt_at": {"$lte": now}},
+                       {"status": "sending", "lease_until": {"$lte": now}, "attempts": {"$lt": max_attempts},
+                        "claim_id": {"$ne": claim_id}}]}  # Not one this call just claimed with a zero lease
+        while len(claimed) < limit:
+            doc = self.collection.find_one_and_update(
+                due, {"$set": {"status": "sending", "lease_until": now + lease, "claim_id": claim_id},
+                      "$inc": {"attempts": 1}},
+                sort=[("next_attempt_at", 1)], return_document=ReturnDocument.AFTER
+            )
+            if doc is None:
+                break
+            claimed.append(self._from_doc(doc))
+        return claimed
+
+    def mark_sent(self, email_id: str, claim_id: str) -> bool:
+        result = self.collection.update_one({"_id": email_id, "claim_id": claim_id, "status": "sending"}, {
+            "$set": {"status": "sent", "lease_until": None, "last_error": None,
+                     "sent_at": datetime.now().isoformat(), "html": "", "attachments": []}
+        })
+        return result.modified_count == 1
+
+    def mark_failed(self, email_id: str, claim_id: str, error: str, retry_at: Optional[float]) -> bool:
+        update = {"status": "pending" if retry_at is not None else "dead", "lease_until": None, "last_error": error}
+        if retry_at is not None:
+            update["next_attempt_at"] = retry_at
+        result = self.collection.update_one({"_id": email_id, "claim_id": claim_id, "status": "sending"},
+                                            {"$set": update})
+        return result.modified_count == 1
+
+    def release(self, email_id: str, attachments: List[dict], now: float) -> bool:
+        result = self.collection.update_one({"_id": email_id, "status": "pending", "attempts": 0},
+                                            {"$set": {"attachments": attachments, "next_attempt_at": now}})
+        return result.modified_count == 1
+
+    def requeue(self, email_id: str, now: float) -> bool:
+        result = self.collection.update_one({"_id": email_id, "status": "dead"},
+                                            {"$set": {"status": "pending", "attempts": 0, "next_attempt_at": now}})
+        return result.modified_count == 1
+
+    def dead_letters(self, limit: int) -> List[dict]:
+        projection = {"event": 1, "recipient": 1, "subject": 1, "attempts": 1, "last_error": 1, "created_at": 1}
+        docs = self.collection.find({"status": "dead"}, projection).sort("created_at", -1).limit(limit)
+        return [self._from_doc(doc) for doc in docs]
+
+    def purge_sent(self, before: str) -> int:
+        return self.collection.delete_many({"status": "sent", "sent_at": {"$lt": before}}).deleted_count
+
+    def counts(self) -> Dict[str, int]:
+        return {row["_id"]: row["n"] for row in
+                self.collection.aggregate([{"$group": {"_id": "$status", "n": {"$sum": 1}}}])}
+
+
+class EmailOutbox:
+    """Enqueueing side of the outbox, plus the admin view of it"""
+
+    def __init__(self, store):
+        self.store = store
+        self.wakeup = threading.Event()  # Set on enqueue, so an inline worker need not wait for its poll
+
+    def enqueue(self, event: str, recipient: str, subject: str, html: str,
+                attachments: Optional[List[Tuple[str, bytes]]] = None, hold: float = 0) -> Optional[str]:
+        """Queue an email, due in hold seconds unless release()d sooner; returns its ID, or None if this
+        event's email to recipient is already queued or sent. Raises DatabaseUnavailableError if the
+        outbox cannot be written, so the caller fails instead of losing the email."""
+        key = email_id(event, recipient)
+        try:
+            added = self.store.add(_email(key, event, recipient, subject, html, attachments, time.time() + hold))
+        except Exception as e:
+            raise DatabaseUnavailableError("email outbox", e) from e
+        if not added:
+            print(f"[OUTBOX] Skipping duplicate {event} email to {recipient}")
+            return None
+        if not hold:
+            self.wakeup.set()
+        return key
+
+    def release(self, email_id: str, attachments: Optional[List[Tuple[str, bytes]]] = None) -> bool:
+        """Make a held email due now, with these attachments; False if it is no longer waiting"""
+        released = self.store.release(email_id, _encode_attachments(attachments), time.time())
+        if released:
+            self.wakeup.set()
+        return released
+
+    def requeue(self, email_id: str) -> bool:
+        """Give a dead-lettered email a fresh set of attempts"""
+        requeued = self.store.requeue(email_id, time.time())
+        if requeued:
+            self.wakeup.set()
+        return requeued
+
+    def dead_letters(self, limit: int = 100) -> List[dict]:
+        return self.store.dead_letters(limit)
+
+    def stats(self) -> dict:
+        counts = self.store.counts()
+        return {status: counts.get(status, 0) for status in STATUSES}
+
+
+class OutboxWorker:
+    """Claims due emails in batches and hands each batch to deliver(), which returns None or an error per email"""
+
+    def __init__(self, outbox: EmailOutbox, deliver: Callable[[List[dict]], List[Optional[Exception]]],
+                 batch_size: int = EMAIL_BATCH_SIZE, max_attempts: int = EMAIL_MAX_ATTEMPTS,
+                 lease: float = EMAIL_LEASE_SECONDS, poll_interval: float = EMAIL_POLL_SECONDS):
+        self.outbox = outbox
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self.lost = 0  # Outcomes dropped because the lease had run out
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge = 0.0
+
+    def run_once(self) -> int:
+        """Deliver one batch of due emails; returns how many were claimed"""
+        store = self.outbox.store
+        expired = store.expire_leases(time.time(), self.max_attempts)
+        if expired:
+            self.dead += expired
+            print(f"[OUTBOX] Dead-lettered {expired} emails whose last lease ran out")
+        batch = store.claim(self.batch_size, time.time(), self.lease, self.max_attempts)
+        if not batch:
+            return 0
+        try:
+            results = self.deliver(batch)
+        except Exception as e:
+            results = [e] * len(batch)
+        for email, error in zip(batch, results):
+            if error is None:
+                if store.mark_sent(email["id"], email["claim_id"]):
+                    self.sent += 1
+                else:
+                    self._lost(email)
+                continue
+            attempts = email["attempts"]
+            message = str(error) or type(error).__name__
+            dead = permanent_failure(error) or attempts >= self.max_attempts
+            retry_at = None if dead else time.time() + retry_delay(attempts)
+            if not store.mark_failed(email["id"], email["claim_id"], message, retry_at):
+                self._lost(email)
+            elif dead:
+                self.dead += 1
+                print(f"[OUTBOX] Dead-lettered {email['event']} email to {email['recipient']}: {message}")
+            else:
+                self.retried += 1
+                print(f"[OUTBOX] Retrying {email['event']} email to {email['recipient']} "
+                      f"(attempt {attempts} failed: {message})")
+        return len(batch)
+
+    def _lost(self, email: dict):
+        self.lost += 1
+        print(f"[OUTBOX] Lease on {email['event']} email to {email['recipient']} ran out before it was recorded; "
+              f"another worker owns it now")
+
+    def _purge(self):
+        if time.time() - self._last_purge < 3600:
+            return
+        self._last_purge = time.time()
+        before = datetime.fromtimestamp(time.time() - EMAIL_RETENTION_DAYS * 86400).isoformat()
+        purged = self.outbox.store.purge_sent(before)
+        if purged:
+            print(f"[OUTBOX] Purged {purged} sent emails")
+
+    def run(self):
+        """Deliver until stop() is called"""
+        while not self._stop.is_set():
+            self.outbox.wakeup.clear()
+            try:
+                self._purge()
+                if self.run_once() == self.batch_size:
+                    continue  # More may be due right away
+            except Exception as e:
+                print(f"[OUTBOX] Worker error: {e}")
+            self.outbox.wakeup.wait(self.poll_interval)
+
+    def start(self):
+        """Run on a daemon thread in this process"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self.outbox.wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"running": self._thread is not None, "sent": self.sent, "retried": self.retried, "dead": self.dead,
+                "lost_leases": self.lost}
+
+
+def _create_outbox_store():
+    if DB_TYPE == "mongodb":
+        from mongo_connection import mongo
+        return MongoOutbox(lambda: mongo.database)
+    return SQLiteOutbox(EMAIL_OUTBOX_PATH)
+
+
+# Global instance; the store is opened with the first email
+email_outbox = EmailOutbox(_create_outbox_store())
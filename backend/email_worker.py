@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Deliver queued emails from the outbox
+Run alongside the API, with the same DB_TYPE and SMTP settings, and start the
+API with EMAIL_OUTBOX_WORKER=external so it only queues:
+
+    DB_TYPE=mongodb EMAIL_OUTBOX_WORKER=external python email_worker.py
+
+Several workers can run at once; each claims its own batches.
+"""
+
+import os
+import signal
+import sys
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import DB_TYPE
+from email_outbox import OutboxWorker, email_outbox
+from services.email_service import EmailService
+from smtp_pool import smtp_pool
+
+def main():
+    worker = OutboxWorker(email_outbox, EmailService.deliver_batch)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop(timeout=0))
+    print(f"📬 Email worker started for DB_TYPE={DB_TYPE}, batches of {worker.batch_size}")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        smtp_pool.close()
+    print(f"✅ Email worker stopped: {worker.stats()}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
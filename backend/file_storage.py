@@ -0,0 +1,313 @@
+"""
+Binary file storage for Legal Voice App
+Uploads are streamed in chunks into GridFS on MongoDB, or into a local
+content-addressed store for the other backends. Database records keep only
+the metadata returned by save(); the bytes are served from /files/{file_id}.
+Browsers load those in <img> and <a> tags, which cannot send the JWT, so the
+API hands out signed links instead: an HMAC over the file ID and an expiry,
+valid for that one file for FILE_URL_TTL_SECONDS or a little longer.
+"""
+
+import base64
+import hashlib
+import hmac
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Callable, Iterator, List, Optional
+
+from config import FILE_URL_SECRET, FILE_URL_TTL_SECONDS, USE_GRIDFS
+from database import DB_TYPE
+
+FILE_STORAGE_PATH = os.getenv(
+    "FILE_STORAGE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "files")
+)
+FILE_CHUNK_SIZE = 255 * 1024  # GridFS default chunk size, also used for streaming reads
+
+GRIDFS_BUCKET = "uploads"
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+FILE_URL_EXPIRY_STEP = 600  # Expiries are rounded up to this, so repeated page loads share a cacheable URL
+
+
+class StoredFile:
+    """An open stored file: its metadata plus a seekable binary reader"""
+
+    def __init__(self, file_id: str, filename: str, content_type: str, length: int,
+                 owner_ids: List[str], reader: BinaryIO):
+        self.file_id = file_id
+        self.filename = filename
+        self.content_type = content_type
+        self.length = length
+        self.owner_ids = owner_ids
+        self.reader = reader
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) in chunks, closing the reader when done"""
+        end = self.length - 1 if end is None else end
+        try:
+            self.reader.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = self.reader.read(min(FILE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            self.reader.close()
+
+
+class GridFSStorage:
+    """Files in a GridFS bucket, addressed by ObjectId"""
+
+    storage_type = "gridfs"
+
+    def __init__(self, get_database: Callable):
+        # The bucket is opened on first use, so creating the store never connects
+        self._get_database = get_database
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            from gridfs import GridFSBucket
+            self._bucket = GridFSBucket(self._get_database(), bucket_name=GRIDFS_BUCKET, chunk_size_bytes=FILE_CHUNK_SIZE)
+        return self._bucket
+
+    def save(self, source: BinaryIO, filename: str, content_type: str, owner_id: str) -> dict:
+        """Stream source into GridFS chunk by chunk"""
+        grid_in = self.bucket.open_upload_stream(
+            filename,
+            metadata={"content_type": content_type, "owner_ids": [owner_id]}
+        )
+        try:
+            while True:
+                chunk = source.read(FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                grid_in.write(chunk)
+        except Exception:
+            grid_in.abort()
+            raise
+        grid_in.close()
+        return {
+            "file_id": str(grid_in._id),
+            "filename": filename,
+            "content_type": content_type,
+            "length": grid_in.length,
+            "storage_type": self.storage_type
+        }
+
+    def open(self, file_id: str) -> Optional[StoredFile]:
+        from bson import ObjectId
+        from bson.errors import InvalidId
+        from gridfs.errors import NoFile
+        try:
+            grid_out = self.bucket.open_download_stream(ObjectId(file_id))
+        except (InvalidId, NoFile):
+            return None
+        metadata = grid_out.metadata or {}
+        return StoredFile(
+            file_id, grid_out.filename, metadata.get("content_type", "application/octet-stream"),
+            grid_out.length, metadata.get("owner_ids", []), grid_out
+        )
+
+    def delete(self, file_id: str, owner_id: str) -> bool:
+        from bson import ObjectId
+        from bson.errors import InvalidId
+        from gridfs.errors import NoFile
+        stored = self.open(file_id)
+        if not stored or owner_id not in stored.owner_ids:
+            return False
+        stored.reader.close()
+        try:
+            self.bucket.delete(ObjectId(file_id))
+        except (InvalidId, NoFile):
+            return False
+        return True
+
+
+class LocalFileStorage:
+    """Files on disk named by their SHA-256, so identical uploads are stored once.
+    A JSON sidecar next to each blob records its type and the users that uploaded it."""
+
+    storage_type = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _paths(self, digest: str):
+        directory = os.path.join(self.root, digest[:2])
+        return directory, os.path.join(directory, digest), os.path.join(directory, f"{digest}.json")
+
+    def _read_meta(self, meta_path: str) -> Optional[dict]:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, meta_path: str, meta: dict):
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def save(self, source: BinaryIO, filename: str, content_type: str, owner_id: str) -> dict:
+        """Stream source to a temp file while hashing it, then move it to its content address"""
+        hasher = hashlib.sha256()
+        length = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = source.read(FILE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    length += len(chunk)
+
+            digest = hasher.hexdigest()
+            directory, blob_path, meta_path = self._paths(digest)
+            with self._lock:
+                os.makedirs(directory, exist_ok=True)
+                if os.path.exists(blob_path):
+                    os.remove(tmp_path)  # Same bytes already stored
+                else:
+                    os.replace(tmp_path, blob_path)
+                meta = self._read_meta(meta_path) or {
+                    "filename": filename,
+                    "content_type": content_type,
+                    "length": length,
+                    "owner_ids": []
+                }
+                if owner_id not in meta["owner_ids"]:
+                    meta["owner_ids"].append(owner_id)
+                self._write_meta(meta_path, meta)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return {
+            "file_id": digest,
+            "filename": filename,
+            "content_type": content_type,
+            "length": length,
+            "storage_type": self.storage_type
+        }
+
+    def open(self, file_id: str) -> Optional[StoredFile]:
+        if not _SHA256_RE.match(file_id):
+            return None
+        _, blob_path, meta_path = self._paths(file_id)
+        meta = self._read_meta(meta_path)
+        if meta is None:
+            return None
+        try:
+            reader = open(blob_path, "rb")
+        except FileNotFoundError:
+            return None
+        return StoredFile(
+            file_id, meta.get("filename"), meta.get("content_type", "application/octet-stream"),
+            meta.get("length", os.fstat(reader.fileno()).st_size), meta.get("owner_ids", []), reader
+        )
+
+    def delete(self, file_id: str, owner_id: str) -> bool:
+        """Drop owner_id's reference; the blob goes once nobody references it"""
+        if not _SHA256_RE.match(file_id):
+            return False
+        _, blob_path, meta_path = self._paths(file_id)
+        with self._lock:
+            meta = self._read_meta(meta_path)
+            if meta is None or owner_id not in meta.get("owner_ids", []):
+                return False
+            meta["owner_ids"].remove(owner_id)
+            if meta["owner_ids"]:
+                self._write_meta(meta_path, meta)
+            else:
+                for path in (blob_path, meta_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+        return True
+
+
+def _create_storage():
+    if DB_TYPE == "mongodb" and USE_GRIDFS:
+        from mongo_connection import mongo
+        print(f"[STORAGE] Using GridFS bucket '{GRIDFS_BUCKET}'")
+        return GridFSStorage(lambda: mongo.database)
+    print(f"[STORAGE] Using local file store at {FILE_STORAGE_PATH}")
+    return LocalFileStorage(FILE_STORAGE_PATH)
+
+
+def file_url(file_id: str) -> str:
+    """API path a stored file is served from"""
+    return f"/files/{file_id}"
+
+
+def _file_signature(file_id: str, expires: int) -> str:
+    if not FILE_URL_SECRET:
+        raise RuntimeError("FILE_URL_SECRET or JWT_SECRET must be set to sign file links")
+    return hmac.new(FILE_URL_SECRET.encode("utf-8"), f"files:{file_id}:{expires}".encode("utf-8"),
+                    hashlib.sha256).hexdigest()
+
+
+def signed_file_url(file_id: str, ttl: int = FILE_URL_TTL_SECONDS) -> str:
+    """Link to a stored file that works without the JWT, for that file only, until it expires"""
+    expires = -(-int(time.time() + ttl) // FILE_URL_EXPIRY_STEP) * FILE_URL_EXPIRY_STEP
+    return f"{file_url(file_id)}?expires={expires}&signature={_file_signature(file_id, expires)}"
+
+
+def verify_file_signature(file_id: str, expires: int, signature: str) -> bool:
+    """Whether a signed link to file_id is genuine and unexpired"""
+    return expires >= time.time() and hmac.compare_digest(_file_signature(file_id, expires), signature)
+
+
+def stored_file_url(url: str) -> str:
+    """A /files/ URL without its signature, as records keep it"""
+    return url.split("?", 1)[0] if url.startswith("/files/") else url
+
+
+def save_data_url(data_url: str, filename: str, owner_id: str) -> dict:
+    """Move an inline base64 data: URL (legacy fallback uploads) into the file store"""
+    header, _, payload = data_url.partition(",")
+    content_type = header[len("data:"):].split(";")[0] or "application/octet-stream"
+    return file_storage.save(io.BytesIO(base64.b64decode(payload)), filename, content_type, owner_id)
+
+
+def parse_range(range_header: Optional[str], length: int):
+    """Parse a single 'bytes=start-end' Range header into an inclusive (start, end).
+    Returns None when there is no usable range (serve the whole file) and
+    raises ValueError when the range lies outside the file."""
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text == "":
+            # Suffix range: the last N bytes
+            suffix = int(end_text)
+            if suffix <= 0 or length == 0:
+                raise ValueError(f"Range not satisfiable: {range_header}")
+            return max(length - suffix, 0), length - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else length - 1
+    except ValueError as e:
+        if "not satisfiable" in str(e):
+            raise
+        return None  # Malformed ranges are ignored, as RFC 7233 allows
+    if start >= length or start > end:
+        raise ValueError(f"Range not satisfiable: {range_header}")
+    return start, min(end, length - 1)
+
+
+# Global instance
+file_storage = _create_storage()
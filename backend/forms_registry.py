@@ -0,0 +1,171 @@
+"""
+Form schema registry for Legal Voice App
+The forms users can fill, with their field definitions. Shared by the API,
+exports and anything else that needs to know a form's fields.
+"""
+
+from typing import List
+
+FORMS_DB = {
+    "name_change": {
+        "id": "name_change",
+        "title": "Name Change Affidavit",
+        "description": "Apply for official name change",
+        "fields": [
+            {"id": "applicant_full_name", "label": "Full Name", "type": "text", "required": True, "help": "Your current full legal name"},
+            {"id": "applicant_age", "label": "Age", "type": "number", "required": True, "help": "Your age in years"},
+            {"id": "applicant_father_name", "label": "Father's Name", "type": "text", "required": True, "help": "Father or guardian's full name"},
+            {"id": "current_address", "label": "Current Address", "type": "textarea", "required": True, "help": "Full residential address with PIN code"},
+            {"id": "previous_name", "label": "Previous Name", "type": "text", "required": True, "help": "The name you used earlier"},
+            {"id": "new_name", "label": "New Name", "type": "text", "required": True, "help": "The new name you want officially"},
+            {"id": "reason", "label": "Reason for Change", "type": "textarea", "required": True, "help": "Short reason, e.g., marriage, spelling correction"},
+            {"id": "date_of_declaration", "label": "Date of Declaration", "type": "date", "required": True, "help": "Date when you sign this form"},
+            {"id": "place", "label": "Place", "type": "text", "required": True, "help": "City/town where you sign"},
+            {"id": "id_proof_type", "label": "ID Proof Type", "type": "select", "required": True, "options": ["Aadhar", "Passport", "Voter ID", "Driving Licence"]},
+            {"id": "id_proof_number", "label": "ID Proof Number", "type": "text", "required": True, "help": "ID number from selected proof"},
+        ]
+    },
+    "property_dispute": {
+        "id": "property_dispute",
+        "title": "Property Dispute Plaint",
+        "description": "File a property dispute case",
+        "fields": [
+            {"id": "plaintiff_name", "label": "Your Name", "type": "text", "required": True},
+            {"id": "plaintiff_address", "label": "Your Address", "type": "textarea", "required": True},
+            {"id": "defendant_name", "label": "Defendant Name", "type": "text", "required": True},
+            {"id": "defendant_address", "label": "Defendant Address", "type": "textarea", "required": True},
+            {"id": "property_description", "label": "Property Details", "type": "textarea", "required": True},
+            {"id": "nature_of_claim", "label": "Claim Type", "type": "select", "required": True, "options": ["Ownership", "Ejectment", "Partition", "Possession"]},
+            {"id": "value_of_claim", "label": "Claim Value (₹)", "type": "number", "required": True},
+            {"id": "facts_of_case", "label": "Facts of Case", "type": "textarea", "required": True},
+            {"id": "relief_sought", "label": "Relief Sought", "type": "textarea", "required": True},
+        ]
+    },
+    "traffic_fine_appeal": {
+        "id": "traffic_fine_appeal",
+        "title": "Traffic Fine Appeal",
+        "description": "Appeal against traffic challan",
+        "fields": [
+            {"id": "appellant_name", "label": "Your Name", "type": "text", "required": True},
+            {"id": "appellant_address", "label": "Your Address", "type": "textarea", "required": True},
+            {"id": "challan_number", "label": "Challan Number", "type": "text", "required": True},
+            {"id": "vehicle_number", "label": "Vehicle Number", "type": "text", "required": True},
+            {"id": "date_of_challan", "label": "Date of Challan", "type": "date", "required": True},
+            {"id": "offence_details", "label": "Offence Details", "type": "textarea", "required": True},
+            {"id": "explanation", "label": "Explanation", "type": "textarea", "required": True},
+        ]
+    },
+    "mutual_divorce": {
+        "id": "mutual_divorce",
+        "title": "Mutual Divorce Petition",
+        "description": "File for mutual consent divorce",
+        "fields": [
+            {"id": "husband_name", "label": "Husband's Name", "type": "text", "required": True},
+            {"id": "wife_name", "label": "Wife's Name", "type": "text", "required": True},
+            {"id": "marriage_date", "label": "Marriage Date", "type": "date", "required": True},
+            {"id": "marriage_place", "label": "Marriage Place", "type": "text", "required": True},
+            {"id": "reason_for_divorce", "label": "Reason for Divorce", "type": "textarea", "required": True},
+            {"id": "mutual_agreement", "label": "Mutual Agreement", "type": "checkbox", "required": True},
+        ]
+    },
+    "affidavit_general": {
+        "id": "affidavit_general",
+        "title": "General Affidavit",
+        "description": "Sworn statement for verification",
+        "fields": [
+            {"id": "deponent_name", "label": "Your Name", "type": "text", "required": True},
+            {"id": "deponent_age", "label": "Your Age", "type": "number", "required": True},
+            {"id": "deponent_address", "label": "Your Address", "type": "textarea", "required": True},
+            {"id": "statement_text", "label": "Statement", "type": "textarea", "required": True},
+            {"id": "place_of_sworn", "label": "Place of Sworn", "type": "text", "required": True},
+            {"id": "date_of_sworn", "label": "Date of Sworn", "type": "date", "required": True},
+        ]
+    },
+    "name_change_gazette": {
+        "id": "name_change_gazette",
+        "title": "Name Change Gazette Notification",
+        "description": "Apply for name change gazette publication",
+        "fields": [
+            {"id": "applicant_full_name", "label": "Current Full Name", "type": "text", "required": True, "help": "Your current full legal name"},
+            {"id": "new_name", "label": "New Name", "type": "text", "required": True, "help": "Your desired new name"},
+            {"id": "previous_name", "label": "Previous Name", "type": "text", "required": True, "help": "Any previous names"},
+            {"id": "reason", "label": "Reason", "type": "textarea", "required": True, "help": "Reason for name change"},
+            {"id": "publication_address", "label": "Publication Address", "type": "textarea", "required": True, "help": "Address for gazette office"},
+            {"id": "proof_of_publication_fee", "label": "Publication Fee Proof", "type": "file", "required": False, "help": "Upload fee payment proof"},
+            {"id": "date_of_application", "label": "Application Date", "type": "date", "required": True, "help": "Date of application"},
+        ]
+    },
+    "property_dispute_simple": {
+        "id": "property_dispute_simple",
+        "title": "Property Dispute Plaint (Simple)",
+        "description": "File a simple property dispute case",
+        "fields": [
+            {"id": "plaintiff_name", "label": "Plaintiff Name", "type": "text", "required": True, "help": "Your full legal name"},
+            {"id": "plaintiff_address", "label": "Plaintiff Address", "type": "textarea", "required": True, "help": "Your complete address with pincode"},
+            {"id": "defendant_name", "label": "Defendant Name", "type": "text", "required": True, "help": "Defendant full legal name"},
+            {"id": "defendant_address", "label": "Defendant Address", "type": "textarea", "required": True, "help": "Defendant complete address"},
+            {"id": "property_description", "label": "Property Description", "type": "textarea", "required": True, "help": "Location, survey number, or address of property"},
+            {"id": "nature_of_claim", "label": "Nature of Claim", "type": "select", "required": True, "options": ["Ownership", "Ejectment", "Partition", "Possession"], "help": "Type of claim"},
+            {"id": "value_of_claim", "label": "Value of Claim (₹)", "type": "number", "required": True, "help": "Monetary value of claim"},
+            {"id": "facts_of_case", "label": "Facts of Case", "type": "textarea", "required": True, "help": "Detailed facts of the case"},
+            {"id": "relief_sought", "label": "Relief Sought", "type": "textarea", "required": True, "help": "What relief you are seeking"},
+            {"id": "date_of_incident", "label": "Date of Incident", "type": "date", "required": False, "help": "When the incident occurred"},
+            {"id": "evidence_list", "label": "Evidence List", "type": "file", "required": False, "help": "Upload evidence documents"},
+            {"id": "verification_declaration", "label": "I Verify", "type": "boolean", "required": True, "help": "I verify that the above information is true"},
+        ]
+    },
+    "traffic_fine_appeal": {
+        "id": "traffic_fine_appeal",
+        "title": "Traffic Fine Appeal",
+        "description": "Appeal against traffic challan",
+        "fields": [
+            {"id": "appellant_name", "label": "Appellant Name", "type": "text", "required": True, "help": "Your full legal name"},
+            {"id": "appellant_address", "label": "Appellant Address", "type": "textarea", "required": True, "help": "Your complete address"},
+            {"id": "challan_number", "label": "Challan Number", "type": "text", "required": True, "help": "Your traffic fine challan number"},
+            {"id": "vehicle_number", "label": "Vehicle Number", "type": "text", "required": True, "help": "Vehicle registration number"},
+            {"id": "date_of_challan", "label": "Date of Challan", "type": "date", "required": True, "help": "When the challan was issued"},
+            {"id": "offence_details", "label": "Offence Details", "type": "textarea", "required": True, "help": "Details of the alleged offence"},
+            {"id": "explanation", "label": "Your Explanation", "type": "textarea", "required": True, "help": "Your explanation/defense"},
+            {"id": "police_station", "label": "Police Station", "type": "text", "required": False, "help": "Police station name"},
+            {"id": "attachments", "label": "Attachments", "type": "file", "required": False, "help": "Upload supporting documents"},
+        ]
+    },
+    "mutual_divorce_petition": {
+        "id": "mutual_divorce_petition",
+        "title": "Mutual Divorce Petition",
+        "description": "File for mutual divorce",
+        "fields": [
+            {"id": "husband_full_name", "label": "Husband's Full Name", "type": "text", "required": True, "help": "Husband's full legal name"},
+            {"id": "wife_full_name", "label": "Wife's Full Name", "type": "text", "required": True, "help": "Wife's full legal name"},
+            {"id": "marriage_date", "label": "Marriage Date", "type": "date", "required": True, "help": "Date of marriage"},
+            {"id": "marriage_place", "label": "Place of Marriage", "type": "text", "required": True, "help": "Where the marriage took place"},
+            {"id": "residential_address_husband", "label": "Husband's Address", "type": "textarea", "required": True, "help": "Husband's residential address"},
+            {"id": "residential_address_wife", "label": "Wife's Address", "type": "textarea", "required": True, "help": "Wife's residential address"},
+            {"id": "reason_for_divorce", "label": "Reason for Divorce", "type": "textarea", "required": True, "help": "Reason for seeking divorce"},
+            {"id": "mutual_agreement", "label": "Mutual Agreement", "type": "boolean", "required": True, "help": "Both parties agree to divorce"},
+            {"id": "children", "label": "Children Details", "type": "textarea", "required": False, "help": "Names, DOB, and custody preferences"},
+            {"id": "maintenance_terms", "label": "Maintenance Terms", "type": "textarea", "required": False, "help": "Agreed maintenance terms"},
+            {"id": "date_of_affidavit", "label": "Date of Affidavit", "type": "date", "required": True, "help": "Date of this affidavit"},
+            {"id": "attachments", "label": "Attachments", "type": "file", "required": True, "help": "Marriage certificate and IDs required"},
+        ]
+    },
+    "affidavit_general": {
+        "id": "affidavit_general",
+        "title": "General Affidavit",
+        "description": "Create a general affidavit",
+        "fields": [
+            {"id": "deponent_name", "label": "Deponent Name", "type": "text", "required": True, "help": "Your full legal name"},
+            {"id": "deponent_age", "label": "Age", "type": "number", "required": True, "help": "Your age"},
+            {"id": "deponent_address", "label": "Address", "type": "textarea", "required": True, "help": "Your complete address"},
+            {"id": "statement_text", "label": "Statement", "type": "textarea", "required": True, "help": "Your statement in first person"},
+            {"id": "place_of_sworn", "label": "Place of Sworn", "type": "text", "required": True, "help": "Where this is sworn"},
+            {"id": "date_of_sworn", "label": "Date of Sworn", "type": "date", "required": True, "help": "Date of swearing"},
+            {"id": "notary_name", "label": "Notary Name", "type": "text", "required": False, "help": "Name of notary public"},
+            {"id": "attachments", "label": "Attachments", "type": "file", "required": False, "help": "Supporting documents"},
+        ]
+    }
+}
+
+def form_field_ids(form_id: str) -> List[str]:
+    """Field ids of a form in schema order; empty for unknown forms"""
+    return [field["id"] for field in FORMS_DB.get(form_id, {}).get("fields", [])]
@@ -0,0 +1,252 @@
+"""
+In-memory secondary indexes for the mock and persistent databases
+Keeps lookups by email, user, form/status and conversation constant-time,
+and per-key counters current for dashboard statistics
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+class UniqueIndex:
+    """Maps a unique key (e.g. email) to a single primary key"""
+
+    def __init__(self, key_func: Callable[[dict], Optional[Hashable]]):
+        self.key_func = key_func
+        self._entries: Dict[Hashable, str] = {}
+
+    def add(self, pk: str, record: dict):
+        key = self.key_func(record)
+        if key is not None:
+            self._entries[key] = pk
+
+    def remove(self, pk: str, record: dict):
+        key = self.key_func(record)
+        if key is not None and self._entries.get(key) == pk:
+            del self._entries[key]
+
+    def get(self, key: Hashable) -> Optional[str]:
+        return self._entries.get(key)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class MultiIndex:
+    """Maps a non-unique key (e.g. user_id) to the primary keys holding it, in insertion order"""
+
+    def __init__(self, key_func: Callable[[dict], Optional[Hashable]]):
+        self.key_func = key_func
+        # dict-as-ordered-set keeps insertion order with O(1) removal
+        self._entries: Dict[Hashable, Dict[str, None]] = {}
+
+    def add(self, pk: str, record: dict):
+        key = self.key_func(record)
+        if key is not None:
+            self._entries.setdefault(key, {})[pk] = None
+
+    def remove(self, pk: str, record: dict):
+        key = self.key_func(record)
+        bucket = self._entries.get(key)
+        if bucket is not None:
+            bucket.pop(pk, None)
+            if not bucket:
+                del self._entries[key]
+
+    def get(self, key: Hashable) -> List[str]:
+        return list(self._entries.get(key, ()))
+
+    def clear(self):
+        self._entries.clear()
+
+
+class SortedIndex:
+    """Maps a key (e.g. user_id) to primary keys kept sorted by a sort field (e.g. timestamp)"""
+
+    def __init__(self, key_func: Callable[[dict], Optional[Hashable]], sort_func: Callable[[dict], str]):
+        self.key_func = key_func
+        self.sort_func = sort_func
+        self._entries: Dict[Hashable, List[tuple]] = {}
+
+    def add(self, pk: str, record: dict):
+        key = self.key_func(record)
+        if key is not None:
+            bisect.insort(self._entries.setdefault(key, []), (self.sort_func(record), pk))
+
+    def remove(self, pk: str, record: dict):
+        key = self.key_func(record)
+        entries = self._entries.get(key)
+        if not entries:
+            return
+        item = (self.sort_func(record), pk)
+        position = bisect.bisect_left(entries, item)
+        if position < len(entries) and entries[position] == item:
+            del entries[position]
+        if not entries:
+            del self._entries[key]
+
+    def get(self, key: Hashable) -> List[str]:
+        return [pk for _, pk in self._entries.get(key, ())]
+
+    def range(self, key: Hashable, after: Optional[str] = None, before: Optional[str] = None,
+              after_pk: str = "\uffff", before_pk: str = "") -> List[str]:
+        """Primary keys whose (sort value, primary key) lies strictly between (after, after_pk) and
+        (before, before_pk); by default every record with the after or before value is excluded"""
+        entries = self._entries.get(key, [])
+        # (value, "\uffff") sorts after every real (value, pk) pair with that value, (value, "") before
+        start = bisect.bisect_right(entries, (after, after_pk)) if after is not None else 0
+        end = bisect.bisect_left(entries, (before, before_pk)) if before is not None else len(entries)
+        return [pk for _, pk in entries[start:end]]
+
+    def clear(self):
+        self._entries.clear()
+
+
+class CountIndex:
+    """Keeps per-key counts of a grouping field (e.g. submissions per status for each user)"""
+
+    def __init__(self, key_func: Callable[[dict], Optional[Hashable]], group_func: Callable[[dict], Hashable]):
+        self.key_func = key_func
+        self.group_func = group_func
+        self._entries: Dict[Hashable, Dict[Hashable, int]] = {}
+
+    def add(self, pk: str, record: dict):
+        key = self.key_func(record)
+        if key is not None:
+            counts = self._entries.setdefault(key, {})
+            group = self.group_func(record)
+            counts[group] = counts.get(group, 0) + 1
+
+    def remove(self, pk: str, record: dict):
+        key = self.key_func(record)
+        counts = self._entries.get(key)
+        if counts is None:
+            return
+        group = self.group_func(record)
+        if counts.get(group, 0) <= 1:
+            counts.pop(group, None)
+        else:
+            counts[group] -= 1
+        if not counts:
+            del self._entries[key]
+
+    def get(self, key: Hashable) -> Dict[Hashable, int]:
+        return dict(self._entries.get(key, {}))
+
+    def items(self) -> Dict[Hashable, Dict[Hashable, int]]:
+        return {key: dict(counts) for key, counts in self._entries.items()}
+
+    def clear(self):
+        self._entries.clear()
+
+
+class IndexedTable:
+    """Primary-key table that keeps its secondary indexes in sync on every write.
+    Reads return shallow copies and writes store one, so no caller can change a record
+    behind the indexes' back; nested values are shared and must be replaced, not mutated."""
+
+    def __init__(self, records: Optional[Dict[str, dict]] = None, **indexes):
+        self.records: Dict[str, dict] = records if records is not None else {}
+        self.indexes = indexes
+        self.lock = threading.RLock()
+        self.reindex()
+
+    def reindex(self):
+        """Rebuild every index from the primary records"""
+        with self.lock:
+            for index in self.indexes.values():
+                index.clear()
+            for pk, record in self.records.items():
+                for index in self.indexes.values():
+                    index.add(pk, record)
+
+    def put(self, pk: str, record: dict):
+        """Insert or replace a record"""
+        with self.lock:
+            existing = self.records.get(pk)
+            if existing is not None:
+                for index in self.indexes.values():
+                    index.remove(pk, existing)
+            record = dict(record)
+            self.records[pk] = record
+            for index in self.indexes.values():
+                index.add(pk, record)
+
+    def update(self, pk: str, updates: dict) -> Optional[dict]:
+        """Apply a partial update, re-indexing the record; returns a copy of the result"""
+        with self.lock:
+            record = self.records.get(pk)
+            if record is None:
+                return None
+            for index in self.indexes.values():
+                index.remove(pk, record)
+            record = {**record, **updates}
+            self.records[pk] = record
+            for index in self.indexes.values():
+                index.add(pk, record)
+            return dict(record)
+
+    def delete(self, pk: str) -> Optional[dict]:
+        with self.lock:
+            record = self.records.pop(pk, None)
+            if record is not None:
+                for index in self.indexes.values():
+                    index.remove(pk, record)
+            return record
+
+    def get(self, pk: str) -> Optional[dict]:
+        record = self.records.get(pk)
+        return dict(record) if record is not None else None
+
+    def lookup(self, index_name: str, key: Hashable) -> List[dict]:
+        """Get all records whose indexed key matches"""
+        index = self.indexes[index_name]
+        with self.lock:
+            pks = [index.get(key)] if isinstance(index, UniqueIndex) else index.get(key)
+            return [dict(self.records[pk]) for pk in pks if pk in self.records]
+
+    def lookup_range(self, index_name: str, key: Hashable, after: Optional[str] = None,
+                     before: Optional[str] = None, after_pk: str = "\uffff", before_pk: str = "") -> List[dict]:
+        """Get records from a SortedIndex whose sort value lies strictly between after and before,
+        with ties on those values decided by primary key against after_pk and before_pk"""
+        with self.lock:
+            pks = self.indexes[index_name].range(key, after, before, after_pk, before_pk)
+            return [dict(self.records[pk]) for pk in pks if pk in self.records]
+
+    def counts(self, index_name: str, key: Hashable) -> Dict[Hashable, int]:
+        """Get the group counts a CountIndex holds for a key"""
+        with self.lock:
+            return self.indexes[index_name].get(key)
+
+    def all_counts(self, index_name: str) -> Dict[Hashable, Dict[Hashable, int]]:
+        """Get every key's group counts from a CountIndex"""
+        with self.lock:
+            return self.indexes[index_name].items()
+
+    def lookup_one(self, index_name: str, key: Hashable) -> Optional[dict]:
+        results = self.lookup(index_name, key)
+        return results[0] if results else None
+
+    def values(self) -> List[dict]:
+        with self.lock:
+            return [dict(record) for record in self.records.values()]
+
+    def __contains__(self, pk: str) -> bool:
+        return pk in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def counters_from_index(day_counts: Dict[Hashable, Dict[Hashable, int]], start_day: Optional[str] = None,
+                        end_day: Optional[str] = None, form_id: Optional[str] = None) -> List[dict]:
+    """Flatten a day -> (form_id, status) CountIndex into analytics bucket rows"""
+    rows = []
+    for day in sorted(day_counts):
+        if (start_day and day < start_day) or (end_day and day > end_day):
+            continue
+        for (bucket_form_id, status), count in day_counts[day].items():
+            if form_id is None or bucket_form_id == form_id:
+                rows.append({"form_id": bucket_form_id, "status": status, "day": day, "count": count})
+    return rows
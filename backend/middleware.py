@@ -4,6 +4,7 @@ from services.auth_service import AuthService
 from typing import Optional, Dict
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
     """
@@ -44,7 +45,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     print(f"[DEBUG] JWT token validated successfully for user: {payload.get('email')}")
     return payload
 
-def get_current_user_optional(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[Dict]:
+def get_current_user_optional(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)) -> Optional[Dict]:
     """
     Optional JWT Authentication dependency
     Returns user info if token is valid, None otherwise
@@ -57,19 +58,24 @@ def get_current_user_optional(credentials: Optional[HTTPAuthorizationCredentials
     
     return payload
 
-def require_admin(user: Dict = Depends(get_current_user)) -> Dict:
+def is_admin(user: Dict) -> bool:
     """
-    Require admin privileges
+    Check admin privileges without raising
     """
-    # Check if user has admin privileges
     # First check if user has isAdmin flag in token
     if user.get("isAdmin") == True:
-        return user
+        return True
     
     # Fallback: check if the email is the admin email
     from config import ADMIN_EMAIL
     
-    if user.get("email") != ADMIN_EMAIL:
+    return user.get("email") == ADMIN_EMAIL
+
+def require_admin(user: Dict = Depends(get_current_user)) -> Dict:
+    """
+    Require admin privileges
+    """
+    if not is_admin(user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Move inline base64 profile photos out of the user documents
+Older fallback uploads stored the whole image as a data: URL in users.profile.photo,
+which every user read then carried along. This moves each one into the file store
+(GridFS or the local store) and leaves a /files/{file_id} reference behind:
+
+    DB_TYPE=mongodb python migrate_user_photos.py
+"""
+
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseService, DB_TYPE
+from file_storage import file_url, save_data_url
+
+def main():
+    print(f"🔄 Moving inline profile photos to file storage for DB_TYPE={DB_TYPE}...")
+    start = time.perf_counter()
+    moved = 0
+    for user in DatabaseService.get_all_users("profile"):
+        profile = user.get("profile") or {}
+        photo = profile.get("photo") or ""
+        if not photo.startswith("data:"):
+            continue
+        stored = save_data_url(photo, "profile_photo", user["user_id"])
+        DatabaseService.update_user(user["user_id"], {"profile": {
+            **profile,
+            "photo": file_url(stored["file_id"]),
+            "photo_storage": stored["storage_type"],
+            "photo_file_id": stored["file_id"]
+        }})
+        moved += 1
+        print(f"  ✅ {user['user_id']}: {len(photo)} inline bytes -> {stored['file_id']}")
+    print(f"✅ Moved {moved} profile photos in {time.perf_counter() - start:.2f}s")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,99 @@
+"""
+MongoDB connection for Legal Voice App
+Importing this module neither imports pymongo nor touches the network: the
+client is created on first use. The app's lifespan calls connect() before
+serving, which pings the server and runs the registered setup (indexes) once,
+so an unreachable server fails startup instead of the first request.
+"""
+
+import os
+import threading
+from typing import Callable, List
+
+from db_errors import DatabaseUnavailableError
+
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "legal_voice")
+MONGODB_TIMEOUT_MS = int(os.getenv("MONGODB_TIMEOUT_MS", "5000"))
+
+
+class LazyHandle:
+    """Stands in for a pymongo Database or Collection, resolved on each use"""
+
+    __slots__ = ("_resolve",)
+
+    def __init__(self, resolve: Callable):
+        self._resolve = resolve
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __getitem__(self, name):
+        return self._resolve()[name]
+
+
+class MongoConnection:
+    """A MongoClient created on first use, plus setup run once the server answers"""
+
+    def __init__(self, uri: str = MONGODB_URI, database_name: str = MONGODB_DATABASE,
+                 timeout_ms: int = MONGODB_TIMEOUT_MS):
+        self.uri = uri
+        self.database_name = database_name
+        self.timeout_ms = timeout_ms
+        self.connected = False
+        self._client = None
+        self._setup: List[Callable] = []
+        self._lock = threading.RLock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from pymongo import MongoClient
+                    # connect=False: no monitor threads or sockets until the first operation
+                    self._client = MongoClient(self.uri, serverSelectionTimeoutMS=self.timeout_ms, connect=False)
+        return self._client
+
+    @property
+    def database(self):
+        return self.client[self.database_name]
+
+    def lazy_database(self) -> LazyHandle:
+        return LazyHandle(lambda: self.database)
+
+    def lazy_collection(self, name: str) -> LazyHandle:
+        return LazyHandle(lambda: self.database[name])
+
+    def on_connect(self, setup: Callable):
+        """Run setup(database) when connect() first succeeds, e.g. to create indexes"""
+        self._setup.append(setup)
+
+    def ping(self):
+        """Round-trip to the server; raises DatabaseUnavailableError"""
+        from pymongo.errors import PyMongoError
+        try:
+            self.client.admin.command("ping")
+        except PyMongoError as e:
+            raise DatabaseUnavailableError("mongodb", e) from e
+
+    def connect(self):
+        """Check the server answers and run the registered setup once"""
+        self.ping()
+        with self._lock:
+            if not self.connected:
+                for setup in self._setup:
+                    setup(self.database)
+                self.connected = True
+                print(f"[DB] Connected to MongoDB database '{self.database_name}'")
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            self.connected = False
+
+
+# Global instance shared by every MongoDB-backed module
+mongo = MongoConnection()
@@ -0,0 +1,306 @@
+"""
+PDF artifact cache for Legal Voice App
+Rendered submission PDFs are stored under a key made of the tracking ID, a hash
+of what the PDF shows (form, status and data) and PDF_TEMPLATE_VERSION, so an
+edited submission or a new template misses the cache and a stale PDF is never
+served. Storing a new version drops the old ones, submission writes drop every
+version, and the least recently used PDFs are evicted once the cache is full.
+PDFs live in a local directory, or in a GridFS bucket on MongoDB with USE_GRIDFS.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterator, Optional, Union
+
+from config import USE_GRIDFS
+from database import DB_TYPE, submission_change_listeners
+from file_storage import FILE_CHUNK_SIZE, StoredFile
+
+PDF_TEMPLATE_VERSION = "3"  # Bump whenever PDFService output or lib/pdf-templates change
+PDF_CACHE_PATH = os.getenv(
+    "PDF_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "pdf_cache")
+)
+PDF_CACHE_MAX_BYTES = int(float(os.getenv("PDF_CACHE_MAX_MB", "256")) * 1024 * 1024)
+PDF_CACHE_BUCKET = "pdf_cache"
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def _key_prefix(tracking_id: str) -> str:
+    return _UNSAFE_CHARS.sub("_", tracking_id) + "."
+
+
+def pdf_cache_key(submission: dict) -> str:
+    """Cache key for the PDF of a submission as it stands now"""
+    content = json.dumps(
+        {"form_id": submission.get("form_id"), "status": submission.get("status"), "data": submission.get("data") or {}},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+    return f"{_key_prefix(submission['tracking_id'])}{digest}.v{PDF_TEMPLATE_VERSION}"
+
+
+def _download_name(key: str) -> str:
+    return key.split(".", 1)[0] + ".pdf"
+
+
+def _chunks(pdf: Union[bytes, BinaryIO]) -> Iterator[bytes]:
+    """A PDF given as bytes or as a binary file, in chunks"""
+    if isinstance(pdf, bytes):
+        yield pdf
+        return
+    while True:
+        chunk = pdf.read(FILE_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+class LocalPDFCache:
+    """PDFs in a directory, at most max_bytes in total, evicted least recently used first.
+    Workers sharing the directory pick up each other's PDFs; each bounds and invalidates what
+    it has seen. A version only another worker knows stays until that worker drops it, which
+    is safe because keys hash what the PDF shows: an outdated PDF's key is never asked for."""
+
+    storage_type = "local"
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._versions = {}  # key prefix -> keys of that submission in _entries
+        self._size = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+        # Adopt PDFs from earlier runs, oldest use first; reads touch the mtime
+        found = []
+        for name in os.listdir(self.root):
+            if name.endswith(".pdf"):
+                stat = os.stat(os.path.join(self.root, name))
+                found.append((stat.st_mtime, name[:-len(".pdf")], stat.st_size))
+        with self._lock:
+            for _, key, size in sorted(found):
+                self._add(key, size)
+            self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.pdf")
+
+    def _add(self, key: str, size: int):
+        """Track a stored key as most recently used"""
+        self._forget(key)
+        self._entries[key] = size
+        self._size += size
+        self._versions.setdefault(key.split(".", 1)[0] + ".", set()).add(key)
+
+    def _forget(self, key: str):
+        """Stop tracking a key, leaving its file alone"""
+        self._size -= self._entries.pop(key, 0)
+        prefix = key.split(".", 1)[0] + "."
+        versions = self._versions.get(prefix)
+        if versions is not None:
+            versions.discard(key)
+            if not versions:
+                del self._versions[prefix]
+
+    def _discard(self, key: str):
+        self._forget(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep: Optional[str] = None):
+        while self._size > self.max_bytes and len(self._entries) > (1 if keep else 0):
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                self._entries.move_to_end(oldest)
+                continue
+            self._discard(oldest)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[StoredFile]:
+        """Open a cached PDF and mark it recently used; None on a miss"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                reader = open(path, "rb")
+            except FileNotFoundError:
+                # Never stored, or evicted or invalidated by another worker sharing the directory
+                self._forget(key)
+                self.misses += 1
+                return None
+            self._add(key, os.fstat(reader.fileno()).st_size)
+            size = self._entries[key]
+            os.utime(path)
+            self.hits += 1
+        return StoredFile(key, _download_name(key), "application/pdf", size, [], reader)
+
+    def put(self, key: str, pdf: Union[bytes, BinaryIO]):
+        """Store a rendered PDF (bytes or a binary file), replacing older versions for the same submission"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".render-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in _chunks(pdf):
+                    out.write(chunk)
+                size = out.tell()
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        prefix = key.split(".", 1)[0] + "."
+        with self._lock:
+            for stale in self._versions.get(prefix, set()) - {key}:
+                self._discard(stale)
+            self._add(key, size)
+            self._evict(keep=key)
+
+    def invalidate(self, tracking_id: str):
+        """Drop every cached version of a submission's PDF"""
+        with self._lock:
+            for key in list(self._versions.get(_key_prefix(tracking_id), ())):
+                self._discard(key)
+
+    def location(self, key: str) -> str:
+        return self._path(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "storage_type": self.storage_type,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class GridFSPDFCache:
+    """PDFs in a GridFS bucket shared by every worker, bounded by total length.
+    metadata.last_used orders eviction; metadata.prefix finds a submission's versions."""
+
+    storage_type = "gridfs"
+
+    def __init__(self, get_database: Callable, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._get_database = get_database
+        self._bucket = None
+        self._files = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """Bucket and its files collection, indexed on first use"""
+        if self._bucket is None:
+            from gridfs import GridFSBucket
+            database = self._get_database()
+            files = database[f"{PDF_CACHE_BUCKET}.files"]
+            files.create_index("filename")
+            files.create_index("metadata.prefix")
+            files.create_index("metadata.last_used")
+            self._files = files
+            self._bucket = GridFSBucket(database, bucket_name=PDF_CACHE_BUCKET, chunk_size_bytes=FILE_CHUNK_SIZE)
+        return self._bucket, self._files
+
+    def _delete(self, query: dict) -> int:
+        from gridfs.errors import NoFile
+        bucket, files = self._open()
+        deleted = 0
+        for file in list(files.find(query, {"_id": True})):
+            try:
+                bucket.delete(file["_id"])
+                deleted += 1
+            except NoFile:
+                pass  # Already removed by another worker
+        return deleted
+
+    def get(self, key: str) -> Optional[StoredFile]:
+        """Open a cached PDF and mark it recently used; None on a miss"""
+        from gridfs.errors import NoFile
+        bucket, files = self._open()
+        file = files.find_one_and_update(
+            {"filename": key}, {"$set": {"metadata.last_used": datetime.now()}}, projection={"_id": True}
+        )
+        try:
+            grid_out = bucket.open_download_stream(file["_id"]) if file else None
+        except NoFile:
+            grid_out = None
+        if grid_out is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return StoredFile(key, _download_name(key), "application/pdf", grid_out.length, [], grid_out)
+
+    def put(self, key: str, pdf: Union[bytes, BinaryIO]):
+        """Store a rendered PDF (bytes or a binary file), replacing older versions, then evict down to max_bytes"""
+        bucket, files = self._open()
+        prefix = key.split(".", 1)[0] + "."
+        grid_in = bucket.open_upload_stream(key, metadata={
+            "prefix": prefix, "content_type": "application/pdf", "last_used": datetime.now()
+        })
+        try:
+            for chunk in _chunks(pdf):
+                grid_in.write(chunk)
+        except BaseException:
+            grid_in.abort()
+            raise
+        grid_in.close()
+        self._delete({"metadata.prefix": prefix, "filename": {"$ne": key}})
+        with self._lock:
+            totals = list(files.aggregate([{"$group": {"_id": None, "length": {"$sum": "$length"}}}]))
+            total = totals[0]["length"] if totals else 0
+            if total <= self.max_bytes:
+                return
+            for file in files.find({"filename": {"$ne": key}}, {"_id": True, "length": True}).sort("metadata.last_used", 1):
+                self.evictions += self._delete({"_id": file["_id"]})
+                total -= file["length"]
+                if total <= self.max_bytes:
+                    break
+
+    def invalidate(self, tracking_id: str):
+        """Drop every cached version of a submission's PDF"""
+        self._delete({"metadata.prefix": _key_prefix(tracking_id)})
+
+    def location(self, key: str) -> str:
+        return f"gridfs://{PDF_CACHE_BUCKET}/{key}"
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "storage_type": self.storage_type,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def _create_pdf_cache():
+    if DB_TYPE == "mongodb" and USE_GRIDFS:
+        from mongo_connection import mongo
+        print(f"[PDF CACHE] Using GridFS bucket '{PDF_CACHE_BUCKET}'")
+        return GridFSPDFCache(lambda: mongo.database, PDF_CACHE_MAX_BYTES)
+    print(f"[PDF CACHE] Using {PDF_CACHE_PATH}")
+    return LocalPDFCache(PDF_CACHE_PATH, PDF_CACHE_MAX_BYTES)
+
+
+# Global instance; any submission write drops that submission's PDFs
+pdf_cache = _create_pdf_cache()
+submission_change_listeners.append(pdf_cache.invalidate)
@@ -0,0 +1,166 @@
+"""
+Bulk PDF export for Legal Voice App
+Streams the PDFs of every matching submission as one ZIP archive. PDFs already
+in the PDF cache are copied from it; the rest are rendered through the render
+pool, PDF_EXPORT_CONCURRENCY at a time, cached, and added to the archive in the
+order they finish. Only the PDFs in flight and the chunk being sent are held in
+memory, so an export of thousands of submissions fits in one request. The
+archive ends with manifest.csv, listing where each PDF came from or why it is missing.
+"""
+
+import asyncio
+import csv
+import os
+import re
+import tempfile
+import time
+import zipfile
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Iterable, Optional
+
+from database import DatabaseService
+from pdf_cache import pdf_cache, pdf_cache_key
+from pdf_renderer import RenderPoolBusy, RenderTimeout, render_pool
+from submission_export import EXPORT_BATCH_SIZE
+
+PDF_EXPORT_CONCURRENCY = int(os.getenv("PDF_EXPORT_CONCURRENCY", "0")) or max(
+    1, min(render_pool.workers * 2, render_pool.max_pending // 2)
+)
+PDF_EXPORT_BUSY_RETRIES = 3
+MANIFEST_COLUMNS = ["tracking_id", "form_id", "status", "file", "source", "bytes", "error"]
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class _ZipSink:
+    """Write-only stream the archive is written into, emptied after every write"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_name(submission: dict) -> str:
+    form_id = _UNSAFE_CHARS.sub("_", submission.get("form_id") or "unknown")
+    return f"{form_id}/{_UNSAFE_CHARS.sub('_', submission['tracking_id'])}.pdf"
+
+
+async def _add_file(archive: zipfile.ZipFile, sink: _ZipSink, name: str, chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    """Copy chunks into a new archive entry, reading them off the event loop and passing on ZIP bytes as they are made"""
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_STORED  # PDF streams are already compressed
+    chunks = iter(chunks)
+    with archive.open(info, "w") as entry:
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            entry.write(chunk)
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def _render(submission: dict, key: str, pool, cache):
+    """Render one submission's PDF into the cache; returns the submission, the RenderedPDF or None, and an error"""
+    for attempt in range(PDF_EXPORT_BUSY_RETRIES):
+        try:
+            pdf = await pool.render(submission["form_id"], submission.get("data") or {}, submission["tracking_id"], key=key)
+            break
+        except RenderPoolBusy as e:
+            if attempt == PDF_EXPORT_BUSY_RETRIES - 1:
+                return submission, None, str(e)
+        except RenderTimeout as e:
+            return submission, None, str(e)
+        except Exception as e:
+            return submission, None, str(e) or type(e).__name__
+    if pdf is None:
+        return submission, None, "render failed"
+
+    def store():
+        with pdf.open() as source:
+            cache.put(key, source)
+
+    try:
+        await asyncio.to_thread(store)
+    except Exception as e:
+        print(f"[EXPORT] Could not cache {key}: {e}")  # The archive still gets the PDF
+    return submission, pdf, None
+
+
+async def export_pdf_zip(form_id: Optional[str] = None, status: Optional[str] = None,
+                         start: Optional[str] = None, end: Optional[str] = None,
+                         pool=render_pool, cache=pdf_cache,
+                         concurrency: int = PDF_EXPORT_CONCURRENCY) -> AsyncIterator[bytes]:
+    """ZIP archive bytes with one PDF per matching submission, created_at in [start, end)"""
+    rows = DatabaseService.iter_submissions(form_id, status, start, end, batch_size=EXPORT_BATCH_SIZE)
+    queued = deque()
+    exhausted = False
+    pending = set()
+    counts = {"cached": 0, "rendered": 0, "failed": 0}
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode="w")
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode="w+", newline="", encoding="utf-8") as manifest:
+        writer = csv.writer(manifest)
+        writer.writerow(MANIFEST_COLUMNS)
+        try:
+            while True:
+                # Keep the render window full, copying cache hits straight into the archive
+                while not exhausted and len(pending) < concurrency:
+                    if not queued:
+                        queued.extend(await asyncio.to_thread(lambda: list(islice(rows, concurrency * 4))))
+                        if not queued:
+                            exhausted = True
+                            break
+                    submission = queued.popleft()
+                    key = pdf_cache_key(submission)
+                    cached = await asyncio.to_thread(cache.get, key)
+                    if cached is None:
+                        pending.add(asyncio.create_task(_render(submission, key, pool, cache)))
+                        continue
+                    name = archive_name(submission)
+                    async for chunk in _add_file(archive, sink, name, cached.iter_range()):
+                        yield chunk
+                    writer.writerow([submission["tracking_id"], submission.get("form_id"), submission.get("status"),
+                                     name, "cache", cached.length, ""])
+                    counts["cached"] += 1
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    submission, pdf, error = task.result()
+                    row = [submission["tracking_id"], submission.get("form_id"), submission.get("status")]
+                    if pdf is None:
+                        writer.writerow(row + ["", "failed", 0, error])
+                        counts["failed"] += 1
+                        continue
+                    name = archive_name(submission)
+                    async for chunk in _add_file(archive, sink, name, pdf.iter_chunks()):
+                        yield chunk
+                    writer.writerow(row + [name, "rendered", pdf.length, ""])
+                    counts["rendered"] += 1
+
+            manifest.seek(0)
+            async for chunk in _add_file(archive, sink, "manifest.csv",
+                                         iter(lambda: manifest.read(64 * 1024).encode("utf-8"), b"")):
+                yield chunk
+            archive.close()
+            yield sink.drain()
+            print(f"[EXPORT] PDF archive done: {counts['cached']} cached, "
+                  f"{counts['rendered']} rendered, {counts['failed']} failed")
+        finally:
+            # The client may disconnect mid-archive; renders already queued finish into the cache
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,294 @@
+"""
+Process-pool PDF rendering for Legal Voice App
+reportlab rendering is CPU-bound, so request handlers hand it to a pool of
+PDF_RENDER_WORKERS processes (default: one per core) and await the result
+instead of blocking the event loop. At most PDF_RENDER_MAX_PENDING jobs are
+queued or running at once; a caller waits up to PDF_RENDER_QUEUE_TIMEOUT_SECONDS
+for a slot before getting RenderPoolBusy, and a job that outlasts
+PDF_RENDER_TIMEOUT_SECONDS raises RenderTimeout. Concurrent renders of the same
+cache key share one job. Workers render into memory; a PDF larger than
+PDF_SPOOL_MAX_MB comes back as a file in the pool's spool directory instead of
+through the result pipe, and the file is removed once nothing refers to it.
+"""
+
+import asyncio
+import functools
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Callable, Dict, Iterator, Optional
+
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "0")) or os.cpu_count() or 1
+PDF_RENDER_MAX_PENDING = int(os.getenv("PDF_RENDER_MAX_PENDING", "0")) or PDF_RENDER_WORKERS * 4
+PDF_RENDER_TIMEOUT_SECONDS = float(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", "30"))
+PDF_RENDER_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PDF_RENDER_QUEUE_TIMEOUT_SECONDS", "10"))
+# Workers are recycled after this many renders to bound reportlab's memory growth
+PDF_RENDER_MAX_TASKS_PER_CHILD = int(os.getenv("PDF_RENDER_MAX_TASKS_PER_CHILD", "200")) or None
+# PDFs above this size are handed over as spool files; 0 keeps every PDF in memory
+PDF_SPOOL_MAX_BYTES = int(float(os.getenv("PDF_SPOOL_MAX_MB", "16")) * 1024 * 1024)
+SPOOL_CHUNK_SIZE = 256 * 1024
+
+
+class RenderPoolBusy(Exception):
+    """Every render slot stayed taken for the whole queue timeout"""
+
+
+class RenderTimeout(Exception):
+    """A render did not finish within its timeout"""
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class RenderedPDF:
+    """A rendered PDF, in memory or spilled to a spool file"""
+
+    def __init__(self, data: Optional[bytes] = None, path: Optional[str] = None, length: int = 0):
+        self.data = data
+        self.path = path
+        self.length = len(data) if data is not None else length
+
+    def __reduce__(self):
+        return _received_pdf, (self.data, self.path, self.length)
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+    def open(self) -> BinaryIO:
+        return io.BytesIO(self.data) if self.path is None else open(self.path, "rb")
+
+    def read(self) -> bytes:
+        with self.open() as f:
+            return f.read()
+
+    def iter_chunks(self, chunk_size: int = SPOOL_CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open() as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+def _received_pdf(data: Optional[bytes], path: Optional[str], length: int) -> RenderedPDF:
+    """Unpickled in the app process, which owns a spool file from here on"""
+    pdf = RenderedPDF(data, path, length)
+    if path is not None:
+        weakref.finalize(pdf, _remove_quietly, path)
+    return pdf
+
+
+# Set in each worker by _init_worker
+_spool_dir: Optional[str] = None
+_spool_max_bytes = 0
+
+
+def _init_worker(spool_dir: Optional[str], spool_max_bytes: int, warm: bool):
+    """Remember where to spill, and import reportlab once per worker instead of on its first job"""
+    global _spool_dir, _spool_max_bytes
+    _spool_dir, _spool_max_bytes = spool_dir, spool_max_bytes
+    if warm:
+        import services.pdf_service  # noqa: F401
+
+
+def spool_pdf(pdf: bytes) -> RenderedPDF:
+    """Wrap a worker's PDF for the trip back, spilling it to disk when it is too large for the pipe"""
+    if not _spool_dir or not _spool_max_bytes or len(pdf) <= _spool_max_bytes:
+        return RenderedPDF(pdf)
+    fd, path = tempfile.mkstemp(dir=_spool_dir, prefix="render-", suffix=".pdf")
+    with os.fdopen(fd, "wb") as out:
+        out.write(pdf)
+    return RenderedPDF(path=path, length=len(pdf))
+
+
+def render_form_pdf(form_id: str, form_data: Dict, tracking_id: str) -> tuple:
+    """Worker job: the RenderedPDF (None on failure) and when rendering started and ended"""
+    from services.pdf_service import PDFService
+    started = time.time()
+    pdf = PDFService.render_pdf(form_id, form_data, tracking_id)
+    return (spool_pdf(pdf) if pdf is not None else None), started, time.time()
+
+
+class RenderPool:
+    """Async front end to a process pool, with bounded pending jobs and per-job timeouts"""
+
+    def __init__(self, workers: int = PDF_RENDER_WORKERS, max_pending: int = PDF_RENDER_MAX_PENDING,
+                 timeout: float = PDF_RENDER_TIMEOUT_SECONDS, queue_timeout: float = PDF_RENDER_QUEUE_TIMEOUT_SECONDS,
+                 job: Callable = render_form_pdf, max_tasks_per_child: Optional[int] = PDF_RENDER_MAX_TASKS_PER_CHILD,
+                 spool_max_bytes: int = PDF_SPOOL_MAX_BYTES):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self.spool_max_bytes = spool_max_bytes
+        self._spool_dir: Optional[str] = None
+        self._job = job
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache key -> job being started or rendered
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.shared = 0
+        self.restarts = 0
+        self.spilled = 0
+        self.queue_seconds = 0.0
+        self.render_seconds = 0.0
+        self.max_render_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the pool on first use; spawned workers inherit no sockets or threads from the app"""
+        with self._lock:
+            if self._executor is None:
+                if self.spool_max_bytes and self._spool_dir is None:
+                    self._spool_dir = tempfile.mkdtemp(prefix="pdf-spool-")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self._spool_dir, self.spool_max_bytes, self._job is render_form_pdf),
+                    max_tasks_per_child=self.max_tasks_per_child
+                )
+                print(f"[PDF RENDER] Started pool with {self.workers} workers")
+            return self._executor
+
+    def _reset_broken(self, executor: ProcessPoolExecutor):
+        """A worker died; replace the pool so the next job gets a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+                print("[PDF RENDER] Worker pool broke, restarting on next job")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, executor: ProcessPoolExecutor, submitted_at: float, future: asyncio.Future):
+        """Free the slot and record the outcome once the worker is done with a job"""
+        self.pending -= 1
+        self._slots.release()
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._reset_broken(executor)
+        pdf, started, finished = future.result() if error is None else (None, 0.0, 0.0)
+        if pdf is None:
+            self.failed += 1
+            return
+        self.completed += 1
+        self.spilled += bool(getattr(pdf, "spilled", False))
+        self.queue_seconds += max(0.0, started - submitted_at)
+        self.render_seconds += finished - started
+        self.max_render_seconds = max(self.max_render_seconds, finished - started)
+
+    async def _start(self, form_id: str, form_data: Dict, tracking_id: str) -> tuple:
+        """Wait for a slot and submit a job; returns its asyncio and executor futures"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RenderPoolBusy(f"{self.max_pending} renders already pending")
+        try:
+            executor = self._get_executor()
+            try:
+                job = executor.submit(self._job, form_id, form_data, tracking_id)
+            except BrokenProcessPool:
+                self._reset_broken(executor)
+                executor = self._get_executor()
+                job = executor.submit(self._job, form_id, form_data, tracking_id)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.pending += 1
+        self.submitted += 1
+        future = asyncio.wrap_future(job)
+        future.add_done_callback(functools.partial(self._finished, executor, time.time()))
+        return future, job
+
+    def _forget_when_done(self, key: str, starting: asyncio.Future):
+        if starting.cancelled() or starting.exception() is not None:
+            self._inflight.pop(key, None)
+        else:
+            starting.result()[0].add_done_callback(lambda _: self._inflight.pop(key, None))
+
+    async def render(self, form_id: str, form_data: Dict, tracking_id: str,
+                     key: Optional[str] = None, timeout: Optional[float] = None) -> Optional[RenderedPDF]:
+        """Render a form PDF in a worker; None if PDFService could not render it.
+        Raises RenderPoolBusy when no slot frees up in time and RenderTimeout when the job overruns."""
+        if not key:
+            future, job = await self._start(form_id, form_data, tracking_id)
+        else:
+            starting = self._inflight.get(key)
+            if starting is not None:
+                self.shared += 1
+            else:
+                # Registered before waiting for a slot, so callers arriving meanwhile join this job
+                starting = asyncio.ensure_future(self._start(form_id, form_data, tracking_id))
+                self._inflight[key] = starting
+                starting.add_done_callback(functools.partial(self._forget_when_done, key))
+            future, job = await asyncio.shield(starting)
+        timeout = timeout or self.timeout
+        try:
+            # Shielded, so a caller giving up leaves the slot taken until the worker is really free
+            pdf, _, _ = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            job.cancel()  # Only succeeds while the job is still queued
+            raise RenderTimeout(f"PDF render for {tracking_id} took over {timeout:g}s")
+        except asyncio.CancelledError:
+            if future.cancelled():
+                # Another caller sharing the job timed out while it was queued, or the pool shut down
+                raise RenderTimeout(f"PDF render for {tracking_id} was cancelled")
+            raise
+        return pdf
+
+    def shutdown(self):
+        """Stop the workers, dropping queued jobs, and remove the spool directory"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            spool_dir, self._spool_dir = self._spool_dir, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if spool_dir is not None:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "started": self._executor is not None,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "shared": self.shared,
+            "restarts": self.restarts,
+            "spilled": self.spilled,
+            "avg_queue_ms": round(self.queue_seconds / self.completed * 1000, 1) if self.completed else 0.0,
+            "avg_render_ms": round(self.render_seconds / self.completed * 1000, 1) if self.completed else 0.0,
+            "max_render_ms": round(self.max_render_seconds * 1000, 1),
+        }
+
+
+# Global instance; the workers start with the first render
+render_pool = RenderPool()
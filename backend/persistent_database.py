@@ -9,6 +9,9 @@ from typing import Optional, Dict, List
 from datetime import datetime
 from pathlib import Path
 
+from db_errors import VersionConflictError
+from memory_index import IndexedTable, UniqueIndex, MultiIndex, SortedIndex, CountIndex, counters_from_index
+
 class PersistentDatabase:
     """File-based persistent database"""
     
@@ -23,6 +26,22 @@ class PersistentDatabase:
         
         # Initialize files if they don't exist
         self._initialize_files()
+        
+        # Load once and keep indexed in memory; files are only rewritten on writes
+        self.submissions = IndexedTable(
+            self._load_data(self.submissions_file),
+            by_user=SortedIndex(lambda s: s.get("user_id"), lambda s: s.get("created_at") or ""),
+            by_form=MultiIndex(lambda s: s.get("form_id")),
+            by_status=MultiIndex(lambda s: s.get("status")),
+            by_form_status=MultiIndex(lambda s: (s.get("form_id"), s.get("status"))),
+            by_user_status=CountIndex(lambda s: s.get("user_id"), lambda s: s.get("status")),
+            by_user_month=CountIndex(lambda s: s.get("user_id"), lambda s: (s.get("created_at") or "")[:7]),
+            by_day=CountIndex(lambda s: (s.get("created_at") or "")[:10] or None, lambda s: (s.get("form_id"), s.get("status"))),
+        )
+        self.users = IndexedTable(
+            self._load_data(self.users_file),
+            by_email=UniqueIndex(lambda u: u.get("email")),
+        )
     
     def _initialize_files(self):
         """Initialize JSON files if they don't exist"""
@@ -53,8 +72,6 @@ class PersistentDatabase:
     
     def save_submission(self, tracking_id: str, form_id: str, data: dict, user_id: str = None, status: str = "submitted"):
         """Save submission to persistent storage"""
-        submissions = self._load_data(self.submissions_file)
-        
         submission = {
             "tracking_id": tracking_id,
             "form_id": form_id,
@@ -63,6 +80,7 @@ class PersistentDatabase:
             "status": status,
             "created_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat(),
+            "version": 1,
             "history": [
                 {
                     "timestamp": datetime.now().isoformat(),
@@ -71,86 +89,130 @@ class PersistentDatabase:
             ]
         }
         
-        submissions[tracking_id] = submission
-        self._save_data(self.submissions_file, submissions)
+        with self.submissions.lock:
+            self.submissions.put(tracking_id, submission)
+            self._save_data(self.submissions_file, self.submissions.records)
         
         print(f"[PERSISTENT DB] Saved submission: {tracking_id}")
         return submission
     
     def get_submission(self, tracking_id: str) -> Optional[dict]:
         """Get submission by tracking ID"""
-        submissions = self._load_data(self.submissions_file)
-        return submissions.get(tracking_id)
-    
-    def update_submission_status(self, tracking_id: str, status: str, message: str):
-        """Update submission status"""
-        submissions = self._load_data(self.submissions_file)
-        
-        if tracking_id not in submissions:
-            return None
-        
-        submissions[tracking_id]["status"] = status
-        submissions[tracking_id]["updated_at"] = datetime.now().isoformat()
-        submissions[tracking_id]["history"].append({
-            "timestamp": datetime.now().isoformat(),
-            "message": message
-        })
-        
-        self._save_data(self.submissions_file, submissions)
-        return submissions[tracking_id]
+        return self.submissions.get(tracking_id)
+    
+    def update_submission_status(self, tracking_id: str, status: str, message: str,
+                                 expected_version: Optional[int] = None):
+        """Update submission status, optionally guarded by version"""
+        with self.submissions.lock:
+            submission = self.submissions.get(tracking_id)
+            if submission is None:
+                return None
+            version = submission.get("version", 1)
+            if expected_version is not None and version != expected_version:
+                raise VersionConflictError(tracking_id, expected_version)
+            
+            submission = self.submissions.update(tracking_id, {
+                "status": status,
+                "updated_at": datetime.now().isoformat(),
+                "version": version + 1,
+                "history": submission["history"] + [{
+                    "timestamp": datetime.now().isoformat(),
+                    "message": message
+                }]
+            })
+            self._save_data(self.submissions_file, self.submissions.records)
+            return submission
+    
+    def set_submission_pdf_artifact(self, tracking_id: str, artifact: dict) -> bool:
+        """Record the stored PDF of a submission"""
+        with self.submissions.lock:
+            if self.submissions.get(tracking_id) is None:
+                return False
+            self.submissions.update(tracking_id, {"pdf_artifact": artifact})
+            self._save_data(self.submissions_file, self.submissions.records)
+            return True
     
     def get_all_submissions(self, form_id: Optional[str] = None, status: Optional[str] = None) -> List[dict]:
         """Get all submissions with optional filters"""
-        submissions = self._load_data(self.submissions_file)
-        results = list(submissions.values())
-        
+        if form_id and status:
+            return self.submissions.lookup("by_form_status", (form_id, status))
         if form_id:
-            results = [r for r in results if r.get("form_id") == form_id]
+            return self.submissions.lookup("by_form", form_id)
         if status:
-            results = [r for r in results if r.get("status") == status]
-        
-        return results
+            return self.submissions.lookup("by_status", status)
+        return self.submissions.values()
+    
+    def get_user_submissions(self, user_id: str, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+        """Get a user's submissions, newest first"""
+        submissions = self.submissions.lookup("by_user", user_id)[::-1]
+        return submissions[offset:offset + limit] if limit is not None else submissions[offset:]
+    
+    def get_user_submission_stats(self, user_id: str) -> dict:
+        """Per-status and this-month counts from the counter indexes"""
+        by_status = self.submissions.counts("by_user_status", user_id)
+        by_month = self.submissions.counts("by_user_month", user_id)
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "this_month": by_month.get(datetime.now().strftime("%Y-%m"), 0)
+        }
     
-    def get_user_submissions(self, user_id: str) -> List[dict]:
-        """Get all submissions for a specific user"""
-        submissions = self._load_data(self.submissions_file)
-        return [s for s in submissions.values() if s.get("user_id") == user_id]
+    def delete_submission(self, tracking_id: str) -> bool:
+        """Delete submission by tracking ID"""
+        with self.submissions.lock:
+            if self.submissions.delete(tracking_id) is None:
+                return False
+            self._save_data(self.submissions_file, self.submissions.records)
+        return True
+    
+    def get_submission_counters(self, start_day: Optional[str] = None, end_day: Optional[str] = None,
+                                form_id: Optional[str] = None) -> List[dict]:
+        """Form/status/day buckets from the counter index, optionally limited to a day range (inclusive)"""
+        return counters_from_index(self.submissions.all_counts("by_day"), start_day, end_day, form_id)
+    
+    def rebuild_submission_counters(self) -> int:
+        """Recompute the counter index from the stored submissions"""
+        self.submissions.reindex()
+        return sum(len(counts) for counts in self.submissions.all_counts("by_day").values())
+    
+    def bulk_insert(self, table: str, records: List[dict]) -> int:
+        """Add a batch of users or submissions and rewrite the file once"""
+        store, key, file_path = {
+            "users": (self.users, "user_id", self.users_file),
+            "submissions": (self.submissions, "tracking_id", self.submissions_file),
+        }[table]
+        with store.lock:
+            for record in records:
+                store.put(record[key], record)
+            self._save_data(file_path, store.records)
+        return len(records)
     
     def save_user(self, user: dict):
         """Save user to persistent storage"""
-        users = self._load_data(self.users_file)
-        users[user["user_id"]] = user
-        self._save_data(self.users_file, users)
+        with self.users.lock:
+            self.users.put(user["user_id"], user)
+            self._save_data(self.users_file, self.users.records)
         print(f"[PERSISTENT DB] Saved user: {user['user_id']}")
     
     def get_user(self, user_id: str) -> Optional[dict]:
         """Get user by ID"""
-        users = self._load_data(self.users_file)
-        return users.get(user_id)
+        return self.users.get(user_id)
     
     def get_user_by_email(self, email: str) -> Optional[dict]:
         """Get user by email"""
-        users = self._load_data(self.users_file)
-        for user in users.values():
-            if user.get("email") == email:
-                return user
-        return None
+        return self.users.lookup_one("by_email", email)
     
     def update_user(self, user_id: str, updates: dict) -> Optional[dict]:
         """Update user information"""
-        users = self._load_data(self.users_file)
-        
-        if user_id in users:
-            users[user_id].update(updates)
-            users[user_id]["updated_at"] = datetime.now().isoformat()
-            self._save_data(self.users_file, users)
-            return users[user_id]
-        return None
+        with self.users.lock:
+            user = self.users.update(user_id, dict(updates, updated_at=datetime.now().isoformat()))
+            if user is not None:
+                self._save_data(self.users_file, self.users.records)
+            return user
     
     def get_all_users(self) -> List[dict]:
         """Get all users"""
-        users = self._load_data(self.users_file)
-        return list(users.values())
+        return self.users.values()
     
     def save_form(self, form_id: str, form_data: dict):
         """Save form template"""
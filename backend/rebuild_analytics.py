@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Rebuild the admin analytics counters and chat conversation summaries from scratch
+Both are maintained on every write; run this after bulk imports, restores,
+or manual edits to the submissions or messages, e.g. nightly from cron:
+
+    DB_TYPE=mongodb python rebuild_analytics.py
+"""
+
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseService, DB_TYPE
+from chat_database import ChatDatabaseService
+
+def main():
+    print(f"🔄 Rebuilding submission counters for DB_TYPE={DB_TYPE}...")
+    start = time.perf_counter()
+    buckets = DatabaseService.rebuild_submission_counters()
+    print(f"✅ Rebuilt {buckets} form/status/day buckets in {time.perf_counter() - start:.2f}s")
+
+    print("🔄 Rebuilding chat conversation summaries...")
+    start = time.perf_counter()
+    conversations = ChatDatabaseService.rebuild_conversation_summaries()
+    print(f"✅ Rebuilt {conversations} conversation summaries in {time.perf_counter() - start:.2f}s")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
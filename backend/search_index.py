@@ -0,0 +1,247 @@
+"""
+Full-text search for Legal Voice App
+One tokenizer for every backend: NFKC-normalized, case-folded runs of Unicode
+letters, marks and digits, so Devanagari, Tamil, Telugu, Kannada and the other
+supported scripts keep their vowel signs and viramas inside a word. SQLite and
+PostgreSQL index the tokens this module produces; the mock and persistent
+backends use the in-process BM25 index below.
+"""
+
+import bisect
+import heapq
+import math
+import threading
+import unicodedata
+from typing import Callable, Iterable, List, Optional, Tuple
+
+SEARCH_KINDS = ("submission", "ticket", "chat")
+
+MAX_QUERY_TERMS = 16
+MAX_PREFIX_EXPANSIONS = 64  # Vocabulary terms a trailing prefix may expand to
+SNIPPET_LENGTH = 160
+
+# Zero-width (non-)joiners shape Indic conjuncts but are not part of the word
+_JOINERS = {"\u200c", "\u200d"}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into normalized search terms; native digits fold to ASCII"""
+    if not text:
+        return []
+    tokens, current = [], []
+    for char in unicodedata.normalize("NFKC", text).casefold():
+        if char in _JOINERS:
+            continue
+        category = unicodedata.category(char)
+        if category == "Nd":
+            current.append(str(unicodedata.digit(char)))
+        elif category[0] in "LMN":
+            current.append(char)
+        elif current:
+            tokens.append("".join(current))
+            current = []
+    if current:
+        tokens.append("".join(current))
+    return tokens
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct terms of a query, in order; the last one is matched as a prefix"""
+    terms = []
+    for token in tokenize(query):
+        if token not in terms:
+            terms.append(token)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def _string_values(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield str(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _string_values(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _string_values(item)
+
+
+def search_document(kind: str, record: dict) -> dict:
+    """The searchable view of a submission, ticket or chat message"""
+    if kind == "submission":
+        return {
+            "kind": kind,
+            "id": record["tracking_id"],
+            "user_id": record.get("user_id"),
+            "title": record.get("form_id"),
+            "created_at": record.get("created_at"),
+            "text": " ".join([record["tracking_id"], *_string_values(record.get("data"))])
+        }
+    if kind == "ticket":
+        return {
+            "kind": kind,
+            "id": record["ticket_id"],
+            "user_id": record.get("user_id"),
+            "title": record.get("subject"),
+            "created_at": record.get("created_at"),
+            "text": " ".join([record["ticket_id"], record.get("subject") or "", record.get("description") or ""])
+        }
+    return {
+        "kind": kind,
+        "id": record["message_id"],
+        "user_id": record.get("user_id"),
+        "title": record.get("sender"),
+        "created_at": record.get("timestamp"),
+        "text": record.get("text") or ""
+    }
+
+
+def index_body(document: dict) -> str:
+    """Space-joined terms, as stored by the SQLite and PostgreSQL indexes"""
+    return " ".join(tokenize(document["text"]))
+
+
+def snippet(text: str, terms: List[str], length: int = SNIPPET_LENGTH) -> str:
+    """A window of text around the first matching term"""
+    folded = text.casefold()
+    positions = [position for position in (folded.find(term) for term in terms) if position >= 0]
+    start = max(min(positions) - length // 4, 0) if positions else 0
+    window = text[start:start + length].strip()
+    return ("…" if start else "") + window + ("…" if start + length < len(text) else "")
+
+
+def search_result(document: dict, score: float, terms: List[str]) -> dict:
+    result = {key: value for key, value in document.items() if key != "text"}
+    result["snippet"] = snippet(document["text"], terms)
+    result["score"] = round(score, 4)
+    return result
+
+
+class InvertedIndex:
+    """In-memory inverted index ranked with BM25.
+    Every query term must match; the last also matches any term it prefixes."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.built = False
+        self._postings = {}     # term -> {doc_key: term frequency}
+        self._documents = {}    # doc_key -> (length, document, term frequencies)
+        self._vocabulary = []   # sorted terms, for prefix expansion
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, document: dict):
+        """Index a search_document(), replacing any earlier version of it"""
+        key = (document["kind"], document["id"])
+        terms = tokenize(document["text"])
+        with self._lock:
+            self._remove(key)
+            frequencies = {}
+            for term in terms:
+                frequencies[term] = frequencies.get(term, 0) + 1
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocabulary, term)
+                postings[key] = frequency
+            self._documents[key] = (len(terms), document, frequencies)
+            self._total_length += len(terms)
+
+    def remove(self, kind: str, doc_id: str):
+        with self._lock:
+            self._remove((kind, doc_id))
+
+    def _remove(self, key):
+        entry = self._documents.pop(key, None)
+        if entry is None:
+            return
+        length, _, frequencies = entry
+        self._total_length -= length
+        for term in frequencies:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self._vocabulary.clear()
+            self._total_length = 0
+            self.built = False
+
+    def ensure_built(self, load: Callable[[], Iterable[dict]]):
+        """Index everything load() yields, once; writes made before that are picked up by the load"""
+        if self.built:
+            return
+        with self._lock:
+            if not self.built:
+                for document in load():
+                    self.add(document)
+                self.built = True
+                print(f"[SEARCH] Indexed {len(self._documents)} documents")
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        expansions = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            expansions.append(term)
+        return expansions
+
+    def search(self, terms: List[str], kinds: Iterable[str] = SEARCH_KINDS, limit: int = 20) -> List[Tuple[float, dict]]:
+        """Top-limit (score, document) pairs for documents containing every term"""
+        if not terms:
+            return []
+        kinds = set(kinds)
+        with self._lock:
+            if not self._documents:
+                return []
+            # Each query term becomes the postings of every vocabulary term it stands for
+            groups = [[term] for term in terms[:-1]] + [self._expand(terms[-1])]
+            group_postings = [[self._postings[term] for term in group if term in self._postings] for group in groups]
+            if not all(group_postings):
+                return []
+
+            count = len(self._documents)
+            average_length = self._total_length / count
+            by_size = sorted(group_postings, key=lambda postings: sum(len(p) for p in postings))
+            candidates = set().union(*by_size[0])
+            for postings in by_size[1:]:
+                candidates = {key for key in candidates if any(key in p for p in postings)}
+                if not candidates:
+                    return []
+
+            def score(key) -> float:
+                length = self._documents[key][0]
+                norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                total = 0.0
+                for postings in group_postings:
+                    best = 0.0
+                    for p in postings:
+                        frequency = p.get(key)
+                        if frequency:
+                            idf = math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5))
+                            best = max(best, idf * frequency * (self.k1 + 1) / (frequency + norm))
+                    total += best
+                return total
+
+            ranked = heapq.nlargest(
+                limit,
+                ((score(key), key) for key in candidates if key[0] in kinds),
+                key=lambda item: item[0]
+            )
+            return [(value, self._documents[key][1]) for value, key in ranked]
+
+
+# Global instance for the mock and persistent backends
+local_search_index = InvertedIndex()
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Synthetic data for scale testing Legal Voice App
+Generates users, submissions for every form in FORMS_DB with status history,
+tickets, feedbacks, chat messages and documents, with names, addresses and
+free text in the supported languages, and bulk-loads them into whichever
+DB_TYPE is configured:
+
+    DB_TYPE=postgresql python seed_data.py --users 100000
+    DB_TYPE=sqlite python seed_data.py --users 1000000 --batch-size 5000
+
+Counts other than --users default to per-user ratios. Records are generated and
+written one batch at a time, so memory stays flat at any volume, and the same
+--seed always produces the same data. Every seeded user signs in with --password.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseService, DB_TYPE, SUBMISSION_HISTORY_CAP
+from chat_database import ChatDatabaseService
+from forms_registry import FORMS_DB
+from services.auth_service import AuthService
+
+# Share of users per language, roughly following the app's traffic
+LANGUAGE_WEIGHTS = {
+    "hi": 30, "en": 20, "ta": 8, "te": 8, "kn": 7, "bn": 7,
+    "mr": 6, "gu": 4, "ml": 4, "pa": 3, "or": 2, "ur": 1,
+}
+
+LOCALES = {
+    "en": {
+        "first": ["Rahul", "Priya", "Arjun", "Sneha", "Vikram", "Ananya", "Rohan", "Kavya"],
+        "last": ["Sharma", "Iyer", "Reddy", "Nair", "Gupta", "Das"],
+        "cities": ["Mumbai", "Delhi", "Bengaluru", "Chennai", "Hyderabad", "Kolkata"],
+        "streets": ["MG Road", "Station Road", "Gandhi Nagar", "Park Street"],
+        "text": [
+            "I want to change my name after marriage.",
+            "My neighbour has occupied part of my ancestral land.",
+            "The challan was issued although my vehicle was parked legally.",
+            "We have been living separately for more than one year.",
+        ],
+        "support": ["When will my application be approved?", "I cannot download the PDF of my form."],
+    },
+    "hi": {
+        "first": ["राहुल", "प्रिया", "अर्जुन", "सुनीता", "विक्रम", "अनन्या", "रोहन", "काव्या"],
+        "last": ["शर्मा", "वर्मा", "गुप्ता", "सिंह", "यादव", "मिश्रा"],
+        "cities": ["दिल्ली", "लखनऊ", "जयपुर", "भोपाल", "पटना", "वाराणसी"],
+        "streets": ["गांधी मार्ग", "स्टेशन रोड", "नेहरू नगर", "सदर बाज़ार"],
+        "text": [
+            "शादी के बाद मैं अपना नाम बदलना चाहती हूँ।",
+            "पड़ोसी ने मेरी पुश्तैनी ज़मीन के हिस्से पर कब्ज़ा कर लिया है।",
+            "गाड़ी सही जगह खड़ी होने के बावजूद चालान काटा गया।",
+            "हम एक साल से अधिक समय से अलग रह रहे हैं।",
+        ],
+        "support": ["मेरा आवेदन कब स्वीकृत होगा?", "मैं अपने फॉर्म की पीडीएफ डाउनलोड नहीं कर पा रहा हूँ।"],
+    },
+    "ta": {
+        "first": ["கார்த்திக்", "பிரியா", "அருண்", "மீனா", "சுரேஷ்", "லக்ஷ்மி"],
+        "last": ["முருகன்", "ராஜன்", "சுப்பிரமணியன்", "கணேசன்"],
+        "cities": ["சென்னை", "மதுரை", "கோயம்புத்தூர்", "திருச்சி"],
+        "streets": ["அண்ணா சாலை", "காந்தி தெரு", "நேரு நகர்"],
+        "text": [
+            "திருமணத்திற்குப் பிறகு என் பெயரை மாற்ற விரும்புகிறேன்.",
+            "பக்கத்து வீட்டுக்காரர் என் நிலத்தின் ஒரு பகுதியை ஆக்கிரமித்துள்ளார்.",
+            "வாகனம் சரியாக நிறுத்தப்பட்டிருந்தும் அபராதம் விதிக்கப்பட்டது.",
+        ],
+        "support": ["என் விண்ணப்பம் எப்போது அங்கீகரிக்கப்படும்?", "படிவத்தை பதிவிறக்க முடியவில்லை."],
+    },
+    "te": {
+        "first": ["రవి", "లక్ష్మి", "శ్రీనివాస్", "పద్మ", "వెంకట్", "సరిత"],
+        "last": ["రెడ్డి", "రావు", "నాయుడు", "చౌదరి"],
+        "cities": ["హైదరాబాద్", "విజయవాడ", "విశాఖపట్నం", "వరంగల్"],
+        "streets": ["గాంధీ రోడ్", "స్టేషన్ రోడ్", "నెహ్రూ నగర్"],
+        "text": [
+            "పెళ్లి తర్వాత నా పేరు మార్చుకోవాలనుకుంటున్నాను.",
+            "పక్కింటి వారు నా భూమిలో కొంత భాగాన్ని ఆక్రమించారు.",
+            "బండి సరిగ్గా పార్క్ చేసినా చలానా వేశారు.",
+        ],
+        "support": ["నా దరఖాస్తు ఎప్పుడు ఆమోదించబడుతుంది?", "ఫారం PDF డౌన్‌లోడ్ కావడం లేదు."],
+    },
+    "kn": {
+        "first": ["ಸುರೇಶ್", "ಅನಿತಾ", "ಮಂಜುನಾಥ್", "ಕಾವ್ಯ", "ರಾಘವೇಂದ್ರ", "ಶ್ವೇತಾ"],
+        "last": ["ಗೌಡ", "ಶೆಟ್ಟಿ", "ಹೆಗ್ಡೆ", "ರಾವ್"],
+        "cities": ["ಬೆಂಗಳೂರು", "ಮೈಸೂರು", "ಹುಬ್ಬಳ್ಳಿ", "ಮಂಗಳೂರು"],
+        "streets": ["ಎಂ.ಜಿ. ರಸ್ತೆ", "ಗಾಂಧಿ ನಗರ", "ಸ್ಟೇಷನ್ ರಸ್ತೆ"],
+        "text": [
+            "ಮದುವೆಯ ನಂತರ ನನ್ನ ಹೆಸರನ್ನು ಬದಲಾಯಿಸಲು ಬಯಸುತ್ತೇನೆ.",
+            "ನೆರೆಯವರು ನನ್ನ ಜಮೀನಿನ ಒಂದು ಭಾಗವನ್ನು ಒತ್ತುವರಿ ಮಾಡಿದ್ದಾರೆ.",
+            "ವಾಹನ ಸರಿಯಾಗಿ ನಿಲ್ಲಿಸಿದ್ದರೂ ದಂಡ ವಿಧಿಸಲಾಗಿದೆ.",
+        ],
+        "support": ["ನನ್ನ ಅರ್ಜಿ ಯಾವಾಗ ಅನುಮೋದನೆಯಾಗುತ್ತದೆ?", "ಫಾರ್ಮ್ PDF ಡೌನ್‌ಲೋಡ್ ಆಗುತ್ತಿಲ್ಲ."],
+    },
+    "bn": {
+        "first": ["সৌরভ", "অনন্যা", "অমিত", "রুমা", "দেবাশিস", "মৌমিতা"],
+        "last": ["বন্দ্যোপাধ্যায়", "চট্টোপাধ্যায়", "দাস", "সেন"],
+        "cities": ["কলকাতা", "হাওড়া", "শিলিগুড়ি", "দুর্গাপুর"],
+        "streets": ["পার্ক স্ট্রিট", "স্টেশন রোড", "গান্ধী নগর"],
+        "text": [
+            "বিয়ের পর আমি আমার নাম পরিবর্তন করতে চাই।",
+            "প্রতিবেশী আমার জমির একাংশ দখল করেছে।",
+        ],
+        "support": ["আমার আবেদন কবে অনুমোদিত হবে?", "ফর্মের PDF ডাউনলোড হচ্ছে না।"],
+    },
+    "mr": {
+        "first": ["सचिन", "अश्विनी", "गणेश", "प्राजक्ता", "महेश", "स्नेहल"],
+        "last": ["पाटील", "जाधव", "कुलकर्णी", "देशमुख"],
+        "cities": ["पुणे", "मुंबई", "नागपूर", "नाशिक"],
+        "streets": ["शिवाजी रोड", "स्टेशन रोड", "गांधी नगर"],
+        "text": [
+            "लग्नानंतर मला माझे नाव बदलायचे आहे.",
+            "शेजाऱ्याने माझ्या जमिनीच्या काही भागावर ताबा घेतला आहे.",
+        ],
+        "support": ["माझा अर्ज कधी मंजूर होईल?", "फॉर्मची PDF डाउनलोड होत नाही."],
+    },
+    "gu": {
+        "first": ["હાર્દિક", "નિશા", "જયેશ", "પૂજા", "કેતન"],
+        "last": ["પટેલ", "શાહ", "દેસાઈ", "મહેતા"],
+        "cities": ["અમદાવાદ", "સુરત", "વડોદરા", "રાજકોટ"],
+        "streets": ["સ્ટેશન રોડ", "ગાંધી માર્ગ"],
+        "text": ["લગ્ન પછી મારે મારું નામ બદલવું છે.", "પડોશીએ મારી જમીનના ભાગ પર કબજો કર્યો છે."],
+        "support": ["મારી અરજી ક્યારે મંજૂર થશે?"],
+    },
+    "ml": {
+        "first": ["അനൂപ്", "ലക്ഷ്മി", "രാജേഷ്", "ദിവ്യ", "സുനിൽ"],
+        "last": ["നായർ", "മേനോൻ", "പിള്ള", "കുറുപ്പ്"],
+        "cities": ["കൊച്ചി", "തിരുവനന്തപുരം", "കോഴിക്കോട്", "തൃശ്ശൂർ"],
+        "streets": ["എം.ജി. റോഡ്", "സ്റ്റേഷൻ റോഡ്"],
+        "text": ["വിവാഹശേഷം എന്റെ പേര് മാറ്റാൻ ആഗ്രഹിക്കുന്നു.", "അയൽക്കാരൻ എന്റെ ഭൂമിയുടെ ഒരു ഭാഗം കൈയേറി."],
+        "support": ["എന്റെ അപേക്ഷ എപ്പോൾ അംഗീകരിക്കും?"],
+    },
+    "pa": {
+        "first": ["ਗੁਰਪ੍ਰੀਤ", "ਹਰਪ੍ਰੀਤ", "ਮਨਦੀਪ", "ਜਸਲੀਨ", "ਅਮਨਦੀਪ"],
+        "last": ["ਸਿੰਘ", "ਕੌਰ", "ਗਿੱਲ", "ਸੰਧੂ"],
+        "cities": ["ਅੰਮ੍ਰਿਤਸਰ", "ਲੁਧਿਆਣਾ", "ਜਲੰਧਰ", "ਪਟਿਆਲਾ"],
+        "streets": ["ਮਾਲ ਰੋਡ", "ਸਟੇਸ਼ਨ ਰੋਡ"],
+        "text": ["ਵਿਆਹ ਤੋਂ ਬਾਅਦ ਮੈਂ ਆਪਣਾ ਨਾਮ ਬਦਲਣਾ ਚਾਹੁੰਦੀ ਹਾਂ।", "ਗੁਆਂਢੀ ਨੇ ਮੇਰੀ ਜ਼ਮੀਨ ਦੇ ਹਿੱਸੇ ਉੱਤੇ ਕਬਜ਼ਾ ਕਰ ਲਿਆ ਹੈ।"],
+        "support": ["ਮੇਰੀ ਅਰਜ਼ੀ ਕਦੋਂ ਮਨਜ਼ੂਰ ਹੋਵੇਗੀ?"],
+    },
+    "or": {
+        "first": ["ସୁଭାଷ", "ପ୍ରିୟଙ୍କା", "ଦେବାଶିଷ", "ସୁମିତ୍ରା"],
+        "last": ["ମହାପାତ୍ର", "ପଟ୍ଟନାୟକ", "ଦାସ", "ସାହୁ"],
+        "cities": ["ଭୁବନେଶ୍ୱର", "କଟକ", "ପୁରୀ", "ସମ୍ବଲପୁର"],
+        "streets": ["ଷ୍ଟେସନ ରୋଡ", "ଗାନ୍ଧୀ ମାର୍ଗ"],
+        "text": ["ବିବାହ ପରେ ମୁଁ ମୋର ନାମ ବଦଳାଇବାକୁ ଚାହେଁ।"],
+        "support": ["ମୋ ଆବେଦନ କେବେ ମଞ୍ଜୁର ହେବ?"],
+    },
+    "ur": {
+        "first": ["عمران", "سائرہ", "فیصل", "نازیہ", "ارشد"],
+        "last": ["خان", "قریشی", "انصاری", "صدیقی"],
+        "cities": ["لکھنؤ", "حیدرآباد", "سری نگر", "بھوپال"],
+        "streets": ["اسٹیشن روڈ", "گاندھی نگر"],
+        "text": ["شادی کے بعد میں اپنا نام تبدیل کرنا چاہتی ہوں۔", "پڑوسی نے میری زمین کے ایک حصے پر قبضہ کر لیا ہے۔"],
+        "support": ["میری درخواست کب منظور ہوگی؟"],
+    },
+}
+
+ADMIN_REPLIES = [
+    "Thank you, we have received your request.",
+    "Your application is under review.",
+    "Please upload a clear copy of your ID proof.",
+    "Your form has been approved. You can download the PDF now.",
+]
+HISTORY_MESSAGES = {
+    "processing": "Application is being reviewed",
+    "approved": "Application approved",
+    "rejected": "Application rejected: documents incomplete",
+}
+# Status a submission ends in, and how often
+FINAL_STATUSES = {"submitted": 35, "processing": 25, "approved": 28, "rejected": 12}
+TICKET_STATUSES = {"open": 40, "in_progress": 25, "resolved": 35}
+FEEDBACK_TYPES = ["general", "bug", "suggestion", "complaint"]
+DOCUMENT_TYPES = ["aadhar", "pan", "passport", "voter_id", "driving_licence"]
+
+
+class SyntheticData:
+    """Deterministic record factory: record i of a kind depends only on the seed and i"""
+
+    def __init__(self, run_id: str, users: int, days: int, seed: int, password: str):
+        self.run_id = run_id
+        self.users = users
+        self.seed = seed
+        self.end = datetime.now().replace(microsecond=0)
+        self.start = self.end - timedelta(days=days)
+        self.password_hash = AuthService.hash_password(password)  # Hashed once; PBKDF2 per user would dominate
+        self.languages = list(LANGUAGE_WEIGHTS)
+        self.language_weights = list(LANGUAGE_WEIGHTS.values())
+
+    def _rng(self, kind: str, i: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{i}")
+
+    @staticmethod
+    def _pick(rng: random.Random, weights: dict) -> str:
+        return rng.choices(list(weights), list(weights.values()))[0]
+
+    def _moment(self, rng: random.Random, after: datetime = None) -> datetime:
+        start = after or self.start
+        return start + timedelta(seconds=rng.randint(0, max(int((self.end - start).total_seconds()), 1)))
+
+    def user_id(self, i: int) -> str:
+        return f"seed-{self.run_id}-u{i:08d}"
+
+    def _user_language(self, i: int) -> str:
+        return self._rng("user", i).choices(self.languages, self.language_weights)[0]
+
+    def _person(self, rng: random.Random, locale: dict) -> str:
+        return f"{rng.choice(locale['first'])} {rng.choice(locale['last'])}"
+
+    def _address(self, rng: random.Random, locale: dict) -> str:
+        return f"{rng.randint(1, 999)}, {rng.choice(locale['streets'])}, {rng.choice(locale['cities'])} - {rng.randint(110001, 855999)}"
+
+    def user(self, i: int) -> dict:
+        rng = self._rng("user", i)
+        language = rng.choices(self.languages, self.language_weights)[0]
+        locale = LOCALES[language]
+        created_at = self._moment(rng).isoformat()
+        return {
+            "user_id": self.user_id(i),
+            "email": f"user{i}.{self.run_id}@example.com",
+            "password": self.password_hash,
+            "phone": f"9{rng.randint(100000000, 999999999)}",
+            "name": self._person(rng, locale),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "verified": rng.random() < 0.8,
+            "language": language,
+            "profile": {"address": self._address(rng, locale), "city": rng.choice(locale["cities"])},
+            "settings": {"language": language, "notifications": rng.random() < 0.7},
+        }
+
+    def _field_value(self, rng: random.Random, field: dict, locale: dict, applicant: str):
+        field_id, field_type = field["id"], field.get("type", "text")
+        if field_type == "select":
+            return rng.choice(field.get("options") or ["Other"])
+        if field_type in ("boolean", "checkbox"):
+            return rng.random() < 0.95
+        if field_type == "date":
+            return self._moment(rng).date().isoformat()
+        if field_type == "number":
+            return rng.randint(18, 80) if "age" in field_id else rng.randint(5, 5000) * 1000
+        if field_type == "file":
+            return [f"{field_id}_{rng.randint(1, 9999)}.pdf" for _ in range(rng.randint(0, 2))]
+        if field_id in ("applicant_full_name", "deponent_name", "plaintiff_name", "appellant_name"):
+            return applicant
+        if "name" in field_id:
+            return self._person(rng, locale)
+        if "address" in field_id:
+            return self._address(rng, locale)
+        if "place" in field_id or "station" in field_id:
+            return rng.choice(locale["cities"])
+        if "vehicle" in field_id:
+            return f"{rng.choice(['KA', 'MH', 'DL', 'TN', 'UP', 'WB'])} {rng.randint(1, 99):02d} AB {rng.randint(1000, 9999)}"
+        if "number" in field_id:
+            return f"{rng.randint(1000, 9999)} {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}"
+        if field_type == "textarea":
+            return " ".join(rng.sample(locale["text"], min(len(locale["text"]), rng.randint(1, 2))))
+        return rng.choice(locale["text"])
+
+    def submission(self, i: int) -> dict:
+        rng = self._rng("submission", i)
+        user_index = rng.randrange(self.users)
+        locale = LOCALES[self._user_language(user_index)]
+        form = FORMS_DB[rng.choice(list(FORMS_DB))]
+        applicant = self._person(rng, locale)
+        data = {field["id"]: self._field_value(rng, field, locale, applicant) for field in form["fields"]}
+
+        created = self._moment(rng)
+        history = [{"timestamp": created.isoformat(), "message": "Form submitted successfully"}]
+        status = self._pick(rng, FINAL_STATUSES)
+        moment = created
+        path = {"submitted": [], "processing": ["processing"],
+                "approved": ["processing", "approved"], "rejected": ["processing", "rejected"]}[status]
+        for step in path:
+            moment = self._moment(rng, moment)
+            history.append({"timestamp": moment.isoformat(), "message": HISTORY_MESSAGES[step]})
+        # A few long-running cases with many review notes, to exercise history caps
+        if status == "processing" and rng.random() < 0.02:
+            for _ in range(rng.randint(5, SUBMISSION_HISTORY_CAP * 2)):
+                moment = self._moment(rng, moment)
+                history.append({"timestamp": moment.isoformat(), "message": "Additional review note"})
+
+        return {
+            "tracking_id": f"TRK{created.strftime('%Y%m%d')}-{self.run_id}{i:08d}".upper(),
+            "form_id": form["id"],
+            "data": data,
+            "user_id": self.user_id(user_index),
+            "status": status,
+            "created_at": created.isoformat(),
+            "updated_at": moment.isoformat(),
+            "version": len(history),
+            "history": history,
+        }
+
+    def ticket(self, i: int) -> dict:
+        rng = self._rng("ticket", i)
+        user_index = rng.randrange(self.users)
+        locale = LOCALES[self._user_language(user_index)]
+        created = self._moment(rng)
+        return {
+            "ticket_id": f"TKT{created.strftime('%Y%m%d%H%M%S')}-{self.run_id}{i:08d}".upper(),
+            "user_id": self.user_id(user_index),
+            "subject": rng.choice(locale["support"]),
+            "description": " ".join(rng.sample(locale["text"], min(len(locale["text"]), 2))),
+            "priority": rng.choice(["low", "medium", "medium", "high"]),
+            "status": self._pick(rng, TICKET_STATUSES),
+            "created_at": created.isoformat(),
+            "updated_at": self._moment(rng, created).isoformat(),
+        }
+
+    def feedback(self, i: int) -> dict:
+        rng = self._rng("feedback", i)
+        user_index = rng.randrange(self.users)
+        locale = LOCALES[self._user_language(user_index)]
+        created = self._moment(rng)
+        return {
+            "feedback_id": f"FB{created.strftime('%Y%m%d%H%M%S')}-{self.run_id}{i:08d}".upper(),
+            "user_id": self.user_id(user_index),
+            "feedback_type": rng.choice(FEEDBACK_TYPES),
+            "message": rng.choice(locale["text"] + locale["support"]),
+            "rating": rng.choices([1, 2, 3, 4, 5], [5, 5, 15, 35, 40])[0],
+            "status": rng.choice(["new", "new", "reviewed"]),
+            "created_at": created.isoformat(),
+            "updated_at": created.isoformat(),
+        }
+
+    def message(self, i: int) -> dict:
+        rng = self._rng("message", i)
+        user_index = rng.randrange(self.users)
+        locale = LOCALES[self._user_language(user_index)]
+        sender = "admin" if rng.random() < 0.4 else "user"
+        timestamp = self._moment(rng).isoformat()
+        return {
+            "message_id": f"MSG-{self.run_id}{i:08d}".upper(),
+            "user_id": self.user_id(user_index),
+            "sender": sender,
+            "text": rng.choice(ADMIN_REPLIES) if sender == "admin" else rng.choice(locale["support"] + locale["text"]),
+            "timestamp": timestamp,
+            "created_at": timestamp,
+        }
+
+    def document(self, i: int) -> dict:
+        rng = self._rng("document", i)
+        user_index = rng.randrange(self.users)
+        document_type = rng.choice(DOCUMENT_TYPES)
+        file_id = hashlib.sha256(f"{self.seed}:{self.run_id}:document:{i}".encode()).hexdigest()
+        return {
+            "document_id": f"doc-{self.run_id}-{i:08d}",
+            "user_id": self.user_id(user_index),
+            "document_type": document_type,
+            "document_data": {
+                "file_url": f"/files/{file_id}",
+                "file_id": file_id,
+                "file_size": rng.randint(50_000, 5_000_000),
+                "file_type": "application/pdf",
+                "original_filename": f"{document_type}.pdf",
+                "storage_type": "local",
+            },
+            "uploaded_at": self._moment(rng).isoformat(),
+            "status": "uploaded",
+        }
+
+
+def batches(factory: Callable[[int], dict], count: int, batch_size: int) -> Iterator[List[dict]]:
+    for start in range(0, count, batch_size):
+        yield [factory(i) for i in range(start, min(start + batch_size, count))]
+
+
+def load(label: str, factory: Callable[[int], dict], count: int, batch_size: int, insert: Callable[[List[dict]], int]):
+    if count <= 0:
+        return
+    print(f"🌱 Seeding {count:,} {label}...")
+    started = time.perf_counter()
+    written = 0
+    for batch in batches(factory, count, batch_size):
+        written += insert(batch)
+        elapsed = time.perf_counter() - started
+        print(f"   {written:>12,} / {count:,}  ({written / elapsed:,.0f}/s)", end="\r", flush=True)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {written:,} {label} in {elapsed:.1f}s ({written / elapsed:,.0f}/s)" + " " * 20)
+
+
+def seed(users: int, submissions: int, tickets: int, feedbacks: int, messages: int, documents: int,
+         days: int = 365, batch_size: int = 1000, seed_value: int = 42, password: str = "Seed@12345",
+         run_id: str = None) -> str:
+    """Generate and bulk-load a synthetic dataset, then rebuild the derived indexes; returns the run id"""
+    run_id = run_id or uuid.uuid4().hex[:6]
+    data = SyntheticData(run_id, max(users, 1), days, seed_value, password)
+    print(f"🚀 Seeding DB_TYPE={DB_TYPE}, run {run_id}, seed {seed_value}")
+    DatabaseService.connect()  # Fail before generating anything; creates MongoDB indexes
+
+    load("users", data.user, users, batch_size, lambda batch: DatabaseService.bulk_insert("users", batch))
+    load("submissions", data.submission, submissions, batch_size, lambda batch: DatabaseService.bulk_insert("submissions", batch))
+    load("tickets", data.ticket, tickets, batch_size, lambda batch: DatabaseService.bulk_insert("tickets", batch))
+    load("feedbacks", data.feedback, feedbacks, batch_size, lambda batch: DatabaseService.bulk_insert("feedbacks", batch))
+    load("documents", data.document, documents, batch_size, lambda batch: DatabaseService.bulk_insert("documents", batch))
+    load("chat messages", data.message, messages, batch_size, ChatDatabaseService.bulk_insert_messages)
+
+    # Bulk inserts skip per-record bookkeeping, so derive it once from the loaded data
+    print("🔄 Rebuilding analytics counters, conversation summaries and search index...")
+    started = time.perf_counter()
+    DatabaseService.rebuild_submission_counters()
+    ChatDatabaseService.rebuild_conversation_summaries()
+    DatabaseService.rebuild_search_index()
+    print(f"✅ Rebuilt in {time.perf_counter() - started:.1f}s")
+    return run_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic data into the configured backend")
+    parser.add_argument("--users", type=int, default=1000, help="number of users")
+    parser.add_argument("--submissions", type=int, help="number of submissions (default: 3 per user)")
+    parser.add_argument("--tickets", type=int, help="number of help tickets (default: 1 per 5 users)")
+    parser.add_argument("--feedbacks", type=int, help="number of feedbacks (default: 1 per 5 users)")
+    parser.add_argument("--messages", type=int, help="number of chat messages (default: 4 per user)")
+    parser.add_argument("--documents", type=int, help="number of uploaded documents (default: 1 per 2 users)")
+    parser.add_argument("--days", type=int, default=365, help="spread created dates over this many past days")
+    parser.add_argument("--batch-size", type=int, default=1000, help="records per bulk insert")
+    parser.add_argument("--seed", type=int, default=42, help="random seed; the same seed generates the same data")
+    parser.add_argument("--password", default="Seed@12345", help="password every seeded user signs in with")
+    parser.add_argument("--run-id", help="prefix for generated IDs (default: random)")
+    args = parser.parse_args()
+
+    def default(value, ratio):
+        return value if value is not None else int(args.users * ratio)
+
+    seed(
+        users=args.users,
+        submissions=default(args.submissions, 3),
+        tickets=default(args.tickets, 0.2),
+        feedbacks=default(args.feedbacks, 0.2),
+        messages=default(args.messages, 4),
+        documents=default(args.documents, 0.5),
+        days=args.days,
+        batch_size=args.batch_size,
+        seed_value=args.seed,
+        password=args.password,
+        run_id=args.run_id,
+    )
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -1,10 +1,12 @@
 import jwt
 from datetime import datetime, timedelta
 from typing import Optional, Dict
-from config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS
+from config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS, CHAT_STREAM_TICKET_SECONDS
 import hashlib
 import secrets
 
+CHAT_STREAM_AUDIENCE = "chat-stream"
+
 class AuthService:
     """Authentication service for JWT token management"""
     
@@ -32,6 +34,27 @@ class AuthService:
         except jwt.InvalidTokenError:
             return None
     
+    @staticmethod
+    def create_stream_ticket(user_id: str, scope: Optional[str]) -> str:
+        """Create a short-lived token that only opens the chat stream for scope (a user_id, or None for all).
+        EventSource cannot send headers, so it carries this in the URL instead of the session token."""
+        payload = {
+            "user_id": user_id,
+            "scope": scope,
+            "aud": CHAT_STREAM_AUDIENCE,
+            "exp": datetime.utcnow() + timedelta(seconds=CHAT_STREAM_TICKET_SECONDS),
+            "iat": datetime.utcnow()
+        }
+        return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    
+    @staticmethod
+    def verify_stream_ticket(ticket: str) -> Optional[Dict]:
+        """Verify a chat stream ticket; session tokens are not tickets, and tickets are not session tokens"""
+        try:
+            return jwt.decode(ticket, JWT_SECRET, algorithms=[JWT_ALGORITHM], audience=CHAT_STREAM_AUDIENCE)
+        except jwt.InvalidTokenError:
+            return None
+    
     @staticmethod
     def hash_password(password: str) -> str:
         """Hash password with salt"""
@@ -1,17 +1,25 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
+from email.mime.application import MIMEApplication
 from email import encoders
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from config import (
     EMAIL_SERVICE, SENDER_EMAIL, FRONTEND_URL,
-    SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD
+    SMTP_USERNAME, SMTP_PASSWORD
 )
+from email_outbox import email_attachments, email_id, email_outbox
+from smtp_pool import SMTPPool, smtp_pool
+import hashlib
 import os
 import uuid
 from datetime import datetime, timedelta
 
+def _digest(content) -> str:
+    """Short stable hash of an email's distinguishing content, for its event name"""
+    data = content if isinstance(content, bytes) else content.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
 class EmailService:
     """Advanced email service for sending beautiful notifications and documents"""
     
@@ -21,19 +29,29 @@ class EmailService:
         subject = "🔐 Welcome Back! Your Account is Secure"
         
         html_body = EmailService._get_login_template(user_name, login_time, ip_address)
-        EmailService._send_email(email, subject, html_body)
+        EmailService._send_email(email, subject, html_body, event=f"login:{login_time}:{ip_address}")
     
     @staticmethod
-    def send_submission_confirmation(email: str, tracking_id: str, form_title: str, user_name: str):
-        """Send beautiful form submission confirmation email"""
+    def send_submission_confirmation(email: str, tracking_id: str, form_title: str, user_name: str,
+                                     pdf: Optional[bytes] = None, hold: float = 0):
+        """Send beautiful form submission confirmation email, with the form's PDF attached when given.
+        With hold, the email waits that long for attach_submission_pdf() before going out without it."""
         subject = f"📋 Form Submitted Successfully - {form_title}"
         
         html_body = EmailService._get_submission_template(user_name, tracking_id, form_title)
-        EmailService._send_email(email, subject, html_body)
+        attachments = [(f"{tracking_id}.pdf", pdf)] if pdf else None
+        EmailService._send_email(email, subject, html_body, attachments, event=f"submission_confirmation:{tracking_id}",
+                                 hold=hold)
+    
+    @staticmethod
+    def attach_submission_pdf(email: str, tracking_id: str, pdf: Optional[bytes]) -> bool:
+        """Send a held submission confirmation now, with the PDF attached when there is one"""
+        attachments = [(f"{tracking_id}.pdf", pdf)] if pdf else None
+        return email_outbox.release(email_id(f"submission_confirmation:{tracking_id}", email), attachments)
     
     @staticmethod
-    def send_status_update(email: str, tracking_id: str, status: str, message: str):
-        """Send beautiful status update email"""
+    def send_status_update(email: str, tracking_id: str, status: str, message: str, version: Optional[int] = None):
+        """Send beautiful status update email; version, the submission's after the update, identifies it"""
         subject = f"📋 Submission Status Update - {tracking_id}"
         
         status_display = {
@@ -48,7 +66,8 @@ class EmailService:
         status_info = EmailServiceExtensions._get_status_info(status)
         
         html_body = EmailServiceExtensions._get_status_update_template(tracking_id, status_display, message, status_info)
-        EmailService._send_email(email, subject, html_body)
+        update = f"v{version}" if version is not None else f"{status}:{_digest(message)}"
+        EmailService._send_email(email, subject, html_body, event=f"status_update:{tracking_id}:{update}")
     
     @staticmethod
     def send_help_ticket_response(email: str, ticket_id: str, subject: str, response: str, user_name: str):
@@ -57,7 +76,7 @@ class EmailService:
         
         from email_extensions import EmailServiceExtensions
         html_body = EmailServiceExtensions._get_help_ticket_response_template(ticket_id, subject, response, user_name)
-        EmailService._send_email(email, email_subject, html_body)
+        EmailService._send_email(email, email_subject, html_body, event=f"ticket_reply:{ticket_id}:{_digest(response)}")
     
     @staticmethod
     def send_feedback_response(email: str, feedback_id: str, feedback_type: str, response: str, user_name: str):
@@ -66,7 +85,7 @@ class EmailService:
         
         from email_extensions import EmailServiceExtensions
         html_body = EmailServiceExtensions._get_feedback_response_template(feedback_id, feedback_type, response, user_name)
-        EmailService._send_email(email, email_subject, html_body)
+        EmailService._send_email(email, email_subject, html_body, event=f"feedback_reply:{feedback_id}:{_digest(response)}")
     
     @staticmethod
     def _get_pdf_template(tracking_id: str) -> str:
@@ -151,66 +170,66 @@ class EmailService:
         reset_link = f"{FRONTEND_URL}/reset-password?token={reset_token}"
         
         html_body = EmailService._get_password_reset_template(user_name, reset_link)
-        EmailService._send_email(email, subject, html_body)
+        EmailService._send_email(email, subject, html_body, event=f"password_reset:{_digest(reset_token)}")
     
     @staticmethod
-    def send_form_pdf(email: str, pdf_path: str, tracking_id: str):
+    def send_form_pdf(email: str, pdf: bytes, tracking_id: str):
         """Send form as PDF attachment"""
         subject = f"📄 Your Legal Form PDF - {tracking_id}"
         
         html_body = EmailService._get_pdf_template(tracking_id)
-        
-        # For now, just send the email without attachment
-        # In production, you would attach the PDF file
-        print(f"[EMAIL] PDF email sent to {email} (PDF: {pdf_path})")
-        EmailService._send_email(email, subject, html_body)
+        EmailService._send_email(email, subject, html_body, [(f"{tracking_id}.pdf", pdf)],
+                                 event=f"form_pdf:{tracking_id}:{_digest(pdf)}")
     
     @staticmethod
-    def _send_email(to_email: str, subject: str, html_body: str):
-        """Internal method to send email"""
-        try:
-            if EMAIL_SERVICE == "smtp":
-                EmailService._send_smtp_email(to_email, subject, html_body)
-            elif EMAIL_SERVICE == "sendgrid":
-                EmailService._send_sendgrid_email(to_email, subject, html_body)
-            else:
-                # Fallback to console logging
-                print(f"[EMAIL] Sending to {to_email}")
-                print(f"[EMAIL] Subject: {subject}")
-                print(f"[EMAIL] Body: {html_body[:100]}...")
-                
-        except Exception as e:
-            print(f"[EMAIL ERROR] {str(e)}")
+    def _send_email(to_email: str, subject: str, html_body: str, attachments: Optional[List[Tuple[str, bytes]]] = None,
+                    event: Optional[str] = None, hold: float = 0):
+        """Queue an email in the outbox for the worker to deliver; attachments are (filename, PDF bytes) pairs.
+        event names what the email is about, so the same event is sent to a recipient only once.
+        Raises DatabaseUnavailableError when the outbox cannot be written; the email is not sent then."""
+        email_outbox.enqueue(event or f"email:{_digest(subject + html_body)}", to_email, subject, html_body,
+                             attachments, hold)
     
     @staticmethod
-    def _send_smtp_email(to_email: str, subject: str, html_body: str):
-        """Send email using SMTP"""
-        if not SMTP_USERNAME or not SMTP_PASSWORD:
-            print(f"[EMAIL] SMTP not configured - logging email to console")
-            print(f"[EMAIL] To: {to_email}")
-            print(f"[EMAIL] Subject: {subject}")
-            return
+    def deliver_batch(emails: List[dict], pool: Optional[SMTPPool] = None) -> List[Optional[Exception]]:
+        """Deliver outbox emails over one pooled SMTP connection; returns None or the error for each.
+        Without SMTP credentials (and no pool given) emails are logged to the console instead."""
+        if pool is None:
+            if EMAIL_SERVICE == "sendgrid":
+                print(f"[EMAIL] SendGrid not configured - using SMTP instead")
+            if EMAIL_SERVICE not in ("smtp", "sendgrid") or not SMTP_USERNAME or not SMTP_PASSWORD:
+                for email in emails:
+                    print(f"[EMAIL] SMTP not configured - logging email to console")
+                    print(f"[EMAIL] To: {email['recipient']}")
+                    print(f"[EMAIL] Subject: {email['subject']}")
+                    for filename, data in email_attachments(email):
+                        print(f"[EMAIL] Attachment: {filename} ({len(data)} bytes)")
+                return [None] * len(emails)
+            pool = smtp_pool
         
-        msg = MIMEMultipart('alternative')
+        messages = [EmailService._build_message(email["recipient"], email["subject"], email["html"],
+                                                email_attachments(email)) for email in emails]
+        results = pool.send_many(messages)
+        for email, error in zip(emails, results):
+            if error is None:
+                print(f"[EMAIL] Sent successfully to {email['recipient']}")
+        return results
+    
+    @staticmethod
+    def _build_message(to_email: str, subject: str, html_body: str, attachments: Optional[List[Tuple[str, bytes]]] = None):
+        """HTML message, wrapped in multipart/mixed with the PDFs when there are attachments"""
+        msg = MIMEMultipart('mixed' if attachments else 'alternative')
         msg['Subject'] = subject
         msg['From'] = SENDER_EMAIL
         msg['To'] = to_email
         
         html_part = MIMEText(html_body, 'html')
         msg.attach(html_part)
-        
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.send_message(msg)
-            print(f"[EMAIL] Sent successfully to {to_email}")
-    
-    @staticmethod
-    def _send_sendgrid_email(to_email: str, subject: str, html_body: str):
-        """Send email using SendGrid API"""
-        print(f"[EMAIL] SendGrid not configured - using SMTP instead")
-        # Fallback to SMTP since SendGrid is not configured
-        EmailService._send_smtp_email(to_email, subject, html_body)
+        for filename, data in attachments or []:
+            pdf_part = MIMEApplication(data, _subtype='pdf')
+            pdf_part.add_header('Content-Disposition', 'attachment', filename=filename)
+            msg.attach(pdf_part)
+        return msg
     
     # ============ Beautiful Email Templates ============
     
@@ -1,11 +1,24 @@
-import openai
 from typing import Dict, List, Optional
 from config import OPENAI_API_KEY, GPT_MODEL, WHISPER_MODEL
 import json
 import re
 
-# Initialize OpenAI client with new API format
-client = openai.OpenAI(api_key=OPENAI_API_KEY)
+# Created on first use: importing openai takes longer than the rest of app startup
+_client = None
+
+def get_client():
+    """Shared OpenAI client"""
+    global _client
+    if _client is None:
+        import openai
+        _client = openai.OpenAI(api_key=OPENAI_API_KEY)
+    return _client
+
+def __getattr__(name):
+    # Keeps `from services.openai_service import client` working
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class OpenAIService:
     """Service for OpenAI API interactions"""
@@ -15,7 +28,7 @@ class OpenAIService:
         """Transcribe audio using Whisper with enhanced multilingual support"""
         try:
             with open(audio_path, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(
+                transcript = get_client().audio.transcriptions.create(
                     model=WHISPER_MODEL,
                     file=audio_file,
                     language="auto",  # Let Whisper auto-detect language
@@ -106,7 +119,7 @@ Return ONLY valid JSON:
 }}"""
         
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=GPT_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a multilingual legal form assistant with expertise in Indian languages. Always return valid JSON only."},
@@ -198,7 +211,7 @@ Return JSON in this exact format:
 }}"""
         
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=GPT_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a multilingual legal form assistant with expertise in Indian languages and legal documentation. Always return valid JSON only."},
@@ -290,7 +303,7 @@ Return JSON:
 }}"""
         
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=GPT_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a legal form validator with expertise in Indian legal documentation. Always return valid JSON only."},
@@ -381,7 +394,7 @@ Return JSON:
 }}"""
         
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=GPT_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a multilingual legal form assistant. Generate short, clear voice questions. Always return valid JSON only."},
@@ -468,7 +481,7 @@ Return JSON:
 }}"""
         
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=GPT_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a language detection expert. Always return valid JSON only."},
@@ -514,7 +527,7 @@ Return JSON:
 }}"""
         
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=GPT_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a professional translator. Always return valid JSON only."},
@@ -0,0 +1,197 @@
+"""
+Shared fonts and styles for PDF rendering
+Unicode TrueType fonts for the Indic scripts users write in are found and
+registered once per process, at import, from PDF_FONTS_PATH and the system
+font directories (Debian's fonts-noto-core has them all). paragraph() sets
+Indic words in their script's font and switches the paragraph to a Unicode
+Latin font with HarfBuzz shaping (reportlab + uharfbuzz), so conjuncts and
+vowel signs join as they should. Text without Indic runs keeps
+the standard PDF fonts. The styles below are built once and shared by every render;
+treat them as read-only.
+"""
+
+import os
+import re
+from types import MappingProxyType
+from typing import Dict, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, TableStyle
+
+FONT_DIRS = [path for path in os.getenv("PDF_FONTS_PATH", "").split(os.pathsep) if path] + [
+    "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"), "/Library/Fonts"
+]
+
+# Unicode blocks of each script, and the font families that cover it, in order of preference
+SCRIPTS = {
+    "devanagari": ("\u0900-\u097f\ua8e0-\ua8ff\u1cd0-\u1cff", ["NotoSansDevanagari", "NotoSerifDevanagari", "Lohit-Devanagari"]),
+    "bengali": ("\u0980-\u09ff", ["NotoSansBengali", "NotoSerifBengali", "Lohit-Bengali", "Lohit-Assamese"]),
+    "gurmukhi": ("\u0a00-\u0a7f", ["NotoSansGurmukhi", "NotoSerifGurmukhi", "Lohit-Gurmukhi"]),
+    "gujarati": ("\u0a80-\u0aff", ["NotoSansGujarati", "NotoSerifGujarati", "Lohit-Gujarati"]),
+    "oriya": ("\u0b00-\u0b7f", ["NotoSansOriya", "NotoSansOdia", "NotoSerifOriya", "Lohit-Odia"]),
+    "tamil": ("\u0b80-\u0bff", ["NotoSansTamil", "NotoSerifTamil", "Lohit-Tamil"]),
+    "telugu": ("\u0c00-\u0c7f", ["NotoSansTelugu", "NotoSerifTelugu", "Lohit-Telugu"]),
+    "kannada": ("\u0c80-\u0cff", ["NotoSansKannada", "NotoSerifKannada", "Lohit-Kannada"]),
+    "malayalam": ("\u0d00-\u0d7f", ["NotoSansMalayalam", "NotoSerifMalayalam", "Lohit-Malayalam"]),
+}
+# Unicode stand-ins for the standard fonts, used around Indic runs where shaping is on
+LATIN_FAMILIES = {
+    "sans": ["NotoSans", "DejaVuSans", "LiberationSans", "FreeSans"],
+    "serif": ["NotoSerif", "DejaVuSerif", "LiberationSerif", "FreeSerif"],
+}
+STANDARD_FONTS = {
+    "Helvetica": ("sans", False), "Helvetica-Bold": ("sans", True),
+    "Times-Roman": ("serif", False), "Times-Bold": ("serif", True),
+}
+
+
+def _find_font_files(dirs: List[str]) -> Dict[str, str]:
+    """File stem -> path of every TrueType font under dirs; earlier dirs win"""
+    found = {}
+    for root in dirs:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() == ".ttf":
+                    found.setdefault(stem, os.path.join(dirpath, filename))
+    return found
+
+
+def _register_family(family: str, files: Dict[str, str]) -> Optional[str]:
+    """Register a family's regular and bold faces under its name; None if it is not installed"""
+    regular = files.get(f"{family}-Regular") or files.get(family)
+    if not regular:
+        return None
+    bold = files.get(f"{family}-Bold") or regular
+    try:
+        pdfmetrics.registerFont(TTFont(family, regular))
+        pdfmetrics.registerFont(TTFont(f"{family}-Bold", bold))
+    except Exception as e:  # e.g. PostScript outlines, which reportlab cannot embed
+        print(f"[PDF FONTS] Skipping {family}: {e}")
+        return None
+    pdfmetrics.registerFontFamily(family, normal=family, bold=f"{family}-Bold",
+                                  italic=family, boldItalic=f"{family}-Bold")
+    return family
+
+
+def _first_family(candidates: List[str], files: Dict[str, str]) -> Optional[str]:
+    for family in candidates:
+        if _register_family(family, files):
+            return family
+    return None
+
+
+def _register_fonts():
+    files = _find_font_files(FONT_DIRS)
+    script_fonts = {script: font for script, (_, candidates) in SCRIPTS.items()
+                    if (font := _first_family(candidates, files))}
+    latin_fonts = {kind: font for kind, candidates in LATIN_FAMILIES.items()
+                   if script_fonts and (font := _first_family(candidates, files))}
+    missing = sorted(set(SCRIPTS) - set(script_fonts))
+    if missing:
+        print(f"[PDF FONTS] No font for {', '.join(missing)}; install fonts-noto-core or set PDF_FONTS_PATH")
+    if script_fonts and not latin_fonts:
+        print("[PDF FONTS] No Unicode Latin font found, Indic text will not be shaped")
+    return script_fonts, latin_fonts
+
+
+# Registered once per process; render workers do this as they start
+SCRIPT_FONTS, LATIN_FONTS = _register_fonts()
+
+_SCRIPT_CHAR = re.compile("|".join(
+    f"(?P<{script}>[{SCRIPTS[script][0]}])" for script in SCRIPT_FONTS
+)) if SCRIPT_FONTS else None
+_TAG = re.compile(r"(<[^>]*>)")
+
+
+def set_script_fonts(markup: str) -> str:
+    """Put every word holding Indic text in its script's font. reportlab shapes a word
+    with the font of its first character, so each word gets a single font even where
+    it runs across inline tags, like a name in <b> followed by a full stop."""
+    pieces = _TAG.split(markup)  # Text at even indexes, tags at odd ones
+    flat, owners = [], []
+    for index, piece in enumerate(pieces):
+        if index % 2 == 0:
+            flat.append(piece)
+            owners.append(index)
+        elif piece.startswith("<br"):
+            flat.append(" ")
+            owners.append(None)
+    text = "".join(flat)
+    fonts = [None] * len(text)
+    for word in re.finditer(r"\S+", text):
+        script = _SCRIPT_CHAR.search(word.group(0))
+        if script:
+            fonts[word.start():word.end()] = [SCRIPT_FONTS[script.lastgroup]] * (word.end() - word.start())
+    for gap in re.finditer(r"\s+", text):  # Spaces between two words in one font join their run
+        if 0 < gap.start() and gap.end() < len(text) and fonts[gap.start() - 1] and fonts[gap.start() - 1] == fonts[gap.end()]:
+            fonts[gap.start():gap.end()] = [fonts[gap.end()]] * (gap.end() - gap.start())
+
+    position = 0
+    for chunk, owner in zip(flat, owners):
+        if owner is not None:
+            out = []
+            for font, run in _runs(chunk, fonts[position:position + len(chunk)]):
+                out.append(f'<font face="{font}">{run}</font>' if font else run)
+            pieces[owner] = "".join(out)
+        position += len(chunk)
+    return "".join(pieces)
+
+
+def _runs(text: str, fonts: list):
+    start = 0
+    for index in range(1, len(text) + 1):
+        if index == len(text) or fonts[index] != fonts[start]:
+            yield fonts[start], text[start:index]
+            start = index
+
+
+_shaped_styles: Dict[str, ParagraphStyle] = {}
+
+
+def shaped_style(style: ParagraphStyle) -> ParagraphStyle:
+    """The style with its standard font swapped for a Unicode one and shaping on, built once per style"""
+    shaped = _shaped_styles.get(style.name)
+    if shaped is None:
+        kind, bold = STANDARD_FONTS.get(style.fontName, ("sans", "Bold" in style.fontName))
+        family = LATIN_FONTS.get(kind) or next(iter(LATIN_FONTS.values()), None)
+        shaped = style
+        if family:
+            shaped = ParagraphStyle(f"{style.name}Shaped", parent=style,
+                                    fontName=f"{family}-Bold" if bold else family, shaping=1)
+        _shaped_styles[style.name] = shaped
+    return shaped
+
+
+def paragraph(markup: str, style: ParagraphStyle) -> Paragraph:
+    """A Paragraph whose Indic words are set in their script's font and shaped"""
+    if _SCRIPT_CHAR is None or not _SCRIPT_CHAR.search(markup):
+        return Paragraph(markup, style)
+    return Paragraph(set_script_fonts(markup), shaped_style(style))
+
+
+# Generic field table layout for forms without a court template
+_sample = getSampleStyleSheet()
+FORM_STYLES = MappingProxyType({
+    "title": ParagraphStyle("FormTitle", parent=_sample["Heading1"], fontSize=18, spaceAfter=30,
+                            alignment=1, textColor=colors.darkblue),
+    "heading": ParagraphStyle("FormHeading", parent=_sample["Heading2"], fontSize=14, spaceAfter=12,
+                              textColor=colors.darkblue),
+    "normal": _sample["Normal"],
+    "cell": ParagraphStyle("FormCell", parent=_sample["Normal"], fontSize=10, leading=13),
+})
+del _sample
+FORM_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, 0), 12),
+    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+])
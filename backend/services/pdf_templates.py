@@ -0,0 +1,298 @@
+"""
+Court document templates for PDF rendering
+The HTML templates in lib/pdf-templates are compiled once, at import, into
+lists of paragraph blocks whose text is split around their {{ field }} and
+{{ field || "default" }} placeholders. Rendering a submission only fills the
+placeholders and lays the blocks out with reportlab using styles built once
+from style.css, so the cost of a PDF grows with its pages, not with parsing.
+"""
+
+import os
+import re
+from datetime import date
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from services.pdf_resources import paragraph
+
+PDF_TEMPLATES_PATH = os.getenv(
+    "PDF_TEMPLATES_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "lib", "pdf-templates")
+)
+
+# Forms rendered through a court template, with form fields that fill a differently named placeholder
+FORM_TEMPLATES = {
+    "name_change": ("name-change", {}),
+    "property_dispute": ("property-dispute", {}),
+    "property_dispute_simple": ("property-dispute", {}),
+    "traffic_fine_appeal": ("traffic-appeal", {}),
+    "mutual_divorce": ("mutual-divorce", {"husband_full_name": "husband_name", "wife_full_name": "wife_name"}),
+    "mutual_divorce_petition": ("mutual-divorce", {}),
+    "caveat": ("caveat", {}),
+    "probate": ("probate", {}),
+}
+
+BLANK = "_______________"  # Left for the applicant or the registry to fill in by hand
+
+PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*(?:\|\|\s*"([^"]*)"\s*)?\}\}')
+
+# Page geometry and styles mirror lib/pdf-templates/style.css (px converted at 0.75pt)
+PAGE_MARGIN_X = 20 * mm
+PAGE_MARGIN_Y = 25 * mm
+CONTENT_PADDING = 19
+BORDER_COLOR = colors.HexColor("#2f4f8f")
+INNER_BORDER_COLOR = colors.HexColor("#9db5cc")
+
+STYLES = {
+    "title": ParagraphStyle("CertTitle", fontName="Times-Bold", fontSize=19.5, leading=24, alignment=TA_CENTER,
+                            textColor=colors.HexColor("#111111")),
+    "court": ParagraphStyle("CertCourt", fontName="Helvetica", fontSize=9.75, leading=13, alignment=TA_CENTER,
+                            spaceBefore=4, textColor=colors.HexColor("#333333")),
+    "sub": ParagraphStyle("CertSub", fontName="Helvetica", fontSize=9, leading=12, alignment=TA_CENTER,
+                          spaceBefore=2, spaceAfter=4, textColor=colors.HexColor("#555555")),
+    "heading": ParagraphStyle("SectionHeading", fontName="Helvetica-Bold", fontSize=10.5, leading=14,
+                              spaceBefore=15, spaceAfter=4, keepWithNext=1, textColor=colors.HexColor("#111111")),
+    "body": ParagraphStyle("SectionBody", fontName="Helvetica", fontSize=9.75, leading=14.6, alignment=TA_LEFT,
+                           spaceAfter=6, textColor=colors.HexColor("#111111")),
+    "justified": ParagraphStyle("SectionJustified", fontName="Helvetica", fontSize=9.75, leading=14.6,
+                                alignment=TA_JUSTIFY, spaceAfter=7.5, textColor=colors.HexColor("#111111")),
+    "footer": ParagraphStyle("CertFooter", fontName="Helvetica", fontSize=9, leading=13,
+                             textColor=colors.HexColor("#111111")),
+}
+# The footer's columns are spread edge to edge, so the last one hugs the right border
+STYLES["footer_end"] = ParagraphStyle("CertFooterEnd", parent=STYLES["footer"], alignment=TA_RIGHT)
+JUSTIFIED_CLASSES = {"claim-text", "petition-body", "prayer-text"}
+FOOTER_TABLE_STYLE = TableStyle([
+    ("LINEABOVE", (0, 0), (-1, 0), 0.75, colors.HexColor("#cccccc")),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+])
+
+
+def _display(value) -> Optional[str]:
+    """Text a form value prints as; None when there is nothing to print"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(str(item.get("filename") or item.get("url") if isinstance(item, dict) else item) for item in value)
+    elif isinstance(value, dict):
+        value = value.get("filename") or value.get("url") or ""
+    text = str(value).strip()
+    return text or None
+
+
+class Block:
+    """One paragraph of a template: literal markup interleaved with (field, default) placeholders"""
+
+    __slots__ = ("style", "parts", "upper")
+
+    def __init__(self, style: str, parts: list, upper: bool = False):
+        self.style = style
+        self.parts = parts
+        self.upper = upper
+
+    def markup(self, values: Dict[str, str]) -> str:
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            field, default = part
+            text = values.get(field) or default
+            if text is None:
+                out.append(BLANK)
+            else:
+                text = text.upper() if self.upper else text
+                out.append(escape(text).replace("\n", "<br/>"))
+        return "".join(out)
+
+    def flowable(self, values: Dict[str, str], style: Optional[str] = None) -> Paragraph:
+        return paragraph(self.markup(values), STYLES[style or self.style])
+
+
+class CompiledTemplate:
+    """A parsed court template; body holds Blocks, footer one list of Blocks per column"""
+
+    def __init__(self, name: str, title: str, body: List[Block], footer: List[List[Block]]):
+        self.name = name
+        self.title = title
+        self.body = body
+        self.footer = footer
+        self.fields = sorted({part[0] for block in body + [b for column in footer for b in column]
+                              for part in block.parts if not isinstance(part, str)})
+
+    def story(self, values: Dict[str, str]) -> list:
+        """Flowables for a filled-in document"""
+        story = [block.flowable(values) for block in self.body]
+        if self.footer:
+            last = len(self.footer) - 1
+            columns = [[block.flowable(values, "footer_end" if index == last and last else None) for block in column]
+                       for index, column in enumerate(self.footer)]
+            width = (A4[0] - 2 * (PAGE_MARGIN_X + CONTENT_PADDING)) / len(columns)
+            table = Table([columns], colWidths=[width] * len(columns))
+            table.setStyle(FOOTER_TABLE_STYLE)
+            story += [Spacer(1, 22), table]
+        return story
+
+
+class _TemplateParser(HTMLParser):
+    """Turns a template's body into Blocks, keeping only the markup reportlab paragraphs understand"""
+
+    INLINE = {"strong": "b", "b": "b", "em": "i", "i": "i"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.body: List[Block] = []
+        self.footer: List[List[Block]] = []
+        self._open: List[tuple] = []  # (tag, classes) of enclosing elements
+        self._in_title = False
+        self._block: Optional[Block] = None
+
+    def _style_for(self, tag: str, classes: set) -> str:
+        enclosing = {cls for _, element_classes in self._open for cls in element_classes}
+        if tag == "h1":
+            return "title"
+        if tag == "h2":
+            return "heading"
+        if "cert-footer" in enclosing:
+            return "footer"
+        if classes & {"court", "sub"}:
+            return "court" if "court" in classes else "sub"
+        return "justified" if enclosing & JUSTIFIED_CLASSES else "body"
+
+    def handle_starttag(self, tag, attrs):
+        classes = set((dict(attrs).get("class") or "").split())
+        if tag == "title":
+            self._in_title = True
+        elif tag in ("h1", "h2", "p"):
+            self._block = Block(self._style_for(tag, classes), [], upper=tag == "h2")
+        elif self._block is not None and tag in self.INLINE:
+            self._block.parts.append(f"<{self.INLINE[tag]}>")
+        elif self._block is not None and tag == "br":
+            self._block.parts.append("<br/>")
+        elif tag == "div" and self._open and "cert-footer" in self._open[-1][1]:
+            self.footer.append([])
+        if tag not in ("br", "meta", "link"):
+            self._open.append((tag, classes))
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in ("h1", "h2", "p") and self._block is not None:
+            block, self._block = self._block, None
+            self._finish(block)
+        elif self._block is not None and tag in self.INLINE:
+            self._block.parts.append(f"</{self.INLINE[tag]}>")
+        while self._open:
+            if self._open.pop()[0] == tag:
+                break
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data.strip()
+            return
+        if self._block is None:
+            return
+        text = re.sub(r"\s+", " ", data)
+        position = 0
+        for match in PLACEHOLDER.finditer(text):
+            self._literal(text[position:match.start()])
+            self._block.parts.append((match.group(1), match.group(2)))
+            position = match.end()
+        self._literal(text[position:])
+
+    def _literal(self, text: str):
+        if text:
+            self._block.parts.append(escape(text.upper() if self._block.upper else text))
+
+    def _finish(self, block: Block):
+        # Trim the whitespace HTML would collapse at the paragraph's edges
+        for index in (0, -1):
+            if block.parts and isinstance(block.parts[index], str):
+                block.parts[index] = block.parts[index].lstrip() if index == 0 else block.parts[index].rstrip()
+        if not any(part for part in block.parts):
+            return
+        if block.style == "footer" and self.footer:
+            self.footer[-1].append(block)
+        else:
+            self.body.append(block)
+
+
+def compile_template(name: str, html: str) -> CompiledTemplate:
+    parser = _TemplateParser()
+    parser.feed(html)
+    parser.close()
+    return CompiledTemplate(name, parser.title, parser.body, parser.footer)
+
+
+def _load_templates(root: str) -> Dict[str, CompiledTemplate]:
+    templates = {}
+    if not os.path.isdir(root):
+        print(f"[PDF] No templates at {root}, using the generic layout for every form")
+        return templates
+    for filename in sorted(os.listdir(root)):
+        if filename.endswith("-template.html"):
+            with open(os.path.join(root, filename), encoding="utf-8") as f:
+                name = filename[:-len("-template.html")]
+                templates[name] = compile_template(name, f.read())
+    return templates
+
+
+# Compiled once per process
+TEMPLATES = _load_templates(PDF_TEMPLATES_PATH)
+
+
+def template_for(form_id: str) -> Optional[CompiledTemplate]:
+    name, _ = FORM_TEMPLATES.get(form_id, (None, None))
+    return TEMPLATES.get(name)
+
+
+def template_values(form_id: str, form_data: Dict) -> Dict[str, str]:
+    """Printable values for a form's placeholders, with dates the registry would otherwise stamp"""
+    _, aliases = FORM_TEMPLATES.get(form_id, (None, {}))
+    values = {key: text for key, text in ((key, _display(value)) for key, value in form_data.items()) if text}
+    for placeholder, field in aliases.items():
+        if placeholder not in values and values.get(field):
+            values[placeholder] = values[field]
+    today = date.today()
+    values.setdefault("date_today", today.strftime("%d/%m/%Y"))
+    values.setdefault("year", str(today.year))
+    return values
+
+
+def _draw_border(canvas, doc):
+    """The certificate's double border, on every page"""
+    width, height = doc.pagesize
+    canvas.saveState()
+    canvas.setStrokeColor(BORDER_COLOR)
+    canvas.setLineWidth(6)
+    canvas.rect(PAGE_MARGIN_X, PAGE_MARGIN_Y, width - 2 * PAGE_MARGIN_X, height - 2 * PAGE_MARGIN_Y)
+    canvas.setStrokeColor(INNER_BORDER_COLOR)
+    canvas.setLineWidth(2.25)
+    inset = 9
+    canvas.rect(PAGE_MARGIN_X + inset, PAGE_MARGIN_Y + inset,
+                width - 2 * (PAGE_MARGIN_X + inset), height - 2 * (PAGE_MARGIN_Y + inset))
+    canvas.restoreState()
+
+
+def build_template_pdf(template: CompiledTemplate, form_id: str, form_data: Dict, output, tracking_id: str):
+    """Render a submission into its court template; output is a path or a binary file object"""
+    doc = SimpleDocTemplate(
+        output, pagesize=A4, title=template.title, subject=tracking_id,
+        leftMargin=PAGE_MARGIN_X + CONTENT_PADDING, rightMargin=PAGE_MARGIN_X + CONTENT_PADDING,
+        topMargin=PAGE_MARGIN_Y + CONTENT_PADDING, bottomMargin=PAGE_MARGIN_Y + CONTENT_PADDING
+    )
+    doc.build(template.story(template_values(form_id, form_data)), onFirstPage=_draw_border, onLaterPages=_draw_border)
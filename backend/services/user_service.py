@@ -36,7 +36,7 @@ class UserService:
     @staticmethod
     def authenticate_user(email: str, password: str) -> Optional[Dict]:
         """Authenticate user with email and password"""
-        user = DatabaseService.get_user_by_email(email)
+        user = DatabaseService.get_user_by_email(email, "auth")
         
         if not user:
             return None
@@ -54,14 +54,14 @@ class UserService:
         }
     
     @staticmethod
-    def get_user(user_id: str) -> Optional[Dict]:
-        """Get user by ID"""
-        return DatabaseService.get_user(user_id)
+    def get_user(user_id: str, projection: str = "full") -> Optional[Dict]:
+        """Get user by ID; see USER_PROJECTIONS in database.py"""
+        return DatabaseService.get_user(user_id, projection)
     
     @staticmethod
-    def get_user_by_email(email: str) -> Optional[Dict]:
-        """Get user by email"""
-        return DatabaseService.get_user_by_email(email)
+    def get_user_by_email(email: str, projection: str = "full") -> Optional[Dict]:
+        """Get user by email; see USER_PROJECTIONS in database.py"""
+        return DatabaseService.get_user_by_email(email, projection)
     
     @staticmethod
     def update_user(user_id: str, updates: Dict) -> Dict:
@@ -72,7 +72,7 @@ class UserService:
     def create_or_update_google_user(google_id: str, email: str, name: str, picture: str = None) -> Dict:
         """Create or update user from Google OAuth"""
         # Check if user exists by email
-        existing_user = DatabaseService.get_user_by_email(email)
+        existing_user = DatabaseService.get_user_by_email(email, "profile")
         
         if existing_user:
             # Update existing user with Google info
@@ -0,0 +1,202 @@
+"""
+Pooled SMTP delivery for Legal Voice App
+Opening an SMTP connection costs a TCP connect, the greeting, STARTTLS and
+AUTH, so connections are kept open and shared by every email the process
+sends, up to SMTP_POOL_SIZE at once. A connection idle for more than
+SMTP_KEEPALIVE_SECONDS is checked with NOOP before it is reused, and one idle
+for more than SMTP_MAX_IDLE_SECONDS is closed instead, since servers drop
+quiet clients. Each connection is retired after SMTP_MAX_MESSAGES_PER_CONNECTION
+messages. A message whose connection drops is retried once on a new one.
+send_many() delivers a batch over one connection, back to back; if that
+connection cannot be opened, the rest of the batch fails with the same error
+rather than waiting out another connect per message.
+"""
+
+import os
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import List, Optional
+
+from config import SMTP_HOST, SMTP_PASSWORD, SMTP_PORT, SMTP_SECURITY, SMTP_USERNAME
+
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+SMTP_KEEPALIVE_SECONDS = float(os.getenv("SMTP_KEEPALIVE_SECONDS", "15"))
+SMTP_MAX_IDLE_SECONDS = float(os.getenv("SMTP_MAX_IDLE_SECONDS", "120"))
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+
+
+def _dropped(error: Exception) -> bool:
+    """Whether an error means the connection is gone, rather than this message was refused"""
+    if isinstance(error, smtplib.SMTPException):  # Also an OSError, but the server answered
+        return isinstance(error, smtplib.SMTPServerDisconnected) or getattr(error, "smtp_code", None) == 421
+    return isinstance(error, OSError)
+
+
+class _Connection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """Thread-safe pool of authenticated SMTP connections"""
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, username: Optional[str] = SMTP_USERNAME,
+                 password: Optional[str] = SMTP_PASSWORD, security: str = SMTP_SECURITY,
+                 size: int = SMTP_POOL_SIZE, max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+                 keepalive: float = SMTP_KEEPALIVE_SECONDS, max_idle: float = SMTP_MAX_IDLE_SECONDS,
+                 timeout: float = SMTP_TIMEOUT_SECONDS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.security = security
+        self.size = size
+        self.max_messages = max_messages
+        self.keepalive = keepalive
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[_Connection] = []  # Most recently used last
+        self._in_use = 0
+        self.sent = 0
+        self.failed = 0
+        self.opened = 0
+        self.reused = 0
+        self.noops = 0
+        self.reconnects = 0
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def _connect(self) -> _Connection:
+        smtp_class = smtplib.SMTP_SSL if self.security == "ssl" else smtplib.SMTP
+        smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.security == "starttls":
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._count("opened")
+        return _Connection(smtp)
+
+    @staticmethod
+    def _discard(conn: _Connection):
+        try:
+            conn.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.smtp.close()
+
+    def _checkout(self) -> _Connection:
+        """An idle connection that still answers, or a new one"""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            idle = time.monotonic() - conn.last_used
+            if idle > self.max_idle:
+                self._discard(conn)
+                continue
+            if idle > self.keepalive:
+                self._count("noops")
+                try:
+                    alive = conn.smtp.noop()[0] == 250
+                except (smtplib.SMTPException, OSError):
+                    alive = False
+                if not alive:
+                    self._discard(conn)
+                    continue
+            self._count("reused")
+            return conn
+
+    def _checkin(self, conn: _Connection):
+        conn.last_used = time.monotonic()
+        if conn.sent >= self.max_messages:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    def send_many(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """Deliver messages in order over one pooled connection; returns None or the error for each"""
+        results: List[Optional[Exception]] = []
+        with self._slots:
+            self._count("_in_use")
+            conn = None
+            connect_error = None
+            try:
+                for msg in messages:
+                    if connect_error is not None:
+                        results.append(connect_error)
+                        self._count("failed")
+                        continue
+                    for attempt in range(2):
+                        try:
+                            if conn is None:
+                                conn = self._checkout()
+                            conn.smtp.send_message(msg)
+                        except Exception as e:
+                            if conn is None:
+                                connect_error = e
+                            elif _dropped(e):
+                                self._discard(conn)
+                                conn = None
+                                if attempt == 0:
+                                    self._count("reconnects")
+                                    continue
+                            results.append(e)
+                            self._count("failed")
+                        else:
+                            conn.sent += 1
+                            results.append(None)
+                            self._count("sent")
+                            if conn.sent >= self.max_messages:
+                                self._discard(conn)
+                                conn = None
+                        break
+            finally:
+                if conn is not None:
+                    self._checkin(conn)
+                self._count("_in_use", -1)
+        return results
+
+    def send(self, msg: Message):
+        """Deliver one message, raising if it was not accepted"""
+        error = self.send_many([msg])[0]
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Close the idle connections, at shutdown"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "sent": self.sent,
+            "failed": self.failed,
+            "connections_opened": self.opened,
+            "reused": self.reused,
+            "noops": self.noops,
+            "reconnects": self.reconnects,
+            "messages_per_connection": round(self.sent / self.opened, 1) if self.opened else 0.0,
+        }
+
+
+# Global instance; connections open with the first email
+smtp_pool = SMTPPool()
@@ -0,0 +1,926 @@
+"""
+SQLite database for single-node Legal Voice App deployments
+WAL journaling, one connection per thread and JSON1 columns for form data
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, List, Tuple
+
+from db_errors import DatabaseUnavailableError, VersionConflictError
+from search_index import index_body, search_document
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "./data/legal_voice.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL CHECK (json_valid(doc)),
+    email TEXT GENERATED ALWAYS AS (json_extract(doc, '$.email')) VIRTUAL
+);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+
+CREATE TABLE IF NOT EXISTS submissions (
+    tracking_id TEXT PRIMARY KEY,
+    form_id TEXT NOT NULL,
+    user_id TEXT,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL DEFAULT '{}' CHECK (json_valid(data)),
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    pdf_artifact TEXT CHECK (pdf_artifact IS NULL OR json_valid(pdf_artifact))
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_user ON submissions(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_form_status ON submissions(form_id, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_created ON submissions(created_at, tracking_id);
+
+CREATE TABLE IF NOT EXISTS submission_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tracking_id TEXT NOT NULL REFERENCES submissions(tracking_id) ON DELETE CASCADE,
+    timestamp TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_tracking ON submission_history(tracking_id, id);
+
+-- Analytics counters: submissions per form x current status x created day.
+-- Triggers keep them in the same transaction as the write that changes them.
+CREATE TABLE IF NOT EXISTS submission_counters (
+    form_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (form_id, status, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_submission_counters_day ON submission_counters(day);
+
+CREATE TRIGGER IF NOT EXISTS trg_submissions_count_insert AFTER INSERT ON submissions
+BEGIN
+    INSERT INTO submission_counters (form_id, status, day, count)
+    VALUES (NEW.form_id, NEW.status, substr(NEW.created_at, 1, 10), 1)
+    ON CONFLICT (form_id, status, day) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_submissions_count_status AFTER UPDATE OF status ON submissions
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE submission_counters SET count = count - 1
+    WHERE form_id = OLD.form_id AND status = OLD.status AND day = substr(OLD.created_at, 1, 10);
+    INSERT INTO submission_counters (form_id, status, day, count)
+    VALUES (NEW.form_id, NEW.status, substr(NEW.created_at, 1, 10), 1)
+    ON CONFLICT (form_id, status, day) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_submissions_count_delete AFTER DELETE ON submissions
+BEGIN
+    UPDATE submission_counters SET count = count - 1
+    WHERE form_id = OLD.form_id AND status = OLD.status AND day = substr(OLD.created_at, 1, 10);
+END;
+
+CREATE TABLE IF NOT EXISTS reset_tokens (
+    token TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    used INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_reset_tokens_email ON reset_tokens(email);
+
+CREATE TABLE IF NOT EXISTS documents (
+    document_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    document_type TEXT NOT NULL,
+    document_data TEXT NOT NULL DEFAULT '{}' CHECK (json_valid(document_data)),
+    uploaded_at TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_user ON documents(user_id, uploaded_at);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    subject TEXT NOT NULL,
+    description TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets(created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_user ON tickets(user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS feedbacks (
+    feedback_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    feedback_type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    rating INTEGER,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedbacks_created ON feedbacks(created_at);
+CREATE INDEX IF NOT EXISTS idx_feedbacks_user ON feedbacks(user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS messages (
+    message_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    text TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_messages_user;
+CREATE INDEX IF NOT EXISTS idx_messages_cursor ON messages(user_id, timestamp, message_id);
+CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
+
+-- One row per chat user, maintained with every message write so the admin sidebar is one query
+CREATE TABLE IF NOT EXISTS conversations (
+    user_id TEXT PRIMARY KEY,
+    last_message_id TEXT,
+    last_message TEXT,
+    last_sender TEXT,
+    last_message_time TEXT,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    unread_admin INTEGER NOT NULL DEFAULT 0,
+    unread_user INTEGER NOT NULL DEFAULT 0,
+    admin_read_at TEXT,
+    user_read_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_last ON conversations(last_message_time);
+
+-- Full-text search: one row per submission, ticket and chat message holding the terms
+-- search_index.tokenize produced, with an FTS5 index over them kept in step by triggers.
+-- The ascii tokenizer keeps non-ASCII characters inside a term, so it only splits on the
+-- spaces between our terms; unicode61 would break Indic words at their vowel signs.
+CREATE TABLE IF NOT EXISTS search_documents (
+    doc_id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    ref_id TEXT NOT NULL,
+    body TEXT NOT NULL,
+    UNIQUE (kind, ref_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+    body, content='search_documents', content_rowid='doc_id', tokenize='ascii'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_search_documents_insert AFTER INSERT ON search_documents
+BEGIN
+    INSERT INTO search_fts (rowid, body) VALUES (new.doc_id, new.body);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_documents_update AFTER UPDATE OF body ON search_documents
+BEGIN
+    INSERT INTO search_fts (search_fts, rowid, body) VALUES ('delete', old.doc_id, old.body);
+    INSERT INTO search_fts (rowid, body) VALUES (new.doc_id, new.body);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_documents_delete AFTER DELETE ON search_documents
+BEGIN
+    INSERT INTO search_fts (search_fts, rowid, body) VALUES ('delete', old.doc_id, old.body);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_submissions_search_delete AFTER DELETE ON submissions
+BEGIN
+    DELETE FROM search_documents WHERE kind = 'submission' AND ref_id = old.tracking_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_tickets_search_delete AFTER DELETE ON tickets
+BEGIN
+    DELETE FROM search_documents WHERE kind = 'ticket' AND ref_id = old.ticket_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_messages_search_delete AFTER DELETE ON messages
+BEGIN
+    DELETE FROM search_documents WHERE kind = 'chat' AND ref_id = old.message_id;
+END;
+"""
+
+# History is folded into each row with JSON1 so a submission is one query
+SUBMISSION_COLUMNS = """
+    s.tracking_id, s.form_id, s.user_id, s.status, s.data, s.created_at, s.updated_at, s.version, s.pdf_artifact,
+    (SELECT json_group_array(json_object('timestamp', h.timestamp, 'message', h.message))
+     FROM (SELECT timestamp, message FROM submission_history
+           WHERE tracking_id = s.tracking_id ORDER BY id) AS h) AS history
+"""
+
+# Columns bulk_insert writes per table; JSON_COLUMNS are serialized first
+BULK_COLUMNS = {
+    "users": ("user_id", "doc"),
+    "submissions": ("tracking_id", "form_id", "user_id", "status", "data", "created_at", "updated_at", "version"),
+    "submission_history": ("tracking_id", "timestamp", "message"),
+    "tickets": ("ticket_id", "user_id", "subject", "description", "priority", "status", "created_at", "updated_at"),
+    "feedbacks": ("feedback_id", "user_id", "feedback_type", "message", "rating", "status", "created_at", "updated_at"),
+    "documents": ("document_id", "user_id", "document_type", "document_data", "uploaded_at", "status"),
+    "messages": ("message_id", "user_id", "sender", "text", "timestamp", "created_at"),
+}
+JSON_COLUMNS = {"doc", "data", "document_data"}
+
+
+class SQLiteDatabase:
+    """SQLite-backed database with a connection per thread"""
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        print(f"[SQLITE DB] Using {path}")
+
+    # ============ Connection Management ============
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a connection for the calling thread"""
+        # isolation_level=None lets us issue BEGIN IMMEDIATE ourselves;
+        # cached_statements keeps the prepared statements hot per connection
+        conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=256, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-16000")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction; takes the write lock up front to avoid upgrade deadlocks"""
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def ping(self):
+        """Round-trip on this thread's connection; raises DatabaseUnavailableError"""
+        try:
+            self.conn.execute("SELECT 1")
+        except sqlite3.Error as e:
+            raise DatabaseUnavailableError("sqlite", e) from e
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _migrate(self):
+        """Bring databases created by older versions up to the current schema"""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(submissions)")}
+        if "version" not in columns:
+            self.conn.execute("ALTER TABLE submissions ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        if "pdf_artifact" not in columns:
+            self.conn.execute("ALTER TABLE submissions ADD COLUMN pdf_artifact TEXT")
+        # Counters added after submissions already existed start out empty
+        if (self.conn.execute("SELECT 1 FROM submissions LIMIT 1").fetchone()
+                and not self.conn.execute("SELECT 1 FROM submission_counters LIMIT 1").fetchone()):
+            self.rebuild_submission_counters()
+        if (self.conn.execute("SELECT 1 FROM messages LIMIT 1").fetchone()
+                and not self.conn.execute("SELECT 1 FROM conversations LIMIT 1").fetchone()):
+            self.rebuild_conversation_summaries()
+        # Search documents added after records already existed start out empty
+        if (not self.conn.execute("SELECT 1 FROM search_documents LIMIT 1").fetchone()
+                and self.conn.execute(
+                    "SELECT 1 FROM submissions UNION ALL SELECT 1 FROM tickets UNION ALL SELECT 1 FROM messages LIMIT 1"
+                ).fetchone()):
+            self.rebuild_search_index()
+
+    # ============ Row Conversion ============
+
+    @staticmethod
+    def _submission_from_row(row) -> dict:
+        return {
+            "tracking_id": row["tracking_id"],
+            "form_id": row["form_id"],
+            "data": json.loads(row["data"]),
+            "user_id": row["user_id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "version": row["version"],
+            "pdf_artifact": json.loads(row["pdf_artifact"]) if row["pdf_artifact"] else None,
+            "history": json.loads(row["history"]) if row["history"] else []
+        }
+
+    @staticmethod
+    def _document_from_row(row) -> dict:
+        document = dict(row)
+        document["document_data"] = json.loads(document["document_data"])
+        return document
+
+    # ============ Submissions ============
+
+    def save_submission(self, tracking_id: str, form_id: str, data: dict, user_id: str = None, status: str = "submitted"):
+        """Save submission with its first history entry"""
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO submissions (tracking_id, form_id, user_id, status, data, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, json(?), ?, ?)",
+                (tracking_id, form_id, user_id, status, json.dumps(data, ensure_ascii=False), now, now)
+            )
+            conn.execute(
+                "INSERT INTO submission_history (tracking_id, timestamp, message) VALUES (?, ?, ?)",
+                (tracking_id, now, "Form submitted successfully")
+            )
+            self._index_search_document(conn, "submission", {"tracking_id": tracking_id, "data": data})
+
+        return {
+            "tracking_id": tracking_id,
+            "form_id": form_id,
+            "data": data,
+            "user_id": user_id,
+            "status": status,
+            "created_at": now,
+            "updated_at": now,
+            "version": 1,
+            "history": [{"timestamp": now, "message": "Form submitted successfully"}]
+        }
+
+    def get_submission(self, tracking_id: str) -> Optional[dict]:
+        """Get submission by tracking ID"""
+        row = self.conn.execute(
+            f"SELECT {SUBMISSION_COLUMNS} FROM submissions s WHERE s.tracking_id = ?",
+            (tracking_id,)
+        ).fetchone()
+        return self._submission_from_row(row) if row else None
+
+    def get_submission_status(self, tracking_id: str) -> Optional[dict]:
+        """Status fields and the latest history message, without form data or full history"""
+        row = self.conn.execute(
+            "SELECT s.tracking_id, s.form_id, s.user_id, s.status, s.created_at, s.updated_at, s.version, "
+            "(SELECT message FROM submission_history WHERE tracking_id = s.tracking_id ORDER BY id DESC LIMIT 1) AS message "
+            "FROM submissions s WHERE s.tracking_id = ?",
+            (tracking_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def update_submission_status(self, tracking_id: str, status: str, message: str,
+                                 expected_version: Optional[int] = None) -> Optional[dict]:
+        """Update status and append a history entry in one transaction, optionally guarded by version"""
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE submissions SET status = ?, updated_at = ?, version = version + 1 "
+                "WHERE tracking_id = ? AND (? IS NULL OR version = ?)",
+                (status, now, tracking_id, expected_version, expected_version)
+            ).rowcount
+            if not updated:
+                if expected_version is not None and conn.execute(
+                    "SELECT 1 FROM submissions WHERE tracking_id = ?", (tracking_id,)
+                ).fetchone():
+                    raise VersionConflictError(tracking_id, expected_version)
+                return None
+            conn.execute(
+                "INSERT INTO submission_history (tracking_id, timestamp, message) VALUES (?, ?, ?)",
+                (tracking_id, now, message)
+            )
+        return self.get_submission(tracking_id)
+
+    def set_submission_pdf_artifact(self, tracking_id: str, artifact: dict) -> bool:
+        """Record the stored PDF of a submission"""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE submissions SET pdf_artifact = json(?) WHERE tracking_id = ?",
+                (json.dumps(artifact), tracking_id)
+            ).rowcount > 0
+
+    def get_all_submissions(self, form_id: Optional[str] = None, status: Optional[str] = None) -> List[dict]:
+        """Get all submissions with optional filters"""
+        clauses, params = [], []
+        if form_id:
+            clauses.append("s.form_id = ?")
+            params.append(form_id)
+        if status:
+            clauses.append("s.status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT {SUBMISSION_COLUMNS} FROM submissions s {where} ORDER BY s.created_at",
+            params
+        ).fetchall()
+        return [self._submission_from_row(row) for row in rows]
+
+    def iter_submissions(self, form_id: Optional[str] = None, status: Optional[str] = None,
+                         start: Optional[str] = None, end: Optional[str] = None,
+                         batch_size: int = 1000) -> Iterator[dict]:
+        """Yield submissions without history in created_at order, created_at in [start, end).
+        Each batch is its own keyset query, so no cursor or transaction spans a yield."""
+        clauses, params = [], []
+        for clause, value in (("form_id = ?", form_id), ("status = ?", status),
+                              ("created_at >= ?", start), ("created_at < ?", end)):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        after = None
+        while True:
+            keyset = ["(created_at, tracking_id) > (?, ?)"] if after else []
+            where = " AND ".join(clauses + keyset)
+            rows = self.conn.execute(
+                "SELECT tracking_id, form_id, user_id, status, data, created_at, updated_at, version "
+                f"FROM submissions {'WHERE ' + where if where else ''} "
+                "ORDER BY created_at, tracking_id LIMIT ?",
+                (*params, *(after or ()), batch_size)
+            ).fetchall()
+            for row in rows:
+                yield {**dict(row), "data": json.loads(row["data"])}
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1]["created_at"], rows[-1]["tracking_id"])
+
+    def get_user_submissions(self, user_id: str, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+        """Get a user's submissions, newest first"""
+        rows = self.conn.execute(
+            f"SELECT {SUBMISSION_COLUMNS} FROM submissions s WHERE s.user_id = ? "
+            "ORDER BY s.created_at DESC LIMIT ? OFFSET ?",
+            (user_id, -1 if limit is None else limit, offset)
+        ).fetchall()
+        return [self._submission_from_row(row) for row in rows]
+
+    def get_user_submission_stats(self, user_id: str) -> dict:
+        """Per-status and this-month counts in one GROUP BY over the user index"""
+        month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) AS count, SUM(created_at >= ?) AS this_month "
+            "FROM submissions WHERE user_id = ? GROUP BY status",
+            (month_start, user_id)
+        ).fetchall()
+        by_status = {row["status"]: row["count"] for row in rows}
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "this_month": sum(row["this_month"] for row in rows)
+        }
+
+    def delete_submission(self, tracking_id: str) -> bool:
+        """Delete submission and its history"""
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM submissions WHERE tracking_id = ?", (tracking_id,)).rowcount > 0
+
+    # ============ Analytics ============
+
+    def get_submission_counters(self, start_day: Optional[str] = None, end_day: Optional[str] = None,
+                                form_id: Optional[str] = None) -> List[dict]:
+        """Non-empty form/status/day buckets, optionally limited to a day range (inclusive)"""
+        clauses, params = ["count > 0"], []
+        if start_day:
+            clauses.append("day >= ?")
+            params.append(start_day)
+        if end_day:
+            clauses.append("day <= ?")
+            params.append(end_day)
+        if form_id:
+            clauses.append("form_id = ?")
+            params.append(form_id)
+        rows = self.conn.execute(
+            f"SELECT form_id, status, day, count FROM submission_counters WHERE {' AND '.join(clauses)} ORDER BY day",
+            params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def rebuild_submission_counters(self) -> int:
+        """Recompute every counter from the submissions table; returns the bucket count"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM submission_counters")
+            conn.execute(
+                "INSERT INTO submission_counters (form_id, status, day, count) "
+                "SELECT form_id, status, substr(created_at, 1, 10), COUNT(*) FROM submissions "
+                "GROUP BY form_id, status, substr(created_at, 1, 10)"
+            )
+            return conn.execute("SELECT COUNT(*) FROM submission_counters").fetchone()[0]
+
+    # ============ Users ============
+
+    def save_user(self, user: dict):
+        """Insert a user, or set its fields if it already exists"""
+        with self._transaction() as conn:
+            inserted = conn.execute(
+                "INSERT INTO users (user_id, doc) VALUES (?, json(?)) ON CONFLICT(user_id) DO NOTHING",
+                (user["user_id"], json.dumps(user, ensure_ascii=False))
+            ).rowcount
+            if not inserted:
+                self._set_user_fields(conn, user["user_id"], user)
+
+    @staticmethod
+    def _user_doc_sql(fields: Optional[List[str]], exclude: Optional[List[str]]):
+        """SQL expression for a projected user document, and its parameters"""
+        if fields is not None:
+            placeholders = ", ".join("?" for _ in fields)
+            return (
+                f"(SELECT json_group_object(key, value) FROM json_each(users.doc) WHERE key IN ({placeholders}))",
+                list(fields)
+            )
+        if exclude:
+            return f"json_remove(doc, {', '.join('?' for _ in exclude)})", [f'$."{key}"' for key in exclude]
+        return "doc", []
+
+    def get_user(self, user_id: str, fields: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None) -> Optional[dict]:
+        """Get user by ID, optionally keeping only fields or dropping exclude"""
+        doc_sql, params = self._user_doc_sql(fields, exclude)
+        row = self.conn.execute(f"SELECT {doc_sql} AS doc FROM users WHERE user_id = ?", (*params, user_id)).fetchone()
+        return json.loads(row["doc"]) if row else None
+
+    def get_user_by_email(self, email: str, fields: Optional[List[str]] = None,
+                          exclude: Optional[List[str]] = None) -> Optional[dict]:
+        """Get user by email, optionally keeping only fields or dropping exclude"""
+        doc_sql, params = self._user_doc_sql(fields, exclude)
+        row = self.conn.execute(
+            f"SELECT {doc_sql} AS doc FROM users WHERE email = ? LIMIT 1", (*params, email)
+        ).fetchone()
+        return json.loads(row["doc"]) if row else None
+
+    @staticmethod
+    def _set_user_fields(conn: sqlite3.Connection, user_id: str, updates: dict):
+        """Set top-level fields of the user document, like Mongo's $set"""
+        paths = ", ".join("?, json(?)" for _ in updates)
+        params = []
+        for key, value in updates.items():
+            params.extend([f'$."{key}"', json.dumps(value, ensure_ascii=False)])
+        return conn.execute(
+            f"UPDATE users SET doc = json_set(doc, {paths}) WHERE user_id = ? RETURNING doc",
+            (*params, user_id)
+        ).fetchone()
+
+    def update_user(self, user_id: str, updates: dict) -> Optional[dict]:
+        """Update user information"""
+        if not updates:
+            return self.get_user(user_id)
+        with self._transaction() as conn:
+            row = self._set_user_fields(conn, user_id, updates)
+        return json.loads(row["doc"]) if row else None
+
+    def get_all_users(self, fields: Optional[List[str]] = None, exclude: Optional[List[str]] = None) -> List[dict]:
+        """Get all users, optionally keeping only fields or dropping exclude"""
+        doc_sql, params = self._user_doc_sql(fields, exclude)
+        return [json.loads(row["doc"]) for row in self.conn.execute(f"SELECT {doc_sql} AS doc FROM users", params)]
+
+    def save_user_profile(self, user_id: str, profile_data: dict) -> Optional[dict]:
+        """Save user profile data"""
+        return self.update_user(user_id, {"profile": profile_data, "updated_at": datetime.now().isoformat()})
+
+    def save_user_settings(self, user_id: str, settings: dict) -> Optional[dict]:
+        """Save user settings"""
+        return self.update_user(user_id, {"settings": settings, "updated_at": datetime.now().isoformat()})
+
+    # ============ Password Reset Tokens ============
+
+    def save_reset_token(self, email: str, token: str, expires_at: str):
+        """Replace any existing reset token for the email"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM reset_tokens WHERE email = ?", (email,))
+            conn.execute(
+                "INSERT INTO reset_tokens (token, email, expires_at, created_at, used) VALUES (?, ?, ?, ?, 0)",
+                (token, email, expires_at, datetime.now().isoformat())
+            )
+
+    def get_reset_token(self, token: str) -> Optional[dict]:
+        """Get unused reset token"""
+        row = self.conn.execute(
+            "SELECT email, token, expires_at, created_at, used FROM reset_tokens WHERE token = ? AND used = 0",
+            (token,)
+        ).fetchone()
+        if not row:
+            return None
+        reset_data = dict(row)
+        reset_data["used"] = bool(reset_data["used"])
+        return reset_data
+
+    def mark_reset_token_used(self, token: str):
+        """Mark reset token as used"""
+        with self._transaction() as conn:
+            conn.execute("UPDATE reset_tokens SET used = 1 WHERE token = ?", (token,))
+
+    # ============ Documents ============
+
+    def save_user_document(self, user_id: str, document_type: str, document_data: dict) -> dict:
+        """Save user document metadata"""
+        document = {
+            "document_id": f"doc_{user_id}_{document_type}_{datetime.now().timestamp()}",
+            "user_id": user_id,
+            "document_type": document_type,
+            "document_data": document_data,
+            "uploaded_at": datetime.now().isoformat(),
+            "status": "uploaded"
+        }
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO documents (document_id, user_id, document_type, document_data, uploaded_at, status) "
+                "VALUES (?, ?, ?, json(?), ?, ?)",
+                (document["document_id"], user_id, document_type,
+                 json.dumps(document_data, ensure_ascii=False), document["uploaded_at"], document["status"])
+            )
+        return document
+
+    def get_user_documents(self, user_id: str) -> List[dict]:
+        """Get all documents for a user"""
+        rows = self.conn.execute(
+            "SELECT * FROM documents WHERE user_id = ? ORDER BY uploaded_at", (user_id,)
+        ).fetchall()
+        return [self._document_from_row(row) for row in rows]
+
+    def delete_user_document(self, document_id: str, user_id: str) -> bool:
+        """Delete a document owned by the user"""
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM documents WHERE document_id = ? AND user_id = ?", (document_id, user_id)
+            ).rowcount > 0
+
+    # ============ Help Tickets ============
+
+    def save_help_ticket(self, ticket: dict) -> dict:
+        """Save help ticket"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO tickets (ticket_id, user_id, subject, description, priority, status, created_at, updated_at) "
+                "VALUES (:ticket_id, :user_id, :subject, :description, :priority, :status, :created_at, :updated_at)",
+                ticket
+            )
+            self._index_search_document(conn, "ticket", ticket)
+        return ticket
+
+    def get_all_tickets(self) -> List[dict]:
+        """Get all help tickets, newest first"""
+        return [dict(row) for row in self.conn.execute("SELECT * FROM tickets ORDER BY created_at DESC")]
+
+    def update_ticket_status(self, ticket_id: str, status: str) -> bool:
+        """Update ticket status"""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tickets SET status = ?, updated_at = ? WHERE ticket_id = ?",
+                (status, datetime.now().isoformat(), ticket_id)
+            ).rowcount > 0
+
+    # ============ Feedbacks ============
+
+    def save_feedback(self, feedback: dict) -> dict:
+        """Save feedback"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO feedbacks (feedback_id, user_id, feedback_type, message, rating, status, created_at, updated_at) "
+                "VALUES (:feedback_id, :user_id, :feedback_type, :message, :rating, :status, :created_at, :updated_at)",
+                feedback
+            )
+        return feedback
+
+    def get_all_feedbacks(self) -> List[dict]:
+        """Get all feedbacks, newest first"""
+        return [dict(row) for row in self.conn.execute("SELECT * FROM feedbacks ORDER BY created_at DESC")]
+
+    def update_feedback_status(self, feedback_id: str, status: str) -> bool:
+        """Update feedback status"""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE feedbacks SET status = ?, updated_at = ? WHERE feedback_id = ?",
+                (status, datetime.now().isoformat(), feedback_id)
+            ).rowcount > 0
+
+    # ============ Chat Messages ============
+
+    def save_chat_message(self, message: dict) -> dict:
+        """Save chat message and fold it into the conversation summary"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO messages (message_id, user_id, sender, text, timestamp, created_at) "
+                "VALUES (:message_id, :user_id, :sender, :text, :timestamp, :created_at)",
+                message
+            )
+            self._index_search_document(conn, "chat", message)
+            conn.execute(
+                """INSERT INTO conversations (user_id, last_message_id, last_message, last_sender,
+                                              last_message_time, message_count, unread_admin, unread_user)
+                   VALUES (:user_id, :message_id, :text, :sender, :timestamp, 1, :to_admin, :to_user)
+                   ON CONFLICT (user_id) DO UPDATE SET
+                       message_count = message_count + 1,
+                       unread_admin = unread_admin + excluded.unread_admin,
+                       unread_user = unread_user + excluded.unread_user,
+                       last_message_id = CASE WHEN excluded.last_message_time >= COALESCE(last_message_time, '')
+                                              THEN excluded.last_message_id ELSE last_message_id END,
+                       last_message = CASE WHEN excluded.last_message_time >= COALESCE(last_message_time, '')
+                                           THEN excluded.last_message ELSE last_message END,
+                       last_sender = CASE WHEN excluded.last_message_time >= COALESCE(last_message_time, '')
+                                          THEN excluded.last_sender ELSE last_sender END,
+                       last_message_time = MAX(COALESCE(last_message_time, ''), excluded.last_message_time)""",
+                {**message, "to_admin": int(message["sender"] != "admin"), "to_user": int(message["sender"] == "admin")}
+            )
+        return message
+
+    def get_chat_messages(self, user_id: str = None, since: Optional[Tuple[str, str]] = None,
+                          before: Optional[Tuple[str, str]] = None, limit: Optional[int] = None) -> List[dict]:
+        """Get chat messages in (timestamp, message_id) order, optionally for one user.
+        since returns messages after a (timestamp, message_id) position; otherwise limit keeps the
+        newest page before before"""
+        clauses, params = [], []
+        if user_id:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if since:
+            clauses.append("(timestamp > ? OR (timestamp = ? AND message_id > ?))")
+            params.extend([since[0], since[0], since[1]])
+        if before:
+            clauses.append("(timestamp < ? OR (timestamp = ? AND message_id < ?))")
+            params.extend([before[0], before[0], before[1]])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        if since or limit is None:
+            query = f"SELECT * FROM messages {where} ORDER BY timestamp, message_id LIMIT ?"
+        else:
+            query = (f"SELECT * FROM (SELECT * FROM messages {where} ORDER BY timestamp DESC, message_id DESC LIMIT ?) "
+                     "ORDER BY timestamp, message_id")
+        rows = self.conn.execute(query, params + [-1 if limit is None else limit])
+        return [dict(row) for row in rows]
+
+    def get_chat_message(self, message_id: str) -> Optional[dict]:
+        """Get one chat message by ID"""
+        row = self.conn.execute("SELECT * FROM messages WHERE message_id = ?", (message_id,)).fetchone()
+        return dict(row) if row else None
+
+    def delete_chat_message(self, message_id: str) -> bool:
+        """Delete a chat message and back it out of the conversation summary"""
+        with self._transaction() as conn:
+            message = conn.execute(
+                "SELECT user_id, sender, timestamp FROM messages WHERE message_id = ?", (message_id,)
+            ).fetchone()
+            if message is None:
+                return False
+            conn.execute("DELETE FROM messages WHERE message_id = ?", (message_id,))
+
+            summary = conn.execute("SELECT * FROM conversations WHERE user_id = ?", (message["user_id"],)).fetchone()
+            if summary is None:
+                return True
+            if summary["message_count"] <= 1:
+                conn.execute("DELETE FROM conversations WHERE user_id = ?", (message["user_id"],))
+                return True
+
+            read_at = summary["user_read_at"] if message["sender"] == "admin" else summary["admin_read_at"]
+            unread = int(read_at is None or message["timestamp"] > read_at)
+            conn.execute(
+                "UPDATE conversations SET message_count = message_count - 1, "
+                "unread_admin = MAX(unread_admin - ?, 0), unread_user = MAX(unread_user - ?, 0) WHERE user_id = ?",
+                (unread * (message["sender"] != "admin"), unread * (message["sender"] == "admin"), message["user_id"])
+            )
+            if summary["last_message_id"] == message_id:
+                conn.execute(
+                    """UPDATE conversations SET (last_message_id, last_message, last_sender, last_message_time) =
+                           (SELECT message_id, text, sender, timestamp FROM messages WHERE user_id = :user_id
+                            ORDER BY timestamp DESC, message_id DESC LIMIT 1)
+                       WHERE user_id = :user_id""",
+                    {"user_id": message["user_id"]}
+                )
+        return True
+
+    def get_conversation_summaries(self) -> List[dict]:
+        """Conversation summaries joined with their users, most recent first"""
+        rows = self.conn.execute(
+            "SELECT c.*, json_extract(u.doc, '$.name') AS name, u.email AS email "
+            "FROM conversations c LEFT JOIN users u ON u.user_id = c.user_id "
+            "ORDER BY c.last_message_time DESC"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_conversation_read(self, user_id: str, reader: str) -> bool:
+        """Reset the reader's unread count ("admin" or "user")"""
+        column = "admin" if reader == "admin" else "user"
+        with self._transaction() as conn:
+            return conn.execute(
+                f"UPDATE conversations SET unread_{column} = 0, {column}_read_at = ? WHERE user_id = ?",
+                (datetime.now().isoformat(), user_id)
+            ).rowcount > 0
+
+    def rebuild_conversation_summaries(self) -> int:
+        """Recompute every conversation summary from the messages. Read times are kept, and unread
+        counts are the other side's messages newer than them (all of them if never read)."""
+        with self._transaction() as conn:
+            conn.execute(
+                """INSERT INTO conversations (user_id, last_message_id, last_message, last_sender,
+                                              last_message_time, message_count, unread_admin, unread_user)
+                   SELECT user_id, message_id, text, sender, timestamp, message_count, unread_admin, unread_user FROM (
+                       SELECT m.*,
+                              ROW_NUMBER() OVER (PARTITION BY m.user_id ORDER BY m.timestamp DESC, m.message_id DESC) AS position,
+                              COUNT(*) OVER (PARTITION BY m.user_id) AS message_count,
+                              SUM(CASE WHEN m.sender != 'admin' AND (c.admin_read_at IS NULL OR m.timestamp > c.admin_read_at)
+                                       THEN 1 ELSE 0 END) OVER (PARTITION BY m.user_id) AS unread_admin,
+                              SUM(CASE WHEN m.sender = 'admin' AND (c.user_read_at IS NULL OR m.timestamp > c.user_read_at)
+                                       THEN 1 ELSE 0 END) OVER (PARTITION BY m.user_id) AS unread_user
+                       FROM messages m LEFT JOIN conversations c ON c.user_id = m.user_id
+                   ) WHERE position = 1
+                   ON CONFLICT (user_id) DO UPDATE SET
+                       last_message_id = excluded.last_message_id, last_message = excluded.last_message,
+                       last_sender = excluded.last_sender, last_message_time = excluded.last_message_time,
+                       message_count = excluded.message_count,
+                       unread_admin = excluded.unread_admin, unread_user = excluded.unread_user"""
+            )
+            conn.execute("DELETE FROM conversations WHERE user_id NOT IN (SELECT user_id FROM messages)")
+            return conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    # ============ Bulk Loading ============
+
+    def bulk_insert(self, table: str, records: List[dict]) -> int:
+        """Insert new records in one transaction with executemany. Counters follow through their
+        triggers; conversation summaries and search documents need a rebuild afterwards."""
+        if table == "users":
+            records = [{"user_id": user["user_id"], "doc": user} for user in records]
+        with self._transaction() as conn:
+            self._insert_many(conn, table, records)
+            if table == "submissions":
+                self._insert_many(conn, "submission_history", [
+                    {"tracking_id": submission["tracking_id"], **entry}
+                    for submission in records for entry in submission.get("history", [])
+                ])
+        return len(records)
+
+    @staticmethod
+    def _insert_many(conn, table: str, records: List[dict]):
+        columns = BULK_COLUMNS[table]
+        placeholders = ", ".join("json(?)" if column in JSON_COLUMNS else "?" for column in columns)
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            [tuple(json.dumps(record.get(column), ensure_ascii=False) if column in JSON_COLUMNS else record.get(column)
+                   for column in columns)
+             for record in records]
+        )
+
+    # ============ Search ============
+
+    @staticmethod
+    def _index_search_document(conn, kind: str, record: dict):
+        document = search_document(kind, record)
+        conn.execute(
+            "INSERT INTO search_documents (kind, ref_id, body) VALUES (?, ?, ?) "
+            "ON CONFLICT (kind, ref_id) DO UPDATE SET body = excluded.body",
+            (kind, document["id"], index_body(document))
+        )
+
+    def search(self, terms: List[str], kinds: List[str], limit: int = 20) -> List[Tuple[float, dict]]:
+        """Top-limit (score, search document) pairs matching every term, the last as a prefix"""
+        if not terms or not kinds:
+            return []
+        # Terms are runs of letters, marks and digits, so quoting them is always safe
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        rows = self.conn.execute(
+            "SELECT d.kind, d.ref_id, -bm25(search_fts) AS score "
+            "FROM search_fts JOIN search_documents d ON d.doc_id = search_fts.rowid "
+            f"WHERE search_fts MATCH ? AND d.kind IN ({', '.join('?' * len(kinds))}) "
+            "ORDER BY bm25(search_fts) LIMIT ?",
+            (match, *kinds, limit)
+        ).fetchall()
+
+        records = {}
+        for kind, table, key in (("submission", "submissions", "tracking_id"),
+                                 ("ticket", "tickets", "ticket_id"),
+                                 ("chat", "messages", "message_id")):
+            ids = [row["ref_id"] for row in rows if row["kind"] == kind]
+            if not ids:
+                continue
+            for record in self.conn.execute(
+                f"SELECT * FROM {table} WHERE {key} IN ({', '.join('?' * len(ids))})", ids
+            ):
+                record = dict(record)
+                if kind == "submission":
+                    record["data"] = json.loads(record["data"])
+                records[(kind, record[key])] = search_document(kind, record)
+        return [(row["score"], records[(row["kind"], row["ref_id"])])
+                for row in rows if (row["kind"], row["ref_id"]) in records]
+
+    def rebuild_search_index(self) -> int:
+        """Re-tokenize every submission, ticket and chat message into the search index"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM search_documents")
+            for row in conn.execute("SELECT tracking_id, data FROM submissions").fetchall():
+                self._index_search_document(conn, "submission", {"tracking_id": row["tracking_id"],
+                                                                 "data": json.loads(row["data"])})
+            for row in conn.execute("SELECT * FROM tickets").fetchall():
+                self._index_search_document(conn, "ticket", dict(row))
+            for row in conn.execute("SELECT * FROM messages").fetchall():
+                self._index_search_document(conn, "chat", dict(row))
+            return conn.execute("SELECT COUNT(*) FROM search_documents").fetchone()[0]
+
+# Global instance
+sqlite_db = SQLiteDatabase()
@@ -0,0 +1,113 @@
+"""
+Submission PDF artifacts for Legal Voice App
+/submit commits the submission and queues its confirmation email, held for
+CONFIRMATION_HOLD_SECONDS, before answering; then it hands the rest to
+publish_submission_pdf(), run as a background task. That renders the PDF in the
+render pool (filling the PDF cache for the first download), then keeps it in the
+file store as a durable artifact with its SHA-256, separate from the evictable
+cache. Next it records the artifact on the submission as pdf_artifact and
+releases the held confirmation with the PDF attached. If the PDF cannot be
+rendered, the confirmation is released without it; if the process dies first,
+the hold runs out and the outbox sends it without the PDF anyway.
+"""
+
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import BinaryIO, Optional
+
+from database import DatabaseService
+from file_storage import file_storage, file_url
+from pdf_cache import pdf_cache, pdf_cache_key
+from pdf_renderer import PDF_RENDER_QUEUE_TIMEOUT_SECONDS, PDF_RENDER_TIMEOUT_SECONDS, RenderedPDF, render_pool
+from services.email_service import EmailService
+
+ARTIFACT_OWNER = "system"  # Owner of artifacts for submissions without a user
+# How long a queued confirmation waits for its PDF: a full render pool wait and render, with room to store it
+CONFIRMATION_HOLD_SECONDS = PDF_RENDER_QUEUE_TIMEOUT_SECONDS + PDF_RENDER_TIMEOUT_SECONDS + 60
+
+
+class _HashingReader:
+    """Binary reader that hashes everything read through it"""
+
+    def __init__(self, source: BinaryIO):
+        self.source = source
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.source.read(size)
+        self.sha256.update(chunk)
+        return chunk
+
+
+async def render_to_cache(submission: dict, pdf_key: str) -> Optional[RenderedPDF]:
+    """Render a submission's PDF in the render pool and store it in the PDF cache; None if it could not be rendered"""
+    pdf = await render_pool.render(submission["form_id"], submission["data"], submission["tracking_id"], key=pdf_key)
+    if pdf is None:
+        return None
+
+    def store():
+        with pdf.open() as source:
+            pdf_cache.put(pdf_key, source)
+
+    await asyncio.to_thread(store)
+    return pdf
+
+
+def store_pdf_artifact(submission: dict, pdf: RenderedPDF, pdf_key: str) -> dict:
+    """Save a rendered PDF in the file store and record it on the submission"""
+    tracking_id = submission["tracking_id"]
+    with pdf.open() as source:
+        reader = _HashingReader(source)
+        stored = file_storage.save(reader, f"{tracking_id}.pdf", "application/pdf",
+                                   submission.get("user_id") or ARTIFACT_OWNER)
+    artifact = {
+        "file_id": stored["file_id"],
+        "url": file_url(stored["file_id"]),
+        "sha256": reader.sha256.hexdigest(),
+        "length": stored["length"],
+        "storage_type": stored["storage_type"],
+        "pdf_key": pdf_key,
+        "created_at": datetime.now().isoformat()
+    }
+    DatabaseService.set_submission_pdf_artifact(tracking_id, artifact)
+    return artifact
+
+
+def delete_pdf_artifact(submission: dict) -> bool:
+    """Remove a deleted submission's stored PDF"""
+    artifact = submission.get("pdf_artifact")
+    if not artifact:
+        return False
+    return file_storage.delete(artifact["file_id"], submission.get("user_id") or ARTIFACT_OWNER)
+
+
+def queue_submission_confirmation(submission: dict, form_title: str, email: str, user_name: str = "User"):
+    """Queue a new submission's confirmation, held for its PDF; raises DatabaseUnavailableError if it cannot be queued"""
+    EmailService.send_submission_confirmation(email, submission["tracking_id"], form_title, user_name,
+                                              hold=CONFIRMATION_HOLD_SECONDS)
+
+
+async def publish_submission_pdf(submission: dict, email: Optional[str] = None) -> Optional[dict]:
+    """Render, store and record a new submission's PDF, then release its held confirmation with it attached.
+    Returns the artifact, or None when there is no PDF."""
+    tracking_id = submission["tracking_id"]
+    pdf, artifact = None, None
+    try:
+        pdf_key = pdf_cache_key(submission)
+        pdf = await render_to_cache(submission, pdf_key)
+        if pdf is None:
+            print(f"[PDF] Could not render {tracking_id}, confirming without the PDF")
+        else:
+            artifact = await asyncio.to_thread(store_pdf_artifact, submission, pdf, pdf_key)
+            print(f"[PDF] Stored {tracking_id} as {artifact['file_id']} ({artifact['length']} bytes)")
+    except Exception as e:
+        print(f"[PDF] Publishing {tracking_id} failed (non-critical): {e}")
+
+    if email:
+        try:
+            attachment = await asyncio.to_thread(pdf.read) if pdf is not None else None
+            await asyncio.to_thread(EmailService.attach_submission_pdf, email, tracking_id, attachment)
+        except Exception as e:
+            print(f"[PDF] Could not release the {tracking_id} confirmation, it goes out when its hold ends: {e}")
+    return artifact
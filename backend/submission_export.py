@@ -0,0 +1,115 @@
+"""
+Streaming submission export for Legal Voice App
+Turns DatabaseService.iter_submissions into NDJSON or CSV chunks, optionally
+gzip-compressed on the fly. One batch of rows is in memory at a time, so an
+export of millions of submissions uses the same memory as one of ten.
+"""
+
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+from database import DatabaseService
+from forms_registry import FORMS_DB, form_field_ids
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+BASE_COLUMNS = ["tracking_id", "form_id", "user_id", "status", "created_at", "updated_at", "version"]
+
+# Spreadsheet apps run cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def csv_data_fields(form_id: Optional[str] = None) -> List[str]:
+    """Form fields flattened into CSV columns: one form's schema, or every form's fields in registry order"""
+    if form_id:
+        return form_field_ids(form_id)
+    fields = []
+    for registered_form_id in FORMS_DB:
+        for field_id in form_field_ids(registered_form_id):
+            if field_id not in fields:
+                fields.append(field_id)
+    return fields
+
+
+def _csv_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    value = str(value)
+    if value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_chunks(rows: Iterable[dict], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """One JSON object per line, form data kept nested"""
+    for batch in _batched(rows, batch_size):
+        yield "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in batch)
+
+
+def csv_chunks(rows: Iterable[dict], form_id: Optional[str] = None,
+               batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Header plus one row per submission; schema fields get their own columns and
+    anything outside the schema lands in extra_data as JSON"""
+    data_fields = csv_data_fields(form_id)
+    known = set(data_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(BASE_COLUMNS + [f"data.{field}" for field in data_fields] + ["extra_data"])
+    for batch in _batched(rows, batch_size):
+        for row in batch:
+            data = row.get("data") or {}
+            extra = {key: value for key, value in data.items() if key not in known}
+            writer.writerow(
+                [_csv_cell(row.get(column)) for column in BASE_COLUMNS]
+                + [_csv_cell(data.get(field)) for field in data_fields]
+                + [_csv_cell(extra) if extra else ""]
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Compress text chunks into a single gzip stream as they are produced"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode("utf-8"))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_submissions(export_format: str, form_id: Optional[str] = None, status: Optional[str] = None,
+                       start: Optional[str] = None, end: Optional[str] = None,
+                       gzip: bool = False) -> Iterator:
+    """Chunks of an export in the given format; bytes when gzip is set, text otherwise"""
+    rows = DatabaseService.iter_submissions(form_id, status, start, end, batch_size=EXPORT_BATCH_SIZE)
+    if export_format == "csv":
+        chunks = csv_chunks(rows, form_id)
+    else:
+        chunks = ndjson_chunks(rows)
+    return gzip_chunks(chunks) if gzip else chunks
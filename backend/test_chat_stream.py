@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for chat stream tickets and cursors
+EventSource opens /chat/stream with a short-lived ticket instead of the session
+token; checks that each is refused where the other is expected, and that resuming
+from a chat cursor misses no message that shares a timestamp
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import jwt
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_TYPE", "mock")
+
+from chat_database import ChatDatabaseService
+from chat_events import catch_up, chat_cursor, format_sse, parse_chat_cursor
+from services import auth_service
+from services.auth_service import AuthService
+
+auth_service.JWT_SECRET = auth_service.JWT_SECRET or "test-jwt-secret"
+
+def test_ticket_round_trip():
+    """A ticket carries the conversation it was issued for"""
+    print("🔍 Testing stream tickets...")
+    claims = AuthService.verify_stream_ticket(AuthService.create_stream_ticket("u1", "u1"))
+    assert claims["user_id"] == "u1" and claims["scope"] == "u1"
+    assert claims["exp"] - time.time() <= auth_service.CHAT_STREAM_TICKET_SECONDS + 1
+    assert AuthService.verify_stream_ticket(AuthService.create_stream_ticket("admin1", None))["scope"] is None
+    print("✅ Tickets verify with their scope")
+
+def test_tickets_and_session_tokens_do_not_mix():
+    """Session tokens open no stream, tickets authenticate no other request, expired tickets nothing"""
+    print("🔍 Testing ticket isolation...")
+    session = AuthService.create_token("u1", "u1@example.com")
+    ticket = AuthService.create_stream_ticket("u1", "u1")
+    assert AuthService.verify_token(session) is not None
+    assert AuthService.verify_stream_ticket(session) is None
+    assert AuthService.verify_token(ticket) is None
+
+    expired = jwt.encode({"user_id": "u1", "scope": "u1", "aud": auth_service.CHAT_STREAM_AUDIENCE,
+                          "exp": int(time.time()) - 1}, auth_service.JWT_SECRET, algorithm=auth_service.JWT_ALGORITHM)
+    assert AuthService.verify_stream_ticket(expired) is None
+    assert AuthService.verify_stream_ticket(ticket[:-2] + "xx") is None
+    print("✅ Tickets and session tokens are not interchangeable")
+
+def test_chat_cursor():
+    """Cursors round-trip, and a bare timestamp from an older client repeats that timestamp rather than skip it"""
+    print("🔍 Testing chat cursors...")
+    message = {"message_id": "m1", "timestamp": "2024-01-01T00:00:00"}
+    cursor = chat_cursor(message)
+    assert parse_chat_cursor(cursor) == ("2024-01-01T00:00:00", "m1")
+    assert f"id: {cursor}\n" in format_sse("message", message)
+    assert parse_chat_cursor("2024-01-01T00:00:00") == ("2024-01-01T00:00:00", "")
+    print("✅ Cursors carry timestamp and message ID")
+
+def test_resume_with_equal_timestamps():
+    """Resuming after a message returns the rest of its timestamp, paging back reaches every message"""
+    print("🔍 Testing resume across equal timestamps...")
+    for message_id in ("c3", "c1", "c2"):
+        ChatDatabaseService.save_chat_message(message_id, "cursor-user", "user", message_id, "2024-01-01T00:00:00")
+    first = ChatDatabaseService.get_chat_messages("cursor-user")[0]
+    rest = ChatDatabaseService.get_chat_messages("cursor-user", since=chat_cursor(first))
+    assert [m["message_id"] for m in rest] == ["c2", "c3"]
+
+    newest = ChatDatabaseService.get_chat_messages("cursor-user", limit=2)
+    older = ChatDatabaseService.get_chat_messages("cursor-user", before=chat_cursor(newest[0]), limit=2)
+    assert [m["message_id"] for m in older + newest] == ["c1", "c2", "c3"]
+    print("✅ No message skipped at a shared timestamp")
+
+def test_catch_up_pages_off_the_event_loop():
+    """A reconnect far behind is read in bounded pages, in worker threads, without gaps"""
+    print("🔍 Testing stream catch-up...")
+    for i in range(7):
+        ChatDatabaseService.save_chat_message(f"k{i}", "catchup-user", "user", f"k{i}", f"2024-02-01T00:00:0{i // 2}")
+    calls = []
+
+    def fetch_page(since, limit):
+        calls.append((limit, threading.current_thread() is threading.main_thread()))
+        return ChatDatabaseService.get_chat_messages("catchup-user", since=since, limit=limit)
+
+    async def collect():
+        return [message["message_id"] async for message in catch_up(fetch_page, "2024-02-01T00:00:00", page_size=3)]
+
+    assert asyncio.run(collect()) == [f"k{i}" for i in range(7)]  # The legacy bare timestamp resends its own second
+    assert calls == [(3, False)] * 3
+    print("✅ Catch-up paged in worker threads")
+
+def main():
+    """Run all chat stream tests"""
+    print("🚀 Starting Chat Stream Tests")
+    print("=" * 50)
+
+    test_ticket_round_trip()
+    test_tickets_and_session_tokens_do_not_mix()
+    test_chat_cursor()
+    test_resume_with_equal_timestamps()
+    test_catch_up_pages_off_the_event_loop()
+
+    print("\n" + "=" * 50)
+    print("✅ All chat stream tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
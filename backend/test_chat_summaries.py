@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test script for MongoDB conversation summaries
+Runs the summary updates against mongomock, from concurrent threads too, with
+each operation made atomic as a server makes it; skipped when mongomock is not
+installed
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_TYPE", "mock")
+
+from chat_database import ChatDatabaseService, _mongo_add_to_summary, _mongo_rebuild_summaries, _mongo_remove_from_summary
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class Atomic:
+    """mongomock database whose every collection operation runs alone, like one on a server,
+    and then lets another thread run, so threads interleave between any two operations"""
+
+    def __init__(self, target, lock=None):
+        self._target = target
+        self._lock = lock or threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if isinstance(attr, mongomock.Collection):
+            return Atomic(attr, self._lock)
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                result = attr(*args, **kwargs)
+            time.sleep(0)
+            return result
+        return locked
+
+def save(database, message_id, user_id, sender, timestamp):
+    """What ChatDatabaseService.save_chat_message does on MongoDB"""
+    message = {"message_id": message_id, "user_id": user_id, "sender": sender, "text": f"text {message_id}",
+               "timestamp": timestamp, "created_at": timestamp}
+    database.messages.insert_one(dict(message))
+    _mongo_add_to_summary(database, message)
+
+def delete(database, message_id):
+    """What ChatDatabaseService.delete_chat_message does on MongoDB"""
+    message = database.messages.find_one_and_delete({"message_id": message_id})
+    if message is not None:
+        _mongo_remove_from_summary(database, message)
+
+def summary(database, user_id):
+    return database.conversations.find_one({"user_id": user_id}, {"_id": False})
+
+def test_summary_updates():
+    """Summaries track last message, counts and unread state through saves, reads and deletes"""
+    if mongomock is None:
+        print("⏭️  mongomock not installed, skipping")
+        return
+    print("🔍 Testing MongoDB conversation summaries...")
+    database = mongomock.MongoClient().legal_voice
+    for i, sender in enumerate(["user", "user", "admin"]):
+        save(database, f"m{i}", "u1", sender, f"2024-01-0{i + 1}")
+    save(database, "old", "u1", "user", "2023-12-31")  # Arrives late, is not the last message
+
+    result = summary(database, "u1")
+    assert (result["message_count"], result["unread_admin"], result["unread_user"]) == (4, 3, 1)
+    assert result["last_message_id"] == "m2" and result["last_message_time"] == "2024-01-03"
+
+    database.conversations.update_one({"user_id": "u1"}, {"$set": {"unread_admin": 0, "admin_read_at": "2024-01-02"}})
+    delete(database, "m2")
+    delete(database, "m1")  # Read already, so the unread count stays at 0
+    result = summary(database, "u1")
+    assert (result["message_count"], result["unread_admin"], result["unread_user"]) == (2, 0, 0)
+    assert result["last_message_id"] == "m0"
+
+    save(database, "$dollar", "u1", "user", "2024-02-01")  # Values are literals, never field paths
+    assert summary(database, "u1")["last_message"] == "text $dollar"
+    for message_id in ("m0", "old", "$dollar"):
+        delete(database, message_id)
+    assert summary(database, "u1") is None
+    print("✅ Conversation summaries maintained")
+
+def test_save_while_deleting_last_message():
+    """A message saved after a delete looked up the next latest message, but before it updated the
+    summary, still ends up as the last message"""
+    if mongomock is None:
+        return
+    print("🔍 Testing a save racing the delete of the last message...")
+    database = mongomock.MongoClient().legal_voice
+    save(database, "m1", "u1", "user", "2024-01-01")
+    save(database, "m3", "u1", "admin", "2024-01-03")
+
+    find_one = database.messages.find_one
+    def find_then_save(*args, **kwargs):
+        result = find_one(*args, **kwargs)
+        if kwargs.get("sort"):  # The lookup of the next latest message, not find_one_and_delete inside mongomock
+            database.messages.find_one = find_one
+            save(database, "m2", "u1", "user", "2024-01-02")  # Older than m3, so it does not move the summary
+        return result
+    database.messages.find_one = find_then_save
+    delete(database, "m3")
+
+    result = summary(database, "u1")
+    assert result["last_message_id"] == "m2" and result["message_count"] == 2
+    assert (result["unread_admin"], result["unread_user"]) == (2, 0)
+    print("✅ The newer message wins")
+
+def test_concurrent_saves_and_deletes():
+    """Saves, and deletes of the newest message, on separate threads leave the summary matching the messages"""
+    if mongomock is None:
+        return
+    print("🔍 Testing concurrent summary updates...")
+    database = Atomic(mongomock.MongoClient().legal_voice)
+    for i in range(20):
+        save(database, f"seed{i:02d}", "u1", "user", f"2024-01-01T00:00:{i:02d}")
+
+    def saver(n):
+        for i in range(25):
+            save(database, f"w{n}-{i:02d}", "u1", "admin" if i % 2 else "user", f"2024-01-02T00:{i:02d}:0{n}")
+
+    def deleter():
+        for i in range(25):
+            delete(database, f"seed{i:02d}")
+            save(database, f"x{i:02d}", "u1", "user", f"2024-01-02T00:{i:02d}:09")  # Newest when saved
+            delete(database, f"x{i:02d}")
+
+    threads = [threading.Thread(target=saver, args=(n,)) for n in range(4)] + [threading.Thread(target=deleter)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latest = database.messages.find_one({"user_id": "u1"}, sort=[("timestamp", -1), ("message_id", -1)])
+    result = summary(database, "u1")
+    assert result["message_count"] == database.messages.count_documents({"user_id": "u1"}) == 100
+    assert (result["unread_admin"], result["unread_user"]) == (52, 48)
+    assert result["last_message_id"] == latest["message_id"] == "w3-24"
+    print("✅ No summary updates lost across threads")
+
+def test_rebuild_keeps_read_state():
+    """A rebuild repairs counts but keeps read times, and counts unread only what came after them"""
+    if mongomock is None:
+        return
+    print("🔍 Testing MongoDB summary rebuild...")
+    database = mongomock.MongoClient().legal_voice
+    for i, sender in enumerate(["user", "admin", "user", "admin", "user"]):
+        save(database, f"m{i}", "u1", sender, f"2024-01-0{i + 1}")
+    save(database, "n0", "u2", "user", "2024-01-01")
+    database.conversations.update_one({"user_id": "u1"}, {"$set": {
+        "admin_read_at": "2024-01-03T12:00", "user_read_at": "2024-01-02T12:00", "unread_admin": 0, "unread_user": 0}})
+    database.conversations.update_one({"user_id": "u2"}, {"$set": {"message_count": 7}})  # Drift
+    database.conversations.insert_one({"user_id": "gone", "message_count": 1})
+
+    assert _mongo_rebuild_summaries(database) == 2
+    result = summary(database, "u1")
+    assert (result["message_count"], result["unread_admin"], result["unread_user"]) == (5, 1, 1)
+    assert (result["admin_read_at"], result["user_read_at"]) == ("2024-01-03T12:00", "2024-01-02T12:00")
+    assert result["last_message_id"] == "m4"
+    result = summary(database, "u2")
+    assert (result["message_count"], result["unread_admin"], result["admin_read_at"]) == (1, 1, None)
+    assert "user_id_1" in database.conversations.index_information()
+    assert sorted(database.list_collection_names()) == ["conversations", "messages"]
+    print("✅ Read state survives a rebuild")
+
+def test_mock_rebuild_keeps_read_state():
+    """The mock backend's rebuild keeps read times the same way"""
+    print("🔍 Testing mock summary rebuild...")
+    for i, sender in enumerate(["user", "admin", "user"]):
+        ChatDatabaseService.save_chat_message(f"rebuild-m{i}", "rebuild-u1", sender, f"text {i}", f"2024-01-0{i + 1}")
+    ChatDatabaseService.mark_conversation_read("rebuild-u1", "admin")
+    ChatDatabaseService.save_chat_message("rebuild-m3", "rebuild-u1", "user", "text 3", "9999-01-01")
+
+    ChatDatabaseService.rebuild_conversation_summaries()
+    result = next(c for c in ChatDatabaseService.get_conversation_summaries() if c["user_id"] == "rebuild-u1")
+    assert (result["message_count"], result["unread_admin"], result["unread_user"]) == (4, 1, 1)
+    assert result["admin_read_at"] is not None and result["user_read_at"] is None
+    print("✅ Mock read state survives a rebuild")
+
+def main():
+    """Run all conversation summary tests"""
+    print("🚀 Starting Conversation Summary Tests")
+    print("=" * 50)
+
+    test_summary_updates()
+    test_save_while_deleting_last_message()
+    test_concurrent_saves_and_deletes()
+    test_rebuild_keeps_read_state()
+    test_mock_rebuild_keeps_read_state()
+
+    print("\n" + "=" * 50)
+    print("✅ All conversation summary tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
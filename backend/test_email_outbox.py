@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Test script for the email outbox
+Queues emails in a throwaway SQLite outbox and delivers them to a local SMTP
+stand-in (aiosmtpd), in this process and through email_worker.py; the
+delivery tests are skipped when aiosmtpd is not installed
+"""
+
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_TYPE", "mock")
+
+from db_errors import DatabaseUnavailableError
+from email_outbox import OutboxWorker, SQLiteOutbox, email_id, email_outbox
+from services.email_service import EmailService
+from smtp_pool import SMTPPool
+
+email_outbox.store = SQLiteOutbox(os.path.join(tempfile.mkdtemp(), "email_outbox.db"))
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import AuthResult
+except ImportError:
+    Controller = None
+
+class Inbox:
+    """aiosmtpd handler: slow@ is deferred (451), bounce@ refused (550), the rest kept"""
+
+    def __init__(self):
+        self.messages = {}
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("slow@"):
+            return "451 Try again later"
+        if address.startswith("bounce@"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.setdefault(envelope.rcpt_tos[0], []).append(envelope.content)
+        return "250 Message accepted"
+
+def start_server() -> tuple:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    inbox = Inbox()
+    server = Controller(inbox, hostname="127.0.0.1", port=port, auth_require_tls=False,
+                        authenticator=lambda *args: AuthResult(success=True))
+    server.start()
+    return server, inbox
+
+def outbox_email(email: str, event: str) -> dict:
+    row = email_outbox.store.conn.execute("SELECT * FROM email_outbox WHERE id = ?", (email_id(event, email),)).fetchone()
+    return dict(row) if row else None
+
+def test_idempotent_enqueue():
+    """The same event is queued once per recipient"""
+    print("🔍 Testing idempotency keys...")
+    for _ in range(2):
+        EmailService.send_status_update("ravi@example.com", "OUTBOX1", "approved", "Approved", version=2)
+    EmailService.send_status_update("RAVI@example.com", "OUTBOX1", "approved", "Approved", version=2)
+    EmailService.send_status_update("ravi@example.com", "OUTBOX1", "rejected", "Rejected", version=3)
+    EmailService.send_status_update("sita@example.com", "OUTBOX1", "rejected", "Rejected", version=3)
+    rows = email_outbox.store.conn.execute(
+        "SELECT event, recipient, status FROM email_outbox WHERE event LIKE 'status_update:OUTBOX1:%'"
+    ).fetchall()
+    assert sorted((row["event"], row["recipient"]) for row in rows) == [
+        ("status_update:OUTBOX1:v2", "ravi@example.com"),
+        ("status_update:OUTBOX1:v3", "ravi@example.com"),
+        ("status_update:OUTBOX1:v3", "sita@example.com"),
+    ]
+    assert all(row["status"] == "pending" for row in rows)
+    print("✅ Duplicates skipped")
+
+def test_enqueue_failure_raises():
+    """An email the outbox cannot store fails its sender instead of vanishing"""
+    print("🔍 Testing an unavailable outbox...")
+
+    class BrokenStore:
+        def add(self, email):
+            raise sqlite3.OperationalError("database is locked")
+
+    store, email_outbox.store = email_outbox.store, BrokenStore()
+    try:
+        EmailService.send_status_update("ravi@example.com", "OUTBOX0", "approved", "Approved", version=2)
+    except DatabaseUnavailableError as e:
+        assert "email outbox" in str(e) and "database is locked" in str(e)
+    else:
+        raise AssertionError("enqueue failure was swallowed")
+    finally:
+        email_outbox.store = store
+    assert outbox_email("ravi@example.com", "status_update:OUTBOX0:v2") is None
+    print("✅ DatabaseUnavailableError raised")
+
+def test_held_confirmation():
+    """A held confirmation waits for its PDF, and goes out when released"""
+    print("🔍 Testing held confirmations...")
+    EmailService.send_submission_confirmation("held@example.com", "OUTBOX3", "Caveat Petition", "Held", hold=600)
+    held = outbox_email("held@example.com", "submission_confirmation:OUTBOX3")
+    assert held["status"] == "pending" and held["next_attempt_at"] > time.time() + 500
+    assert "held@example.com" not in [e["recipient"] for e in email_outbox.store.claim(50, time.time(), lease=0, max_attempts=8)]
+
+    assert EmailService.attach_submission_pdf("held@example.com", "OUTBOX3", b"%PDF-held")
+    released = outbox_email("held@example.com", "submission_confirmation:OUTBOX3")
+    assert released["next_attempt_at"] <= time.time() and "OUTBOX3.pdf" in released["attachments"]
+    assert not EmailService.attach_submission_pdf("nobody@example.com", "OUTBOX3", None)
+    print("✅ Held, then released with the PDF")
+
+def test_worker_delivers_retries_and_dead_letters():
+    """One batch: delivered, deferred for a retry, and dead-lettered"""
+    if Controller is None:
+        print("⏭️  aiosmtpd not installed, skipping")
+        return
+    print("🔍 Testing batch delivery...")
+    server, inbox = start_server()
+    pool = SMTPPool(host=server.hostname, port=server.port, username=None, password=None, security="none")
+    worker = OutboxWorker(email_outbox, lambda batch: EmailService.deliver_batch(batch, pool), batch_size=50)
+    EmailService.send_submission_confirmation("ravi@example.com", "OUTBOX2", "Caveat Petition", "Ravi", b"%PDF-outbox")
+    EmailService.send_password_reset_link("slow@example.com", "reset-token")
+    EmailService.send_feedback_response("bounce@example.com", "FB1", "general", "Thanks!", "Bounce")
+    try:
+        assert worker.run_once() == 7  # With the released confirmation
+        assert worker.run_once() == 0  # The deferred email is not due yet
+    finally:
+        pool.close()
+        server.stop()
+
+    assert len(inbox.messages["ravi@example.com"]) == 3 and len(inbox.messages["sita@example.com"]) == 1
+    assert b'filename="OUTBOX3.pdf"' in inbox.messages["held@example.com"][0]
+    assert b'filename="OUTBOX2.pdf"' in inbox.messages["ravi@example.com"][-1]
+    assert pool.stats()["connections_opened"] == 1
+
+    sent = outbox_email("ravi@example.com", "submission_confirmation:OUTBOX2")
+    assert sent["status"] == "sent" and sent["attempts"] == 1 and sent["attachments"] == "[]"
+    deferred = [row for row in email_outbox.store.conn.execute("SELECT * FROM email_outbox WHERE recipient = 'slow@example.com'")]
+    assert len(deferred) == 1 and deferred[0]["status"] == "pending" and deferred[0]["attempts"] == 1
+    assert deferred[0]["next_attempt_at"] > time.time() and "451" in deferred[0]["last_error"]
+
+    dead = email_outbox.dead_letters()
+    assert [email["recipient"] for email in dead] == ["bounce@example.com"] and "550" in dead[0]["last_error"]
+    assert email_outbox.stats()["dead"] == 1 and email_outbox.stats()["sent"] == 5
+    assert email_outbox.requeue(dead[0]["id"]) and not email_outbox.requeue(dead[0]["id"])
+    print("✅ 5 sent over one connection, 1 deferred, 1 dead-lettered and requeued")
+
+def leased(claimed: list, recipient: str) -> dict:
+    (email,) = [e for e in claimed if e["recipient"] == recipient]
+    return email
+
+def test_attempts_and_leases():
+    """Every claim is an attempt; a stale claim records nothing; the last allowed attempt dead-letters"""
+    print("🔍 Testing leases and attempt limits...")
+    EmailService.send_login_notification("lease@example.com", "Lease", "today", "127.0.0.1")
+    store, event = email_outbox.store, "login:today:127.0.0.1"
+    first = leased(store.claim(50, time.time(), lease=0, max_attempts=2), "lease@example.com")
+    assert first["status"] == "sending" and first["attempts"] == 1
+    second = leased(store.claim(50, time.time() + 1, lease=0, max_attempts=2), "lease@example.com")  # The first worker hung
+    assert second["attempts"] == 2 and second["claim_id"] != first["claim_id"]
+    assert not store.mark_sent(first["id"], first["claim_id"])  # The first worker wakes up too late
+    assert not store.mark_failed(first["id"], first["claim_id"], "late", time.time())
+    assert outbox_email("lease@example.com", event)["status"] == "sending"
+
+    # A poison email whose every lease runs out is dead-lettered, not claimed forever
+    assert "lease@example.com" not in [e["recipient"] for e in store.claim(50, time.time() + 2, lease=0, max_attempts=2)]
+    assert store.expire_leases(time.time() + 2, max_attempts=2) >= 1
+    row = outbox_email("lease@example.com", event)
+    assert row["status"] == "dead" and row["attempts"] == 2 and "Lease expired" in row["last_error"]
+
+    assert email_outbox.requeue(first["id"])
+    worker = OutboxWorker(email_outbox, lambda batch: [ConnectionRefusedError("down")] * len(batch), max_attempts=2)
+    worker.run_once()
+    assert outbox_email("lease@example.com", event)["status"] == "pending"
+    store.conn.execute("UPDATE email_outbox SET next_attempt_at = 0 WHERE id = ?", (first["id"],))
+    worker.run_once()
+    row = outbox_email("lease@example.com", event)
+    assert row["status"] == "dead" and row["attempts"] == 2 and row["last_error"] == "down"
+    assert not store.mark_sent(first["id"], first["claim_id"])
+    print("✅ Claims count as attempts, stale claims ignored, poison emails dead-lettered")
+
+def test_worker_process():
+    """email_worker.py delivers what the app queued, from its own process"""
+    if Controller is None:
+        return
+    print("🔍 Testing the worker process...")
+    EmailService.send_help_ticket_response("worker@example.com", "T1", "Help", "Fixed", "Asha")
+    server, inbox = start_server()
+    env = dict(os.environ, EMAIL_OUTBOX_PATH=email_outbox.store.path, SMTP_HOST=server.hostname, SMTP_PORT=str(server.port), SMTP_SECURITY="none",
+               SMTP_USERNAME="worker", SMTP_PASSWORD="secret", EMAIL_SERVICE="smtp", EMAIL_POLL_SECONDS="0.1")
+    worker = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "email_worker.py")],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 20
+        while "worker@example.com" not in inbox.messages and time.time() < deadline:
+            time.sleep(0.1)
+    finally:
+        worker.terminate()
+        worker.wait(10)
+        server.stop()
+    assert "worker@example.com" in inbox.messages
+    assert worker.returncode == 0
+    print("✅ Delivered by email_worker.py")
+
+def main():
+    """Run all email outbox tests"""
+    print("🚀 Starting Email Outbox Tests")
+    print("=" * 50)
+
+    test_idempotent_enqueue()
+    test_enqueue_failure_raises()
+    test_held_confirmation()
+    test_worker_delivers_retries_and_dead_letters()
+    test_attempts_and_leases()
+    test_worker_process()
+
+    print("\n" + "=" * 50)
+    print("✅ All email outbox tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the local content-addressed file store
+Runs against a throwaway directory, no external services needed
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_TYPE", "mock")
+os.environ.setdefault("FILE_STORAGE_PATH", tempfile.mkdtemp())
+
+import file_storage
+from file_storage import LocalFileStorage, parse_range, signed_file_url, stored_file_url, verify_file_signature, FILE_CHUNK_SIZE
+
+file_storage.FILE_URL_SECRET = file_storage.FILE_URL_SECRET or "test-file-url-secret"
+
+def make_store():
+    return LocalFileStorage(tempfile.mkdtemp())
+
+def test_save_and_read_back():
+    """Files larger than one chunk should round-trip byte for byte"""
+    print("🔍 Testing save and read...")
+    store = make_store()
+    data = os.urandom(FILE_CHUNK_SIZE * 2 + 123)
+    meta = store.save(io.BytesIO(data), "scan.pdf", "application/pdf", "u1")
+    assert meta["length"] == len(data)
+    assert meta["storage_type"] == "local"
+
+    stored = store.open(meta["file_id"])
+    assert stored.content_type == "application/pdf"
+    assert stored.owner_ids == ["u1"]
+    assert b"".join(stored.iter_range()) == data
+
+    stored = store.open(meta["file_id"])
+    assert b"".join(stored.iter_range(FILE_CHUNK_SIZE - 5, FILE_CHUNK_SIZE + 5)) == data[FILE_CHUNK_SIZE - 5:FILE_CHUNK_SIZE + 6]
+    print("✅ Chunked save and ranged reads work")
+
+def test_deduplicates_and_reference_counts():
+    """Identical uploads share one blob, which lives until its last owner deletes it"""
+    print("🔍 Testing deduplication...")
+    store = make_store()
+    first = store.save(io.BytesIO(b"same bytes"), "a.txt", "text/plain", "u1")
+    second = store.save(io.BytesIO(b"same bytes"), "b.txt", "text/plain", "u2")
+    assert first["file_id"] == second["file_id"]
+
+    assert not store.delete(first["file_id"], "u3")
+    assert store.delete(first["file_id"], "u1")
+    assert store.open(first["file_id"]).owner_ids == ["u2"]
+    assert store.delete(first["file_id"], "u2")
+    assert store.open(first["file_id"]) is None
+    print("✅ Shared blobs are removed with their last owner")
+
+def test_rejects_path_like_ids():
+    """Only SHA-256 ids should ever reach the filesystem"""
+    print("🔍 Testing id validation...")
+    store = make_store()
+    assert store.open("../../etc/passwd") is None
+    assert not store.delete("../x", "u1")
+    print("✅ Invalid ids are rejected")
+
+def test_parse_range():
+    """Single byte ranges should follow RFC 7233"""
+    print("🔍 Testing range parsing...")
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("bytes=abc", 100) is None
+    for unsatisfiable in ("bytes=100-", "bytes=9-3"):
+        try:
+            parse_range(unsatisfiable, 100)
+            assert False, f"{unsatisfiable} should be rejected"
+        except ValueError:
+            pass
+    print("✅ Range headers parsed correctly")
+
+def test_signed_links():
+    """Signed links open one file until they expire, and are not forgeable"""
+    print("🔍 Testing signed file links...")
+    file_id = "ab" * 32
+    url = signed_file_url(file_id, ttl=60)
+    path, _, query = url.partition("?")
+    params = dict(part.split("=") for part in query.split("&"))
+    expires, signature = int(params["expires"]), params["signature"]
+    assert path == f"/files/{file_id}" and stored_file_url(url) == path
+    assert time.time() + 60 <= expires <= time.time() + 60 + file_storage.FILE_URL_EXPIRY_STEP
+    assert verify_file_signature(file_id, expires, signature)
+    assert not verify_file_signature("cd" * 32, expires, signature)  # Another file
+    assert not verify_file_signature(file_id, expires + 600, signature)  # A later expiry
+    assert not verify_file_signature(file_id, expires, "0" * 64)
+
+    expired = signed_file_url(file_id, ttl=-2 * file_storage.FILE_URL_EXPIRY_STEP)
+    params = dict(part.split("=") for part in expired.partition("?")[2].split("&"))
+    assert not verify_file_signature(file_id, int(params["expires"]), params["signature"])
+    assert stored_file_url("https://res.cloudinary.com/x.jpg?v=1") == "https://res.cloudinary.com/x.jpg?v=1"
+    print("✅ Links are scoped to one file and expire")
+
+def main():
+    """Run all file storage tests"""
+    print("🚀 Starting File Storage Tests")
+    print("=" * 50)
+
+    test_save_and_read_back()
+    test_deduplicates_and_reference_counts()
+    test_rejects_path_like_ids()
+    test_parse_range()
+    test_signed_links()
+
+    print("\n" + "=" * 50)
+    print("✅ All file storage tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
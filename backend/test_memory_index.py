@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-memory secondary indexes
+Checks that mock lookups stay consistent with the records across writes
+"""
+
+import os
+import sys
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("DB_TYPE", "mock")
+
+from database import DatabaseService
+from memory_index import IndexedTable, UniqueIndex, MultiIndex, SortedIndex, CountIndex
+
+def test_unique_index_follows_updates():
+    """Email index should move with the record when the email changes"""
+    print("🔍 Testing unique index...")
+    users = IndexedTable(by_email=UniqueIndex(lambda u: u.get("email")))
+    users.put("u1", {"user_id": "u1", "email": "old@example.com"})
+    users.update("u1", {"email": "new@example.com"})
+
+    assert users.lookup_one("by_email", "old@example.com") is None
+    assert users.lookup_one("by_email", "new@example.com")["user_id"] == "u1"
+
+    users.delete("u1")
+    assert users.lookup_one("by_email", "new@example.com") is None
+    print("✅ Unique index stays in sync")
+
+def test_multi_index_filters():
+    """Form/status index should match a linear scan"""
+    print("🔍 Testing multi index...")
+    submissions = IndexedTable(
+        by_form_status=MultiIndex(lambda s: (s.get("form_id"), s.get("status")))
+    )
+    for i in range(100):
+        submissions.put(f"T{i}", {"form_id": f"form_{i % 3}", "status": "submitted"})
+    for i in range(0, 100, 10):
+        submissions.update(f"T{i}", {"status": "approved"})
+
+    for form_id in ("form_0", "form_1", "form_2"):
+        for status in ("submitted", "approved"):
+            expected = [s for s in submissions.values() if s["form_id"] == form_id and s["status"] == status]
+            assert submissions.lookup("by_form_status", (form_id, status)) == expected
+    print("✅ Multi index matches linear scan")
+
+def test_sorted_index_order():
+    """Messages should come back in timestamp order regardless of insert order"""
+    print("🔍 Testing sorted index...")
+    messages = IndexedTable(
+        by_user=SortedIndex(lambda m: m.get("user_id"), lambda m: m.get("timestamp", ""))
+    )
+    messages.put("m3", {"user_id": "u1", "timestamp": "2024-01-03T00:00:00"})
+    messages.put("m1", {"user_id": "u1", "timestamp": "2024-01-01T00:00:00"})
+    messages.put("m2", {"user_id": "u1", "timestamp": "2024-01-02T00:00:00"})
+    messages.put("x1", {"user_id": "u2", "timestamp": "2024-01-01T00:00:00"})
+
+    assert [m["timestamp"][:10] for m in messages.lookup("by_user", "u1")] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+    messages.delete("m2")
+    assert len(messages.lookup("by_user", "u1")) == 2
+    assert len(messages.lookup("by_user", "u2")) == 1
+    print("✅ Sorted index keeps timestamp order")
+
+def test_sorted_index_range():
+    """Range lookups return only messages strictly between the bounds"""
+    print("🔍 Testing sorted index range...")
+    messages = IndexedTable(
+        by_user=SortedIndex(lambda m: m.get("user_id"), lambda m: m.get("timestamp", ""))
+    )
+    for day in range(1, 6):
+        messages.put(f"m{day}", {"user_id": "u1", "timestamp": f"2024-01-0{day}T00:00:00"})
+
+    after = messages.lookup_range("by_user", "u1", after="2024-01-02T00:00:00")
+    assert [m["timestamp"][:10] for m in after] == ["2024-01-03", "2024-01-04", "2024-01-05"]
+
+    between = messages.lookup_range("by_user", "u1", after="2024-01-01T00:00:00", before="2024-01-04T00:00:00")
+    assert [m["timestamp"][:10] for m in between] == ["2024-01-02", "2024-01-03"]
+    assert messages.lookup_range("by_user", "u2", after="2024-01-01T00:00:00") == []
+
+    # Ties on the sort value are split by primary key
+    for pk in ("t1", "t2", "t3"):
+        messages.put(pk, {"user_id": "u1", "timestamp": "2024-01-03T00:00:00"})
+    after_t1 = messages.lookup_range("by_user", "u1", after="2024-01-03T00:00:00", before="2024-01-04T00:00:00",
+                                     after_pk="t1")
+    assert [m["timestamp"] for m in after_t1] == ["2024-01-03T00:00:00"] * 2
+    before_t2 = messages.lookup_range("by_user", "u1", after="2024-01-02T00:00:00", before="2024-01-03T00:00:00",
+                                      before_pk="t2")
+    assert len(before_t2) == 2  # m3 and t1
+    print("✅ Sorted index range excludes its bounds")
+
+def test_count_index_follows_status_changes():
+    """Per-user status counts should move with updates and deletes"""
+    print("🔍 Testing count index...")
+    submissions = IndexedTable(
+        by_user_status=CountIndex(lambda s: s.get("user_id"), lambda s: s.get("status"))
+    )
+    for i in range(5):
+        submissions.put(f"T{i}", {"user_id": "u1", "status": "submitted"})
+    submissions.put("X1", {"user_id": "u2", "status": "submitted"})
+    submissions.update("T0", {"status": "approved"})
+    submissions.update("T1", {"status": "approved"})
+    submissions.delete("T2")
+
+    assert submissions.counts("by_user_status", "u1") == {"submitted": 2, "approved": 2}
+    assert submissions.counts("by_user_status", "u2") == {"submitted": 1}
+    assert submissions.counts("by_user_status", "nobody") == {}
+    print("✅ Count index stays in sync")
+
+def test_reads_cannot_change_records():
+    """Returned records are copies, so editing one leaves the table and its indexes alone"""
+    print("🔍 Testing record isolation...")
+    submissions = IndexedTable(by_status=MultiIndex(lambda s: s.get("status")))
+    record = {"status": "submitted"}
+    submissions.put("T1", record)
+    record["status"] = "approved"
+    for read in (submissions.get("T1"), submissions.lookup("by_status", "submitted")[0], submissions.values()[0],
+                 submissions.update("T1", {"version": 2})):
+        read["status"] = "rejected"
+    assert submissions.get("T1") == {"status": "submitted", "version": 2}
+    assert submissions.lookup("by_status", "rejected") == []
+
+    DatabaseService.save_reset_token("reset@example.com", "tok-isolation", "2099-01-01T00:00:00")
+    DatabaseService.get_reset_token("tok-isolation")["used"] = True
+    assert DatabaseService.get_reset_token("tok-isolation") is not None
+    DatabaseService.mark_reset_token_used("tok-isolation")
+    assert DatabaseService.get_reset_token("tok-isolation") is None
+    print("✅ Writes only go through the table")
+
+def main():
+    """Run all index tests"""
+    print("🚀 Starting Memory Index Tests")
+    print("=" * 50)
+
+    test_unique_index_follows_updates()
+    test_multi_index_filters()
+    test_sorted_index_order()
+    test_sorted_index_range()
+    test_count_index_follows_status_changes()
+    test_reads_cannot_change_records()
+
+    print("\n" + "=" * 50)
+    print("✅ All memory index tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the PDF artifact cache
+Runs the local LRU store against a throwaway directory
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_cache import PDF_TEMPLATE_VERSION, LocalPDFCache, pdf_cache_key
+
+def submission(tracking_id="TRK1", status="submitted", **data):
+    return {"tracking_id": tracking_id, "form_id": "name_change", "status": status, "data": data or {"new_name": "राम"}}
+
+def read(stored) -> bytes:
+    return b"".join(stored.iter_range())
+
+def test_keys_follow_content():
+    """Data and status changes produce a new key; key order in the data does not"""
+    print("🔍 Testing cache keys...")
+    key = pdf_cache_key(submission())
+    assert key.startswith("TRK1.") and key.endswith(f".v{PDF_TEMPLATE_VERSION}")
+    assert pdf_cache_key(submission(status="approved")) != key
+    assert pdf_cache_key(submission(new_name="श्याम")) != key
+    assert pdf_cache_key(submission(a=1, b=2)) == pdf_cache_key(submission(b=2, a=1))
+    assert pdf_cache_key(submission("../TRK/2")).startswith("___TRK_2.")
+    print("✅ Keys track what the PDF shows")
+
+def test_hits_versions_and_invalidation():
+    """A new version replaces the old one and invalidation drops every version"""
+    print("🔍 Testing hits and invalidation...")
+    cache = LocalPDFCache(tempfile.mkdtemp(), max_bytes=1024)
+    old_key, new_key = pdf_cache_key(submission()), pdf_cache_key(submission(status="approved"))
+    assert cache.get(old_key) is None
+
+    cache.put(old_key, b"%PDF-old")
+    stored = cache.get(old_key)
+    assert stored.filename == "TRK1.pdf" and stored.length == 8 and read(stored) == b"%PDF-old"
+
+    cache.put(new_key, io.BytesIO(b"%PDF-new"))
+    assert cache.get(old_key) is None and read(cache.get(new_key)) == b"%PDF-new"
+    cache.put(pdf_cache_key(submission("TRK10")), b"%PDF-other")
+
+    cache.invalidate("TRK1")
+    assert cache.get(new_key) is None
+    assert cache.stats()["entries"] == 1
+    print("✅ Versions replaced and invalidated")
+
+def test_lru_eviction_and_restart():
+    """The least recently used PDFs go first, and a new instance adopts what is on disk"""
+    print("🔍 Testing LRU eviction...")
+    root = tempfile.mkdtemp()
+    cache = LocalPDFCache(root, max_bytes=300)
+    keys = [pdf_cache_key(submission(f"TRK{i}")) for i in range(3)]
+    for key in keys:
+        cache.put(key, b"x" * 100)
+    read(cache.get(keys[0]))
+    cache.put(pdf_cache_key(submission("TRK3")), b"x" * 100)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 300
+    assert not [name for name in os.listdir(root) if name.startswith(".render-")]
+
+    restarted = LocalPDFCache(root, max_bytes=300)
+    assert restarted.stats()["entries"] == 3
+    cache.get(keys[0]).reader.close()
+    print("✅ Evicted least recently used")
+
+def test_invalidation_across_workers():
+    """Invalidation touches only versions this worker has seen, without listing the directory;
+    a version another worker removed is a plain miss"""
+    print("🔍 Testing invalidation across workers...")
+    root = tempfile.mkdtemp()
+    first, second = LocalPDFCache(root, max_bytes=1024), LocalPDFCache(root, max_bytes=1024)
+    key = pdf_cache_key(submission())
+    first.put(key, b"%PDF-shared")
+
+    listdir = os.listdir
+    os.listdir = lambda path: (_ for _ in ()).throw(AssertionError("invalidate listed the directory"))
+    try:
+        second.invalidate("TRK1")  # Never seen here: the file stays, and still matches its key
+        assert read(second.get(key)) == b"%PDF-shared"
+        second.invalidate("TRK1")
+    finally:
+        os.listdir = listdir
+    assert first.get(key) is None
+    assert first.stats()["entries"] == 0 and first.stats()["bytes"] == 0
+    print("✅ Invalidation stays in memory")
+
+def main():
+    """Run all PDF cache tests"""
+    print("🚀 Starting PDF Cache Tests")
+    print("=" * 50)
+
+    test_keys_follow_content()
+    test_hits_versions_and_invalidation()
+    test_invalidation_across_workers()
+    test_lru_eviction_and_restart()
+
+    print("\n" + "=" * 50)
+    print("✅ All PDF cache tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the bulk PDF export
+Builds archives from the mock database with a throwaway cache and a stand-in render job
+"""
+
+import asyncio
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_TYPE", "mock")
+os.environ.setdefault("PDF_CACHE_PATH", tempfile.mkdtemp())
+
+from database import DatabaseService
+from pdf_cache import LocalPDFCache, pdf_cache_key
+from pdf_export import export_pdf_zip
+from pdf_renderer import RenderedPDF, RenderPool
+
+def fake_job(form_id, form_data, tracking_id):
+    """Renders a marker PDF, or fails the way PDFService does"""
+    started = time.time()
+    pdf = None if form_data.get("broken") else RenderedPDF(f"%PDF-{tracking_id}".encode())
+    return pdf, started, time.time()
+
+def collect(archive) -> bytes:
+    async def run():
+        return b"".join([chunk async for chunk in archive])
+    return asyncio.run(run())
+
+def read(stored) -> bytes:
+    return b"".join(stored.iter_range())
+
+def test_archive_contents():
+    """Cached PDFs are copied, missing ones rendered and cached, failures listed in the manifest"""
+    print("🔍 Testing PDF archive export...")
+    for tracking_id, data in [("EXPCACHED", {"n": 1}), ("EXPRENDER", {"n": 2}), ("EXPBROKEN", {"broken": True})]:
+        DatabaseService.save_submission(tracking_id, "caveat", data)
+    DatabaseService.save_submission("EXPOTHER", "probate", {})
+    submissions = {s["tracking_id"]: s for s in DatabaseService.get_all_submissions("caveat")}
+
+    cache = LocalPDFCache(tempfile.mkdtemp(), max_bytes=1024 * 1024)
+    cache.put(pdf_cache_key(submissions["EXPCACHED"]), b"%PDF-from-cache")
+    pool = RenderPool(workers=1, job=fake_job)
+    try:
+        data = collect(export_pdf_zip("caveat", pool=pool, cache=cache, concurrency=2))
+    finally:
+        pool.shutdown()
+
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    assert archive.testzip() is None
+    assert archive.read("caveat/EXPCACHED.pdf") == b"%PDF-from-cache"
+    assert archive.read("caveat/EXPRENDER.pdf") == b"%PDF-EXPRENDER"
+    assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+    manifest = {row["tracking_id"]: row for row in csv.DictReader(io.StringIO(archive.read("manifest.csv").decode()))}
+    assert manifest["EXPCACHED"]["source"] == "cache" and manifest["EXPRENDER"]["source"] == "rendered"
+    assert manifest["EXPBROKEN"]["source"] == "failed" and manifest["EXPBROKEN"]["file"] == ""
+    assert "EXPOTHER" not in manifest and "caveat/EXPBROKEN.pdf" not in archive.namelist()
+    assert read(cache.get(pdf_cache_key(submissions["EXPRENDER"]))) == b"%PDF-EXPRENDER"
+    print(f"✅ Archive of {len(archive.namelist())} files, {len(data)} bytes")
+
+def main():
+    """Run all PDF export tests"""
+    print("🚀 Starting PDF Export Tests")
+    print("=" * 50)
+
+    test_archive_contents()
+
+    print("\n" + "=" * 50)
+    print("✅ All PDF export tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for the PDF render pool
+Renders in real worker processes; the slow and crashing jobs below
+exercise backpressure, timeouts and pool recovery
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_renderer import RenderPool, RenderPoolBusy, RenderTimeout
+
+def slow_job(form_id, form_data, tracking_id):
+    """Stands in for a huge document"""
+    time.sleep(form_data["seconds"])
+    return b"%PDF-slow", 0.0, 0.0
+
+def crashing_job(form_id, form_data, tracking_id):
+    """Kills its worker on request, like a segfault or the OOM killer would"""
+    if form_data.get("crash"):
+        os._exit(1)
+    started = time.time()
+    return b"%PDF-ok", started, time.time()
+
+def test_renders_off_the_event_loop():
+    """PDFs come back from workers while the loop keeps serving, and duplicate renders share a job"""
+    print("🔍 Testing pooled rendering...")
+    pool = RenderPool(workers=2)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        data = {"new_name": "राम", "reason": "Marriage"}
+        pdfs = await asyncio.gather(
+            pool.render("name_change", data, "TRK1", key="TRK1.a.v1"),
+            pool.render("name_change", data, "TRK1", key="TRK1.a.v1"),
+            pool.render("name_change", data, "TRK2"),
+        )
+        ticking.cancel()
+        return pdfs, ticks
+
+    try:
+        pdfs, ticks = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert all(pdf.read().startswith(b"%PDF") and not pdf.spilled for pdf in pdfs)
+    stats = pool.stats()
+    assert stats["submitted"] == 2 and stats["shared"] == 1 and stats["completed"] == 2
+    assert stats["pending"] == 0 and stats["avg_render_ms"] > 0
+    assert ticks > 0
+    print(f"✅ Rendered in workers ({stats['avg_render_ms']} ms each, loop ticked {ticks} times)")
+
+def test_large_pdfs_spill_to_disk():
+    """PDFs over the spool limit come back as files that go away with their last reference"""
+    print("🔍 Testing spill to disk...")
+    pool = RenderPool(workers=1, spool_max_bytes=512)
+
+    async def run():
+        small = await pool.render("affidavit_general", {}, "TRKSMALL")
+        large = await pool.render("name_change", {"reason": "Marriage " * 2000}, "TRKLARGE")
+        return small, large
+
+    try:
+        small, large = asyncio.run(run())
+        spool_dir = pool._spool_dir
+        assert large.spilled and os.path.dirname(large.path) == spool_dir
+        assert large.length == os.path.getsize(large.path) and large.read().startswith(b"%PDF")
+        assert b"".join(large.iter_chunks(1024)) == large.read()
+        path = large.path
+        del large
+        gc.collect()
+        assert not os.path.exists(path)
+        assert pool.stats()["spilled"] >= 1
+    finally:
+        pool.shutdown()
+    assert not os.path.exists(spool_dir)
+    print("✅ Large PDFs spilled and cleaned up")
+
+def test_backpressure_and_timeouts():
+    """An overrunning job times out but keeps its slot, so the next caller is turned away"""
+    print("🔍 Testing backpressure...")
+    pool = RenderPool(workers=1, max_pending=1, timeout=0.3, queue_timeout=0.1, job=slow_job)
+
+    async def run():
+        await pool.render("name_change", {"seconds": 0.1}, "WARM", timeout=30)  # Spawn the worker
+        try:
+            await pool.render("name_change", {"seconds": 1}, "SLOW")
+            assert False, "slow render did not time out"
+        except RenderTimeout:
+            pass
+        try:
+            await pool.render("name_change", {"seconds": 0}, "NEXT")
+            assert False, "render accepted with every slot taken"
+        except RenderPoolBusy:
+            pass
+        while pool.pending:
+            await asyncio.sleep(0.05)
+        return await pool.render("name_change", {"seconds": 0}, "LATER", timeout=5)
+
+    try:
+        pdf = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert pdf == b"%PDF-slow"
+    assert stats["timeouts"] == 1 and stats["rejected"] == 1 and stats["pending"] == 0
+    print("✅ Overload rejected instead of queued without bound")
+
+def test_recovers_from_dead_worker():
+    """A crashed worker fails its own job and the pool is replaced for the next one"""
+    print("🔍 Testing pool recovery...")
+    pool = RenderPool(workers=1, job=crashing_job)
+
+    async def run():
+        try:
+            await pool.render("name_change", {"crash": True}, "CRASH")
+            assert False, "crashed render returned"
+        except BrokenProcessPool:
+            pass
+        return await pool.render("name_change", {}, "AFTER")
+
+    try:
+        pdf = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert pdf == b"%PDF-ok"
+    assert pool.stats()["restarts"] == 1 and pool.stats()["failed"] == 1
+    print("✅ Pool restarted after a worker died")
+
+def main():
+    """Run all render pool tests"""
+    print("🚀 Starting PDF Render Pool Tests")
+    print("=" * 50)
+
+    test_renders_off_the_event_loop()
+    test_large_pdfs_spill_to_disk()
+    test_backpressure_and_timeouts()
+    test_recovers_from_dead_worker()
+
+    print("\n" + "=" * 50)
+    print("✅ All render pool tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
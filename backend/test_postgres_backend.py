@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Test script for the PostgreSQL backend
+Needs a server: set DATABASE_URL to run it, otherwise every test is skipped.
+Each test works in a throwaway schema that is dropped afterwards.
+"""
+
+import os
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+
+import postgres_database
+from db_errors import VersionConflictError
+from postgres_database import PostgresDatabase
+from search_index import query_terms
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+@contextmanager
+def fresh_db():
+    """PostgresDatabase whose search_path is a new, empty schema"""
+    schema = f"legal_voice_test_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(DATABASE_URL)
+    with admin.begin() as connection:
+        connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    db = PostgresDatabase(make_url(DATABASE_URL).update_query_dict({"options": f"-csearch_path={schema}"}))
+    try:
+        yield db
+    finally:
+        db.engine.dispose()
+        with admin.begin() as connection:
+            connection.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        admin.dispose()
+
+def skipped():
+    if DATABASE_URL:
+        return False
+    print("⏭️  DATABASE_URL not set, skipping")
+    return True
+
+def test_pool_settings():
+    """The engine uses the configured pool and returns every connection to it"""
+    if skipped():
+        return
+    print("🔍 Testing connection pool...")
+    with fresh_db() as db:
+        pool = db.engine.pool
+        assert pool.size() == postgres_database.PG_POOL_SIZE
+        assert pool._max_overflow == postgres_database.PG_MAX_OVERFLOW
+        assert pool._timeout == postgres_database.PG_POOL_TIMEOUT
+        assert pool._recycle == postgres_database.PG_POOL_RECYCLE
+        assert pool._pre_ping
+        db.ping()
+        db.save_submission("TRK1", "name_change", {}, "u1")
+        db.get_submission("TRK1")
+        assert pool.checkedout() == 0
+    print("✅ Pool configured and connections returned")
+
+def test_user_projections():
+    """Projected reads keep explicit nulls and leave out fields the user never had"""
+    if skipped():
+        return
+    print("🔍 Testing user projections...")
+    with fresh_db() as db:
+        db.save_user({"user_id": "u1", "email": "a@example.com", "name": "आशा", "password": "hash",
+                      "picture": None, "profile": {"address": "Somewhere"}})
+        db.save_user({"user_id": "u2", "email": "b@example.com", "name": "B"})
+
+        assert db.get_user("u1", fields=["user_id", "picture", "phone"]) == {"user_id": "u1", "picture": None}
+        assert db.get_user_by_email("b@example.com", fields=["phone"]) == {}
+        assert db.get_user("u1", fields=[]) == {}
+        assert "password" not in db.get_user_by_email("a@example.com", exclude=["password", "password_hash"])
+        assert sorted(db.get_all_users(fields=["name"]), key=lambda u: u["name"]) == [{"name": "B"}, {"name": "आशा"}]
+        assert db.get_user("u1")["password"] == "hash"
+
+        db.update_user("u1", {"email": "new@example.com", "picture": "/files/p"})
+        assert db.get_user_by_email("a@example.com") is None
+        assert db.get_user_by_email("new@example.com", fields=["picture"]) == {"picture": "/files/p"}
+    print("✅ User projections built in SQL")
+
+def test_status_update_single_statement():
+    """The status bump and its history row are one UPDATE ... RETURNING / INSERT ... SELECT"""
+    if skipped():
+        return
+    print("🔍 Testing status update statement...")
+    with fresh_db() as db:
+        db.save_submission("TRK1", "name_change", {"applicant_full_name": "राम"}, "u1")
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            submission = db.update_submission_status("TRK1", "processing", "Under review", expected_version=1)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        writes = [s for s in statements if "submission_history" in s and "INSERT" in s]
+        assert len(writes) == 1 and "UPDATE submissions" in writes[0] and "RETURNING" in writes[0]
+        assert submission["version"] == 2 and submission["status"] == "processing"
+        assert [h["message"] for h in submission["history"]] == ["Form submitted successfully", "Under review"]
+
+        try:
+            db.update_submission_status("TRK1", "rejected", "Stale admin view", expected_version=1)
+            assert False, "stale version was accepted"
+        except VersionConflictError:
+            pass
+        assert len(db.get_submission("TRK1")["history"]) == 2
+        assert db.update_submission_status("missing", "approved", "x") is None
+        assert db.update_submission_status("missing", "approved", "x", expected_version=1) is None
+
+        status = db.get_submission_status("TRK1")
+        assert status["version"] == 2 and status["message"] == "Under review" and "data" not in status
+    print("✅ Status and history written together")
+
+def test_concurrent_writers():
+    """Writers on separate pooled connections lose no history rows"""
+    if skipped():
+        return
+    print("🔍 Testing concurrent writers...")
+    with fresh_db() as db:
+        db.save_submission("TRK1", "name_change", {}, "u1")
+
+        def worker(n):
+            for i in range(20):
+                db.update_submission_status("TRK1", "processing", f"worker {n} update {i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        submission = db.get_submission("TRK1")
+        assert len(submission["history"]) == 1 + 4 * 20 and submission["version"] == 1 + 4 * 20
+    print("✅ No updates lost across connections")
+
+def test_counter_triggers():
+    """The trigger moves counters on insert, status change and delete; a rebuild agrees"""
+    if skipped():
+        return
+    print("🔍 Testing counter triggers...")
+    with fresh_db() as db:
+        for i in range(4):
+            db.save_submission(f"TRK{i}", "name_change", {}, "u1")
+        db.save_submission("OTHER", "property_dispute", {}, "u1")
+        db.update_submission_status("TRK0", "approved", "Approved")
+        db.update_submission_status("TRK0", "approved", "Approved again")  # Same status, no move
+        db.delete_submission("TRK1")
+
+        counts = {(b["form_id"], b["status"]): b["count"] for b in db.get_submission_counters()}
+        assert counts == {("name_change", "submitted"): 2, ("name_change", "approved"): 1, ("property_dispute", "submitted"): 1}
+        assert len(db.get_submission_counters(form_id="property_dispute")) == 1
+        assert db.get_submission_counters(start_day="2000-01-01", end_day="2000-12-31") == []
+
+        with db.engine.begin() as connection:
+            connection.execute(text("DELETE FROM submission_counters"))
+        assert db.rebuild_submission_counters() == 3
+        assert {(b["form_id"], b["status"]): b["count"] for b in db.get_submission_counters()} == counts
+    print("✅ Counters maintained by trigger and rebuilt")
+
+def test_tsvector_search():
+    """Search matches every term with the last as a prefix, and deletes drop documents"""
+    if skipped():
+        return
+    print("🔍 Testing tsvector search...")
+    with fresh_db() as db:
+        db.save_submission("TRK20240101-AB12CD34", "name_change", {"new_name": "राम कुमार", "place": "चेन्नई"}, "u1")
+        db.save_help_ticket({"ticket_id": "TKT1", "user_id": "u2", "subject": "பெயர் மாற்றம்",
+                             "description": "Form stuck for ಕನ್ನಡ applicant", "priority": "medium",
+                             "status": "open", "created_at": "2024-01-01", "updated_at": "2024-01-01"})
+        db.save_chat_message({"message_id": "m1", "user_id": "u1", "sender": "user", "text": "नमस्ते, फॉर्म कब तक?",
+                              "timestamp": "2024-01-01", "created_at": "2024-01-01"})
+
+        def ids(query, kinds=("submission", "ticket", "chat")):
+            return [document["id"] for _, document in db.search(query_terms(query), list(kinds))]
+
+        assert ids("राम कु") == ["TRK20240101-AB12CD34"]
+        assert sorted(ids("क")) == ["TRK20240101-AB12CD34", "m1"]
+        assert ids("மாற்றம்") == ["TKT1"]
+        assert ids("फॉर्म", ["submission", "ticket"]) == []
+
+        assert db.delete_chat_message("m1")
+        assert ids("फॉर्म") == []
+        with db.engine.begin() as connection:
+            connection.execute(text("DELETE FROM search_documents"))
+        assert db.rebuild_search_index() == 2
+        assert ids("ಕನ್ನಡ") == ["TKT1"]
+    print("✅ tsvector search kept in step")
+
+def test_conversation_rebuild():
+    """A summary rebuild repairs counts, keeps read times and counts unread only what came after them"""
+    if skipped():
+        return
+    print("🔍 Testing conversation summary rebuild...")
+    with fresh_db() as db:
+        for i, sender in enumerate(["user", "user", "admin"]):
+            db.save_chat_message({"message_id": f"m{i}", "user_id": "u1", "sender": sender, "text": f"text {i}",
+                                  "timestamp": f"2024-01-0{i + 1}", "created_at": f"2024-01-0{i + 1}"})
+        assert db.mark_conversation_read("u1", "admin")
+        db.save_chat_message({"message_id": "m3", "user_id": "u1", "sender": "user", "text": "text 3",
+                              "timestamp": "9999-01-01", "created_at": "9999-01-01"})
+        with db.engine.begin() as connection:
+            connection.execute(text("UPDATE conversations SET message_count = 9, unread_user = 5"))  # Drift
+
+        assert db.rebuild_conversation_summaries() == 1
+        summary = db.get_conversation_summaries()[0]
+        assert (summary["message_count"], summary["unread_admin"], summary["unread_user"]) == (4, 1, 1)
+        assert summary["admin_read_at"] is not None and summary["last_message"] == "text 3"
+
+        with db.engine.begin() as connection:
+            connection.execute(text("DELETE FROM messages"))
+        assert db.rebuild_conversation_summaries() == 0
+    print("✅ Read state survives a rebuild")
+
+def main():
+    """Run all PostgreSQL backend tests"""
+    print("🚀 Starting PostgreSQL Backend Tests")
+    print("=" * 50)
+
+    test_pool_settings()
+    test_user_projections()
+    test_status_update_single_statement()
+    test_concurrent_writers()
+    test_counter_triggers()
+    test_tsvector_search()
+    test_conversation_rebuild()
+
+    print("\n" + "=" * 50)
+    print("✅ All PostgreSQL backend tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
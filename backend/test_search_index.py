@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for full-text search
+Covers the tokenizer, the in-process BM25 index and the SQLite FTS5 index
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from search_index import InvertedIndex, query_terms, search_document, search_result, tokenize
+from sqlite_database import SQLiteDatabase
+
+ALL_KINDS = ["submission", "ticket", "chat"]
+
+def sample_records():
+    return [
+        ("submission", {"tracking_id": "TRK20240101-AB12CD34", "user_id": "u1",
+                        "data": {"new_name": "राम कुमार", "place": "चेन्नई", "age": 34}}),
+        ("ticket", {"ticket_id": "TKT1", "user_id": "u2", "subject": "பெயர் மாற்றம்",
+                    "description": "Form stuck for ಕನ್ನಡ applicant"}),
+        ("chat", {"message_id": "m1", "user_id": "u1", "sender": "user", "text": "नमस्ते, फॉर्म कब तक?"}),
+    ]
+
+def test_tokenizer_keeps_indic_words():
+    """Vowel signs and viramas stay inside a word; joiners, punctuation and case do not"""
+    print("🔍 Testing tokenizer...")
+    assert tokenize("राम कुमार।") == ["राम", "कुमार"]
+    assert tokenize("தமிழ், తెలుగు ಕನ್ನಡ") == ["தமிழ்", "తెలుగు", "ಕನ್ನಡ"]
+    assert tokenize("क्\u200dष") == ["क्ष"]
+    assert tokenize("TRK20240101-AB12") == ["trk20240101", "ab12"]
+    assert tokenize("२०२४ ௨௦") == ["2024", "20"]
+    assert query_terms("Ram ram RAM kumar") == ["ram", "kumar"]
+    print("✅ Indic words tokenized whole")
+
+def test_inverted_index():
+    """All terms must match, the last one as a prefix, and removals take effect"""
+    print("🔍 Testing in-process index...")
+    index = InvertedIndex()
+    for kind, record in sample_records():
+        index.add(search_document(kind, record))
+
+    def ids(query, kinds=ALL_KINDS):
+        return [document["id"] for _, document in index.search(query_terms(query), kinds)]
+
+    assert ids("राम कु") == ["TRK20240101-AB12CD34"]
+    assert ids("राम फॉर्म") == []
+    assert ids("फॉर्म") == ["m1"]
+    assert ids("trk20240101-ab12") == ["TRK20240101-AB12CD34"]
+    assert ids("ಕನ್ನಡ", ["chat"]) == []
+    assert ids("34") == ["TRK20240101-AB12CD34"]
+
+    index.remove("chat", "m1")
+    assert ids("फॉर्म") == []
+    assert len(index) == 2
+
+    _, document = index.search(query_terms("ಕನ್ನಡ"))[0]
+    result = search_result(document, 1.0, query_terms("ಕನ್ನಡ"))
+    assert result["title"] == "பெயர் மாற்றம்" and "ಕನ್ನಡ" in result["snippet"] and "text" not in result
+    print("✅ Index matches, ranks and forgets")
+
+def test_sqlite_fts():
+    """SQLite keeps its FTS5 index in step with inserts and deletes"""
+    print("🔍 Testing SQLite search...")
+    db = SQLiteDatabase(os.path.join(tempfile.mkdtemp(), "legal_voice_test.db"))
+    submission = sample_records()[0][1]
+    db.save_submission(submission["tracking_id"], "name_change", submission["data"], "u1")
+    db.save_help_ticket({**sample_records()[1][1], "priority": "medium", "status": "open",
+                         "created_at": "2024-01-01", "updated_at": "2024-01-01"})
+    db.save_chat_message({**sample_records()[2][1], "timestamp": "2024-01-01", "created_at": "2024-01-01"})
+
+    def ids(query, kinds=ALL_KINDS):
+        return [document["id"] for _, document in db.search(query_terms(query), kinds)]
+
+    assert ids("राम कु") == ["TRK20240101-AB12CD34"]
+    assert sorted(ids("क")) == ["TRK20240101-AB12CD34", "m1"]
+    assert ids("மாற்றம்") == ["TKT1"]
+    assert ids("फॉर्म", ["submission", "ticket"]) == []
+
+    assert db.delete_chat_message("m1")
+    assert ids("फॉर्म") == []
+    db.conn.execute("DELETE FROM search_documents")
+    assert db.rebuild_search_index() == 2
+    assert ids("ಕನ್ನಡ") == ["TKT1"]
+    db.close()
+    print("✅ SQLite search kept in step")
+
+def main():
+    """Run all search tests"""
+    print("🚀 Starting Search Tests")
+    print("=" * 50)
+
+    test_tokenizer_keeps_indic_words()
+    test_inverted_index()
+    test_sqlite_fts()
+
+    print("\n" + "=" * 50)
+    print("✅ All search tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
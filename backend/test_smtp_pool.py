@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for the SMTP connection pool
+Delivers to a local SMTP stand-in (aiosmtpd); skipped when it is not installed
+"""
+
+import os
+import socket
+import sys
+import threading
+from email.message import EmailMessage
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from smtp_pool import SMTPPool
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    Controller = None
+
+class Inbox:
+    """aiosmtpd handler that keeps what it receives and refuses bounce@ addresses"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("bounce@"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.rcpt_tos[0])
+        self.sessions.add(id(session))
+        return "250 Message accepted"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(inbox=None, port=None):
+    inbox = inbox or Inbox()
+    server = Controller(inbox, hostname="127.0.0.1", port=port or free_port())
+    server.start()
+    return server, inbox
+
+def make_pool(server, **kwargs) -> SMTPPool:
+    return SMTPPool(host=server.hostname, port=server.port, username=None, password=None, security="none", **kwargs)
+
+def message(to: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@legalvoice.com"
+    msg["To"] = to
+    msg["Subject"] = "Status update"
+    msg.set_content("Your submission was approved")
+    return msg
+
+def test_connections_are_reused():
+    """Concurrent senders share at most size connections"""
+    if Controller is None:
+        print("⏭️  aiosmtpd not installed, skipping")
+        return
+    print("🔍 Testing connection reuse...")
+    server, inbox = start_server()
+    pool = make_pool(server, size=2)
+    try:
+        def worker(n):
+            for i in range(10):
+                pool.send(message(f"user{n}-{i}@example.com"))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        pool.close()
+        server.stop()
+
+    stats = pool.stats()
+    assert len(inbox.messages) == 40 and stats["sent"] == 40
+    assert stats["connections_opened"] <= 2 and len(inbox.sessions) <= 2
+    assert stats["in_use"] == 0
+    print(f"✅ 40 emails over {stats['connections_opened']} connections")
+
+def test_message_cap_and_refusals():
+    """Connections retire after max_messages; a refused recipient fails alone"""
+    if Controller is None:
+        return
+    print("🔍 Testing message cap and refused recipients...")
+    server, inbox = start_server()
+    pool = make_pool(server, max_messages=3)
+    try:
+        results = pool.send_many([message(f"user{i}@example.com") for i in range(7)]
+                                 + [message("bounce@example.com"), message("last@example.com")])
+    finally:
+        pool.close()
+        server.stop()
+
+    assert results[:7] == [None] * 7 and results[8] is None
+    assert "bounce@example.com" in str(results[7])
+    assert inbox.messages[-1] == "last@example.com" and len(inbox.messages) == 8
+    assert pool.stats()["connections_opened"] == 3 and pool.stats()["failed"] == 1
+    print("✅ Connections capped, refusal isolated")
+
+def test_reconnects_after_drop():
+    """A connection the server dropped is noticed by NOOP, or on send, and replaced"""
+    if Controller is None:
+        return
+    print("🔍 Testing keepalive and reconnection...")
+    for keepalive in (0, 60):
+        server, inbox = start_server()
+        pool = make_pool(server, keepalive=keepalive)
+        try:
+            pool.send(message("before@example.com"))
+            server.stop()  # Drops the pooled connection
+            server, _ = start_server(inbox, server.port)
+            pool.send(message("after@example.com"))
+        finally:
+            pool.close()
+            server.stop()
+
+        stats = pool.stats()
+        assert inbox.messages == ["before@example.com", "after@example.com"]
+        assert stats["connections_opened"] == 2 and stats["failed"] == 0
+        if keepalive:
+            assert stats["reconnects"] == 1
+        else:
+            assert stats["noops"] == 1 and stats["reconnects"] == 0
+    print("✅ Dropped connections replaced")
+
+def test_connect_failure_fails_the_batch():
+    """When no connection can be opened, the rest of the batch fails without reconnecting"""
+    print("🔍 Testing batches against an unreachable server...")
+    pool = SMTPPool(host="127.0.0.1", port=free_port(), username=None, password=None, security="none", timeout=5)
+    connect, attempts = pool._connect, []
+    pool._connect = lambda: attempts.append(1) or connect()
+
+    results = pool.send_many([message(f"user{i}@example.com") for i in range(3)])
+    assert len(attempts) == 1
+    assert isinstance(results[0], OSError) and results[1] is results[0] and results[2] is results[0]
+    assert pool.stats()["failed"] == 3 and pool.stats()["connections_opened"] == 0
+    print("✅ One connect attempt per batch")
+
+def main():
+    """Run all SMTP pool tests"""
+    print("🚀 Starting SMTP Pool Tests")
+    print("=" * 50)
+
+    test_connections_are_reused()
+    test_message_cap_and_refusals()
+    test_reconnects_after_drop()
+    test_connect_failure_fails_the_batch()
+
+    print("\n" + "=" * 50)
+    print("✅ All SMTP pool tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite backend
+Runs against a throwaway database file, no external services needed
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_errors import VersionConflictError
+from sqlite_database import SQLiteDatabase
+
+def make_db():
+    temp_dir = tempfile.mkdtemp()
+    return SQLiteDatabase(os.path.join(temp_dir, "legal_voice_test.db"))
+
+def test_wal_mode():
+    """Connections should run in WAL mode"""
+    print("🔍 Testing journal mode...")
+    db = make_db()
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.close()
+    print("✅ WAL journaling enabled")
+
+def test_users():
+    """Users round-trip and email lookups follow updates"""
+    print("🔍 Testing users...")
+    db = make_db()
+    db.save_user({"user_id": "u1", "email": "old@example.com", "name": "Test User", "picture": None})
+    db.update_user("u1", {"email": "new@example.com"})
+    db.save_user_profile("u1", {"address": "१२३ मुख्य मार्ग"})
+
+    assert db.get_user_by_email("old@example.com") is None
+    user = db.get_user_by_email("new@example.com")
+    assert user["name"] == "Test User"
+    assert user["picture"] is None
+    assert user["profile"]["address"] == "१२३ मुख्य मार्ग"
+    db.close()
+    print("✅ Users stored and indexed")
+
+def test_user_projections():
+    """Projected reads return only the requested fields"""
+    print("🔍 Testing user projections...")
+    db = make_db()
+    db.save_user({"user_id": "u1", "email": "a@example.com", "name": "A", "password": "hash",
+                  "profile": {"address": "Somewhere", "photo": "/files/abc"}})
+
+    assert db.get_user("u1", fields=["user_id", "email", "phone"]) == {"user_id": "u1", "email": "a@example.com"}
+    profile = db.get_user_by_email("a@example.com", exclude=["password", "password_hash"])
+    assert "password" not in profile
+    assert profile["profile"]["address"] == "Somewhere"
+    assert db.get_all_users(fields=["name"]) == [{"name": "A"}]
+    assert db.get_user("u1")["password"] == "hash"
+    db.close()
+    print("✅ User projections applied in SQL")
+
+def test_submissions_and_history():
+    """Status updates append history in order"""
+    print("🔍 Testing submissions...")
+    db = make_db()
+    db.save_submission("TRK1", "name_change", {"applicant_full_name": "राम"}, "u1")
+    db.save_submission("TRK2", "property_dispute", {}, "u1")
+    db.update_submission_status("TRK1", "processing", "Under review")
+    submission = db.update_submission_status("TRK1", "approved", "Approved")
+
+    assert submission["status"] == "approved"
+    assert [h["message"] for h in submission["history"]] == ["Form submitted successfully", "Under review", "Approved"]
+    assert submission["data"]["applicant_full_name"] == "राम"
+    assert len(db.get_user_submissions("u1")) == 2
+    assert [s["tracking_id"] for s in db.get_all_submissions("name_change", "approved")] == ["TRK1"]
+    assert db.update_submission_status("missing", "approved", "x") is None
+
+    status = db.get_submission_status("TRK1")
+    assert status["status"] == "approved" and status["version"] == 3
+    assert status["message"] == "Approved"
+    assert "data" not in status and "history" not in status
+    assert db.get_submission_status("missing") is None
+
+    assert db.get_submission("TRK1")["pdf_artifact"] is None
+    assert db.set_submission_pdf_artifact("TRK1", {"file_id": "abc", "length": 10})
+    assert db.get_submission("TRK1")["pdf_artifact"] == {"file_id": "abc", "length": 10}
+    assert db.get_submission("TRK1")["version"] == 3
+    assert not db.set_submission_pdf_artifact("missing", {"file_id": "abc"})
+
+    assert db.delete_submission("TRK1")
+    assert db.conn.execute("SELECT COUNT(*) FROM submission_history WHERE tracking_id = 'TRK1'").fetchone()[0] == 0
+    db.close()
+    print("✅ Submissions and history stored")
+
+def test_concurrent_writers():
+    """Writers on separate threads each get their own connection"""
+    print("🔍 Testing concurrent writers...")
+    db = make_db()
+    db.save_submission("TRK1", "name_change", {}, "u1")
+
+    def worker(n):
+        for i in range(20):
+            db.update_submission_status("TRK1", "processing", f"worker {n} update {i}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(db.get_submission("TRK1")["history"]) == 1 + 4 * 20
+    db.close()
+    print("✅ No updates lost across threads")
+
+def test_version_conflict():
+    """A stale expected version is rejected without writing anything"""
+    print("🔍 Testing optimistic version checks...")
+    db = make_db()
+    assert db.save_submission("TRK1", "name_change", {}, "u1")["version"] == 1
+    submission = db.update_submission_status("TRK1", "processing", "Under review", expected_version=1)
+    assert submission["version"] == 2
+
+    try:
+        db.update_submission_status("TRK1", "rejected", "Stale admin view", expected_version=1)
+        assert False, "stale version was accepted"
+    except VersionConflictError:
+        pass
+
+    submission = db.get_submission("TRK1")
+    assert submission["status"] == "processing"
+    assert len(submission["history"]) == 2
+    assert db.update_submission_status("missing", "approved", "x", expected_version=1) is None
+    db.close()
+    print("✅ Stale versions rejected")
+
+def test_user_stats_and_pages():
+    """Dashboard counts come from the database and pages run newest first"""
+    print("🔍 Testing user stats and pagination...")
+    db = make_db()
+    for i in range(5):
+        db.save_submission(f"TRK{i}", "name_change", {}, "u1")
+    db.save_submission("OTHER", "name_change", {}, "u2")
+    db.update_submission_status("TRK0", "approved", "Approved")
+    db.update_submission_status("TRK1", "rejected", "Rejected")
+    db.conn.execute("UPDATE submissions SET created_at = '2000-01-01T00:00:00' WHERE tracking_id = 'TRK2'")
+
+    stats = db.get_user_submission_stats("u1")
+    assert stats["total"] == 5
+    assert stats["by_status"] == {"submitted": 3, "approved": 1, "rejected": 1}
+    assert stats["this_month"] == 4
+
+    first_page = db.get_user_submissions("u1", limit=2)
+    second_page = db.get_user_submissions("u1", limit=2, offset=2)
+    everything = db.get_user_submissions("u1")
+    assert [s["tracking_id"] for s in first_page + second_page] == [s["tracking_id"] for s in everything[:4]]
+    assert everything[-1]["tracking_id"] == "TRK2"
+    db.close()
+    print("✅ Stats aggregated and pages ordered")
+
+def test_submission_counters():
+    """Counters follow inserts, status changes and deletes, and rebuild to the same values"""
+    print("🔍 Testing analytics counters...")
+    db = make_db()
+    for i in range(4):
+        db.save_submission(f"TRK{i}", "name_change", {}, "u1")
+    db.save_submission("OTHER", "property_dispute", {}, "u1")
+    db.update_submission_status("TRK0", "approved", "Approved")
+    db.update_submission_status("TRK0", "approved", "Approved again")
+    db.delete_submission("TRK1")
+
+    counts = {(b["form_id"], b["status"]): b["count"] for b in db.get_submission_counters()}
+    assert counts == {("name_change", "submitted"): 2, ("name_change", "approved"): 1, ("property_dispute", "submitted"): 1}
+    assert len(db.get_submission_counters(form_id="property_dispute")) == 1
+    assert db.get_submission_counters(start_day="2000-01-01", end_day="2000-12-31") == []
+
+    db.conn.execute("DELETE FROM submission_counters")
+    assert db.rebuild_submission_counters() == 3
+    assert {(b["form_id"], b["status"]): b["count"] for b in db.get_submission_counters()} == counts
+    db.close()
+    print("✅ Counters maintained and rebuilt")
+
+def test_iter_submissions():
+    """Keyset batches visit every matching row once, oldest first, without history"""
+    print("🔍 Testing batched submission iteration...")
+    db = make_db()
+    for i in range(7):
+        db.save_submission(f"TRK{i}", "name_change", {"name": f"नाम {i}"}, "u1")
+    db.save_submission("OTHER", "property_dispute", {}, "u1")
+    db.update_submission_status("TRK3", "approved", "Approved")
+
+    rows = list(db.iter_submissions(form_id="name_change", batch_size=3))
+    assert [row["tracking_id"] for row in rows] == [f"TRK{i}" for i in range(7)]
+    assert rows[0]["data"] == {"name": "नाम 0"} and "history" not in rows[0]
+    assert [row["tracking_id"] for row in db.iter_submissions(status="approved", batch_size=1)] == ["TRK3"]
+    assert list(db.iter_submissions(end="2000-01-01")) == []
+    db.close()
+    print("✅ Submissions streamed in batches")
+
+def test_bulk_insert():
+    """Bulk-loaded users and submissions read back like saved ones, with history split out"""
+    print("🔍 Testing bulk insert...")
+    db = make_db()
+    users = [{"user_id": f"u{i}", "email": f"u{i}@example.com", "name": f"प्रिया {i}"} for i in range(3)]
+    assert db.bulk_insert("users", users) == 3
+    history = [{"timestamp": "2024-01-01T00:00:00", "message": "Form submitted successfully"},
+               {"timestamp": "2024-01-02T00:00:00", "message": "Application approved"}]
+    submissions = [{"tracking_id": f"TRK{i}", "form_id": "name_change", "data": {"new_name": "राम"}, "user_id": "u0",
+                    "status": "approved", "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-02T00:00:00",
+                    "version": 2, "history": history} for i in range(4)]
+    assert db.bulk_insert("submissions", submissions) == 4
+
+    assert db.get_user_by_email("u2@example.com")["name"] == "प्रिया 2"
+    submission = db.get_submission("TRK3")
+    assert submission["data"] == {"new_name": "राम"} and submission["history"] == history
+    assert [(b["status"], b["count"]) for b in db.get_submission_counters()] == [("approved", 4)]
+    assert db.rebuild_search_index() == 4
+    db.close()
+    print("✅ Bulk records loaded")
+
+def test_conversation_summaries():
+    """Summaries track last message, counts and unread state through saves, reads and deletes"""
+    print("🔍 Testing conversation summaries...")
+    db = make_db()
+    db.save_user({"user_id": "u1", "email": "asha@example.com", "name": "आशा"})
+    for i, sender in enumerate(["user", "user", "admin"]):
+        db.save_chat_message({"message_id": f"m{i}", "user_id": "u1", "sender": sender, "text": f"text {i}",
+                              "timestamp": f"2024-01-0{i + 1}", "created_at": f"2024-01-0{i + 1}"})
+
+    summary = db.get_conversation_summaries()[0]
+    assert (summary["name"], summary["email"]) == ("आशा", "asha@example.com")
+    assert (summary["message_count"], summary["unread_admin"], summary["unread_user"]) == (3, 2, 1)
+    assert summary["last_message"] == "text 2"
+
+    assert db.mark_conversation_read("u1", "admin")
+    assert db.delete_chat_message("m2")
+    summary = db.get_conversation_summaries()[0]
+    assert (summary["message_count"], summary["unread_admin"], summary["unread_user"]) == (2, 0, 0)
+    assert summary["last_message"] == "text 1"
+
+    db.save_chat_message({"message_id": "m3", "user_id": "u1", "sender": "user", "text": "text 3",
+                          "timestamp": "9999-01-01", "created_at": "9999-01-01"})
+    db.conn.execute("UPDATE conversations SET message_count = 9, unread_user = 5")  # Drift
+    assert db.rebuild_conversation_summaries() == 1
+    summary = db.get_conversation_summaries()[0]
+    assert (summary["message_count"], summary["unread_admin"], summary["unread_user"]) == (3, 1, 0)
+    assert summary["admin_read_at"] is not None and summary["last_message"] == "text 3"
+
+    db.conn.execute("DELETE FROM conversations")
+    assert db.rebuild_conversation_summaries() == 1
+    summary = db.get_conversation_summaries()[0]
+    assert (summary["message_count"], summary["unread_admin"], summary["unread_user"]) == (3, 3, 0)
+    db.conn.execute("DELETE FROM messages")
+    assert db.rebuild_conversation_summaries() == 0
+    db.close()
+    print("✅ Conversation summaries maintained")
+
+def test_tokens_documents_messages():
+    """Remaining entities round-trip"""
+    print("🔍 Testing tokens, documents and messages...")
+    db = make_db()
+    db.save_reset_token("a@example.com", "tok", "2099-01-01T00:00:00")
+    assert db.get_reset_token("tok")["email"] == "a@example.com"
+    db.mark_reset_token_used("tok")
+    assert db.get_reset_token("tok") is None
+
+    document = db.save_user_document("u1", "aadhar", {"file_url": "https://example.com/a.pdf"})
+    assert db.get_user_documents("u1")[0]["document_data"]["file_url"] == "https://example.com/a.pdf"
+    assert db.delete_user_document(document["document_id"], "u1")
+
+    db.save_chat_message({"message_id": "m2", "user_id": "u1", "sender": "admin", "text": "b",
+                          "timestamp": "2024-01-02", "created_at": "2024-01-02"})
+    db.save_chat_message({"message_id": "m1", "user_id": "u1", "sender": "user", "text": "a",
+                          "timestamp": "2024-01-01", "created_at": "2024-01-01"})
+    assert [m["message_id"] for m in db.get_chat_messages("u1")] == ["m1", "m2"]
+    assert db.delete_chat_message("m1")
+    db.close()
+    print("✅ Tokens, documents and messages stored")
+
+def test_chat_message_cursor():
+    """Paging and delta sync by (timestamp, message_id) skip no message sharing a timestamp"""
+    print("🔍 Testing chat message cursors...")
+    db = make_db()
+    for message_id in ("m5", "m3", "m1", "m4", "m2"):
+        db.save_chat_message({"message_id": message_id, "user_id": "u1", "sender": "user", "text": message_id,
+                              "timestamp": "2024-01-01", "created_at": "2024-01-01"})
+    position = lambda m: (m["timestamp"], m["message_id"])
+
+    newest = db.get_chat_messages("u1", limit=2)
+    assert [m["message_id"] for m in newest] == ["m4", "m5"]
+    older = db.get_chat_messages("u1", before=position(newest[0]), limit=2)
+    assert [m["message_id"] for m in older] == ["m2", "m3"]
+
+    delta = db.get_chat_messages("u1", since=("2024-01-01", "m2"))
+    assert [m["message_id"] for m in delta] == ["m3", "m4", "m5"]
+    assert [m["message_id"] for m in db.get_chat_messages("u1", since=("2024-01-01", ""))] == ["m1", "m2", "m3", "m4", "m5"]
+    assert db.get_chat_messages("u1", since=position(newest[-1])) == []
+    db.close()
+    print("✅ Equal timestamps neither skipped nor repeated")
+
+def main():
+    """Run all SQLite backend tests"""
+    print("🚀 Starting SQLite Backend Tests")
+    print("=" * 50)
+
+    test_wal_mode()
+    test_users()
+    test_user_projections()
+    test_submissions_and_history()
+    test_concurrent_writers()
+    test_version_conflict()
+    test_user_stats_and_pages()
+    test_submission_counters()
+    test_iter_submissions()
+    test_bulk_insert()
+    test_conversation_summaries()
+    test_tokens_documents_messages()
+    test_chat_message_cursor()
+
+    print("\n" + "=" * 50)
+    print("✅ All SQLite backend tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
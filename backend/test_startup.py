@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for application startup
+Measures the import time of app.py with `python -X importtime` against a
+budget, and checks that database problems surface instead of being hidden
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_errors import DatabaseUnavailableError
+from db_health import HealthMonitor
+from mongo_connection import MongoConnection
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+# Optional or per-request dependencies that must not load at import
+DEFERRED_MODULES = ["openai", "cloudinary", "reportlab", "pymongo"]
+UNREACHABLE_MONGODB_URI = "mongodb://127.0.0.1:1"
+
+def import_time_report(env: dict) -> dict:
+    """Cumulative import time in ms of every module `import app` loads"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    report = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        report[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return report
+
+def test_import_time_budget():
+    """Importing the app stays within budget, even with MongoDB unreachable"""
+    print("🔍 Measuring app import time...")
+    env = {**os.environ, "DB_TYPE": "mongodb", "MONGODB_URI": UNREACHABLE_MONGODB_URI,
+           "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "test"), "JWT_SECRET": os.getenv("JWT_SECRET", "test")}
+    report = import_time_report(env)
+
+    total_ms = report["app"][1]
+    slowest = sorted(report.items(), key=lambda item: item[1][0], reverse=True)[:5]
+    for name, (self_ms, _) in slowest:
+        print(f"   {self_ms:8.1f} ms  {name}")
+    print(f"   import app: {total_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)")
+
+    assert total_ms < IMPORT_TIME_BUDGET_MS
+    loaded = [module for module in DEFERRED_MODULES if module in report]
+    assert not loaded, f"imported at startup: {loaded}"
+    print("✅ App imports within budget")
+
+def test_unreachable_mongodb_fails():
+    """connect() raises instead of falling back, and setup waits for a server"""
+    print("🔍 Testing unreachable MongoDB...")
+    connection = MongoConnection(UNREACHABLE_MONGODB_URI, "legal_voice_test", timeout_ms=200)
+    ran_setup = []
+    connection.on_connect(ran_setup.append)
+    started = time.perf_counter()
+    try:
+        connection.connect()
+        assert False, "connect() succeeded without a server"
+    except DatabaseUnavailableError as e:
+        assert e.backend == "mongodb"
+    assert time.perf_counter() - started < 5
+    assert not connection.connected and ran_setup == []
+    connection.close()
+    print("✅ Startup fails loudly")
+
+def test_health_monitor():
+    """Probes record failures, timeouts and recovery"""
+    print("🔍 Testing health monitor...")
+    outcomes = [ConnectionError("refused"), None, "slow"]
+
+    def ping():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if outcome == "slow":
+            time.sleep(0.3)
+
+    async def run():
+        monitor = HealthMonitor("test", ping, interval=60, timeout=0.1)
+        assert await monitor.check() is False
+        assert monitor.snapshot()["last_error"] == "refused"
+        assert await monitor.check() is True
+        assert monitor.consecutive_failures == 0
+        assert await monitor.check() is False
+        monitor.start()
+        await monitor.stop()
+
+    asyncio.run(run())
+    print("✅ Health transitions recorded")
+
+def main():
+    """Run all startup tests"""
+    print("🚀 Starting Startup Tests")
+    print("=" * 50)
+
+    test_import_time_budget()
+    test_unreachable_mongodb_fails()
+    test_health_monitor()
+
+    print("\n" + "=" * 50)
+    print("✅ All startup tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the submission endpoints
+Drives the FastAPI app in-process with TestClient against the mock database;
+the lifespan (database connect, outbox worker) is not started
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_TYPE", "mock")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("JWT_SECRET", "test-jwt-secret")
+os.environ.setdefault("FILE_STORAGE_PATH", tempfile.mkdtemp())
+os.environ.setdefault("PDF_CACHE_PATH", tempfile.mkdtemp())
+os.environ.setdefault("EMAIL_OUTBOX_PATH", os.path.join(tempfile.mkdtemp(), "outbox.db"))
+os.environ.setdefault("EMAIL_OUTBOX_WORKER", "external")
+
+from fastapi.testclient import TestClient
+
+from app import app
+from database import DatabaseService, DatabaseUnavailableError
+from services.auth_service import AuthService
+from services.email_service import EmailService
+
+client = TestClient(app)
+ADMIN = {"Authorization": f"Bearer {AuthService.create_token('api-admin', 'admin@example.com', True)}"}
+
+def make_submission(tracking_id: str, user_id: str) -> dict:
+    DatabaseService.save_user({"user_id": user_id, "email": f"{user_id}@example.com", "name": user_id})
+    return DatabaseService.save_submission(tracking_id, "name_change", {}, user_id)
+
+def auth(user_id: str) -> dict:
+    return {"Authorization": f"Bearer {AuthService.create_token(user_id, f'{user_id}@example.com')}"}
+
+def test_status_update_survives_a_notification_failure():
+    """An update whose email cannot be queued is still a success, and the email can be sent later"""
+    print("🔍 Testing status updates when the outbox is down...")
+    make_submission("API-NOTIFY", "api-user1")
+    sent = []
+    send = EmailService.send_status_update
+
+    def unavailable(*args):
+        raise DatabaseUnavailableError("email outbox", "disk full")
+
+    EmailService.send_status_update = staticmethod(unavailable)
+    try:
+        response = client.put("/admin/submissions/API-NOTIFY/status", headers=ADMIN,
+                              json={"status": "approved", "message": "Approved", "version": 1})
+    finally:
+        EmailService.send_status_update = send
+    assert response.status_code == 200
+    body = response.json()
+    assert body["version"] == 2 and body["notified"] is False and "disk full" in body["notify_error"]
+    assert len(DatabaseService.get_submission("API-NOTIFY")["history"]) == 2  # Written once
+
+    EmailService.send_status_update = staticmethod(lambda *args: sent.append(args))
+    try:
+        response = client.post("/admin/submissions/API-NOTIFY/notify", headers=ADMIN)
+    finally:
+        EmailService.send_status_update = send
+    assert response.status_code == 200 and response.json() == {"tracking_id": "API-NOTIFY", "version": 2, "notified": True}
+    assert sent == [("api-user1@example.com", "API-NOTIFY", "approved", "Approved", 2)]
+
+    assert client.post("/admin/submissions/API-MISSING/notify", headers=ADMIN).status_code == 404
+    assert client.post("/admin/submissions/API-NOTIFY/notify", headers=auth("api-user1")).status_code == 403
+    print("✅ Saved updates answer 200 and notify on request")
+
+def test_tracking_validators():
+    """Both tracking endpoints answer 304 while unchanged and hide other users' submissions"""
+    print("🔍 Testing tracking ETags...")
+    make_submission("API-TRACK", "api-owner")
+    DatabaseService.save_user({"user_id": "api-other", "email": "api-other@example.com", "name": "Other"})
+    owner = auth("api-owner")
+
+    for path in ("/track/API-TRACK", "/track/API-TRACK/status"):
+        first = client.get(path, headers=owner)
+        assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+        etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+
+        cached = client.get(path, headers={**owner, "If-None-Match": etag})
+        assert cached.status_code == 304 and cached.headers["ETag"] == etag and not cached.content
+        assert client.get(path, headers={**owner, "If-None-Match": 'W/"stale", *'}).status_code == 304
+        assert client.get(path, headers={**owner, "If-Modified-Since": last_modified}).status_code == 304
+        assert client.get(path, headers={**owner, "If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+        # If-None-Match wins over If-Modified-Since when both are sent
+        assert client.get(path, headers={**owner, "If-None-Match": 'W/"stale"',
+                                         "If-Modified-Since": last_modified}).status_code == 200
+
+        assert client.get(path, headers=auth("api-other")).status_code == 404
+        assert client.get(path, headers={**auth("api-other"), "If-None-Match": etag}).status_code == 404
+        assert client.get(path, headers={**ADMIN, "If-None-Match": etag}).status_code == 304
+
+    etags = {path: client.get(path, headers=owner).headers["ETag"] for path in ("/track/API-TRACK", "/track/API-TRACK/status")}
+    assert len(set(etags.values())) == 2  # Each representation has its own validator
+    DatabaseService.update_submission_status("API-TRACK", "processing", "Under review")
+    for path, etag in etags.items():
+        changed = client.get(path, headers={**owner, "If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["ETag"] != etag
+        assert changed.json()["version"] == 2 and changed.json()["status"] == "processing"
+    assert client.get("/track/API-MISSING/status", headers=owner).status_code == 404
+    print("✅ Unchanged submissions answer 304")
+
+def main():
+    """Run all submission endpoint tests"""
+    print("🚀 Starting Submission API Tests")
+    print("=" * 50)
+
+    test_status_update_survives_a_notification_failure()
+    test_tracking_validators()
+
+    print("\n" + "=" * 50)
+    print("✅ All submission API tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
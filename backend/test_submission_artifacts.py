@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for submission PDF artifacts
+Publishes a submission's PDF against the mock database and throwaway stores,
+capturing the confirmation email's release instead of sending it
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_TYPE", "mock")
+os.environ.setdefault("FILE_STORAGE_PATH", tempfile.mkdtemp())
+os.environ.setdefault("PDF_CACHE_PATH", tempfile.mkdtemp())
+
+from database import DatabaseService
+from file_storage import file_storage
+from pdf_cache import pdf_cache, pdf_cache_key
+from pdf_renderer import render_pool
+from services.email_service import EmailService
+from submission_artifacts import delete_pdf_artifact, publish_submission_pdf
+
+def publish(submission, email="ravi@example.com"):
+    """Run the pipeline, returning the artifact and the held confirmations it released"""
+    sent = []
+    release = EmailService.attach_submission_pdf
+    EmailService.attach_submission_pdf = staticmethod(lambda *args: sent.append(args))
+    try:
+        artifact = asyncio.run(publish_submission_pdf(submission, email))
+    finally:
+        EmailService.attach_submission_pdf = staticmethod(release)
+    return artifact, sent
+
+def test_publishes_pdf():
+    """The PDF is cached, stored with its checksum, recorded on the submission and attached"""
+    print("🔍 Testing PDF publishing...")
+    submission = DatabaseService.save_submission("ARTPDF1", "caveat", {"caveator_name": "Ravi"}, user_id="u-art")
+    try:
+        artifact, sent = publish(submission)
+    finally:
+        render_pool.shutdown()
+
+    stored = file_storage.open(artifact["file_id"])
+    pdf = b"".join(stored.iter_range())
+    assert pdf.startswith(b"%PDF") and stored.owner_ids == ["u-art"]
+    assert artifact["sha256"] == hashlib.sha256(pdf).hexdigest() and artifact["length"] == len(pdf)
+    assert artifact["url"] == f"/files/{artifact['file_id']}"
+    assert DatabaseService.get_submission("ARTPDF1")["pdf_artifact"] == artifact
+    assert DatabaseService.get_submission("ARTPDF1")["version"] == submission["version"]
+    assert pdf_cache.get(pdf_cache_key(submission)) is not None
+
+    (email, tracking_id, attachment), = sent
+    assert (email, tracking_id) == ("ravi@example.com", "ARTPDF1") and attachment == pdf
+
+    assert delete_pdf_artifact(DatabaseService.get_submission("ARTPDF1"))
+    assert file_storage.open(artifact["file_id"]) is None
+    print(f"✅ Published {artifact['length']} bytes as {artifact['file_id'][:12]}")
+
+def test_confirms_without_pdf():
+    """A submission whose PDF cannot be rendered is still confirmed, without an attachment"""
+    print("🔍 Testing confirmation without a PDF...")
+    submission = {"tracking_id": "ARTPDF2", "form_id": "caveat", "data": None, "status": "submitted"}
+    artifact, sent = publish(submission)
+    assert artifact is None
+    assert len(sent) == 1 and sent[0][2] is None
+    print("✅ Confirmation released without the PDF")
+
+def test_attachment_message():
+    """Attachments turn the HTML email into multipart/mixed with a PDF part"""
+    print("🔍 Testing attachment MIME structure...")
+    plain = EmailService._build_message("ravi@example.com", "Hi", "<p>Hi</p>")
+    assert plain.get_content_type() == "multipart/alternative"
+    msg = EmailService._build_message("ravi@example.com", "Hi", "<p>Hi</p>", [("TRK1.pdf", b"%PDF-1.4")])
+    html, pdf = msg.get_payload()
+    assert msg.get_content_type() == "multipart/mixed" and html.get_content_type() == "text/html"
+    assert pdf.get_content_type() == "application/pdf" and pdf.get_filename() == "TRK1.pdf"
+    assert pdf.get_payload(decode=True) == b"%PDF-1.4"
+    print("✅ PDF attached")
+
+def main():
+    """Run all submission artifact tests"""
+    print("🚀 Starting Submission Artifact Tests")
+    print("=" * 50)
+
+    test_publishes_pdf()
+    test_confirms_without_pdf()
+    test_attachment_message()
+
+    print("\n" + "=" * 50)
+    print("✅ All submission artifact tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for paging a user's submissions
+Runs the mock and persistent (JSON file) backends; SQLite has its own in
+test_sqlite_backend.py
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_TYPE", "mock")
+
+from database import DatabaseService
+from persistent_database import PersistentDatabase
+
+def check_pages(save, get_user_submissions, user_id):
+    """Pages of two, newest first, add up to the full list without gaps or repeats"""
+    for i in range(5):
+        save(f"{user_id}-TRK{i}", "name_change", {}, user_id)
+    save(f"{user_id}-OTHER", "name_change", {}, f"{user_id}-someone-else")
+
+    everything = get_user_submissions(user_id)
+    assert len(everything) == 5
+    created = [s["created_at"] for s in everything]
+    assert created == sorted(created, reverse=True)
+
+    pages = [get_user_submissions(user_id, limit=2, offset=offset) for offset in (0, 2, 4)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [s["tracking_id"] for page in pages for s in page] == [s["tracking_id"] for s in everything]
+    assert get_user_submissions(user_id, limit=2, offset=5) == []
+    assert get_user_submissions(user_id, offset=3) == everything[3:]
+
+def test_mock_pages():
+    """The mock backend pages through its per-user sorted index"""
+    print("🔍 Testing mock submission pages...")
+    check_pages(DatabaseService.save_submission, DatabaseService.get_user_submissions, "pages-mock")
+    stats = DatabaseService.get_user_submission_stats("pages-mock")
+    assert stats["total"] == 5
+    print("✅ Mock pages add up")
+
+def test_persistent_pages():
+    """The persistent backend pages the same way, also after reloading its files"""
+    print("🔍 Testing persistent submission pages...")
+    data_dir = tempfile.mkdtemp()
+    db = PersistentDatabase(data_dir)
+    check_pages(db.save_submission, db.get_user_submissions, "pages-file")
+
+    reloaded = PersistentDatabase(data_dir)
+    assert reloaded.get_user_submissions("pages-file", limit=2, offset=2) == db.get_user_submissions("pages-file", limit=2, offset=2)
+    assert reloaded.get_user_submission_stats("pages-file")["total"] == 5
+    print("✅ Persistent pages add up")
+
+def main():
+    """Run all submission paging tests"""
+    print("🚀 Starting Submission Paging Tests")
+    print("=" * 50)
+
+    test_mock_pages()
+    test_persistent_pages()
+
+    print("\n" + "=" * 50)
+    print("✅ All submission paging tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the read-through user cache
+Exercises the in-process tier only, no Redis needed
+"""
+
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("DB_TYPE", "mock")
+
+from database import DatabaseService, user_cache
+from user_cache import LRUCache, UserCache
+
+PROJECTIONS = ["auth", "summary", "profile", "full"]
+
+def make_cache(**kwargs):
+    return UserCache(PROJECTIONS, redis_url=None, **kwargs)
+
+def test_lru_bounds_and_expiry():
+    """Oldest entries are evicted past maxsize and expired ones are dropped"""
+    print("🔍 Testing LRU bounds and TTL...")
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+    short = LRUCache(maxsize=10, ttl=0.01)
+    short.set("a", 1)
+    time.sleep(0.02)
+    assert short.get("a") is None
+    print("✅ LRU evicts and expires entries")
+
+def test_hits_copies_and_invalidation():
+    """Hits return private copies and invalidation drops every projection"""
+    print("🔍 Testing user cache hits...")
+    cache = make_cache()
+    user = {"user_id": "u1", "email": "a@example.com", "name": "A"}
+    cache.put(user, "summary", cache.generation())
+    cache.put(user, "profile", cache.generation())
+
+    cached = cache.get("u1", "summary")
+    cached["name"] = "changed"
+    assert cache.get("u1", "summary")["name"] == "A"
+    assert cache.get_by_email("a@example.com", "profile")["name"] == "A"
+    assert cache.get("u1", "full") is None
+
+    cache.invalidate("u1")
+    assert cache.get("u1", "summary") is None
+    assert cache.get_by_email("a@example.com", "profile") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 3
+    assert stats["hit_rate"] == 0.5
+    print("✅ Hits, copies and invalidation work")
+
+def test_stale_fill_is_skipped():
+    """A read that raced with a write must not repopulate the cache"""
+    print("🔍 Testing racing reads...")
+    cache = make_cache()
+    generation = cache.generation()
+    cache.invalidate("u1")  # a write lands while the read is in flight
+    cache.put({"user_id": "u1", "email": "old@example.com"}, "summary", generation)
+    assert cache.get("u1", "summary") is None
+    print("✅ Stale reads are not cached")
+
+def test_email_map_follows_email_changes():
+    """A cached email must still belong to the user it points to"""
+    print("🔍 Testing email lookups...")
+    cache = make_cache()
+    cache.put({"user_id": "u1", "email": "old@example.com"}, "summary", cache.generation())
+    cache.invalidate("u1")
+    cache.put({"user_id": "u1", "email": "new@example.com"}, "summary", cache.generation())
+    assert cache.get_by_email("old@example.com", "summary") is None
+    assert cache.get_by_email("new@example.com", "summary")["user_id"] == "u1"
+    print("✅ Email lookups follow email changes")
+
+def test_password_hashes_never_cached():
+    """auth reads skip the cache and no cached projection keeps a password field"""
+    print("🔍 Testing password hashes stay out of the cache...")
+    cache = make_cache()
+    user = {"user_id": "u1", "email": "a@example.com", "password": "hash", "password_hash": "hash"}
+    cache.put(user, "auth", cache.generation())
+    assert cache.get("u1", "auth") is None and len(cache.local) == 0
+    cache.put(user, "full", cache.generation())
+    assert "password" not in cache.get("u1", "full") and "password_hash" not in cache.get("u1", "full")
+
+    DatabaseService.save_user({"user_id": "cache-u1", "email": "cache@example.com", "name": "C", "password": "hash"})
+    for _ in range(2):  # A miss, then a hit
+        assert DatabaseService.get_user_by_email("cache@example.com", "auth")["password"] == "hash"
+        assert "password" not in DatabaseService.get_user_by_email("cache@example.com", "full")
+        assert "password" not in DatabaseService.get_user("cache-u1")
+    assert user_cache.get("cache-u1", "auth") is None
+    print("✅ Password hashes are read from the database only")
+
+def main():
+    """Run all user cache tests"""
+    print("🚀 Starting User Cache Tests")
+    print("=" * 50)
+
+    test_lru_bounds_and_expiry()
+    test_hits_copies_and_invalidation()
+    test_stale_fill_is_skipped()
+    test_email_map_follows_email_changes()
+    test_password_hashes_never_cached()
+
+    print("\n" + "=" * 50)
+    print("✅ All user cache tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,233 @@
+"""
+Read-through user cache for Legal Voice App
+Users are read on nearly every authenticated request and once per row in admin
+views. Reads go through a bounded in-process LRU with a TTL. With
+USER_CACHE_REDIS_URL set, a shared Redis tier sits behind it, and each write
+is broadcast so every worker drops its local copy. Password hashes are never
+cached: the "auth" projection always reads the database, and they are stripped
+from every other projection before it is stored.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL")
+
+REDIS_KEY_PREFIX = "legal_voice:user_cache:"
+REDIS_INVALIDATION_CHANNEL = "legal_voice:user_cache:invalidate"
+
+# Projections that carry credentials, and the credential fields kept out of every cached user
+UNCACHED_PROJECTIONS = ("auth",)
+SECRET_FIELDS = ("password", "password_hash")
+
+
+def without_secrets(user: dict) -> dict:
+    return {field: value for field, value in user.items() if field not in SECRET_FIELDS}
+
+
+class LRUCache:
+    """Thread-safe bounded LRU whose entries expire ttl seconds after they are set"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisTier:
+    """Shared tier behind the local LRU; also carries invalidations between workers"""
+
+    def __init__(self, url: str, ttl: float, on_remote_invalidate):
+        import redis
+        self._error_types = (redis.RedisError, OSError)
+        self.client = redis.Redis.from_url(url)
+        self.ttl = max(1, int(ttl))
+        self.errors = 0
+        self._origin = uuid.uuid4().hex
+        self._on_remote_invalidate = on_remote_invalidate
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{REDIS_INVALIDATION_CHANNEL: self._handle_invalidation})
+        self._listener = self._pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _handle_invalidation(self, message):
+        origin, _, user_id = message["data"].decode().partition(":")
+        if origin != self._origin:
+            self._on_remote_invalidate(user_id)
+
+    def _failed(self, action: str, error: Exception):
+        # The database is always the fallback, so a Redis outage only costs hit rate
+        self.errors += 1
+        print(f"[USER CACHE] Redis {action} failed: {error}")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self.client.get(REDIS_KEY_PREFIX + key)
+        except self._error_types as e:
+            self._failed("get", e)
+            return None
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str):
+        try:
+            self.client.set(REDIS_KEY_PREFIX + key, value, ex=self.ttl)
+        except self._error_types as e:
+            self._failed("set", e)
+
+    def invalidate(self, user_id: str, keys: Iterable[str]):
+        try:
+            self.client.delete(*[REDIS_KEY_PREFIX + key for key in keys])
+            self.client.publish(REDIS_INVALIDATION_CHANNEL, f"{self._origin}:{user_id}")
+        except self._error_types as e:
+            self._failed("invalidate", e)
+
+    def close(self):
+        self._listener.stop()
+        self._pubsub.close()
+
+
+class UserCache:
+    """User documents per (projection, user_id), plus an email -> user_id map.
+    Values are stored serialized, so callers always get a private copy."""
+
+    def __init__(self, projections: Iterable[str], maxsize: int = USER_CACHE_SIZE,
+                 ttl: float = USER_CACHE_TTL_SECONDS, redis_url: Optional[str] = USER_CACHE_REDIS_URL):
+        self.projections = list(projections)
+        self.local = LRUCache(maxsize, ttl)
+        self.shared = RedisTier(redis_url, ttl, self._drop_local) if redis_url else None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._generation = 0  # bumped by every invalidation
+
+    @staticmethod
+    def cacheable(projection: str) -> bool:
+        return projection not in UNCACHED_PROJECTIONS
+
+    @staticmethod
+    def _key(projection: str, user_id: str) -> str:
+        return f"{projection}:{user_id}"
+
+    def _lookup(self, key: str, count: bool = True) -> Optional[str]:
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += count
+            return value
+        if self.shared:
+            value = self.shared.get(key)
+            if value is not None:
+                self.shared_hits += count
+                self.local.set(key, value)
+                return value
+        return None
+
+    def get(self, user_id: str, projection: str) -> Optional[dict]:
+        if not self.cacheable(projection):
+            return None
+        value = self._lookup(self._key(projection, user_id))
+        if value is None:
+            self.misses += 1
+            return None
+        return json.loads(value)
+
+    def get_by_email(self, email: str, projection: str) -> Optional[dict]:
+        if not self.cacheable(projection):
+            return None
+        user_id = self._lookup(f"email:{email}", count=False)
+        user = self._lookup(self._key(projection, user_id)) if user_id else None
+        # The email map is not invalidated on email changes, so check it still points here
+        if user is None or json.loads(user).get("email") != email:
+            self.misses += 1
+            return None
+        return json.loads(user)
+
+    def generation(self) -> int:
+        """Take before reading the database; pass to put() with the result"""
+        return self._generation
+
+    def put(self, user: dict, projection: str, generation: int):
+        """Cache a database read, unless a write happened while it was in flight or it is an
+        "auth" read; password fields are dropped from whatever is cached"""
+        if generation != self._generation or not user.get("user_id") or not self.cacheable(projection):
+            return
+        user = without_secrets(user)
+        entries = {self._key(projection, user["user_id"]): json.dumps(user, default=str)}
+        if user.get("email"):
+            entries[f"email:{user['email']}"] = user["user_id"]
+        for key, value in entries.items():
+            self.local.set(key, value)
+            if self.shared:
+                self.shared.set(key, value)
+
+    def _drop_local(self, user_id: str):
+        self._generation += 1
+        self.local.delete(*[self._key(projection, user_id) for projection in self.projections])
+
+    def invalidate(self, user_id: str):
+        """Drop every cached projection of a user, here and in the other workers"""
+        self.invalidations += 1
+        self._drop_local(user_id)
+        if self.shared:
+            self.shared.invalidate(user_id, [self._key(projection, user_id) for projection in self.projections])
+
+    def clear(self):
+        self._generation += 1
+        self.local.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "size": len(self.local),
+            "max_size": self.local.maxsize,
+            "ttl_seconds": self.local.ttl,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.local.evictions,
+            "invalidations": self.invalidations,
+            "shared_tier": "redis" if self.shared else None,
+            "shared_errors": self.shared.errors if self.shared else 0
+        }
@@ -3,6 +3,7 @@
 import { useState, useEffect } from "react"
 import Link from "next/link"
 import { useAuth } from "@/lib/auth-context"
+import { resolveFileUrl } from "@/lib/file-url"
 import { User, MessageSquare, HelpCircle, Shield, Settings } from "lucide-react"
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
@@ -46,7 +47,7 @@ export default function Header() {
         if (response.ok) {
           const data = await response.json()
           const photo = data.profile?.photo || data.photo || ""
-          setUserPhoto(photo)
+          setUserPhoto(resolveFileUrl(photo))
         }
       } catch (error) {
         console.error("Error loading user photo:", error)
@@ -79,6 +79,13 @@ export class AdminApiClient {
     })
   }
 
+  // Re-send the status email of the submission's current version (after notified: false)
+  static async resendStatusNotification(trackingId: string) {
+    return this.makeRequest(`/admin/submissions/${trackingId}/notify`, {
+      method: 'POST'
+    })
+  }
+
   static async deleteSubmission(trackingId: string) {
     return this.makeRequest(`/admin/submissions/${trackingId}`, {
       method: 'DELETE'
@@ -138,6 +145,14 @@ export class AdminApiClient {
     }
   }
 
+  // Ranked search over submissions, tickets and chat; the server returns only the top matches
+  static async search(query: string, kinds?: Array<'submission' | 'ticket' | 'chat'>, limit?: number) {
+    const params = new URLSearchParams({ q: query })
+    if (kinds && kinds.length) params.append('kinds', kinds.join(','))
+    if (limit) params.append('limit', String(limit))
+    return this.makeRequest(`/admin/search?${params.toString()}`)
+  }
+
   // Admin tickets
   static async getTickets() {
     return this.makeRequest('/admin/tickets')
@@ -151,8 +166,9 @@ export class AdminApiClient {
   }
 
   // Admin messages
-  static async getMessages() {
-    return this.makeRequest('/admin/messages')
+  // since: next_since of an earlier call, to fetch only newer messages
+  static async getMessages(since?: string | null) {
+    return this.makeRequest(since ? `/admin/messages?since=${encodeURIComponent(since)}` : '/admin/messages')
   }
 
   static async sendMessageToUser(userId: string, message: string) {
@@ -162,6 +178,17 @@ export class AdminApiClient {
     })
   }
 
+  // Chat sidebar: one summary per user with last message and unread counts
+  static async getChatUsers() {
+    return this.makeRequest('/chat/users')
+  }
+
+  static async markConversationRead(userId: string) {
+    return this.makeRequest(`/chat/conversations/${userId}/read`, {
+      method: 'POST'
+    })
+  }
+
   // Admin users
   static async getUsers() {
     return this.makeRequest('/admin/users')
@@ -0,0 +1,135 @@
+// Push delivery for chat messages over Server-Sent Events
+// Replaces polling /chat/messages: the backend pushes each new or deleted message,
+// and EventSource reconnects on its own, resuming from the last message it saw.
+// EventSource cannot send the Authorization header, so each connection opens with a
+// short-lived ticket from POST /chat/stream/ticket; once a ticket has expired and the
+// browser gives up reconnecting, a fresh ticket is fetched and the stream resumes.
+// fetchChatMessages reads /chat/messages by cursor: the newest page on first load,
+// then only messages after next_since, so no view re-downloads the whole history.
+
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
+const RECONNECT_DELAY_MS = 3000
+
+export interface ChatStreamMessage {
+  message_id: string
+  user_id: string
+  sender: "user" | "admin"
+  text: string
+  timestamp: string
+  created_at?: string
+}
+
+export interface ChatStreamHandlers {
+  onMessage?: (message: ChatStreamMessage) => void
+  onDelete?: (event: { message_id: string; user_id: string }) => void
+}
+
+export interface ChatMessagesPage {
+  messages: ChatStreamMessage[]
+  next_since?: string | null
+  next_before?: string | null
+  has_more?: boolean
+}
+
+// since: a next_since cursor (delta sync); before + limit: the page of older history
+export async function fetchChatMessages(
+  options: { since?: string | null; before?: string | null; limit?: number; userId?: string } = {}
+): Promise<ChatMessagesPage | null> {
+  const token = localStorage.getItem("token")
+  if (!token) return null
+  const params = new URLSearchParams()
+  if (options.since) params.set("since", options.since)
+  if (options.before) params.set("before", options.before)
+  if (options.limit) params.set("limit", String(options.limit))
+  if (options.userId) params.set("user_id", options.userId)
+  const response = await fetch(`${API_BASE_URL}/chat/messages?${params.toString()}`, {
+    headers: { "Authorization": `Bearer ${token}` }
+  })
+  if (!response.ok) return null
+  return response.json()
+}
+
+// Add incoming messages to a list, replacing any with the same id, in timestamp order
+export function mergeChatMessages<T extends { id: string; timestamp?: string }>(current: T[], incoming: T[]): T[] {
+  if (incoming.length === 0) return current
+  const byId = new Map(current.map((message) => [message.id, message] as [string, T]))
+  incoming.forEach((message) => byId.set(message.id, message))
+  return Array.from(byId.values()).sort((a, b) => (a.timestamp || "").localeCompare(b.timestamp || ""))
+}
+
+async function fetchTicket(token: string, userId?: string): Promise<string | null> {
+  const query = userId ? `?${new URLSearchParams({ user_id: userId }).toString()}` : ""
+  const response = await fetch(`${API_BASE_URL}/chat/stream/ticket${query}`, {
+    method: "POST",
+    headers: { "Authorization": `Bearer ${token}` }
+  })
+  if (!response.ok) return null
+  const data = await response.json()
+  return data.ticket || null
+}
+
+// Returns an unsubscribe function; userId limits an admin stream to one conversation
+export function subscribeToChat(handlers: ChatStreamHandlers, userId?: string): () => void {
+  const token = localStorage.getItem("token")
+  if (!token || typeof EventSource === "undefined") {
+    return () => {}
+  }
+
+  let source: EventSource | null = null
+  let closed = false
+  let lastEventId = ""
+  let retryTimer: ReturnType<typeof setTimeout> | null = null
+
+  const connect = async () => {
+    let ticket: string | null = null
+    try {
+      ticket = await fetchTicket(token, userId)
+    } catch (error) {
+      console.error("[ChatStream] Could not get a stream ticket:", error)
+    }
+    if (closed) return
+    if (!ticket) {
+      retryTimer = setTimeout(connect, RECONNECT_DELAY_MS)
+      return
+    }
+
+    const params = new URLSearchParams({ ticket })
+    if (userId) params.set("user_id", userId)
+    if (lastEventId) params.set("since", lastEventId)
+    source = new EventSource(`${API_BASE_URL}/chat/stream?${params.toString()}`)
+
+    source.addEventListener("message", (event) => {
+      const messageEvent = event as MessageEvent
+      if (messageEvent.lastEventId) lastEventId = messageEvent.lastEventId
+      try {
+        handlers.onMessage?.(JSON.parse(messageEvent.data))
+      } catch (error) {
+        console.error("[ChatStream] Bad message event:", error)
+      }
+    })
+
+    source.addEventListener("delete", (event) => {
+      try {
+        handlers.onDelete?.(JSON.parse((event as MessageEvent).data))
+      } catch (error) {
+        console.error("[ChatStream] Bad delete event:", error)
+      }
+    })
+
+    // The browser retries dropped connections itself, but stops once the ticket is refused
+    source.addEventListener("error", () => {
+      if (source?.readyState === EventSource.CLOSED && !closed) {
+        source = null
+        retryTimer = setTimeout(connect, RECONNECT_DELAY_MS)
+      }
+    })
+  }
+
+  connect()
+
+  return () => {
+    closed = true
+    if (retryTimer) clearTimeout(retryTimer)
+    source?.close()
+  }
+}
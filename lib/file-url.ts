@@ -0,0 +1,12 @@
+// Resolve file URLs returned by the backend for use in <img src> and links
+// Uploads kept in the backend file store come back as "/files/{id}?expires=...&signature=...",
+// signed links the API hands out since the browser sends no header; they only need the API host.
+
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
+
+export function resolveFileUrl(url?: string | null): string {
+  if (!url || !url.startsWith("/files/")) {
+    return url || ""
+  }
+  return `${API_BASE_URL}${url}`
+}
@@ -12,6 +12,8 @@ class StatusUpdater {
   private static instance: StatusUpdater
   private updateInterval: NodeJS.Timeout | null = null
   private lastCheckTime: string = new Date().toISOString()
+  // ETag of the last status seen per tracking ID, so unchanged submissions answer 304
+  private etags: Map<string, string> = new Map()
 
   static getInstance(): StatusUpdater {
     if (!StatusUpdater.instance) {
@@ -53,15 +55,23 @@ class StatusUpdater {
         const submission = updatedSubmissions[i]
         
         try {
-          // Try to fetch latest status from backend
-          const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/track/${submission.trackingId}`, {
-            headers: {
-              'Authorization': `Bearer ${localStorage.getItem('token')}`,
-              'Content-Type': 'application/json'
-            }
+          // Try to fetch latest status from backend; the status-only endpoint skips form data
+          const headers: Record<string, string> = {
+            'Authorization': `Bearer ${localStorage.getItem('token')}`,
+            'Content-Type': 'application/json'
+          }
+          const etag = this.etags.get(submission.trackingId)
+          if (etag) headers['If-None-Match'] = etag
+
+          const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/track/${submission.trackingId}/status`, {
+            headers
           })
 
+          if (response.status === 304) continue
+
           if (response.ok) {
+            const newEtag = response.headers.get('ETag')
+            if (newEtag) this.etags.set(submission.trackingId, newEtag)
             const data = await response.json()
             
             // Check if status has changed